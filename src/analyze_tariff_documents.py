@@ -15,6 +15,8 @@ from pptx import Presentation
 from PyPDF2 import PdfReader
 import re
 
+from src import country_registry
+
 # 로깅 설정
 logging.basicConfig(
     level=logging.INFO,
@@ -33,18 +35,8 @@ DATA_DIR = os.path.join(ROOT_DIR, 'data')
 NEW_TARIFF_DOCS_DIR = os.path.join(DATA_DIR, 'new_tariff_docs')
 TARIFF_DATA_DIR = os.path.join(DATA_DIR, 'tariff_data')
 
-# 대상 국가 목록 (ISO 코드)
-TARGET_COUNTRIES = {
-    'KR': '대한민국',
-    'JP': '일본',
-    'CN': '중국',
-    'IN': '인도',
-    'TH': '태국',
-    'VN': '베트남',
-    'TW': '대만',
-    'EU': '유럽연합',
-    'MX': '멕시코'
-}
+# 대상 국가 목록 (ISO 코드, data/countries.json의 국가 레지스트리)
+TARGET_COUNTRIES = country_registry.target_countries()
 
 def validate_document_format(file_path):
     """
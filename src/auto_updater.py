@@ -12,8 +12,8 @@ import json
 import logging
 import importlib
 from datetime import datetime
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.cron import CronTrigger
+
+from src import scheduler_leader
 
 # 로깅 설정
 logging.basicConfig(
@@ -33,24 +33,28 @@ ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(ROOT_DIR, 'data')
 
 def update_all_data():
-    """모든 데이터를 업데이트합니다."""
+    """모든 데이터를 업데이트합니다.
+
+    파이프라인 실행부터 세대 게시까지 업데이트 잠금(data/update.lock)을 잡고 실행합니다.
+    대시보드 작업자나 다른 업데이트 프로세스가 이미 업데이트 중이면 건너뛰고 False를 반환합니다.
+    """
+    update_pipeline = importlib.import_module('src.update_pipeline')
+    try:
+        with update_pipeline.update_lock():
+            return _run_update(update_pipeline)
+    except update_pipeline.UpdateInProgressError as e:
+        logger.warning(f"데이터 업데이트 건너뜀: {str(e)}")
+        return False
+
+def _run_update(update_pipeline):
+    """업데이트 잠금을 잡은 상태에서 파이프라인을 실행하고 업데이트 이력을 기록합니다."""
     try:
         logger.info("데이터 업데이트 시작...")
         
-        # 관세 데이터 수집 모듈 임포트 및 실행
-        logger.info("관세 데이터 수집 모듈 실행 중...")
-        tariff_collector = importlib.import_module('src.tariff_data_collector')
-        tariff_collector.collect_tariff_data()
-        
-        # 제조 비용 시뮬레이션 모듈 임포트 및 실행
-        logger.info("제조 비용 시뮬레이션 모듈 실행 중...")
-        cost_simulator = importlib.import_module('src.manufacturing_cost_simulator')
-        cost_simulator.collect_all_cost_data()
-        
-        # 수출 가격 계산기 모듈 임포트 및 실행
-        logger.info("수출 가격 계산기 모듈 실행 중...")
-        export_calculator = importlib.import_module('src.export_price_calculator')
-        export_calculator.calculate_export_prices_for_products()
+        # 업데이트 파이프라인 실행 (관세 수집, 비용 수집, 비용 지수, 카테고리 지수, 수출 지수)
+        run = update_pipeline.run_update_pipeline(
+            progress=lambda stage, event: logger.info(f"파이프라인 단계 '{stage}': {event}"), lock=False)
+        cache_hits = run.report['cache_hits']
         
         logger.info("데이터 업데이트 완료")
         
@@ -59,6 +63,10 @@ def update_all_data():
         with open(os.path.join(DATA_DIR, 'last_update.txt'), 'w', encoding='utf-8') as f:
             f.write(update_time)
         
+        # 새 데이터 세대 게시 및 보존 기간이 지난 세대 정리
+        snapshot_store = importlib.import_module('src.snapshot_store')
+        generation_id = snapshot_store.publish_and_collect()
+        
         # 업데이트 이력 기록
         update_history_file = os.path.join(DATA_DIR, 'update_history.json')
         
@@ -73,7 +81,9 @@ def update_all_data():
         
         update_history['updates'].append({
             'timestamp': update_time,
-            'status': 'success'
+            'status': 'success',
+            'cache_hits': cache_hits,
+            'generation_id': generation_id
         })
         
         # 최대 100개의 업데이트 이력만 유지
@@ -116,17 +126,14 @@ def update_all_data():
         return False
 
 def setup_scheduler():
-    """데이터 자동 업데이트를 위한 스케줄러를 설정합니다."""
-    scheduler = BackgroundScheduler()
-    
-    # 매일 03:00, 06:00, 21:00에 데이터 업데이트
-    scheduler.add_job(update_all_data, CronTrigger(hour=3, minute=0))
-    scheduler.add_job(update_all_data, CronTrigger(hour=6, minute=0))
-    scheduler.add_job(update_all_data, CronTrigger(hour=21, minute=0))
-    
-    # 스케줄러 시작
-    scheduler.start()
-    logger.info("스케줄러 시작됨 - 매일 03:00, 06:00, 21:00에 데이터 업데이트")
+    """데이터 자동 업데이트를 위한 스케줄러를 설정합니다.
+
+    매일 03:00, 06:00, 21:00 예약 업데이트는 리더로 선출된 프로세스만 실행합니다.
+    (여러 업데이트 프로세스나 대시보드 작업자가 함께 실행되어도 파이프라인이 동시에 실행되지 않음)
+    """
+    scheduler = scheduler_leader.start_scheduler(update_all_data)
+    logger.info(f"스케줄러 시작됨 - 매일 03:00, 06:00, 21:00에 데이터 업데이트 "
+                f"(리더: {'예' if scheduler.lease.is_leader else '아니오'})")
     
     return scheduler
 
@@ -166,13 +173,13 @@ def run_updater():
     """자동 업데이트 메커니즘을 실행합니다."""
     logger.info("자동 업데이트 메커니즘 시작")
     
-    # 초기 데이터 업데이트
-    logger.info("초기 데이터 업데이트 실행")
-    update_all_data()
-    
-    # 스케줄러 설정
+    # 스케줄러 설정 (리더 선출)
     scheduler = setup_scheduler()
     
+    # 초기 데이터 업데이트 (리더만 실행)
+    logger.info("초기 데이터 업데이트 실행")
+    scheduler.run_job()
+    
     try:
         # 업데이트 상태 모니터링
         while True:
@@ -0,0 +1,217 @@
+"""
+차트 렌더링 서비스
+
+이 모듈은 제조 비용 지수와 수출 가격 지수 막대 그래프 렌더링을 담당합니다.
+- 차트는 처음 요청될 때 렌더링하고 (차트 종류, 데이터 버전, 형식, 크기, DPI) 키로 캐시합니다.
+- SVG와 저해상도 PNG(기본 100 DPI)를 지원합니다.
+- pyplot 전역 상태를 쓰지 않고 Figure 객체를 직접 만들며, 렌더링이 끝나면 항상 해제합니다.
+  (장시간 실행되는 스케줄러 프로세스에서 그림이 누적되지 않음)
+- matplotlib은 처음 렌더링할 때 로드합니다.
+- submit()은 작업자 풀에서 렌더링하므로 호출한 쪽(업데이트 파이프라인 등)을 막지 않습니다.
+
+데이터 버전을 지정하지 않으면 차트 데이터의 해시를 버전으로 사용합니다.
+"""
+
+import os
+import io
+import json
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from src import country_registry
+
+# 지원 형식 (형식, MIME 타입)
+FORMATS = {
+    'svg': 'image/svg+xml',
+    'png': 'image/png'
+}
+
+# 기본 그림 크기(인치)와 PNG 해상도
+DEFAULT_SIZE = (12, 8)
+PNG_DPI = 100
+
+# 캐시 항목 수 상한
+MAX_ENTRIES = 128
+
+# 차트 종류 정의 (제목 형식, y축 레이블, 막대 색상, 한국 막대 색상)
+# 제목 형식의 {category}에는 제품 카테고리 이름이 들어갑니다.
+ChartKind = namedtuple('ChartKind', ['title', 'category_title', 'ylabel', 'color', 'highlight'])
+
+CHART_KINDS = {
+    'manufacturing_cost': ChartKind(
+        title='국가별 제조 비용 지수 (대한민국 = 100)',
+        category_title='{category} 제조 비용 지수 (대한민국 = 100)',
+        ylabel='비용 지수', color='skyblue', highlight='red'),
+    'product_category': ChartKind(
+        title='국가별 제조 비용 지수 (대한민국 = 100)',
+        category_title='{category} 제조 비용 지수 (대한민국 = 100)',
+        ylabel='비용 지수', color='lightgreen', highlight='red'),
+    'export_price': ChartKind(
+        title='국가별 미국 수출 가격 지수 (대한민국 = 100)',
+        category_title='{category} - 국가별 미국 수출 가격 지수 (대한민국 = 100)',
+        ylabel='가격 지수', color='lightcoral', highlight='blue')
+}
+
+def data_version(index, category=None):
+    """차트 데이터의 해시를 데이터 버전으로 반환합니다."""
+    payload = json.dumps([category, sorted(index.items())], ensure_ascii=False, default=float)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+def draw_index_chart(figure, kind, index, category=None):
+    """국가별 지수 막대 그래프를 그림에 그립니다. (대한민국 막대를 맨 앞에 강조)"""
+    spec = CHART_KINDS[kind]
+    names = country_registry.target_countries()
+    codes = list(index.keys())
+    if 'KR' in codes:
+        codes.insert(0, codes.pop(codes.index('KR')))
+    labels = [names.get(code, code) for code in codes]
+    values = [index[code] for code in codes]
+
+    ax = figure.add_subplot(1, 1, 1)
+    bars = ax.bar(labels, values, color=spec.color)
+    if codes and codes[0] == 'KR':
+        bars[0].set_color(spec.highlight)
+
+    ax.set_title(spec.category_title.format(category=category) if category else spec.title, fontsize=16)
+    ax.set_xlabel('국가', fontsize=14)
+    ax.set_ylabel(spec.ylabel, fontsize=14)
+    ax.tick_params(axis='x', labelrotation=45)
+    for label in ax.get_xticklabels():
+        label.set_horizontalalignment('right')
+
+    # 값 표시
+    for i, v in enumerate(values):
+        ax.text(i, v + 2, f'{v:.1f}', ha='center', fontsize=12)
+
+    ax.grid(axis='y', linestyle='--', alpha=0.7)
+    figure.tight_layout()
+
+def render_chart(kind, index, category=None, fmt='svg', size=DEFAULT_SIZE, dpi=PNG_DPI):
+    """차트를 렌더링하여 바이트로 반환합니다. 그림은 렌더링 후 항상 해제됩니다."""
+    if kind not in CHART_KINDS:
+        raise ValueError(f"알 수 없는 차트 종류: {kind}")
+    if fmt not in FORMATS:
+        raise ValueError(f"지원하지 않는 차트 형식: {fmt}")
+
+    # matplotlib은 처음 렌더링할 때 로드 (대시보드 import 시간 단축)
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.backends.backend_svg import FigureCanvasSVG
+
+    # pyplot을 거치지 않으므로 전역 그림 목록에 등록되지 않음
+    figure = Figure(figsize=size, dpi=dpi)
+    canvas = FigureCanvasSVG(figure) if fmt == 'svg' else FigureCanvasAgg(figure)
+    try:
+        draw_index_chart(figure, kind, index, category)
+        buffer = io.BytesIO()
+        canvas.print_figure(buffer, format=fmt, dpi=dpi)
+        return buffer.getvalue()
+    finally:
+        figure.clear()
+
+class ChartService:
+    """차트 렌더링 결과 캐시와 작업자 풀
+
+    같은 키의 렌더링이 동시에 요청되면 한 번만 렌더링하고 결과를 공유합니다.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, workers=1):
+        self.max_entries = max_entries
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._pending = {}
+        self._executor = None
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def cache_key(kind, version, category, fmt, size, dpi):
+        """캐시 키를 반환합니다. SVG는 해상도와 무관하므로 DPI를 키에서 제외합니다."""
+        return (kind, version, category, fmt, tuple(size), None if fmt == 'svg' else dpi)
+
+    def render(self, kind, index, category=None, fmt='svg', size=DEFAULT_SIZE, dpi=PNG_DPI, version=None):
+        """차트 바이트를 반환합니다. 캐시에 없을 때만 렌더링합니다."""
+        if version is None:
+            version = data_version(index, category)
+        key = self.cache_key(kind, version, category, fmt, size, dpi)
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return self._entries[key]
+            self._misses += 1
+            event = self._pending.get(key)
+            owner = event is None
+            if owner:
+                event = self._pending[key] = threading.Event()
+
+        if not owner:
+            # 다른 스레드가 같은 차트를 렌더링 중이면 결과를 기다림
+            event.wait()
+            with self._lock:
+                if key in self._entries:
+                    return self._entries[key]
+            return self.render(kind, index, category, fmt, size, dpi, version)
+
+        try:
+            content = render_chart(kind, index, category, fmt, size, dpi)
+            with self._lock:
+                self._entries[key] = content
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return content
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+            event.set()
+
+    def save(self, file_path, kind, index, category=None, fmt=None, size=DEFAULT_SIZE, dpi=PNG_DPI, version=None):
+        """차트를 파일로 저장하고 경로를 반환합니다. 형식은 생략하면 파일 확장자로 정합니다."""
+        fmt = fmt or os.path.splitext(file_path)[1].lstrip('.').lower()
+        content = self.render(kind, index, category, fmt, size, dpi, version)
+        temp_path = f"{file_path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(content)
+        os.replace(temp_path, file_path)
+        return file_path
+
+    def submit(self, func, *args, **kwargs):
+        """func(렌더링 작업, 예: self.save)를 작업자 풀에서 실행하고 Future를 반환합니다."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='chart')
+            executor = self._executor
+        return executor.submit(func, *args, **kwargs)
+
+    def invalidate(self):
+        """캐시된 차트를 모두 비웁니다."""
+        with self._lock:
+            self._entries.clear()
+
+    def shutdown(self, wait=True):
+        """작업자 풀을 종료합니다."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def stats(self):
+        """캐시 적중/실패 횟수와 항목 수를 반환합니다."""
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'entries': len(self._entries),
+                'bytes': sum(len(content) for content in self._entries.values())
+            }
+
+# 프로세스 전체에서 공유하는 차트 서비스
+_service = ChartService()
+
+def get_service():
+    """프로세스 전체에서 공유하는 차트 서비스를 반환합니다."""
+    return _service
@@ -0,0 +1,89 @@
+"""
+제조 비용 지수 계산 엔진
+
+이 모듈은 국가×비용 요소 행렬을 사용하여 제조 비용 지수를 계산합니다.
+- 모든 비용 요소를 기준 국가(한국) 행으로 한 번에 정규화
+- 정규화된 행렬과 가중치 벡터의 행렬-벡터 곱으로 비용 지수 계산
+- 여러 가중치 벡터(제품 카테고리, 가정 시나리오)를 한 번의 호출로 계산
+"""
+
+import numpy as np
+
+from src import country_registry
+
+# 비용 요소 목록 (행렬의 열 순서)
+COST_FACTORS = [
+    'corporate_tax',
+    'interest_rate',
+    'labor_cost',
+    'land_cost',
+    'utility_cost',
+    'logistics_cost',
+    'fx_inflation_risk'
+]
+
+# 기준 국가 (지수 = 100)
+BASE_COUNTRY = 'KR'
+
+def build_factor_matrix(factor_values, countries):
+    """비용 요소별 국가 데이터를 국가×비용 요소 행렬로 변환합니다.
+
+    factor_values는 {비용 요소: {국가 코드: 값}} 형식입니다. 값이 없는 국가가 있으면 KeyError를 발생시킵니다.
+    """
+    factor_matrix = np.column_stack([
+        country_registry.to_vector(factor_values[factor], countries, np.nan) for factor in COST_FACTORS
+    ]).reshape(len(countries), len(COST_FACTORS))
+    missing = np.isnan(factor_matrix)
+    if missing.any():
+        rows, columns = np.nonzero(missing)
+        raise KeyError(f"비용 요소 데이터가 없는 국가: {COST_FACTORS[columns[0]]}/{list(countries)[rows[0]]}")
+    return factor_matrix
+
+def build_weight_matrix(weights_list):
+    """가중치 딕셔너리 목록을 가중치 행렬(가중치 집합×비용 요소)로 변환합니다."""
+    return np.array(
+        [[weights[factor] for factor in COST_FACTORS] for weights in weights_list],
+        dtype=float
+    )
+
+def normalize_factor_matrix(factor_matrix, base_row):
+    """모든 비용 요소를 기준 국가 행 대비 100 기준으로 정규화합니다."""
+    return factor_matrix / factor_matrix[base_row] * 100
+
+def compute_cost_index(normalized_matrix, weights):
+    """정규화된 국가×비용 요소 행렬과 가중치로 비용 지수를 계산합니다.
+
+    weights가 (비용 요소,) 벡터이면 (국가,) 배열을, (가중치 집합, 비용 요소) 행렬이면
+    (가중치 집합, 국가) 배열을 반환합니다. 비용 요소 순서대로 누적하므로 기존
+    딕셔너리 기반 계산과 부동소수점 결과가 동일합니다.
+    """
+    weights = np.asarray(weights, dtype=float)
+    weight_matrix = np.atleast_2d(weights)
+
+    # (가중치 집합, 국가) 결과를 비용 요소 순서대로 누적
+    result = normalized_matrix[np.newaxis, :, 0] * weight_matrix[:, 0, np.newaxis]
+    for column in range(1, normalized_matrix.shape[1]):
+        result = result + normalized_matrix[np.newaxis, :, column] * weight_matrix[:, column, np.newaxis]
+
+    return result[0] if weights.ndim == 1 else result
+
+def calculate_cost_indices(factor_values, weights_list, countries, base_country=BASE_COUNTRY):
+    """비용 요소 데이터와 가중치 목록으로 정규화 행렬과 비용 지수 행렬을 계산합니다.
+
+    (정규화된 국가×비용 요소 행렬, 가중치 집합×국가 비용 지수 행렬)을 반환합니다.
+    """
+    factor_matrix = build_factor_matrix(factor_values, countries)
+    normalized_matrix = normalize_factor_matrix(factor_matrix, list(countries).index(base_country))
+    cost_indices = compute_cost_index(normalized_matrix, build_weight_matrix(weights_list))
+    return normalized_matrix, cost_indices
+
+def to_country_dict(values, countries):
+    """국가 순서의 배열을 {국가 코드: 값} 딕셔너리로 변환합니다."""
+    return {country: float(value) for country, value in zip(countries, values)}
+
+def normalized_factor_dicts(normalized_matrix, countries):
+    """정규화된 행렬을 {비용 요소: {국가 코드: 값}} 딕셔너리로 변환합니다."""
+    return {
+        factor: to_country_dict(normalized_matrix[:, column], countries)
+        for column, factor in enumerate(COST_FACTORS)
+    }
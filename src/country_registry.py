@@ -0,0 +1,152 @@
+"""
+국가 레지스트리
+
+이 모듈은 분석 대상 원산지 국가 목록을 데이터 파일(data/countries.json)에서 로드하여
+모든 엔진이 공유하는 정수 국가 ID 공간을 제공합니다.
+- 국가 ID는 레지스트리의 국가 순서이며 비용·관세·수출 엔진 배열의 국가 축 인덱스로 사용
+- 국가 코드 → ID 변환은 정렬된 코드 배열의 이진 탐색으로 일괄 처리 (국가별 Python 반복 없음)
+- {국가 코드: 값} 딕셔너리와 국가 축 배열 사이의 변환도 배열 연산으로 처리
+- 국가별 샘플 데이터(기업세율, 임금, 화물 비용 등)도 국가 목록 파일의 parameters에서 국가 축 배열로 제공
+"""
+
+import os
+import json
+import threading
+import numpy as np
+
+# 프로젝트 루트 디렉토리 경로
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 국가 목록 파일
+COUNTRIES_FILE = os.path.join(ROOT_DIR, 'data', 'countries.json')
+
+# 기준 국가 (설정 파일에 없을 때)
+DEFAULT_BASE_COUNTRY = 'KR'
+
+def _search(sorted_codes, order, keys):
+    """정렬된 코드 배열에서 keys의 원래 위치를 이진 탐색합니다. 없는 코드는 -1입니다."""
+    keys = np.asarray(keys, dtype=str).reshape(-1)
+    if len(sorted_codes) == 0:
+        return np.full(len(keys), -1, dtype=np.int64)
+    positions = np.minimum(np.searchsorted(sorted_codes, keys), len(sorted_codes) - 1)
+    found = sorted_codes[positions] == keys
+    return np.where(found, order[positions], -1).astype(np.int64)
+
+def lookup(codes, keys):
+    """keys의 각 국가 코드가 codes 배열에서 차지하는 위치를 반환합니다. 없는 코드는 -1입니다."""
+    codes = np.asarray(codes, dtype=str)
+    order = np.argsort(codes, kind='stable')
+    return _search(codes[order], order, keys)
+
+def to_vector(values, codes, default=0.0):
+    """{국가 코드: 값} 딕셔너리를 codes 순서의 배열로 변환합니다. 없는 국가는 default입니다."""
+    result = np.full(len(codes), default, dtype=float)
+    if values:
+        positions = lookup(codes, list(values))
+        known = positions >= 0
+        result[positions[known]] = np.fromiter(values.values(), dtype=float, count=len(values))[known]
+    return result
+
+class CountryRegistry:
+    """국가 코드·이름 배열과 정수 국가 ID 조회를 제공하는 레지스트리입니다."""
+
+    def __init__(self, codes, names, base_country=DEFAULT_BASE_COUNTRY, parameters=None):
+        self.codes = np.asarray(codes, dtype=str)
+        self.names = np.asarray(names, dtype=str)
+        if len(self.codes) != len(self.names):
+            raise ValueError("국가 코드와 국가명의 개수가 다릅니다.")
+        # {파라미터 이름: 국가 ID 순서 배열} (값이 없는 국가는 NaN)
+        self.parameters = {name: np.asarray(values, dtype=float) for name, values in (parameters or {}).items()}
+        if any(values.shape != self.codes.shape for values in self.parameters.values()):
+            raise ValueError("국가 파라미터의 개수가 국가 개수와 다릅니다.")
+        if len(np.unique(self.codes)) != len(self.codes):
+            raise ValueError("국가 코드가 중복되었습니다.")
+
+        # 이진 탐색용 정렬 색인 (한 번만 계산)
+        self._order = np.argsort(self.codes, kind='stable')
+        self._sorted_codes = self.codes[self._order]
+        self.base_country = base_country
+        self.base_id = self.id_of(base_country)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def ids_of(self, codes):
+        """국가 코드 배열의 국가 ID 배열을 반환합니다. 등록되지 않은 코드는 -1입니다."""
+        return _search(self._sorted_codes, self._order, codes)
+
+    def id_of(self, code):
+        """국가 코드의 국가 ID를 반환합니다. 등록되지 않은 코드는 KeyError를 발생시킵니다."""
+        country_id = int(self.ids_of([code])[0])
+        if country_id < 0:
+            raise KeyError(f"등록되지 않은 국가 코드: {code}")
+        return country_id
+
+    def names_by_code(self):
+        """{국가 코드: 국가명} 딕셔너리를 레지스트리 순서로 반환합니다."""
+        return dict(zip(self.codes.tolist(), self.names.tolist()))
+
+    def vector(self, values, default=0.0):
+        """{국가 코드: 값} 딕셔너리를 국가 ID 순서의 배열로 변환합니다."""
+        return to_vector(values, self.codes, default)
+
+    def to_dict(self, values):
+        """국가 ID 순서의 배열을 {국가 코드: 값} 딕셔너리로 변환합니다."""
+        return dict(zip(self.codes.tolist(), np.asarray(values, dtype=float).tolist()))
+
+    def parameter(self, name, default=None):
+        """국가 파라미터를 국가 ID 순서의 배열로 반환합니다.
+
+        값이 없는 국가는 default를 사용하며, default가 None이면 KeyError를 발생시킵니다.
+        """
+        values = self.parameters.get(name)
+        if values is None:
+            values = np.full(len(self.codes), np.nan)
+        missing = np.isnan(values)
+        if missing.any():
+            if default is None:
+                raise KeyError(f"국가 파라미터 {name}가 없는 국가: {', '.join(self.codes[missing].tolist())}")
+            values = np.where(missing, float(default), values)
+        return values
+
+def read_registry(file_path=COUNTRIES_FILE):
+    """국가 목록 파일에서 국가 레지스트리를 생성합니다."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    countries = config.get('countries', [])
+    names = list(dict.fromkeys(name for country in countries for name in country.get('parameters') or {}))
+    return CountryRegistry(
+        [country['code'] for country in countries],
+        [country.get('name', country['code']) for country in countries],
+        config.get('base_country', DEFAULT_BASE_COUNTRY),
+        {name: [(country.get('parameters') or {}).get(name, np.nan) for country in countries] for name in names}
+    )
+
+# 프로세스 전체에서 공유하는 레지스트리 (국가 목록 파일이 바뀌면 다시 로드)
+_registry_lock = threading.Lock()
+_registry_cache = {}
+
+def get_registry(file_path=COUNTRIES_FILE):
+    """국가 목록 파일의 레지스트리를 반환합니다. 파일이 바뀌지 않았다면 다시 읽지 않습니다."""
+    stat = os.stat(file_path)
+    token = (stat.st_mtime_ns, stat.st_size)
+    with _registry_lock:
+        cached = _registry_cache.get(file_path)
+        if cached is None or cached[0] != token:
+            cached = (token, read_registry(file_path))
+            _registry_cache[file_path] = cached
+        return cached[1]
+
+def target_countries():
+    """분석 대상 {국가 코드: 국가명} 딕셔너리를 레지스트리 순서로 반환합니다."""
+    return get_registry().names_by_code()
+
+def country_codes():
+    """분석 대상 국가 코드 목록을 국가 ID 순서로 반환합니다."""
+    return get_registry().codes.tolist()
+
+def country_parameter(name, default=None):
+    """국가 파라미터를 {국가 코드: 값} 딕셔너리로 레지스트리 순서로 반환합니다."""
+    registry = get_registry()
+    return registry.to_dict(registry.parameter(name, default))
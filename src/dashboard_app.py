@@ -8,19 +8,21 @@
 - 수출 가격 비교 페이지
 """
 
-from flask import Flask, render_template, request, jsonify, redirect, url_for
+from flask import Flask, Response, render_template, request, jsonify, redirect, url_for, g, has_request_context
 import os
 import json
-import pandas as pd
-from datetime import datetime
-import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.use('Agg')  # 서버 환경에서 그래프 생성을 위한 백엔드 설정
-import io
-import base64
-from apscheduler.schedulers.background import BackgroundScheduler
-import sys
+from datetime import datetime, timezone
+import functools
+import numpy as np
 import importlib
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from src import chart_service, country_registry, hs_export_pipeline, hs_index, manufacturing_cost_simulator, scenario_engine, sensitivity, shared_snapshot, snapshot_store, tariff_store
 
 # 프로젝트 루트 디렉토리 경로
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -35,26 +37,52 @@ STATIC_DIR = os.path.join(ROOT_DIR, 'static')
 # 템플릿 디렉토리 경로
 TEMPLATE_DIR = os.path.join(ROOT_DIR, 'templates')
 
-# 대상 국가 목록 (ISO 코드)
-TARGET_COUNTRIES = {
-    'KR': '대한민국',
-    'JP': '일본',
-    'CN': '중국',
-    'IN': '인도',
-    'TH': '태국',
-    'VN': '베트남',
-    'TW': '대만',
-    'EU': '유럽연합',
-    'MX': '멕시코'
-}
+# 데이터 버전 마커 (데이터 업데이트가 완료될 때마다 갱신됨)
+DATA_VERSION_FILE = os.path.join(DATA_DIR, 'last_update.txt')
+
+# 데이터 업데이트 작업 기록 DB (작업자 간 공유)
+UPDATE_JOBS_DB = os.path.join(DATA_DIR, 'update_jobs.db')
+
+# 대상 국가 목록 (ISO 코드, data/countries.json의 국가 레지스트리)
+TARGET_COUNTRIES = country_registry.target_countries()
+
+# 응답 캐시 정책
+# - 정적 파일은 하루 동안 캐시
+# - HTML 페이지는 프록시가 1분 동안 반복 요청을 처리
+# - 버전 API와 차트는 저장 후 매번 데이터 버전 ETag로 재검증 (바뀌지 않았으면 304)
+STATIC_MAX_AGE = 86400
+HTML_CACHE_CONTROL = 'public, max-age=60'
+API_CACHE_CONTROL = 'public, no-cache'
 
 # Flask 애플리케이션 생성
 app = Flask(__name__, 
             static_folder=STATIC_DIR,
             template_folder=TEMPLATE_DIR)
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = STATIC_MAX_AGE
+
+@app.before_request
+def pin_data_generation():
+    """요청이 끝날 때까지 같은 데이터 세대를 읽도록 현재 세대를 고정합니다."""
+    g.data_generation = snapshot_store.current_generation()
 
 @app.after_request
 def add_header(response):
+    """응답 종류별 캐시 헤더를 설정합니다.
+
+    - 정적 파일: send_file이 설정한 max-age, ETag, Last-Modified를 그대로 사용
+    - 버전 API(/api/v1/*), 차트: versioned_response가 설정한 데이터 버전 ETag를 그대로 사용
+    - HTML 페이지(GET): 짧은 max-age와 본문 ETag (프록시가 반복 요청을 처리하고 이후에는 304로 재검증)
+    - 그 밖의 응답(작업 상태, POST 등): 캐시 금지
+    """
+    if request.endpoint == 'static' or 'Cache-Control' in response.headers:
+        return response
+    
+    if request.method in ('GET', 'HEAD') and response.status_code == 200 and response.mimetype == 'text/html':
+        response.headers["Cache-Control"] = HTML_CACHE_CONTROL
+        response.last_modified = data_version()[1]
+        response.add_etag()
+        return response.make_conditional(request)
+    
     response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
     response.headers["Pragma"] = "no-cache"
     response.headers["Expires"] = "0"
@@ -70,78 +98,376 @@ def ensure_directories():
     os.makedirs(os.path.join(STATIC_DIR, 'js'), exist_ok=True)
 
 # 데이터 업데이트 함수
-def update_all_data():
-    """모든 데이터를 업데이트합니다."""
-    try:
-        print("데이터 업데이트 시작...")
+def update_all_data(progress=None):
+    """모든 데이터를 업데이트합니다.
+
+    progress가 주어지면 각 단계의 시작과 종료 시 progress(단계 이름, 이벤트)를 호출합니다.
+    이벤트는 'start', 'finish', 'error' 중 하나입니다.
+    파이프라인 실행부터 세대 게시까지 업데이트 잠금을 잡고 실행하며, 다른 프로세스(다른 작업자, 자동 업데이트)가
+    업데이트 중이면 UpdateInProgressError가 발생합니다.
+    """
+    update_pipeline = importlib.import_module('src.update_pipeline')
+    with update_pipeline.update_lock():
+        try:
+            print("데이터 업데이트 시작...")
+            
+            # 업데이트 파이프라인 실행 (관세 수집, 비용 수집, 비용 지수, 카테고리 지수, 수출 지수)
+            update_pipeline.run_update_pipeline(progress=progress, lock=False)
+            
+            print("데이터 업데이트 완료")
+            
+            # 업데이트 시간 기록 (데이터 버전 마커 갱신)
+            update_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            with open(DATA_VERSION_FILE, 'w', encoding='utf-8') as f:
+                f.write(update_time)
+            
+            # 새 데이터 세대 게시 및 보존 기간이 지난 세대 정리
+            snapshot_store.publish_and_collect()
+            
+            # 이전 버전의 캐시 항목 제거
+            snapshot_cache.invalidate()
+            
+            return True
+        except Exception as e:
+            print(f"데이터 업데이트 오류: {str(e)}")
+            return False
+
+# 백그라운드 데이터 업데이트 작업 관리
+class UpdateJobManager:
+    """데이터 업데이트를 백그라운드 작업으로 실행하고 진행 상태를 기록합니다.
+
+    작업 기록은 데이터 디렉토리의 SQLite DB(data/update_jobs.db)에 저장되므로, 작업자(gunicorn)가 여러 개여도
+    어느 작업자에서나 작업 상태를 조회할 수 있습니다. 어느 작업자에서든 실행 중인 작업이 있으면 새 작업을 만들지 않고
+    실행 중인 작업을 반환합니다. 작업을 실행하던 작업자 프로세스가 종료되어 끝나지 않은 작업은 실패로 기록합니다.
+    """
+
+    ACTIVE_STATUSES = ('queued', 'running')
+
+    def __init__(self, runner, max_jobs=20, path=None):
+        self.runner = runner
+        self.max_jobs = max_jobs
+        self.path = path or UPDATE_JOBS_DB
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        connection.execute("CREATE TABLE IF NOT EXISTS jobs (job_id TEXT PRIMARY KEY, status TEXT NOT NULL, "
+                           "submitted_at TEXT NOT NULL, record TEXT NOT NULL)")
+        return connection
+
+    @contextmanager
+    def _transaction(self):
+        """쓰기 트랜잭션 (BEGIN IMMEDIATE이므로 여러 작업자가 동시에 작업을 만들어도 하나만 생성됨)"""
+        connection = self._connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            yield connection
+            connection.execute("COMMIT")
+        except BaseException:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            raise
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _save(connection, job):
+        connection.execute("INSERT OR REPLACE INTO jobs (job_id, status, submitted_at, record) VALUES (?, ?, ?, ?)",
+                           (job['job_id'], job['status'], job['submitted_at'], json.dumps(job, ensure_ascii=False)))
+
+    @staticmethod
+    def _worker_alive(job):
+        """작업을 실행하는 작업자 프로세스가 살아 있는지 확인합니다. (다른 호스트의 작업자는 확인할 수 없으므로 살아 있다고 봄)"""
+        if os.name == 'nt' or job.get('worker_host') != socket.gethostname():
+            return True
+        try:
+            os.kill(job['worker_pid'], 0)
+        except ProcessLookupError:
+            return False
+        except OSError:
+            pass
+        return True
+
+    def submit(self):
+        """업데이트 작업을 시작합니다. (작업 상태, 새 작업 여부)를 반환합니다."""
+        with self._transaction() as connection:
+            rows = connection.execute("SELECT record FROM jobs WHERE status IN (?, ?)", self.ACTIVE_STATUSES).fetchall()
+            for row in rows:
+                job = json.loads(row[0])
+                if self._worker_alive(job):
+                    return self._snapshot(job), False
+                
+                # 종료된 작업자의 작업은 실패로 기록
+                job['status'] = 'failed'
+                job['error'] = "작업을 실행하던 작업자가 종료되었습니다."
+                job['current_stages'] = []
+                job['finished_at'] = datetime.now().isoformat()
+                self._save(connection, job)
+            
+            job_id = uuid.uuid4().hex
+            job = {
+                'job_id': job_id,
+                'status': 'queued',
+                'submitted_at': datetime.now().isoformat(),
+                'started_at': None,
+                'finished_at': None,
+                'current_stages': [],
+                'stages': {},
+                'error': None,
+                'worker_host': socket.gethostname(),
+                'worker_pid': os.getpid()
+            }
+            self._save(connection, job)
+            
+            # 오래된 작업 기록 정리
+            connection.execute("DELETE FROM jobs WHERE job_id NOT IN "
+                               "(SELECT job_id FROM jobs ORDER BY submitted_at DESC LIMIT ?)", (self.max_jobs,))
         
-        # 관세 데이터 수집 모듈 임포트 및 실행
-        tariff_collector = importlib.import_module('src.tariff_data_collector')
-        tariff_collector.collect_tariff_data()
+        thread = threading.Thread(target=self._run, args=(job_id,), name=f"update-job-{job_id[:8]}", daemon=True)
+        thread.start()
+        return self._snapshot(job), True
+
+    def get(self, job_id):
+        """작업 상태를 반환합니다. 작업이 없으면 None을 반환합니다."""
+        connection = self._connect()
+        try:
+            row = connection.execute("SELECT record FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        finally:
+            connection.close()
+        return self._snapshot(json.loads(row[0])) if row else None
+
+    def _update(self, job_id, change):
+        """작업 기록을 읽어 change(작업)로 수정하고 저장합니다."""
+        with self._transaction() as connection:
+            row = connection.execute("SELECT record FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if row is None:
+                return
+            job = json.loads(row[0])
+            change(job)
+            self._save(connection, job)
+
+    def _run(self, job_id):
+        """작업을 실행하고 결과를 기록합니다."""
+        def start(job):
+            job['status'] = 'running'
+            job['started_at'] = datetime.now().isoformat()
         
-        # 제조 비용 시뮬레이션 모듈 임포트 및 실행
-        cost_simulator = importlib.import_module('src.manufacturing_cost_simulator')
-        cost_simulator.collect_all_cost_data()
+        self._update(job_id, start)
         
-        # 수출 가격 계산기 모듈 임포트 및 실행
-        export_calculator = importlib.import_module('src.export_price_calculator')
-        export_calculator.calculate_export_prices_for_products()
+        try:
+            success = self.runner(progress=lambda stage, event: self._on_progress(job_id, stage, event))
+            error = None if success else "데이터 업데이트 중 오류가 발생했습니다."
+        except Exception as e:
+            success = False
+            error = str(e)
         
-        print("데이터 업데이트 완료")
+        def finish(job):
+            job['status'] = 'succeeded' if success else 'failed'
+            job['error'] = error
+            job['current_stages'] = []
+            job['finished_at'] = datetime.now().isoformat()
         
-        # 업데이트 시간 기록
-        update_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        with open(os.path.join(DATA_DIR, 'last_update.txt'), 'w', encoding='utf-8') as f:
-            f.write(update_time)
+        self._update(job_id, finish)
+
+    def _on_progress(self, job_id, stage, event):
+        """단계 진행 이벤트를 작업 상태에 반영합니다. (단계 시작 시각은 작업을 실행하는 작업자의 단조 시계 기준)"""
+        now = time.monotonic()
         
-        return True
-    except Exception as e:
-        print(f"데이터 업데이트 오류: {str(e)}")
-        return False
+        def change(job):
+            if event == 'start':
+                job['stages'][stage] = {'status': 'running', 'started': now, 'duration_seconds': None}
+                job['current_stages'].append(stage)
+            else:
+                stage_info = job['stages'].setdefault(stage, {'started': now})
+                stage_info['status'] = 'finished' if event == 'finish' else event
+                stage_info['duration_seconds'] = round(now - stage_info['started'], 3)
+                if stage in job['current_stages']:
+                    job['current_stages'].remove(stage)
+        
+        self._update(job_id, change)
+
+    @staticmethod
+    def _snapshot(job):
+        """외부에 반환할 작업 상태 사본을 생성합니다."""
+        result = {key: value for key, value in job.items() if key not in ('worker_host', 'worker_pid')}
+        result['current_stages'] = list(job['current_stages'])
+        result['stages'] = [
+            {
+                'name': name,
+                'status': info.get('status'),
+                'duration_seconds': info.get('duration_seconds')
+            }
+            for name, info in job['stages'].items()
+        ]
+        # 입력이 바뀌지 않아 저장된 결과를 재사용한 단계
+        result['cache_hits'] = [name for name, info in job['stages'].items() if info.get('status') == 'cached']
+        return result
+
+update_jobs = UpdateJobManager(lambda progress: update_all_data(progress=progress))
 
 # 스케줄러 설정
 def setup_scheduler():
-    """데이터 자동 업데이트를 위한 스케줄러를 설정합니다."""
-    scheduler = BackgroundScheduler()
-    
-    # 매일 03:00, 06:00, 21:00에 데이터 업데이트
-    scheduler.add_job(update_all_data, 'cron', hour='3', minute='0')
-    scheduler.add_job(update_all_data, 'cron', hour='6', minute='0')
-    scheduler.add_job(update_all_data, 'cron', hour='21', minute='0')
-    
-    scheduler.start()
-    print("스케줄러 시작됨")
+    """데이터 자동 업데이트를 위한 스케줄러를 설정합니다.
+
+    여러 작업자나 노드가 스케줄러를 실행해도 리더로 선출된 프로세스만 예약 업데이트를 실행합니다.
+    (src/scheduler_leader.py, 다른 프로세스는 게시된 새 데이터 세대를 읽음)
+    예약 업데이트도 수동 업데이트와 같은 작업 관리자(update_jobs)로 실행되므로 실행 중인 작업이 있으면 합류합니다.
+    """
+    scheduler_leader = importlib.import_module('src.scheduler_leader')
+    return scheduler_leader.start_scheduler(lambda: update_jobs.submit()[0])
+
+# 데이터 스냅샷 캐시
+class DataSnapshotCache:
+    """데이터 파일의 파싱 결과를 데이터 버전별로 한 번만 보관하는 스레드 안전 캐시입니다.
+
+    각 항목은 파일의 수정 시각(mtime)과 크기로 검증되며, 데이터 버전 마커 파일이 바뀌면
+    모든 항목이 무효화됩니다. 반환된 객체는 여러 요청이 공유하므로 수정하지 않아야 합니다.
+    """
+
+    def __init__(self, version_file):
+        self.version_file = version_file
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _file_token(file_path):
+        """파일의 (수정 시각, 크기)를 반환합니다. 파일이 없으면 None을 반환합니다."""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def get(self, file_path, parser, default=None):
+        """파일을 파싱한 결과를 반환합니다. 파일이 바뀌지 않았다면 디스크를 읽지 않습니다."""
+        version = self._file_token(self.version_file)
+        token = self._file_token(file_path)
+        
+        with self._lock:
+            # 데이터 버전이 바뀌면 전체 캐시 무효화
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            
+            entry = self._entries.get(file_path)
+            if entry is not None and entry[0] == token:
+                self.hits += 1
+                return entry[1]
+            
+            self.misses += 1
+            value = parser(file_path) if token is not None else default
+            self._entries[file_path] = (token, value)
+            return value
+
+    def invalidate(self):
+        """모든 캐시 항목을 무효화합니다."""
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+    def stats(self):
+        """캐시 적중/실패 횟수를 반환합니다."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries)
+            }
+
+# 세대가 게시되면 포인터 파일이 바뀌므로 이전 세대의 캐시 항목이 정리됨
+snapshot_cache = DataSnapshotCache(snapshot_store.pointer_file())
+
+def pinned_generation():
+    """요청에 고정된 데이터 세대 ID를 반환합니다. 요청 밖에서는 현재 세대를 반환합니다. (없으면 None)"""
+    if has_request_context() and 'data_generation' in g:
+        return g.data_generation
+    return snapshot_store.current_generation()
+
+def data_path(*parts):
+    """데이터 파일 경로를 요청에 고정된 데이터 세대 기준으로 반환합니다.
+
+    요청 밖에서는 현재 세대를, 게시된 세대가 없으면 작업 데이터 디렉토리를 사용합니다.
+    """
+    return snapshot_store.resolve(os.path.join(*parts), pinned_generation())
+
+def shared_data():
+    """요청에 고정된 데이터 세대의 공유 스냅샷(메모리 맵 배열)을 반환합니다.
+
+    게시된 세대가 없거나 공유 스냅샷이 없는 세대이면 None을 반환하며, 이때 호출한 쪽은 데이터 파일을 파싱합니다.
+    """
+    generation_id = pinned_generation()
+    if generation_id is None:
+        return None
+    try:
+        return shared_snapshot.get_snapshot(generation_id)
+    except Exception as e:
+        print(f"공유 스냅샷 로드 오류: {str(e)}")
+        return None
+
+def read_json_file(file_path):
+    """JSON 파일을 읽어 파싱합니다."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def read_text_file(file_path):
+    """텍스트 파일을 읽어 앞뒤 공백을 제거합니다."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return f.read().strip()
 
 # 최신 관세 정책 업데이트 데이터 로드
 def load_tariff_policy_updates():
     """최신 미국 관세 정책 업데이트 정보를 로드합니다."""
     try:
-        file_path = os.path.join(TARIFF_DATA_DIR, "tariff_policy_updates.json")
-        if os.path.exists(file_path):
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get('updates', [])
+        file_path = data_path("tariff_data", "tariff_policy_updates.json")
+        data = snapshot_cache.get(file_path, read_json_file)
+        if data:
+            return data.get('updates', [])
         return []
     except Exception as e:
         print(f"관세 정책 업데이트 데이터 로드 오류: {str(e)}")
         return []
 
+# 관세 품목 HS 코드 접두사 색인 로드
+def read_hs_prefix_index(file_path):
+    """관세 저장소의 HS 코드로 접두사 색인을 생성합니다."""
+    return hs_index.HSPrefixIndex(tariff_store.read_table(file_path).hs_codes)
+
+def load_hs_prefix_index():
+    """관세 품목 HS 코드 접두사 색인을 로드합니다."""
+    try:
+        snapshot = shared_data()
+        table = snapshot.tariff_table() if snapshot is not None else None
+        if table is not None:
+            return snapshot.cached('hs_prefix_index', lambda: hs_index.HSPrefixIndex(table.hs_codes))
+        
+        index = snapshot_cache.get(data_path('tariff_data', os.path.basename(tariff_store.STORE_FILE)), read_hs_prefix_index)
+        if index is not None:
+            return index
+    except Exception as e:
+        print(f"HS 코드 색인 로드 오류: {str(e)}")
+    return hs_index.HSPrefixIndex([])
+
 # 제조 비용 지수 데이터 로드
 def load_manufacturing_cost_index(product_category=None):
     """제조 비용 지수 데이터를 로드합니다."""
     try:
-        if product_category:
-            file_path = os.path.join(COST_DATA_DIR, f"manufacturing_cost_index_{product_category.replace(' ', '_')}.json")
-            if os.path.exists(file_path):
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    return data.get('manufacturing_cost_index', {})
+        snapshot = shared_data()
+        if snapshot is not None and 'cost_index' in snapshot:
+            return snapshot.index('cost_index', product_category)
         
-        file_path = os.path.join(COST_DATA_DIR, "manufacturing_cost_index.json")
-        if os.path.exists(file_path):
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+        if product_category:
+            file_path = data_path("cost_data", f"manufacturing_cost_index_{product_category.replace(' ', '_')}.json")
+            data = snapshot_cache.get(file_path, read_json_file)
+            if data:
                 return data.get('manufacturing_cost_index', {})
+        
+        file_path = data_path("cost_data", "manufacturing_cost_index.json")
+        data = snapshot_cache.get(file_path, read_json_file)
+        if data:
+            return data.get('manufacturing_cost_index', {})
         return {}
     except Exception as e:
         print(f"제조 비용 지수 데이터 로드 오류: {str(e)}")
@@ -151,36 +477,156 @@ def load_manufacturing_cost_index(product_category=None):
 def load_export_price_index(product_category=None):
     """수출 가격 지수 데이터를 로드합니다."""
     try:
-        if product_category:
-            file_path = os.path.join(EXPORT_DATA_DIR, f"export_price_index_{product_category.replace(' ', '_')}.json")
-            if os.path.exists(file_path):
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    return data.get('export_price_index', {})
+        snapshot = shared_data()
+        if snapshot is not None and 'export_index' in snapshot:
+            return snapshot.index('export_index', product_category)
         
-        file_path = os.path.join(EXPORT_DATA_DIR, "export_price_index.json")
-        if os.path.exists(file_path):
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+        if product_category:
+            file_path = data_path("export_data", f"export_price_index_{product_category.replace(' ', '_')}.json")
+            data = snapshot_cache.get(file_path, read_json_file)
+            if data:
                 return data.get('export_price_index', {})
+        
+        file_path = data_path("export_data", "export_price_index.json")
+        data = snapshot_cache.get(file_path, read_json_file)
+        if data:
+            return data.get('export_price_index', {})
         return {}
     except Exception as e:
         print(f"수출 가격 지수 데이터 로드 오류: {str(e)}")
         return {}
 
+# 제품 카테고리 목록 로드
+def read_product_category_names(file_path):
+    """제품 카테고리 설정 파일에서 (종합 지수 표시 이름, 카테고리 이름 목록)을 읽습니다."""
+    default_label, product_categories = manufacturing_cost_simulator.read_product_categories(file_path)
+    return default_label, list(product_categories)
+
+def load_product_category_names():
+    """대시보드에 표시할 (종합 지수 표시 이름, 카테고리 이름 목록)을 로드합니다."""
+    file_path = data_path(manufacturing_cost_simulator.PRODUCT_CATEGORIES_FILE_NAME)
+    if not os.path.exists(file_path):
+        file_path = manufacturing_cost_simulator.PRODUCT_CATEGORIES_FILE
+    try:
+        return snapshot_cache.get(file_path, read_product_category_names,
+                                  (manufacturing_cost_simulator.DEFAULT_CATEGORY_LABEL, []))
+    except Exception as e:
+        print(f"제품 카테고리 설정 로드 오류: {str(e)}")
+        return manufacturing_cost_simulator.DEFAULT_CATEGORY_LABEL, []
+
+# 가정 시나리오 기준 데이터 로드
+def read_scenario_baseline(version_file):
+    """데이터 버전 마커가 있는 데이터 디렉토리로 시나리오 기준 데이터를 만듭니다."""
+    return scenario_engine.load_baseline(os.path.dirname(version_file))
+
+def load_scenario_baseline():
+    """가정 시나리오 계산의 기준 데이터를 데이터 버전별로 한 번만 로드합니다."""
+    version_file = data_path("last_update.txt")
+    baseline = snapshot_cache.get(version_file, read_scenario_baseline)
+    if baseline is None:
+        baseline = read_scenario_baseline(version_file)
+    return baseline
+
+# 민감도 분석 결과 로드
+def read_sensitivity_result(cost_data_dir):
+    """비용 요소 데이터 디렉토리가 속한 데이터 디렉토리로 민감도 분석 결과를 계산합니다."""
+    return sensitivity.analyze(sensitivity.load_inputs(os.path.dirname(cost_data_dir)))
+
+def load_sensitivity_result():
+    """모든 카테고리·국가의 민감도 분석 결과를 데이터 버전별로 한 번만 계산합니다."""
+    cost_data_dir = data_path("cost_data")
+    result = snapshot_cache.get(cost_data_dir, read_sensitivity_result)
+    if result is None:
+        result = read_sensitivity_result(cost_data_dir)
+    return result
+
 # 마지막 업데이트 시간 로드
 def load_last_update_time():
     """마지막 데이터 업데이트 시간을 로드합니다."""
     try:
-        file_path = os.path.join(DATA_DIR, 'last_update.txt')
-        if os.path.exists(file_path):
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read().strip()
-        return "정보 없음"
+        return snapshot_cache.get(data_path("last_update.txt"), read_text_file, "정보 없음")
     except Exception as e:
         print(f"마지막 업데이트 시간 로드 오류: {str(e)}")
         return "정보 없음"
 
+# 데이터 버전 (ETag, Last-Modified)
+_published_at = functools.lru_cache(maxsize=64)(snapshot_store.published_at)
+
+def data_version():
+    """요청에 고정된 데이터 세대의 (버전, 게시 시각 datetime)을 반환합니다.
+
+    게시된 세대가 없으면 작업 데이터 디렉토리의 데이터 버전 마커 파일로 버전을 만듭니다.
+    """
+    generation_id = pinned_generation()
+    if generation_id is not None:
+        modified = _published_at(generation_id)
+        version = generation_id
+    else:
+        try:
+            stat = os.stat(DATA_VERSION_FILE)
+            modified, version = stat.st_mtime, f"working-{stat.st_mtime_ns:x}-{stat.st_size:x}"
+        except OSError:
+            modified, version = 0, 'empty'
+    return version, datetime.fromtimestamp(int(modified), timezone.utc)
+
+def versioned_response(build, cache_control=API_CACHE_CONTROL):
+    """데이터 버전을 ETag로 하는 조건부 GET 응답을 반환합니다.
+
+    If-None-Match(또는 If-Modified-Since)가 현재 데이터 버전과 일치하면 build를 호출하지 않고 304를 반환합니다.
+    build는 응답(또는 jsonify 가능한 값)을 반환하며, 200 응답에만 버전 헤더를 붙입니다.
+    요청 파라미터는 호출 전에 검사해야 합니다. (build 안에서 검사하면 조건부 GET이 404 대신 304를 받음)
+    """
+    version, modified = data_version()
+    
+    if request.if_none_match:
+        not_modified = request.if_none_match.contains_weak(version)
+    else:
+        not_modified = request.if_modified_since is not None and modified <= request.if_modified_since
+    
+    if not_modified:
+        response = Response(status=304)
+    else:
+        response = build()
+        if not isinstance(response, Response):
+            response = jsonify(response)
+        if response.status_code != 200:
+            return response
+    
+    response.set_etag(version)
+    response.last_modified = modified
+    response.headers["Cache-Control"] = cache_control
+    return response
+
+def api_error(message, status):
+    """JSON 오류 응답을 반환합니다."""
+    response = jsonify({'error': message})
+    response.status_code = status
+    return response
+
+def api_category():
+    """요청의 category 쿼리 파라미터를 검사하여 반환합니다. (없으면 None, 알 수 없는 카테고리는 ValueError)"""
+    category = request.args.get('category') or None
+    if category is not None and category not in load_product_category_names()[1]:
+        raise ValueError(f"알 수 없는 제품 카테고리: {category}")
+    return category
+
+# HS 코드별 수출 가격 지수 로드
+def load_hs_export_indices():
+    """HS 코드별 수출 가격 지수 테이블을 로드합니다. 파일이 없으면 None을 반환합니다."""
+    snapshot = shared_data()
+    if snapshot is not None and 'hs_export' in snapshot:
+        return snapshot.hs_export_indices()
+    file_path = data_path("export_data", hs_export_pipeline.HS_EXPORT_INDEX_FILE_NAME)
+    return snapshot_cache.get(file_path, hs_export_pipeline.read_export_indices)
+
+# 관세 저장소 로드
+def load_tariff_table():
+    """관세 저장소 테이블을 로드합니다. 파일이 없으면 None을 반환합니다."""
+    snapshot = shared_data()
+    if snapshot is not None and 'tariff' in snapshot:
+        return snapshot.tariff_table()
+    return snapshot_cache.get(data_path('tariff_data', os.path.basename(tariff_store.STORE_FILE)), tariff_store.read_table)
+
 # 라우트: 홈페이지
 @app.route('/')
 def home():
@@ -192,7 +638,13 @@ def home():
 @app.route('/tariff-policy')
 def tariff_policy():
     """최신 미국 관세 정책 요약 페이지를 렌더링합니다."""
-    policy_updates = load_tariff_policy_updates()
+    line_index = load_hs_prefix_index()
+    
+    # 정책별 영향 받는 관세 품목 수 (류/호/소호 단위 HS 코드를 세번 단위 품목으로 확장)
+    policy_updates = [
+        dict(update, affected_line_count=len(line_index.lines_under_any(update.get('affected_hs_codes', []))))
+        for update in load_tariff_policy_updates()
+    ]
     last_update = load_last_update_time()
     return render_template('tariff_policy.html', 
                           policy_updates=policy_updates,
@@ -202,10 +654,12 @@ def tariff_policy():
 @app.route('/manufacturing-cost', methods=['GET', 'POST'])
 def manufacturing_cost():
     """국가별 제조 비용 시뮬레이션 페이지를 렌더링합니다."""
+    # 제품 카테고리 목록 (종합 지수 + 설정 파일의 카테고리)
+    default_label, category_names = load_product_category_names()
+    product_categories = [default_label] + category_names
     product_category = request.args.get('product_category', None)
-    
-    # 제품 카테고리 목록
-    product_categories = ["일반", "EPS 모터", "알루미늄"]
+    if product_category not in category_names:
+        product_category = None
     
     # 제조 비용 지수 데이터 로드
     cost_index = load_manufacturing_cost_index(product_category)
@@ -224,7 +678,7 @@ def manufacturing_cost():
     
     return render_template('manufacturing_cost.html',
                           product_categories=product_categories,
-                          selected_category=product_category if product_category else "일반",
+                          selected_category=product_category if product_category else default_label,
                           countries=countries,
                           costs=costs,
                           last_update=last_update)
@@ -233,10 +687,12 @@ def manufacturing_cost():
 @app.route('/export-price', methods=['GET', 'POST'])
 def export_price():
     """수출 가격 비교 페이지를 렌더링합니다."""
+    # 제품 카테고리 목록 (종합 지수 + 설정 파일의 카테고리)
+    default_label, category_names = load_product_category_names()
+    product_categories = [default_label] + category_names
     product_category = request.args.get('product_category', None)
-    
-    # 제품 카테고리 목록
-    product_categories = ["일반", "EPS 모터", "알루미늄"]
+    if product_category not in category_names:
+        product_category = None
     
     # 수출 가격 지수 데이터 로드
     price_index = load_export_price_index(product_category)
@@ -269,7 +725,7 @@ def export_price():
     
     return render_template('export_price.html',
                           product_categories=product_categories,
-                          selected_category=product_category if product_category else "일반",
+                          selected_category=product_category if product_category else default_label,
                           countries=countries,
                           prices=prices,
                           norm_prices=norm_prices,
@@ -278,28 +734,205 @@ def export_price():
 # 라우트: 데이터 수동 업데이트
 @app.route('/update-data', methods=['POST'])
 def update_data():
-    """데이터를 수동으로 업데이트합니다."""
-    success = update_all_data()
-    return jsonify({'success': success})
+    """데이터 업데이트 작업을 시작하고 작업 ID를 반환합니다.
+
+    이미 실행 중인 작업이 있으면 해당 작업에 합류합니다.
+    """
+    job, created = update_jobs.submit()
+    return jsonify({
+        'job_id': job['job_id'],
+        'status': job['status'],
+        'coalesced': not created,
+        'status_url': url_for('update_data_status', job_id=job['job_id'])
+    }), 202
+
+# 라우트: 데이터 업데이트 작업 상태
+@app.route('/update-data/<job_id>', methods=['GET'])
+def update_data_status(job_id):
+    """데이터 업데이트 작업의 진행 상태를 반환합니다."""
+    job = update_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': '작업을 찾을 수 없습니다.'}), 404
+    return jsonify(job)
+
+# 라우트: 가정 시나리오 일괄 계산
+@app.route('/api/scenarios', methods=['POST'])
+def api_scenarios():
+    """가정 시나리오 목록의 제조 비용 지수와 수출 가격 지수를 계산합니다. 파일은 쓰지 않습니다.
+
+    요청 본문: {"scenarios": [시나리오, ...], "hs_codes": [HS 코드, ...], "formula": 수식 이름}
+    """
+    payload = request.get_json(silent=True) or {}
+    scenarios = payload.get('scenarios')
+    if not isinstance(scenarios, list) or not all(isinstance(scenario, dict) for scenario in scenarios):
+        return jsonify({'error': "'scenarios'는 시나리오 객체의 목록이어야 합니다."}), 400
+    
+    try:
+        result = scenario_engine.run_scenarios(
+            scenarios, load_scenario_baseline(), payload.get('hs_codes'),
+            payload.get('formula', scenario_engine.DEFAULT_FORMULA))
+    except (ValueError, KeyError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify(scenario_engine.result_to_dict(result))
+
+# 라우트: 민감도(토네이도) 분석
+@app.route('/api/sensitivity')
+def api_sensitivity():
+    """제조 비용 지수와 수출 가격 지수의 입력별 민감도와 토네이도 데이터를 반환합니다.
+
+    쿼리 파라미터: category, country (여러 번 지정 가능), shock (입력 변화 비율, 기본 0.1), top (항목 수)
+    """
+    try:
+        shock = float(request.args.get('shock', sensitivity.DEFAULT_SHOCK))
+        top = request.args.get('top', type=int)
+        data = sensitivity.result_to_dict(
+            load_sensitivity_result(), shock, top,
+            request.args.getlist('category') or None, request.args.getlist('country') or None)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify(data)
+
+# 라우트: 버전 API - 제조 비용 지수
+@app.route('/api/v1/cost-index')
+def api_v1_cost_index():
+    """제조 비용 지수를 반환합니다. 쿼리 파라미터: category (제품 카테고리, 생략하면 종합 지수)"""
+    try:
+        category = api_category()
+    except ValueError as e:
+        return api_error(str(e), 404)
+    
+    def build():
+        return {'data_version': data_version()[0], 'category': category,
+                'manufacturing_cost_index': load_manufacturing_cost_index(category)}
+    return versioned_response(build)
+
+# 라우트: 버전 API - 수출 가격 지수
+@app.route('/api/v1/export-index')
+def api_v1_export_index():
+    """수출 가격 지수를 반환합니다. 쿼리 파라미터: category (제품 카테고리, 생략하면 종합 지수)"""
+    try:
+        category = api_category()
+    except ValueError as e:
+        return api_error(str(e), 404)
+    
+    def build():
+        return {'data_version': data_version()[0], 'category': category,
+                'export_price_index': load_export_price_index(category)}
+    return versioned_response(build)
+
+# 라우트: 버전 API - HS 코드별 수출 가격 지수
+@app.route('/api/v1/export-index/hs')
+def api_v1_hs_export_index():
+    """HS 코드별 국가별 수출 가격 지수를 반환합니다. 쿼리 파라미터: hs_code (여러 번 지정 가능, 생략하면 전체)"""
+    table = load_hs_export_indices()
+    if table is None:
+        return api_error("HS 코드별 수출 가격 지수 데이터가 없습니다.", 404)
+    hs_codes = request.args.getlist('hs_code')
+    try:
+        rows = {table.row(hs_code) for hs_code in hs_codes}
+    except KeyError as e:
+        return api_error(str(e.args[0]), 404)
+    
+    def build():
+        items = [
+            {'hs_code': hs_code, 'name': name, 'description': description, 'export_price_index': index}
+            for row, (hs_code, name, description, index) in enumerate(table.items())
+            if not hs_codes or row in rows
+        ]
+        return {'data_version': data_version()[0], 'formula': table.formula, 'base_country': table.base_country,
+                'calculation_date': table.calculation_date, 'products': items}
+    return versioned_response(build)
+
+# 라우트: 버전 API - 관세 정책 업데이트
+@app.route('/api/v1/policy-updates')
+def api_v1_policy_updates():
+    """최신 미국 관세 정책 업데이트 목록을 반환합니다."""
+    return versioned_response(lambda: {'data_version': data_version()[0], 'updates': load_tariff_policy_updates()})
+
+# 라우트: 버전 API - 관세 품목
+@app.route('/api/v1/tariff-lines')
+def api_v1_tariff_lines():
+    """(국가, HS 코드)별 최신 관세 품목을 반환합니다.
+
+    쿼리 파라미터: country (국가 코드), hs_prefix (HS 코드 접두사, 예: 8708 또는 8708.10)
+    """
+    def build():
+        table = load_tariff_table()
+        if table is None:
+            return api_error("관세 데이터가 없습니다.", 404)
+        mask = tariff_store.latest_mask(table) & tariff_store.select(table, request.args.get('country') or None)
+        prefix = hs_index.normalize_hs_code(request.args.get('hs_prefix', ''))
+        if prefix:
+            mask &= np.char.startswith(hs_index.normalize_hs_codes(table.hs_codes), prefix)[table.hs_id]
+        return {'data_version': data_version()[0], 'lines': tariff_store.table_records(table, mask)}
+    return versioned_response(build)
+
+# 라우트: 차트 이미지
+@app.route('/charts/<kind>.<fmt>')
+def chart(kind, fmt):
+    """제조 비용 지수 또는 수출 가격 지수 차트를 처음 요청될 때 렌더링하여 반환합니다.
+
+    kind: manufacturing_cost, export_price / fmt: svg, png / 쿼리 파라미터: category (제품 카테고리)
+    같은 데이터 세대의 같은 차트는 차트 서비스 캐시에서 반환합니다.
+    """
+    if kind not in ('manufacturing_cost', 'export_price') or fmt not in chart_service.FORMATS:
+        return jsonify({'error': f"지원하지 않는 차트: {kind}.{fmt}"}), 404
+    
+    category = request.args.get('category') or None
+    if kind == 'manufacturing_cost':
+        index = load_manufacturing_cost_index(category)
+        chart_kind = 'product_category' if category else 'manufacturing_cost'
+    else:
+        index = load_export_price_index(category)
+        chart_kind = 'export_price'
+    if not index:
+        return jsonify({'error': "차트 데이터가 없습니다."}), 404
+    
+    # 게시된 세대가 없으면 데이터 해시를 버전으로 사용
+    return versioned_response(lambda: Response(
+        chart_service.get_service().render(chart_kind, index, category, fmt, version=g.get('data_generation')),
+        mimetype=chart_service.FORMATS[fmt]))
+
+# 라우트: 데이터 캐시 상태
+@app.route('/cache-stats')
+def cache_stats():
+    """데이터 스냅샷 캐시의 적중/실패 횟수와 공유 스냅샷 맵 상태를 반환합니다."""
+    stats = snapshot_cache.stats()
+    stats['shared_snapshot'] = shared_snapshot.mapper.stats()
+    return jsonify(stats)
 
 # 메인 함수
 def main():
-    """메인 함수"""
-    ensure_directories()
-    
-    # 템플릿 파일 생성
-    create_template_files()
+    """메인 함수 (개발 서버, 스케줄러 포함)"""
+    # 템플릿 파일은 없을 때만 생성
+    ensure_site_files()
     
     # 스케줄러 설정
     setup_scheduler()
     
-    # 초기 데이터 업데이트
-    update_all_data()
+    # 게시된 데이터 세대가 없을 때만 초기 데이터 업데이트 (백그라운드 작업, 서버 시작을 막지 않음)
+    if snapshot_store.current_generation() is None:
+        update_jobs.submit()
     
     # Flask 애플리케이션 실행
     app.run(host='0.0.0.0', port=5000, debug=True)
 
 # 템플릿 파일 생성
+def site_files():
+    """create_template_files가 생성하는 템플릿, CSS, JavaScript 파일 경로 목록을 반환합니다."""
+    return [
+        os.path.join(TEMPLATE_DIR, name)
+        for name in ('base.html', 'index.html', 'tariff_policy.html', 'manufacturing_cost.html', 'export_price.html')
+    ] + [os.path.join(STATIC_DIR, 'css', 'style.css'), os.path.join(STATIC_DIR, 'js', 'script.js')]
+
+def ensure_site_files(force=False):
+    """템플릿, CSS, JavaScript 파일이 하나라도 없으면 생성합니다. force가 True이면 항상 다시 생성합니다."""
+    if force or not all(os.path.exists(path) for path in site_files()):
+        ensure_directories()
+        create_template_files()
+
 def create_template_files():
     """필요한 템플릿 파일을 생성합니다."""
     # 기본 레이아웃 템플릿
@@ -451,6 +1084,7 @@ def create_tariff_policy_template():
             <p class="summary">{{ update.summary }}</p>
             <div class="details">
                 <p><strong>영향 받는 HS 코드:</strong> {{ update.affected_hs_codes|join(', ') }}</p>
+                <p><strong>영향 받는 관세 품목:</strong> {{ update.affected_line_count }}개</p>
                 <p><strong>발효일:</strong> {{ update.effective_date }}</p>
                 <p><strong>출처:</strong> {{ update.source }}</p>
             </div>
@@ -1180,12 +1814,43 @@ document.addEventListener('DOMContentLoaded', function() {
     const updateDataBtn = document.getElementById('updateDataBtn');
     
     if (updateDataBtn) {
+        // 버튼 상태 복원
+        function resetButton() {
+            updateDataBtn.disabled = false;
+            updateDataBtn.textContent = '데이터 업데이트';
+        }
+        
+        // 작업 상태 주기적 확인
+        function pollJob(statusUrl) {
+            fetch(statusUrl)
+            .then(response => response.json())
+            .then(job => {
+                if (job.status === 'succeeded') {
+                    alert('데이터가 성공적으로 업데이트되었습니다. 페이지를 새로고침합니다.');
+                    location.reload();
+                } else if (job.status === 'failed') {
+                    alert('데이터 업데이트 중 오류가 발생했습니다.');
+                    resetButton();
+                } else {
+                    if (job.current_stages && job.current_stages.length > 0) {
+                        updateDataBtn.textContent = '업데이트 중... (' + job.current_stages.join(', ') + ')';
+                    }
+                    setTimeout(function() { pollJob(statusUrl); }, 2000);
+                }
+            })
+            .catch(error => {
+                console.error('Error:', error);
+                alert('데이터 업데이트 상태 확인 중 오류가 발생했습니다.');
+                resetButton();
+            });
+        }
+        
         updateDataBtn.addEventListener('click', function() {
             // 버튼 비활성화 및 텍스트 변경
             updateDataBtn.disabled = true;
             updateDataBtn.textContent = '업데이트 중...';
             
-            // 데이터 업데이트 요청
+            // 데이터 업데이트 작업 요청
             fetch('/update-data', {
                 method: 'POST',
                 headers: {
@@ -1194,20 +1859,12 @@ document.addEventListener('DOMContentLoaded', function() {
             })
             .then(response => response.json())
             .then(data => {
-                if (data.success) {
-                    alert('데이터가 성공적으로 업데이트되었습니다. 페이지를 새로고침합니다.');
-                    location.reload();
-                } else {
-                    alert('데이터 업데이트 중 오류가 발생했습니다.');
-                    updateDataBtn.disabled = false;
-                    updateDataBtn.textContent = '데이터 업데이트';
-                }
+                pollJob(data.status_url);
             })
             .catch(error => {
                 console.error('Error:', error);
                 alert('데이터 업데이트 요청 중 오류가 발생했습니다.');
-                updateDataBtn.disabled = false;
-                updateDataBtn.textContent = '데이터 업데이트';
+                resetButton();
             });
         });
     }
@@ -11,10 +11,10 @@
 
 import os
 import json
-import pandas as pd
 import numpy as np
 from datetime import datetime
-import matplotlib.pyplot as plt
+
+from src import chart_service, country_registry, export_price_engine, hs_export_pipeline, manufacturing_cost_simulator
 
 # 데이터 저장 경로
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
@@ -22,18 +22,16 @@ COST_DATA_DIR = os.path.join(DATA_DIR, 'cost_data')
 TARIFF_DATA_DIR = os.path.join(DATA_DIR, 'tariff_data')
 EXPORT_DATA_DIR = os.path.join(DATA_DIR, 'export_data')
 
-# 대상 국가 목록 (ISO 코드)
-TARGET_COUNTRIES = {
-    'KR': '대한민국',
-    'JP': '일본',
-    'CN': '중국',
-    'IN': '인도',
-    'TH': '태국',
-    'VN': '베트남',
-    'TW': '대만',
-    'EU': '유럽연합',
-    'MX': '멕시코'
-}
+# 대상 국가 목록 (ISO 코드, data/countries.json의 국가 레지스트리)
+TARGET_COUNTRIES = country_registry.target_countries()
+
+# 샘플 화물 비용 데이터 (2025년 기준 추정치, 40ft 컨테이너 기준 USD, 국가 레지스트리의 freight_cost)
+FREIGHT_COSTS = country_registry.country_parameter('freight_cost')
+
+# 무역 협정 혜택 (관세 감면 %)
+# 특혜 세율(한-미 FTA, USMCA)은 관세 규칙의 실효 관세율에 이미 반영되므로 모든 국가가 0입니다.
+# (국가별 특혜 적용 현황은 tariff_rules.trade_agreements 참조)
+TRADE_AGREEMENT_BENEFITS = dict.fromkeys(TARGET_COUNTRIES, 0.0)
 
 def ensure_data_dir():
     """데이터 디렉토리가 존재하는지 확인하고, 없으면 생성합니다."""
@@ -43,18 +41,8 @@ def collect_freight_costs():
     """국가별 미국으로의 화물 비용 데이터를 수집합니다."""
     print("국가별 미국으로의 화물 비용 데이터 수집 중...")
     
-    # 샘플 화물 비용 데이터 (2025년 기준 추정치, 40ft 컨테이너 기준 USD)
-    freight_costs = {
-        'KR': 4500,  # 대한민국 → 미국
-        'JP': 4800,  # 일본 → 미국
-        'CN': 5200,  # 중국 → 미국
-        'IN': 6500,  # 인도 → 미국
-        'TH': 6000,  # 태국 → 미국
-        'VN': 5800,  # 베트남 → 미국
-        'TW': 4600,  # 대만 → 미국
-        'EU': 5500,  # 유럽연합 → 미국
-        'MX': 3200   # 멕시코 → 미국 (육로 운송)
-    }
+    # 샘플 화물 비용 데이터 (2025년 기준 추정치, 40ft 컨테이너 기준 USD, 국가 목록 파일이 바뀌면 다시 읽음)
+    freight_costs = country_registry.country_parameter('freight_cost')
     
     # 데이터 저장
     file_path = os.path.join(EXPORT_DATA_DIR, "freight_costs.json")
@@ -67,88 +55,36 @@ def collect_freight_costs():
     print(f"화물 비용 데이터 저장 완료: {file_path}")
     return freight_costs
 
-def get_tariff_rates():
-    """국가별 미국 관세율 데이터를 가져옵니다."""
-    print("국가별 미국 관세율 데이터 로드 중...")
-    
-    # 관세 데이터 파일 경로
-    all_countries_file_path = os.path.join(TARIFF_DATA_DIR, "all_countries_tariff_data.json")
-    
-    if not os.path.exists(all_countries_file_path):
-        print("관세 데이터 파일이 존재하지 않습니다. 샘플 데이터를 생성합니다.")
-        return create_sample_tariff_rates()
-    
-    try:
-        with open(all_countries_file_path, 'r', encoding='utf-8') as f:
-            tariff_data = json.load(f)
-        
-        # 국가별 평균 관세율 계산
-        tariff_rates = {}
-        for country_code, country_info in tariff_data.get('countries', {}).items():
-            rates = []
-            for item in country_info.get('data', []):
-                rate_str = item.get('general_rate', '0%')
-                if rate_str.endswith('%'):
-                    try:
-                        rate = float(rate_str.rstrip('%'))
-                        rates.append(rate)
-                    except ValueError:
-                        continue
-            
-            if rates:
-                tariff_rates[country_code] = sum(rates) / len(rates)
-            else:
-                tariff_rates[country_code] = 0.0
-        
-        return tariff_rates
-    except Exception as e:
-        print(f"관세 데이터 로드 오류: {str(e)}")
-        return create_sample_tariff_rates()
+def get_tariff_rates(as_of_date=None):
+    """국가별 미국 관세율 데이터를 가져옵니다.
 
-def create_sample_tariff_rates():
-    """샘플 관세율 데이터를 생성합니다."""
-    print("샘플 관세율 데이터 생성 중...")
-    
-    # 샘플 관세율 데이터 (2025년 기준 추정치, %)
-    tariff_rates = {
-        'KR': 0.0,   # 대한민국 (한-미 FTA)
-        'JP': 27.5,  # 일본 (기본 관세 + 자동차 부품 25% 추가 관세)
-        'CN': 52.5,  # 중국 (기본 관세 + 중국 특별 관세 25% + 자동차 부품 25% 추가 관세)
-        'IN': 27.5,  # 인도 (기본 관세 + 자동차 부품 25% 추가 관세)
-        'TH': 27.5,  # 태국 (기본 관세 + 자동차 부품 25% 추가 관세)
-        'VN': 27.5,  # 베트남 (기본 관세 + 자동차 부품 25% 추가 관세)
-        'TW': 27.5,  # 대만 (기본 관세 + 자동차 부품 25% 추가 관세)
-        'EU': 27.5,  # 유럽연합 (기본 관세 + 자동차 부품 25% 추가 관세)
-        'MX': 0.0    # 멕시코 (USMCA)
-    }
+    제품 목록 HS 코드의 as_of_date(생략하면 오늘) 기준 관세 규칙 실효 관세율을 국가별로 평균합니다.
+    """
+    print("국가별 미국 관세율 데이터 계산 중...")
+    as_of_date = hs_export_pipeline.tariff_as_of(as_of_date)
+    
+    # 제품 목록 기준 국가별 평균 실효 관세율 (%)
+    countries = list(TARGET_COUNTRIES)
+    tariff_rates = dict(zip(countries, hs_export_pipeline.country_tariff_rates(countries, as_of_date).tolist()))
     
     # 데이터 저장
     file_path = os.path.join(EXPORT_DATA_DIR, "tariff_rates.json")
     with open(file_path, 'w', encoding='utf-8') as f:
         json.dump({
             'collection_date': datetime.now().isoformat(),
+            'as_of_date': as_of_date,
             'data': tariff_rates
         }, f, ensure_ascii=False, indent=2)
     
-    print(f"샘플 관세율 데이터 저장 완료: {file_path}")
+    print(f"관세율 데이터 저장 완료: {file_path}")
     return tariff_rates
 
 def get_trade_agreement_benefits():
     """국가별 무역 협정 혜택 데이터를 가져옵니다."""
     print("국가별 무역 협정 혜택 데이터 수집 중...")
     
-    # 샘플 무역 협정 혜택 데이터 (관세 감면 %)
-    trade_agreement_benefits = {
-        'KR': 100.0,  # 대한민국 (한-미 FTA, 대부분 품목 100% 관세 면제)
-        'JP': 0.0,    # 일본 (무역 협정 없음)
-        'CN': 0.0,    # 중국 (무역 협정 없음)
-        'IN': 0.0,    # 인도 (무역 협정 없음)
-        'TH': 0.0,    # 태국 (무역 협정 없음)
-        'VN': 0.0,    # 베트남 (무역 협정 없음)
-        'TW': 0.0,    # 대만 (무역 협정 없음)
-        'EU': 0.0,    # 유럽연합 (무역 협정 협상 중)
-        'MX': 100.0   # 멕시코 (USMCA, 대부분 품목 100% 관세 면제)
-    }
+    # 무역 협정 혜택 (관세 감면 %, 특혜 세율은 실효 관세율에 반영되어 있음)
+    trade_agreement_benefits = dict(TRADE_AGREEMENT_BENEFITS)
     
     # 데이터 저장
     file_path = os.path.join(EXPORT_DATA_DIR, "trade_agreement_benefits.json")
@@ -191,58 +127,75 @@ def create_sample_manufacturing_cost_index():
     """샘플 제조 비용 지수 데이터를 생성합니다."""
     print("샘플 제조 비용 지수 데이터 생성 중...")
     
-    # 샘플 제조 비용 지수 데이터 (한국 = 100 기준)
-    manufacturing_cost_index = {
-        'KR': 100.0,  # 대한민국
-        'JP': 120.0,  # 일본
-        'CN': 75.0,   # 중국
-        'IN': 65.0,   # 인도
-        'TH': 70.0,   # 태국
-        'VN': 60.0,   # 베트남
-        'TW': 90.0,   # 대만
-        'EU': 130.0,  # 유럽연합
-        'MX': 80.0    # 멕시코
-    }
+    # 샘플 제조 비용 지수 데이터 (한국 = 100 기준, 국가 레지스트리의 sample_cost_index)
+    manufacturing_cost_index = country_registry.country_parameter('sample_cost_index')
     
     return manufacturing_cost_index
 
-def calculate_export_price_index(product_category=None):
-    """국가별 미국 수출 가격 지수를 계산합니다."""
+def calculate_export_price_index(product_category=None, manufacturing_cost_index=None, freight_costs=None,
+                                 tariff_rates=None, trade_agreement_benefits=None, visualize=True):
+    """국가별 미국 수출 가격 지수를 계산합니다.
+
+    입력 데이터가 주어지면 다시 수집하거나 파일에서 읽지 않고 그대로 사용합니다.
+    visualize가 False이면 시각화 이미지를 생성하지 않습니다.
+    """
+    return calculate_export_price_indices({product_category: manufacturing_cost_index}, freight_costs,
+                                          tariff_rates, trade_agreement_benefits, visualize)[product_category]
+
+def calculate_export_price_indices(cost_indices, freight_costs=None, tariff_rates=None,
+                                   trade_agreement_benefits=None, visualize=True):
+    """여러 제품 카테고리의 국가별 미국 수출 가격 지수를 한 번에 계산합니다.
+
+    cost_indices는 {제품 카테고리(기본은 None): 제조 비용 지수 또는 None} 형식이며,
+    제조 비용 지수가 None인 카테고리는 파일에서 읽습니다. 모든 카테고리는 수출 가격
+    계산 엔진의 한 번의 벡터 연산으로 계산되며 {제품 카테고리: 수출 가격 지수}를 반환합니다.
+    """
     print("국가별 미국 수출 가격 지수 계산 중...")
     
-    # 필요한 데이터 수집
-    manufacturing_cost_index = get_manufacturing_cost_index(product_category)
-    freight_costs = collect_freight_costs()
-    tariff_rates = get_tariff_rates()
-    trade_agreement_benefits = get_trade_agreement_benefits()
-    
-    # 한국의 화물 비용을 기준으로 정규화
-    normalized_freight_costs = {country: cost / freight_costs['KR'] * 20 for country, cost in freight_costs.items()}
-    
-    # 관세율에 무역 협정 혜택 적용
-    effective_tariff_rates = {}
-    for country in tariff_rates:
-        benefit_pct = trade_agreement_benefits.get(country, 0.0)
-        effective_tariff_rates[country] = tariff_rates[country] * (1 - benefit_pct / 100)
-    
-    # 최종 수출 가격 지수 계산 (제조 비용 + 화물 비용 + 관세)
-    export_price_index = {}
-    for country in TARGET_COUNTRIES:
-        # 제조 비용 (80% 가중치)
-        manufacturing_component = manufacturing_cost_index[country] * 0.8
-        
-        # 화물 비용 (10% 가중치)
-        freight_component = normalized_freight_costs[country] * 0.1
-        
-        # 관세 (10% 가중치)
-        # 관세는 제조 비용과 화물 비용의 합에 적용됨
-        base_cost = manufacturing_cost_index[country] + normalized_freight_costs[country]
-        tariff_component = base_cost * (effective_tariff_rates[country] / 100) * 0.1
-        
-        # 최종 수출 가격 지수
-        export_price_index[country] = manufacturing_component + freight_component + tariff_component
-    
-    # 데이터 저장
+    # 필요한 데이터 수집 (주어지지 않은 경우)
+    categories = list(cost_indices)
+    cost_indices = {
+        category: cost_index if cost_index is not None else get_manufacturing_cost_index(category)
+        for category, cost_index in cost_indices.items()
+    }
+    if freight_costs is None:
+        freight_costs = collect_freight_costs()
+    if tariff_rates is None:
+        tariff_rates = get_tariff_rates()
+    if trade_agreement_benefits is None:
+        trade_agreement_benefits = get_trade_agreement_benefits()
+    
+    # 국가 레지스트리 순서의 국가 축 배열
+    countries = list(TARGET_COUNTRIES)
+    freight = export_price_engine.country_vector(freight_costs, countries)
+    tariff = export_price_engine.country_vector(tariff_rates, countries)
+    benefit = export_price_engine.country_vector(trade_agreement_benefits, countries)
+    
+    # 보고용 화물 비용 지수(한국 = 20)와 무역 협정 혜택을 적용한 실효 관세율
+    normalized_freight_costs = dict(zip(countries, (freight / freight[countries.index('KR')] * 20).tolist()))
+    effective_tariff_rates = dict(zip(countries, (tariff * (1 - benefit / 100)).tolist()))
+    
+    # 최종 수출 가격 지수 계산 (제조 비용 80% + 화물 비용 10% + 관세 10%)
+    prices = export_price_engine.evaluate(
+        'weighted_80_10_10', countries,
+        cost=export_price_engine.country_matrix(cost_indices, categories, countries),
+        freight=freight,
+        tariff=tariff,
+        benefit=benefit,
+        categories=categories
+    )
+    
+    export_price_indices = {}
+    for category in categories:
+        export_price_indices[category] = prices.by_country(category=category)
+        save_export_price_index(export_price_indices[category], cost_indices[category], normalized_freight_costs,
+                                tariff_rates, effective_tariff_rates, category, visualize)
+    
+    return export_price_indices
+
+def save_export_price_index(export_price_index, manufacturing_cost_index, normalized_freight_costs,
+                            tariff_rates, effective_tariff_rates, product_category=None, visualize=True):
+    """수출 가격 지수를 JSON, CSV 파일로 저장하고 visualize가 True이면 시각화합니다."""
     file_name = "export_price_index.json"
     if product_category:
         file_name = f"export_price_index_{product_category.replace(' ', '_')}.json"
@@ -266,30 +219,27 @@ def calculate_export_price_index(product_category=None):
                            tariff_rates, effective_tariff_rates, product_category)
     
     # 수출 가격 지수 시각화
-    create_export_price_visualization(export_price_index, product_category)
-    
-    return export_price_index
+    if visualize:
+        create_export_price_visualization(export_price_index, product_category)
 
 def create_export_price_csv(export_price_index, manufacturing_cost_index, normalized_freight_costs, 
                            tariff_rates, effective_tariff_rates, product_category=None):
     """수출 가격 지수를 CSV 파일로 저장합니다."""
-    
-    # 데이터프레임 생성을 위한 데이터 준비
-    data = []
-    for country_code, country_name in TARGET_COUNTRIES.items():
-        data.append({
-            '국가 코드': country_code,
-            '국가명': country_name,
-            '제조 비용 지수': manufacturing_cost_index[country_code],
-            '화물 비용 지수': normalized_freight_costs[country_code],
-            '기본 관세율(%)': tariff_rates[country_code],
-            '실효 관세율(%)': effective_tariff_rates[country_code],
-            '최종 수출 가격 지수': export_price_index[country_code]
-        })
-    
-    # 데이터프레임 생성 및 CSV 저장
-    df = pd.DataFrame(data)
-    
+    import pandas as pd  # CSV 내보내기에서만 사용 (대시보드 import 시 로드하지 않음)
+    
+    # 국가 레지스트리 순서로 열 단위 데이터프레임 생성
+    codes = list(TARGET_COUNTRIES)
+    df = pd.DataFrame({
+        '국가 코드': codes,
+        '국가명': list(TARGET_COUNTRIES.values()),
+        '제조 비용 지수': pd.Series(manufacturing_cost_index, dtype=float).reindex(codes).to_numpy(),
+        '화물 비용 지수': pd.Series(normalized_freight_costs, dtype=float).reindex(codes).to_numpy(),
+        '기본 관세율(%)': pd.Series(tariff_rates, dtype=float).reindex(codes).to_numpy(),
+        '실효 관세율(%)': pd.Series(effective_tariff_rates, dtype=float).reindex(codes).to_numpy(),
+        '최종 수출 가격 지수': pd.Series(export_price_index, dtype=float).reindex(codes).to_numpy()
+    })
+    
+    # CSV 저장
     file_name = "export_price_index.csv"
     if product_category:
         file_name = f"export_price_index_{product_category.replace(' ', '_')}.csv"
@@ -301,51 +251,13 @@ def create_export_price_csv(export_price_index, manufacturing_cost_index, normal
     return csv_file_path
 
 def create_export_price_visualization(export_price_index, product_category=None):
-    """수출 가격 지수를 시각화합니다."""
-    
-    # 국가 이름과 가격 지수 준비
-    countries = [TARGET_COUNTRIES[code] for code in export_price_index.keys()]
-    prices = list(export_price_index.values())
-    
-    # 한국을 기준으로 정렬
-    kr_index = countries.index('대한민국')
-    countries.insert(0, countries.pop(kr_index))
-    prices.insert(0, prices.pop(kr_index))
-    
-    # 막대 그래프 생성
-    plt.figure(figsize=(12, 8))
-    bars = plt.bar(countries, prices, color='lightcoral')
-    
-    # 한국 막대 강조
-    bars[0].set_color('blue')
-    
-    # 그래프 제목 및 레이블 설정
-    title = '국가별 미국 수출 가격 지수 (대한민국 = 100)'
-    if product_category:
-        title = f'{product_category} - 국가별 미국 수출 가격 지수 (대한민국 = 100)'
-    
-    plt.title(title, fontsize=16)
-    plt.xlabel('국가', fontsize=14)
-    plt.ylabel('가격 지수', fontsize=14)
-    plt.xticks(rotation=45, ha='right')
-    
-    # 값 표시
-    for i, v in enumerate(prices):
-        plt.text(i, v + 2, f'{v:.1f}', ha='center', fontsize=12)
-    
-    # 그리드 추가
-    plt.grid(axis='y', linestyle='--', alpha=0.7)
-    
-    # 여백 조정
-    plt.tight_layout()
-    
-    # 이미지 저장
+    """수출 가격 지수를 시각화합니다. (차트 서비스로 렌더링, 같은 데이터는 캐시 재사용)"""
     file_name = "export_price_index.png"
     if product_category:
         file_name = f"export_price_index_{product_category.replace(' ', '_')}.png"
     
     img_file_path = os.path.join(EXPORT_DATA_DIR, file_name)
-    plt.savefig(img_file_path, dpi=300)
+    chart_service.get_service().save(img_file_path, 'export_price', export_price_index, product_category)
     
     print(f"수출 가격 지수 시각화 저장 완료: {img_file_path}")
     return img_file_path
@@ -364,15 +276,28 @@ def format_export_price_comparison_korean(export_price_index):
     
     return "\n".join(result)
 
-def calculate_export_prices_for_products():
-    """여러 제품 카테고리에 대한 수출 가격을 계산합니다."""
+def calculate_export_prices_for_products(cost_indices=None, visualize=True):
+    """여러 제품 카테고리에 대한 수출 가격을 계산합니다.
+
+    cost_indices는 {제품 카테고리(기본은 None): 제조 비용 지수} 형식이며, 주어지면
+    제조 비용 지수 파일을 다시 읽지 않습니다. 계산 대상은 기본 지수와 제품 카테고리 설정
+    파일의 모든 카테고리입니다. 화물 비용, 관세율, 무역 협정 혜택은 한 번만 수집하여
+    모든 카테고리에 사용합니다.
+    """
     ensure_data_dir()
+    cost_indices = cost_indices or {}
+    categories = [None] + list(manufacturing_cost_simulator.load_product_categories())
     
-    # 기본 수출 가격 지수 계산
-    export_price_index = calculate_export_price_index()
+    # 공통 입력 데이터 수집
+    freight_costs = collect_freight_costs()
+    tariff_rates = get_tariff_rates()
+    trade_agreement_benefits = get_trade_agreement_benefits()
     
-    # 특정 제품 카테고리에 대한 수출 가격 지수 계산
-    eps_motor_price_index = calculate_export_price_index("EPS 모터")
+    # 기본 및 모든 제품 카테고리에 대한 수출 가격 지수를 한 번에 계산
+    export_price_indices = calculate_export_price_indices(
+        {category: cost_indices.get(category) for category in categories},
+        freight_costs, tariff_rates, trade_agreement_benefits, visualize=visualize)
+    export_price_index = export_price_indices[None]
     
     # 한국어 형식으로 포맷팅된 결과 저장
     formatted_result = format_export_price_comparison_korean(export_price_index)
@@ -384,7 +309,8 @@ def calculate_export_prices_for_products():
     
     return {
         'general': export_price_index,
-        'eps_motor': eps_motor_price_index
+        'eps_motor': export_price_indices.get("EPS 모터"),
+        'categories': {category: export_price_indices[category] for category in categories[1:]}
     }
 
 if __name__ == "__main__":
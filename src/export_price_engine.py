@@ -0,0 +1,162 @@
+"""
+수출 가격 지수 계산 엔진
+
+이 모듈은 (국가 × HS 코드 × 제품 카테고리 × 날짜) 텐서 전체의 수출 가격 지수를 한 번의
+NumPy 브로드캐스트 연산으로 계산합니다. 계산식은 등록된 수식 중에서 선택합니다.
+- weighted_80_10_10: 제조 비용 80%, 화물 비용 10%, (제조 + 화물) 비용에 대한 관세 10%
+- weighted_70_10_20: 제조 비용 70%, 화물 비용 10%, 관세 영향 20% (기준 국가 = 100 정규화)
+- landed: (제조 비용 + 화물 비용) × (1 + 관세율) × (1 - 무역 협정 혜택) (기준 국가 = 100 정규화)
+
+입력 배열의 모양:
+- 제조 비용 지수: (국가,) 또는 (카테고리, 국가)
+- 화물 비용, 무역 협정 혜택(%): (국가,)
+- 관세율(%): (국가,), (HS 코드, 국가) 또는 (날짜, HS 코드, 국가)
+결과 배열의 모양은 (국가, HS 코드, 카테고리, 날짜)입니다.
+"""
+
+import numpy as np
+from collections import namedtuple
+
+from src import country_registry
+
+# 수식에 전달되는 입력 (모두 (국가, HS 코드, 카테고리, 날짜)로 브로드캐스트 가능한 배열)
+PriceInputs = namedtuple('PriceInputs', ['cost', 'freight', 'tariff', 'benefit', 'base_index'])
+
+# 수출 가격 수식 (이름, 설명, 계산 함수, 기준 국가 = 100 정규화 여부)
+ExportPriceFormula = namedtuple('ExportPriceFormula', ['name', 'description', 'compute', 'normalize'])
+
+# 등록된 수식
+FORMULAS = {}
+
+def register_formula(name, description, compute, normalize=False):
+    """수출 가격 수식을 등록합니다. compute(PriceInputs)는 가격 배열을 반환해야 합니다."""
+    FORMULAS[name] = ExportPriceFormula(name, description, compute, normalize)
+    return FORMULAS[name]
+
+def get_formula(formula):
+    """수식 이름 또는 ExportPriceFormula를 ExportPriceFormula로 변환합니다."""
+    if isinstance(formula, ExportPriceFormula):
+        return formula
+    if formula not in FORMULAS:
+        raise KeyError(f"등록되지 않은 수출 가격 수식: {formula}")
+    return FORMULAS[formula]
+
+def base_freight_index(inputs, scale):
+    """기준 국가의 화물 비용을 scale로 하는 화물 비용 지수를 반환합니다."""
+    return inputs.freight / inputs.freight[inputs.base_index] * scale
+
+def _weighted_80_10_10(inputs):
+    """제조 비용 80%, 화물 비용 10%, 관세 10% 가중 수출 가격"""
+    freight = base_freight_index(inputs, 20)
+    effective_tariff = inputs.tariff * (1 - inputs.benefit / 100)
+    return inputs.cost * 0.8 + freight * 0.1 + (inputs.cost + freight) * (effective_tariff / 100) * 0.1
+
+def _weighted_70_10_20(inputs):
+    """제조 비용 70%, 화물 비용 10%, 관세 영향 20% 가중 수출 가격"""
+    freight = base_freight_index(inputs, 100)
+    # 기준 국가의 관세 영향은 관세율과 관계없이 100으로 둠
+    tariff = inputs.tariff.copy()
+    tariff[inputs.base_index] = 0.0
+    tariff_component = 100 * (1 + tariff / 100) * 0.2 * (1 - inputs.benefit / 100)
+    return inputs.cost * 0.7 + freight * 0.1 + tariff_component
+
+def _landed(inputs):
+    """관세와 무역 협정 혜택을 적용한 도착 가격"""
+    return (inputs.cost + inputs.freight) * (1 + inputs.tariff / 100) * (1 - inputs.benefit / 100)
+
+register_formula('weighted_80_10_10', "제조 비용 80%, 화물 비용 10%, 관세 10% 가중치", _weighted_80_10_10)
+register_formula('weighted_70_10_20', "제조 비용 70%, 화물 비용 10%, 관세 영향 20% 가중치 (기준 국가 = 100)",
+                 _weighted_70_10_20, normalize=True)
+register_formula('landed', "(제조 비용 + 화물 비용) × (1 + 관세율) × (1 - 혜택) (기준 국가 = 100)",
+                 _landed, normalize=True)
+
+def apply_formula(formula, inputs):
+    """PriceInputs에 수식을 적용합니다. 첫 번째 축이 국가인 배열이면 모양에 제한이 없습니다."""
+    formula = get_formula(formula)
+    values = formula.compute(inputs)
+    if formula.normalize:
+        values = values / values[inputs.base_index] * 100
+    return values
+
+def country_vector(values, countries, default=0.0):
+    """{국가 코드: 값} 딕셔너리를 국가 순서의 배열로 변환합니다."""
+    return country_registry.to_vector(values, countries, default)
+
+def country_matrix(values, rows, countries, default=0.0):
+    """{행 키: {국가 코드: 값}} 딕셔너리를 (행, 국가) 배열로 변환합니다."""
+    matrix = np.full((len(rows), len(countries)), default, dtype=float)
+    for i, row in enumerate(rows):
+        matrix[i] = country_registry.to_vector(values.get(row) or {}, countries, default)
+    return matrix
+
+def timeline_tariffs(timeline, countries, hs_codes, dates, default=0.0):
+    """관세 적용 기간 색인에서 (날짜, HS 코드, 국가) 관세율 배열을 일괄 조회합니다."""
+    date_grid, hs_grid, country_grid = np.meshgrid(
+        np.asarray(dates, dtype='datetime64[D]'), np.asarray(hs_codes, dtype=str),
+        np.asarray(countries, dtype=str), indexing='ij')
+    rows = timeline.rows_at(country_grid.ravel(), hs_grid.ravel(), date_grid.ravel())
+    rates = np.where(rows >= 0, timeline.table.rate[np.maximum(rows, 0)], default) if len(rows) else rows
+    return np.asarray(rates, dtype=float).reshape(len(dates), len(hs_codes), len(countries))
+
+class ExportPriceTensor:
+    """(국가, HS 코드, 카테고리, 날짜) 축 레이블과 수출 가격 지수 배열"""
+
+    def __init__(self, countries, hs_codes, categories, dates, values):
+        self.countries = list(countries)
+        self.hs_codes = list(hs_codes)
+        self.categories = list(categories)
+        self.dates = list(dates)
+        self.values = values
+
+    def by_country(self, hs_code=None, category=None, date=None):
+        """한 (HS 코드, 카테고리, 날짜)의 {국가 코드: 지수}를 반환합니다."""
+        column = self.values[:, self.hs_codes.index(hs_code), self.categories.index(category),
+                             self.dates.index(date)]
+        return dict(zip(self.countries, column.tolist()))
+
+def _cost_tensor(cost, country_count):
+    """제조 비용 지수를 (국가, 1, 카테고리, 1) 배열로 변환합니다."""
+    cost = np.asarray(cost, dtype=float).reshape(-1, country_count)
+    return cost.T[:, np.newaxis, :, np.newaxis]
+
+def _tariff_tensor(tariff, country_count):
+    """관세율을 (국가, HS 코드, 1, 날짜) 배열로 변환합니다."""
+    tariff = np.asarray(tariff, dtype=float)
+    tariff = tariff.reshape((1,) * (3 - tariff.ndim) + tariff.shape)
+    if tariff.shape[-1] != country_count:
+        raise ValueError("관세율 배열의 마지막 축은 국가여야 합니다.")
+    return tariff.transpose(2, 1, 0)[:, :, np.newaxis, :]
+
+def _country_tensor(values, country_count):
+    """국가별 값을 (국가, 1, 1, 1) 배열로 변환합니다."""
+    return np.asarray(values, dtype=float).reshape(country_count, 1, 1, 1)
+
+def evaluate(formula, countries, cost, freight, tariff, benefit=None, base_country='KR',
+             hs_codes=None, categories=None, dates=None):
+    """(국가 × HS 코드 × 카테고리 × 날짜) 수출 가격 지수를 한 번에 계산합니다.
+
+    hs_codes, categories, dates는 각 축의 레이블이며, 생략하면 길이 1의 [None] 축이 됩니다.
+    """
+    formula = get_formula(formula)
+    countries = list(countries)
+    country_count = len(countries)
+    hs_codes = [None] if hs_codes is None else list(hs_codes)
+    categories = [None] if categories is None else list(categories)
+    dates = [None] if dates is None else list(dates)
+    benefit = np.zeros(country_count) if benefit is None else benefit
+
+    inputs = PriceInputs(
+        cost=_cost_tensor(cost, country_count),
+        freight=_country_tensor(freight, country_count),
+        tariff=_tariff_tensor(tariff, country_count),
+        benefit=_country_tensor(benefit, country_count),
+        base_index=countries.index(base_country)
+    )
+
+    shape = (country_count, len(hs_codes), len(categories), len(dates))
+    for name, array in zip(('제조 비용', '관세율'), (inputs.cost, inputs.tariff)):
+        if any(size not in (1, expected) for size, expected in zip(array.shape, shape)):
+            raise ValueError(f"{name} 배열의 모양 {array.shape}이 축 레이블 {shape}과 맞지 않습니다.")
+
+    values = np.broadcast_to(apply_formula(formula, inputs), shape).astype(float)
+    return ExportPriceTensor(countries, hs_codes, categories, dates, values)
@@ -0,0 +1,333 @@
+"""
+HS 코드별 수출 가격 지수 파이프라인
+
+이 모듈은 제품 목록(data/hs_products.json: HS 코드 + 제조 비용 카테고리)에 있는 모든 HS 코드의
+국가별 수출 가격 지수를 한 번의 수출 가격 엔진 호출로 계산하고, HS 코드마다 JSON·CSV·PNG를
+따로 쓰는 대신 하나의 열 단위 파일(export_data/hs_export_price_index.npz)로 저장합니다.
+- HS 코드 → 관세율 행은 관세 저장소 HS 코드 사전의 이진 탐색으로 일괄 조회
+- 제품 카테고리 → 제조 비용 지수 행은 카테고리 ID 배열로 일괄 선택
+  (제조 비용 지수가 주어지지 않은 카테고리는 일반 제조 비용 지수 사용)
+- 결과는 (HS 코드, 국가) 행렬 하나이며 제품 정보 열과 함께 저장
+"""
+
+import os
+import json
+import time
+import tempfile
+import numpy as np
+from collections import namedtuple
+from datetime import datetime
+
+from src import country_registry, export_price_engine, tariff_rules, tariff_store
+
+# 프로젝트 루트 디렉토리 경로
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 데이터 디렉토리 경로
+DATA_DIR = os.path.join(ROOT_DIR, 'data')
+EXPORT_DATA_DIR = os.path.join(DATA_DIR, 'export_data')
+
+# 제품 목록 파일
+HS_PRODUCTS_FILE_NAME = 'hs_products.json'
+HS_PRODUCTS_FILE = os.path.join(DATA_DIR, HS_PRODUCTS_FILE_NAME)
+
+# HS 코드별 수출 가격 지수 통합 파일
+HS_EXPORT_INDEX_FILE_NAME = 'hs_export_price_index.npz'
+
+# 제품 목록 (모든 필드는 제품 순서의 문자열 배열, 일반 제조 비용 카테고리는 빈 문자열)
+HSProducts = namedtuple('HSProducts', ['hs_codes', 'names', 'descriptions', 'categories'])
+
+def build_products(hs_codes, names=None, descriptions=None, categories=None):
+    """HS 코드와 제품 정보 목록으로 제품 목록을 생성합니다. 중복된 HS 코드는 ValueError입니다."""
+    hs_codes = np.asarray(hs_codes, dtype=str)
+    count = len(hs_codes)
+    if len(np.unique(hs_codes)) != count:
+        raise ValueError("제품 목록에 중복된 HS 코드가 있습니다.")
+
+    def column(values, default):
+        if values is None:
+            return np.asarray(default, dtype=str)
+        values = np.asarray(['' if value is None else value for value in values], dtype=str)
+        if len(values) != count:
+            raise ValueError("제품 정보의 개수가 HS 코드 개수와 다릅니다.")
+        return values
+
+    return HSProducts(
+        hs_codes=hs_codes,
+        names=column(names, hs_codes),
+        descriptions=column(descriptions, np.full(count, '')),
+        categories=column(categories, np.full(count, ''))
+    )
+
+def read_products(file_path=HS_PRODUCTS_FILE):
+    """제품 목록 파일에서 제품 목록을 로드합니다."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+
+    products = config.get('products', [])
+    return build_products(
+        [product['hs_code'] for product in products],
+        [product.get('name') or product['hs_code'] for product in products],
+        [product.get('description') for product in products],
+        [product.get('category') for product in products]
+    )
+
+def load_products(data_dir=DATA_DIR):
+    """데이터 디렉토리의 제품 목록을 로드합니다."""
+    return read_products(os.path.join(data_dir, HS_PRODUCTS_FILE_NAME))
+
+def store_tariff_matrix(table, hs_codes, countries):
+    """관세 저장소의 최신 종가세율을 (HS 코드, 국가) 행렬로 일괄 조회합니다. 없는 칸은 0입니다."""
+    rates = tariff_store.latest_rate_matrix(table, countries)
+    rows = country_registry.lookup(table.hs_codes, hs_codes)
+    known = rows >= 0
+    matrix = np.zeros((len(rows), len(countries)))
+    matrix[known] = rates[rows[known]]
+    return matrix
+
+def tariff_matrix(hs_codes, countries, table=None, overrides=None):
+    """(HS 코드, 국가) 관세율 행렬을 만듭니다.
+
+    관세 저장소(table)의 최신 관세율을 기본으로 하고, overrides({HS 코드: {국가 코드: 관세율}})에
+    있는 HS 코드 행은 그 값으로 대체합니다.
+    """
+    hs_codes = np.asarray(hs_codes, dtype=str)
+    if table is None:
+        matrix = np.zeros((len(hs_codes), len(countries)))
+    else:
+        matrix = store_tariff_matrix(table, hs_codes, countries)
+
+    if overrides:
+        override_codes = list(overrides)
+        rows = country_registry.lookup(hs_codes, override_codes)
+        known = rows >= 0
+        matrix[rows[known]] = export_price_engine.country_matrix(
+            overrides, [code for code, found in zip(override_codes, known) if found], countries)
+    return matrix
+
+def rule_tariff_records(products, countries, as_of_date, expiration_date=None):
+    """제품 목록 전체의 as_of_date 기준 관세 규칙 실효 관세율을 관세 저장소 항목 목록으로 만듭니다.
+
+    (HS 코드, 국가) 관세율은 결정 테이블로 한 번에 계산하며, 항목의 적용 시작일은 as_of_date입니다.
+    """
+    rates = tariff_rules.effective_rates(products.hs_codes, countries, as_of_date)
+    return [
+        {
+            "country_code": country_code,
+            "hs_code": hs_code,
+            "description": description,
+            "rate": rate,
+            "effective_date": as_of_date,
+            "expiration_date": expiration_date,
+            "notes": f"관세 규칙 적용 (기준일 {as_of_date})"
+        }
+        for hs_code, description, line_rates in zip(products.hs_codes.tolist(), products.descriptions.tolist(),
+                                                    rates.tolist())
+        for country_code, rate in zip(countries, line_rates)
+    ]
+
+def tariff_as_of(as_of_date=None):
+    """관세 규칙 기준일(YYYY-MM-DD)을 반환합니다. 생략하면 오늘입니다."""
+    return as_of_date or datetime.now().date().isoformat()
+
+def store_base_rates(table):
+    """관세 저장소 HS 코드 사전 순서의 기본 관세율(MFN, base_rate 열) 벡터를 반환합니다. 값이 없는 HS 코드는 0입니다."""
+    base_rates = np.full(len(table.hs_codes), -np.inf)
+    known = ~np.isnan(table.base_rate)
+    np.maximum.at(base_rates, table.hs_id[known], table.base_rate[known])
+    return np.where(np.isfinite(base_rates), base_rates, 0.0)
+
+def rule_tariff_matrix(table, countries, as_of_date=None):
+    """관세 저장소 HS 코드 사전 순서의 (HS 코드, 국가) 관세 규칙 실효 관세율 행렬을 계산합니다.
+
+    기본 관세는 저장소의 base_rate(규칙 파일에 MFN 규칙이 있으면 규칙 세율)이며, 특혜 세율과 추가 관세는
+    as_of_date(생략하면 오늘) 기준 관세 규칙으로 중첩합니다.
+    """
+    return tariff_rules.effective_rates(table.hs_codes, countries, tariff_as_of(as_of_date), store_base_rates(table))
+
+def country_tariff_rates(countries, as_of_date=None, data_dir=DATA_DIR):
+    """제품 목록 HS 코드의 관세 규칙 실효 관세율(as_of_date 기준)을 국가별로 평균한 (국가,) 벡터를 반환합니다.
+
+    제품이 없으면 모든 국가가 0입니다.
+    """
+    products = load_products(data_dir)
+    if not len(products.hs_codes):
+        return np.zeros(len(countries))
+    return tariff_rules.effective_rates(products.hs_codes, countries, tariff_as_of(as_of_date)).mean(axis=0)
+
+def category_ids(products, categories):
+    """제품별 제조 비용 행 번호를 반환합니다. categories에 없는 카테고리는 일반(None) 행입니다."""
+    labels = ['' if category is None else category for category in categories]
+    general = labels.index('') if '' in labels else -1
+    ids = country_registry.lookup(labels, products.categories)
+    ids = np.where(ids >= 0, ids, general)
+    if (ids < 0).any():
+        raise KeyError("일반 제조 비용 지수(None)가 없어 카테고리를 대체할 수 없습니다.")
+    return ids
+
+class HSExportIndexTable:
+    """제품 목록과 (HS 코드, 국가) 수출 가격 지수 행렬"""
+
+    def __init__(self, products, countries, values, formula, base_country='KR', calculation_date=None):
+        self.products = products
+        self.countries = list(countries)
+        self.values = np.asarray(values, dtype=float)
+        self.formula = formula
+        self.base_country = base_country
+        self.calculation_date = calculation_date or datetime.now().strftime('%Y-%m-%d')
+        self._rows = {code: row for row, code in enumerate(products.hs_codes.tolist())}
+
+    def __len__(self):
+        return len(self.products.hs_codes)
+
+    def row(self, hs_code):
+        """HS 코드의 행 번호를 반환합니다. 없는 HS 코드는 KeyError를 발생시킵니다."""
+        if hs_code not in self._rows:
+            raise KeyError(f"제품 목록에 없는 HS 코드: {hs_code}")
+        return self._rows[hs_code]
+
+    def by_country(self, hs_code):
+        """한 HS 코드의 {국가 코드: 수출 가격 지수}를 반환합니다."""
+        return dict(zip(self.countries, self.values[self.row(hs_code)].tolist()))
+
+    def items(self):
+        """(HS 코드, 제품명, 제품 설명, {국가 코드: 지수})를 제품 순서로 반환합니다."""
+        products = self.products
+        for row, values in enumerate(self.values.tolist()):
+            yield (str(products.hs_codes[row]), str(products.names[row]), str(products.descriptions[row]),
+                   dict(zip(self.countries, values)))
+
+def compute_export_indices(products, countries, cost_indices, freight, tariff, benefit=None,
+                           formula='landed', base_country='KR'):
+    """제품 목록 전체의 국가별 수출 가격 지수를 한 번에 계산합니다.
+
+    cost_indices는 {카테고리: {국가 코드: 제조 비용 지수}}이며 일반 지수는 None 키입니다.
+    freight, benefit은 {국가 코드: 값}, tariff는 제품 순서의 (HS 코드, 국가) 관세율 배열입니다.
+    """
+    countries = list(countries)
+    categories = list(cost_indices)
+    ids = category_ids(products, categories)
+
+    prices = export_price_engine.evaluate(
+        formula, countries,
+        cost=export_price_engine.country_matrix(cost_indices, categories, countries),
+        freight=export_price_engine.country_vector(freight, countries),
+        tariff=tariff,
+        benefit=None if benefit is None else export_price_engine.country_vector(benefit, countries),
+        base_country=base_country,
+        hs_codes=products.hs_codes.tolist(),
+        categories=categories
+    )
+
+    # (국가, HS 코드, 카테고리) 중 제품별 카테고리 열만 선택 → (HS 코드, 국가)
+    values = prices.values[:, np.arange(len(ids)), ids, 0].T
+    return HSExportIndexTable(products, countries, values, export_price_engine.get_formula(formula).name,
+                              base_country)
+
+def write_export_indices(result, output_dir=EXPORT_DATA_DIR):
+    """수출 가격 지수를 하나의 열 단위 파일로 원자적으로 저장합니다."""
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, HS_EXPORT_INDEX_FILE_NAME)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        np.savez(
+            f,
+            countries=np.asarray(result.countries, dtype=str),
+            values=result.values,
+            metadata=np.array(json.dumps({
+                'formula': result.formula,
+                'base_country': result.base_country,
+                'calculation_date': result.calculation_date
+            }, ensure_ascii=False)),
+            **result.products._asdict()
+        )
+    os.replace(temp_path, path)
+    return path
+
+def read_export_indices(path=os.path.join(EXPORT_DATA_DIR, HS_EXPORT_INDEX_FILE_NAME)):
+    """통합 파일에서 수출 가격 지수를 로드합니다. 파일이 없으면 None을 반환합니다."""
+    if not os.path.exists(path):
+        return None
+
+    with np.load(path, allow_pickle=False) as data:
+        products = HSProducts(**{field: data[field] for field in HSProducts._fields})
+        countries = data['countries'].tolist()
+        values = data['values']
+        metadata = json.loads(str(data['metadata']))
+
+    return HSExportIndexTable(products, countries, values, metadata['formula'],
+                              metadata['base_country'], metadata['calculation_date'])
+
+def tariff_summary(table, hs_codes):
+    """대시보드용 {HS 코드: {제품 설명, 국가별 최신 관세율}} 요약을 한 번의 조회로 만듭니다."""
+    names = tariff_store.country_names(table)
+    mask = tariff_store.latest_mask(table) & np.isin(table.hs_codes[table.hs_id], np.asarray(hs_codes, dtype=str))
+
+    summary = {}
+    for record in tariff_store.table_records(table, mask):
+        entry = summary.setdefault(record["hs_code"], {
+            "product_description": record["description"],
+            "country_rates": {}
+        })
+        entry["country_rates"][record["country_code"]] = {
+            "country_name": names.get(record["country_code"], record["country_code"]),
+            "tariff_rate": record["rate"],
+            "effective_date": record["effective_date"]
+        }
+    return summary
+
+def export_index_summary(result):
+    """대시보드용 {HS 코드: {제품 설명, 기준 국가, 계산일, 국가별 지수}} 요약을 만듭니다."""
+    return {
+        hs_code: {
+            "product_description": description,
+            "base_country": result.base_country,
+            "calculation_date": result.calculation_date,
+            "indices": indices
+        }
+        for hs_code, _, description, indices in result.items()
+    }
+
+def synthetic_products(hs_count, categories=(None,)):
+    """벤치마크용 제품 목록을 생성합니다. 카테고리는 categories를 순서대로 반복합니다."""
+    hs_codes = [f"{8400 + i // 100:04d}.{i % 100:02d}" for i in range(hs_count)]
+    return build_products(hs_codes, categories=[categories[i % len(categories)] for i in range(hs_count)])
+
+def benchmark(hs_count=5000, repeat=3, seed=0):
+    """hs_count개 HS 코드의 계산·저장·로드 시간(초, repeat회 중 최솟값)을 측정합니다."""
+    rng = np.random.default_rng(seed)
+    countries = country_registry.country_codes()
+    categories = [None, "EPS 모터", "알루미늄"]
+    products = synthetic_products(hs_count, categories)
+    cost_indices = {
+        category: dict(zip(countries, rng.uniform(80, 120, len(countries)).tolist())) for category in categories
+    }
+    freight = dict(zip(countries, rng.uniform(3, 8, len(countries)).tolist()))
+    tariff = rng.uniform(0, 30, (hs_count, len(countries)))
+
+    timings = {'compute': [], 'write': [], 'read': []}
+    with tempfile.TemporaryDirectory() as output_dir:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = compute_export_indices(products, countries, cost_indices, freight, tariff)
+            timings['compute'].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            path = write_export_indices(result, output_dir)
+            timings['write'].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            read_export_indices(path)
+            timings['read'].append(time.perf_counter() - start)
+
+    summary = {name: min(values) for name, values in timings.items()}
+    summary['hs_count'] = hs_count
+    summary['country_count'] = len(countries)
+    return summary
+
+if __name__ == "__main__":
+    # 5,000개 HS 코드 벤치마크
+    result = benchmark()
+    print(f"HS 코드 {result['hs_count']}개 × 국가 {result['country_count']}개 수출 가격 지수")
+    print(f"계산: {result['compute'] * 1000:.1f} ms, 저장: {result['write'] * 1000:.1f} ms, "
+          f"로드: {result['read'] * 1000:.1f} ms")
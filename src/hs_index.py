@@ -0,0 +1,104 @@
+"""
+HS 코드 접두사 색인
+
+이 모듈은 HS 코드를 정렬된 숫자 문자열 배열로 색인하여 계층(류/호/소호/세번) 조회를 제공합니다.
+- 접두사 P 아래의 모든 관세 품목 조회 (이진 탐색, O(log n))
+- 품목 L을 포함하는 가장 구체적인 규칙 코드 조회 (색인된 코드 길이별 이진 탐색)
+- 수천 개의 코드를 한 번에 처리하는 일괄 조회 (NumPy 문자열 절단 + searchsorted)
+"""
+
+import numpy as np
+
+# 접두사 범위의 상한을 만들 때 붙이는 문자 (ASCII에서 '9' 다음 문자)
+PREFIX_UPPER_BOUND = ':'
+
+def normalize_hs_code(hs_code):
+    """HS 코드에서 숫자만 남깁니다. ('8708.10.00' → '87081000')"""
+    return ''.join(ch for ch in str(hs_code) if ch.isdigit())
+
+def normalize_hs_codes(hs_codes):
+    """HS 코드 목록을 숫자 문자열 배열로 변환합니다."""
+    return np.array([normalize_hs_code(hs_code) for hs_code in hs_codes], dtype=str)
+
+class HSPrefixIndex:
+    """정렬된 HS 코드 배열 기반 접두사 색인"""
+
+    def __init__(self, hs_codes):
+        codes = np.unique(np.asarray(list(hs_codes), dtype=str))
+        keys = normalize_hs_codes(codes)
+        order = np.argsort(keys, kind='stable')
+
+        # 원래 형식의 코드와 정규화된 키를 같은 순서로 보관
+        self.codes = codes[order]
+        self.keys = keys[order]
+        self.key_lengths = np.unique(np.char.str_len(self.keys)) if len(self.keys) else np.array([], dtype=int)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def prefix_ranges(self, prefixes):
+        """접두사 목록 각각에 대해 색인 내 [시작, 끝) 위치 배열을 반환합니다."""
+        prefix_keys = normalize_hs_codes(prefixes)
+        starts = np.searchsorted(self.keys, prefix_keys, side='left')
+        ends = np.searchsorted(self.keys, np.char.add(prefix_keys, PREFIX_UPPER_BOUND), side='left')
+        return starts, ends
+
+    def lines_under(self, prefix):
+        """접두사 아래의 모든 HS 코드를 반환합니다. ('8708' → ['8708.10.00', ...])"""
+        starts, ends = self.prefix_ranges([prefix])
+        return self.codes[starts[0]:ends[0]]
+
+    def lines_under_many(self, prefixes):
+        """여러 접두사 아래의 HS 코드를 한 번에 조회하여 {접두사: HS 코드 배열}을 반환합니다."""
+        prefixes = list(prefixes)
+        starts, ends = self.prefix_ranges(prefixes)
+        return {
+            prefix: self.codes[start:end]
+            for prefix, start, end in zip(prefixes, starts.tolist(), ends.tolist())
+        }
+
+    def lines_under_any(self, prefixes):
+        """접두사 중 하나 이상에 속하는 HS 코드를 중복 없이 반환합니다."""
+        starts, ends = self.prefix_ranges(list(prefixes))
+        covered = np.zeros(len(self.codes) + 1, dtype=np.int64)
+        np.add.at(covered, starts, 1)
+        np.add.at(covered, ends, -1)
+        return self.codes[np.cumsum(covered[:-1]) > 0]
+
+    def count_under_many(self, prefixes):
+        """여러 접두사 아래의 HS 코드 개수 배열을 반환합니다."""
+        starts, ends = self.prefix_ranges(list(prefixes))
+        return ends - starts
+
+    def most_specific_positions(self, hs_codes):
+        """각 HS 코드를 포함하는 가장 긴 색인 코드의 위치 배열을 반환합니다. 없으면 -1입니다.
+
+        색인된 코드 길이마다 조회 코드를 그 길이로 절단하여 이진 탐색하고,
+        짧은 길이부터 차례로 덮어써서 가장 구체적인 코드가 남도록 합니다.
+        """
+        query_keys = normalize_hs_codes(hs_codes)
+        positions = np.full(len(query_keys), -1, dtype=np.int64)
+        if len(self.keys) == 0 or len(query_keys) == 0:
+            return positions
+
+        query_lengths = np.char.str_len(query_keys)
+        for length in self.key_lengths.tolist():
+            truncated = query_keys.astype(f'<U{length}')
+            found_at = np.minimum(np.searchsorted(self.keys, truncated), len(self.keys) - 1)
+            matched = (self.keys[found_at] == truncated) & (query_lengths >= length)
+            positions[matched] = found_at[matched]
+
+        return positions
+
+    def most_specific_many(self, hs_codes):
+        """각 HS 코드를 포함하는 가장 구체적인 색인 코드 배열을 반환합니다. 없으면 빈 문자열입니다."""
+        positions = self.most_specific_positions(hs_codes)
+        result = np.full(len(positions), '', dtype=self.codes.dtype if len(self.codes) else str)
+        matched = positions >= 0
+        result[matched] = self.codes[positions[matched]]
+        return result
+
+    def most_specific(self, hs_code):
+        """HS 코드를 포함하는 가장 구체적인 색인 코드를 반환합니다. 없으면 None입니다."""
+        position = self.most_specific_positions([hs_code])[0]
+        return None if position < 0 else str(self.codes[position])
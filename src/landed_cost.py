@@ -0,0 +1,306 @@
+"""
+절대 도착 원가 계산 모듈
+
+이 모듈은 지수(한국 = 100)가 아닌 단위당 USD 도착 원가를 계산합니다. 수집된 원시 비용 요소와
+SKU별 자재 명세서(BOM)·공정 자원 사용량(data/sku_catalog.json)을 결합하여
+(SKU × 원산지 국가) 전체를 배열 연산으로 한 번에 평가합니다.
+- 자재비: BOM 수량 × 단가의 합 (원산지와 무관)
+- 노무비·유틸리티비·부지비: 단위당 자원 사용량 × 원산지별 단가 (시간당 노동 비용, 전기·수도·가스 단가, 월 임대료)
+- 화물비: 40ft 컨테이너당 화물 비용 ÷ 컨테이너당 적재 수량
+- 관세: 공장 출고 원가(자재 + 노무 + 유틸리티 + 부지) × 관세율 × (1 - 무역 협정 혜택)
+원시 비용 요소 배열은 데이터 파일이 바뀌지 않는 한 다시 읽지 않고 재사용합니다.
+"""
+
+import os
+import json
+import time
+import threading
+import numpy as np
+from collections import namedtuple
+
+from src import country_registry, export_price_calculator, export_price_engine, hs_export_pipeline, tariff_rules, tariff_store
+
+# 프로젝트 루트 디렉토리 경로
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 데이터 디렉토리 경로
+DATA_DIR = os.path.join(ROOT_DIR, 'data')
+
+# SKU 카탈로그 파일
+SKU_CATALOG_FILE_NAME = 'sku_catalog.json'
+SKU_CATALOG_FILE = os.path.join(DATA_DIR, SKU_CATALOG_FILE_NAME)
+
+# 공정 자원별 (카탈로그 필드, 비용 파일, 데이터 키, 원가 구성 요소)
+PROCESS_RESOURCES = [
+    ('labor_hours', 'labor_costs.json', 'total_labor_costs', 'labor'),        # USD/시간
+    ('electricity_kwh', 'utility_costs.json', 'electricity_costs', 'utility'),  # USD/kWh
+    ('water_m3', 'utility_costs.json', 'water_costs', 'utility'),              # USD/m³
+    ('gas_mmbtu', 'utility_costs.json', 'gas_costs', 'utility'),               # USD/MMBtu
+    ('floor_space_m2_month', 'land_costs.json', 'data', 'land')                # USD/m²/월
+]
+RESOURCE_FIELDS = [resource[0] for resource in PROCESS_RESOURCES]
+
+# 원가 구성 요소 (결과 배열의 첫 번째 축 순서)
+COMPONENTS = ['material', 'labor', 'utility', 'land', 'freight', 'tariff']
+COMPONENT_LABELS = {
+    'material': '자재비',
+    'labor': '노무비',
+    'utility': '유틸리티비',
+    'land': '부지비',
+    'freight': '화물비',
+    'tariff': '관세'
+}
+
+# 공장 출고 원가(관세 과세 가격)에 포함되는 구성 요소
+EX_WORKS_COMPONENTS = ['material', 'labor', 'utility', 'land']
+
+# 원가 계산용 원시 비용 요소 배열
+# - resource_prices: (공정 자원, 국가) 단가
+# - freight: (국가,) 40ft 컨테이너당 화물 비용
+# - benefit: (국가,) 무역 협정 혜택(%)
+# - hs_codes, hs_tariffs: 관세 저장소의 정렬된 HS 코드 사전과 (HS 코드, 국가) 관세 규칙 실효 관세율(%)
+LandedCostFactors = namedtuple('LandedCostFactors', [
+    'countries', 'resource_prices', 'freight', 'benefit', 'hs_codes', 'hs_tariffs'
+])
+
+# SKU 카탈로그 (SKU 순서의 배열)
+# - usage: (SKU, 공정 자원) 단위당 자원 사용량
+# - material_cost: (SKU,) BOM 자재비 합계
+SKUCatalog = namedtuple('SKUCatalog', [
+    'skus', 'names', 'hs_codes', 'units_per_container', 'usage', 'material_cost'
+])
+
+def _freight_file(data_dir):
+    """40ft 컨테이너당 화물 비용 파일 경로를 반환합니다."""
+    return os.path.join(data_dir, 'export_data', 'freight_costs.json')
+
+def _store_file(data_dir):
+    """관세 저장소 파일 경로를 반환합니다."""
+    return os.path.join(data_dir, 'tariff_data', os.path.basename(tariff_store.STORE_FILE))
+
+def read_freight_costs(file_path):
+    """화물 비용 파일에서 {국가 코드: 40ft 컨테이너당 USD}를 읽습니다.
+
+    수집 형식('data' 키)이 아닌 파일이거나 파일이 없으면 기본 화물 비용을 사용합니다.
+    """
+    if os.path.exists(file_path):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict) and isinstance(data.get('data'), dict):
+            return data['data']
+    return dict(export_price_calculator.FREIGHT_COSTS)
+
+def load_factors(data_dir=DATA_DIR, as_of_date=None):
+    """데이터 디렉토리의 원시 비용 요소, 관세 저장소의 HS 코드와 관세 규칙(as_of_date 기준)으로 원가 계산 배열을 만듭니다."""
+    countries = country_registry.country_codes()
+    cost_data_dir = os.path.join(data_dir, 'cost_data')
+
+    sources = {}
+    resource_prices = np.zeros((len(PROCESS_RESOURCES), len(countries)))
+    for row, (field, file_name, key, _) in enumerate(PROCESS_RESOURCES):
+        if file_name not in sources:
+            with open(os.path.join(cost_data_dir, file_name), 'r', encoding='utf-8') as f:
+                sources[file_name] = json.load(f)
+        values = sources[file_name][key]
+        missing = [country for country in countries if country not in values]
+        if missing:
+            raise KeyError(f"{file_name}의 {key}에 국가 데이터가 없습니다: {', '.join(missing)}")
+        resource_prices[row] = export_price_engine.country_vector(values, countries)
+
+    table = tariff_store.read_table(_store_file(data_dir))
+    return LandedCostFactors(
+        countries=countries,
+        resource_prices=resource_prices,
+        freight=export_price_engine.country_vector(read_freight_costs(_freight_file(data_dir)), countries),
+        benefit=export_price_engine.country_vector(export_price_calculator.TRADE_AGREEMENT_BENEFITS, countries),
+        hs_codes=np.asarray(table.hs_codes, dtype=str),
+        hs_tariffs=hs_export_pipeline.rule_tariff_matrix(table, countries, as_of_date)
+    )
+
+def _factor_token(data_dir, as_of_date):
+    """관세 규칙 기준일과 원가 계산에 쓰이는 파일들의 (수정 시각, 크기) 목록을 반환합니다."""
+    paths = sorted({os.path.join(data_dir, 'cost_data', resource[1]) for resource in PROCESS_RESOURCES})
+    paths += [_freight_file(data_dir), _store_file(data_dir), country_registry.COUNTRIES_FILE,
+              tariff_rules.TARIFF_RULES_FILE, os.path.join(data_dir, hs_export_pipeline.HS_PRODUCTS_FILE_NAME)]
+    token = [hs_export_pipeline.tariff_as_of(as_of_date)]
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            token.append((path, stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            token.append((path, None, None))
+    return tuple(token)
+
+# 프로세스 전체에서 공유하는 원시 비용 요소 배열 (데이터 파일이 바뀌면 다시 로드)
+_factors_lock = threading.Lock()
+_factors_cache = {}
+
+def get_factors(data_dir=DATA_DIR, as_of_date=None):
+    """원가 계산 배열을 반환합니다. 데이터 파일과 관세 규칙 기준일이 바뀌지 않았다면 다시 읽지 않습니다."""
+    token = _factor_token(data_dir, as_of_date)
+    with _factors_lock:
+        cached = _factors_cache.get(data_dir)
+        if cached is None or cached[0] != token:
+            cached = (token, load_factors(data_dir, as_of_date))
+            _factors_cache[data_dir] = cached
+        return cached[1]
+
+def build_catalog(records):
+    """SKU 목록(딕셔너리)으로 SKU 카탈로그를 만듭니다.
+
+    각 SKU는 sku, hs_code, units_per_container, 공정 자원 사용량(없으면 0),
+    bill_of_materials([{component, quantity, unit_cost}])를 가집니다.
+    """
+    skus = np.asarray([record['sku'] for record in records], dtype=str)
+    if len(np.unique(skus)) != len(skus):
+        raise ValueError("SKU 카탈로그에 중복된 SKU가 있습니다.")
+
+    units = np.asarray([record['units_per_container'] for record in records], dtype=float)
+    if (units <= 0).any():
+        raise ValueError("컨테이너당 적재 수량은 0보다 커야 합니다.")
+
+    usage = np.asarray([[record.get(field, 0.0) for field in RESOURCE_FIELDS] for record in records],
+                       dtype=float).reshape(len(records), len(RESOURCE_FIELDS))
+    if (usage < 0).any():
+        raise ValueError("공정 자원 사용량은 음수일 수 없습니다.")
+
+    # BOM 행을 평탄화하여 SKU별 자재비를 일괄 합산
+    bom_rows = [(row, item['quantity'], item['unit_cost'])
+                for row, record in enumerate(records) for item in record.get('bill_of_materials', [])]
+    bom = np.asarray(bom_rows, dtype=float).reshape(-1, 3)
+    material_cost = np.bincount(bom[:, 0].astype(np.int64), weights=bom[:, 1] * bom[:, 2], minlength=len(records))
+
+    return SKUCatalog(
+        skus=skus,
+        names=np.asarray([record.get('name', record['sku']) for record in records], dtype=str),
+        hs_codes=np.asarray([record['hs_code'] for record in records], dtype=str),
+        units_per_container=units,
+        usage=usage,
+        material_cost=material_cost
+    )
+
+def read_catalog(file_path=SKU_CATALOG_FILE):
+    """SKU 카탈로그 파일을 로드합니다."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return build_catalog(json.load(f).get('skus', []))
+
+def load_catalog(data_dir=DATA_DIR):
+    """데이터 디렉토리의 SKU 카탈로그를 로드합니다."""
+    return read_catalog(os.path.join(data_dir, SKU_CATALOG_FILE_NAME))
+
+class LandedCostResult:
+    """(원가 구성 요소, SKU, 국가) 단위당 USD 원가 배열과 축 레이블"""
+
+    def __init__(self, catalog, countries, components):
+        self.catalog = catalog
+        self.countries = list(countries)
+        self.components = components
+        self.total = components.sum(axis=0)
+        self._rows = {sku: row for row, sku in enumerate(catalog.skus.tolist())}
+
+    def component(self, name):
+        """한 원가 구성 요소의 (SKU, 국가) 배열을 반환합니다."""
+        return self.components[COMPONENTS.index(name)]
+
+    def breakdown(self, sku, country):
+        """한 SKU·원산지의 {원가 구성 요소: USD, 'total': USD}를 반환합니다."""
+        if sku not in self._rows:
+            raise KeyError(f"카탈로그에 없는 SKU: {sku}")
+        row, column = self._rows[sku], self.countries.index(country)
+        result = dict(zip(COMPONENTS, self.components[:, row, column].tolist()))
+        result['total'] = float(self.total[row, column])
+        return result
+
+    def cheapest_origins(self):
+        """SKU별 도착 원가가 가장 낮은 원산지 국가 코드 배열을 반환합니다."""
+        return np.asarray(self.countries, dtype=str)[self.total.argmin(axis=1)]
+
+def tariff_rates(catalog, factors):
+    """SKU별 (SKU, 국가) 실효 관세율(%)을 반환합니다. 관세 저장소에 없는 HS 코드는 0입니다."""
+    rows = country_registry.lookup(factors.hs_codes, catalog.hs_codes)
+    known = rows >= 0
+    rates = np.zeros((len(rows), len(factors.countries)))
+    rates[known] = factors.hs_tariffs[rows[known]]
+    return rates * (1 - factors.benefit / 100)
+
+def calculate_landed_costs(catalog, factors=None):
+    """SKU 카탈로그 전체의 원산지별 단위당 USD 도착 원가를 한 번에 계산합니다."""
+    if factors is None:
+        factors = get_factors()
+
+    sku_count, country_count = len(catalog.skus), len(factors.countries)
+    components = np.zeros((len(COMPONENTS), sku_count, country_count))
+    components[COMPONENTS.index('material')] = catalog.material_cost[:, np.newaxis]
+
+    # 공정 자원 사용량 × 원산지별 단가 (구성 요소별 행렬 곱)
+    resource_components = np.asarray([resource[3] for resource in PROCESS_RESOURCES])
+    for name in np.unique(resource_components).tolist():
+        columns = resource_components == name
+        components[COMPONENTS.index(name)] = catalog.usage[:, columns] @ factors.resource_prices[columns]
+
+    components[COMPONENTS.index('freight')] = factors.freight / catalog.units_per_container[:, np.newaxis]
+
+    ex_works = components[[COMPONENTS.index(name) for name in EX_WORKS_COMPONENTS]].sum(axis=0)
+    components[COMPONENTS.index('tariff')] = ex_works * tariff_rates(catalog, factors) / 100
+
+    return LandedCostResult(catalog, factors.countries, components)
+
+def synthetic_catalog(sku_count, hs_codes, seed=0, bom_lines=6):
+    """벤치마크용 SKU 카탈로그를 생성합니다."""
+    rng = np.random.default_rng(seed)
+    usage_scale = np.array([1.0, 8.0, 0.03, 0.02, 0.08])
+    records = [
+        {
+            'sku': f"SKU-{i:06d}",
+            'hs_code': hs_codes[i % len(hs_codes)],
+            'units_per_container': int(rng.integers(500, 5000)),
+            **dict(zip(RESOURCE_FIELDS, (rng.uniform(0.1, 1.0, len(RESOURCE_FIELDS)) * usage_scale).tolist())),
+            'bill_of_materials': [
+                {'component': f"C{j}", 'quantity': float(q), 'unit_cost': float(c)}
+                for j, (q, c) in enumerate(zip(rng.uniform(0.5, 4, bom_lines), rng.uniform(0.1, 12, bom_lines)))
+            ]
+        }
+        for i in range(sku_count)
+    ]
+    return build_catalog(records)
+
+def benchmark(sku_count=50000, repeat=3, data_dir=DATA_DIR):
+    """sku_count개 SKU × 전체 원산지의 도착 원가 계산 시간(초, repeat회 중 최솟값)을 측정합니다."""
+    start = time.perf_counter()
+    load_factors(data_dir)
+    factor_load = time.perf_counter() - start
+
+    get_factors(data_dir)
+    start = time.perf_counter()
+    factors = get_factors(data_dir)
+    cached_load = time.perf_counter() - start
+
+    catalog = synthetic_catalog(sku_count, factors.hs_codes.tolist() or ['0000.00'])
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        calculate_landed_costs(catalog, factors)
+        timings.append(time.perf_counter() - start)
+
+    return {
+        'sku_count': sku_count,
+        'country_count': len(factors.countries),
+        'factor_load': factor_load,
+        'cached_factor_load': cached_load,
+        'compute': min(timings)
+    }
+
+if __name__ == "__main__":
+    # 샘플 카탈로그의 원산지별 도착 원가
+    result = calculate_landed_costs(load_catalog())
+    for sku, name, origin in zip(result.catalog.skus.tolist(), result.catalog.names.tolist(),
+                                 result.cheapest_origins().tolist()):
+        breakdown = result.breakdown(sku, origin)
+        parts = ", ".join(f"{COMPONENT_LABELS[component]} {breakdown[component]:.2f}" for component in COMPONENTS)
+        print(f"{sku} ({name}) 최저 원가 원산지 {origin}: {breakdown['total']:.2f} USD/개 ({parts})")
+
+    # 50,000개 SKU 벤치마크
+    summary = benchmark()
+    print(f"SKU {summary['sku_count']}개 × 국가 {summary['country_count']}개 도착 원가: "
+          f"{summary['compute'] * 1000:.1f} ms (비용 요소 로드 {summary['factor_load'] * 1000:.1f} ms, "
+          f"캐시 재사용 {summary['cached_factor_load'] * 1000:.2f} ms)")
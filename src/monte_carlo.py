@@ -0,0 +1,276 @@
+"""
+환율·인플레이션 몬테카를로 불확실성 엔진
+
+이 모듈은 국가별 환율 변동성과 인플레이션을 하나의 값 대신 분포로 다룹니다.
+- 국가별 월간 환율(로그 수익률)·인플레이션 경로를 표본 추출
+- 현지 통화 비용 요소(노동, 토지, 유틸리티, 물류)에 물가 수준과 환율 변화를 반영하고
+  환율/인플레이션 리스크 요소는 실현 변동성과 실현 인플레이션으로 다시 계산
+- 표본마다 제조 비용 지수와 수출 가격 지수를 계산하여 백분위 구간으로 요약
+
+표본은 청크 단위로 생성하고 고정 구간 히스토그램과 합계로만 요약하므로 10^6개 이상의
+표본에서도 메모리 사용량이 청크 크기로 제한됩니다. 각 청크는 SeedSequence에서 파생된
+독립 난수열을 사용하므로 결과는 (시드, 표본 수, 청크 크기)로 결정되며 프로세스 풀
+사용 여부나 작업자 수와 무관합니다.
+"""
+
+import os
+import json
+import numpy as np
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from src import cost_index_engine, country_registry, export_price_calculator, export_price_engine
+from src import hs_export_pipeline, manufacturing_cost_simulator
+
+# 프로젝트 루트 디렉토리 경로
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 데이터 디렉토리 경로
+DATA_DIR = os.path.join(ROOT_DIR, 'data')
+
+# 환율과 물가 수준의 영향을 받는 현지 통화 비용 요소
+LOCAL_CURRENCY_FACTORS = ['labor_cost', 'land_cost', 'utility_cost', 'logistics_cost']
+
+# 환율/인플레이션 리스크 지수의 실현값 하한 (기준 국가 정규화 시 0으로 나누지 않도록 함)
+MIN_RISK_INDEX = 0.01
+
+# 요약 히스토그램 설정 (기준값 최대치의 HISTOGRAM_RANGE배까지 HISTOGRAM_BINS개 구간)
+HISTOGRAM_BINS = 4000
+HISTOGRAM_RANGE = 4.0
+
+# 기본 백분위
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+# 몬테카를로 모델 입력
+# (국가, 국가×비용 요소 원시 행렬, 가중치 벡터, 환율 변동성(연간 %), 인플레이션(연간 %),
+#  인플레이션 표준편차(연간 %p), 화물 비용, 관세율, 무역 협정 혜택, 기간(개월), 히스토그램 구간 경계)
+MonteCarloModel = namedtuple('MonteCarloModel', [
+    'countries', 'factor_matrix', 'weights', 'fx_volatility', 'inflation', 'inflation_sd',
+    'freight', 'tariff', 'benefit', 'horizon_months', 'edges'
+])
+
+# 청크 요약 (표본 수, 지표별 (국가, 구간) 히스토그램, 합계, 제곱합, 구간 밖 표본 수)
+SampleSummary = namedtuple('SampleSummary', ['draws', 'histograms', 'sums', 'squares', 'clipped'])
+
+# 요약 대상 지표
+METRICS = ('manufacturing_cost_index', 'export_price_index')
+
+def load_model(data_dir=DATA_DIR, product_category=None, inflation_sd=1.0, horizon_months=12, as_of_date=None):
+    """데이터 디렉토리의 비용 요소·환율/인플레이션 데이터와 관세 규칙으로 모델을 만듭니다.
+
+    관세율은 제품 목록 HS 코드의 as_of_date(생략하면 오늘) 기준 실효 관세율의 국가별 평균입니다.
+    inflation_sd는 모든 국가에 적용할 연간 인플레이션 표준편차(%p)입니다.
+    """
+    cost_data_dir = os.path.join(data_dir, 'cost_data')
+    countries = country_registry.country_codes()
+
+    factor_values = manufacturing_cost_simulator.load_cost_factor_data(cost_data_dir)
+    with open(os.path.join(cost_data_dir, "fx_inflation_data.json"), 'r', encoding='utf-8') as f:
+        fx_inflation = json.load(f)
+
+    weights = manufacturing_cost_simulator.COST_FACTOR_WEIGHTS
+    if product_category is not None:
+        weights = manufacturing_cost_simulator.load_product_categories(data_dir)[product_category]
+
+    model = MonteCarloModel(
+        countries=countries,
+        factor_matrix=cost_index_engine.build_factor_matrix(factor_values, countries),
+        weights=cost_index_engine.build_weight_matrix([weights])[0],
+        fx_volatility=export_price_engine.country_vector(fx_inflation['fx_volatility'], countries),
+        inflation=export_price_engine.country_vector(fx_inflation['inflation_rates'], countries),
+        inflation_sd=np.full(len(countries), float(inflation_sd)),
+        freight=export_price_engine.country_vector(export_price_calculator.FREIGHT_COSTS, countries),
+        tariff=hs_export_pipeline.country_tariff_rates(countries, as_of_date, data_dir),
+        benefit=export_price_engine.country_vector(export_price_calculator.TRADE_AGREEMENT_BENEFITS, countries),
+        horizon_months=int(horizon_months),
+        edges=None
+    )
+    return with_histogram_edges(model)
+
+def with_histogram_edges(model, bins=HISTOGRAM_BINS, range_factor=HISTOGRAM_RANGE):
+    """기준값(불확실성이 없는 경우)을 바탕으로 요약 히스토그램 구간 경계를 정합니다."""
+    cost_index, export_index = propagate(model, model.factor_matrix[np.newaxis])
+    upper = max(float(cost_index.max()), float(export_index.max())) * range_factor
+    return model._replace(edges=np.linspace(0.0, upper, bins + 1))
+
+def baseline_indices(model):
+    """불확실성이 없는 경우의 (제조 비용 지수, 수출 가격 지수) 국가 배열을 반환합니다."""
+    cost_index, export_index = propagate(model, model.factor_matrix[np.newaxis])
+    return cost_index[0], export_index[0]
+
+def sample_factor_matrices(model, rng, draws):
+    """환율·인플레이션 경로를 표본 추출하여 (표본, 국가, 비용 요소) 원시 행렬을 반환합니다."""
+    months = model.horizon_months
+    country_count = len(model.countries)
+
+    # 월간 환율 로그 수익률 (현지 통화 강세 = 양수, 달러 환산 비용 증가)
+    fx_returns = rng.standard_normal((draws, months, country_count)) * (model.fx_volatility / 100 / np.sqrt(12))
+    fx_factor = np.exp(fx_returns.sum(axis=1))
+    if months > 1:
+        realized_volatility = fx_returns.std(axis=1) * np.sqrt(12) * 100
+    else:
+        realized_volatility = np.abs(fx_returns[:, 0]) * np.sqrt(12) * 100
+
+    # 월간 인플레이션 (%, 평균은 12개월 복리로 연간 인플레이션이 되는 월간 상승률)
+    monthly_mean = ((1 + model.inflation / 100) ** (1 / 12) - 1) * 100
+    monthly_inflation = (monthly_mean
+                         + rng.standard_normal((draws, months, country_count)) * (model.inflation_sd / np.sqrt(12)))
+    price_level = np.prod(1 + monthly_inflation / 100, axis=1)
+    realized_inflation = (price_level ** (12 / months) - 1) * 100
+
+    factor_matrices = np.repeat(model.factor_matrix[np.newaxis], draws, axis=0)
+    columns = [cost_index_engine.COST_FACTORS.index(factor) for factor in LOCAL_CURRENCY_FACTORS]
+    factor_matrices[:, :, columns] *= (price_level * fx_factor)[:, :, np.newaxis]
+
+    # 환율/인플레이션 리스크 지수 (collect_fx_inflation_data와 같은 정의)
+    risk_column = cost_index_engine.COST_FACTORS.index('fx_inflation_risk')
+    factor_matrices[:, :, risk_column] = np.maximum(
+        (realized_volatility * 0.5 + realized_inflation * 0.5) * 2, MIN_RISK_INDEX)
+
+    return factor_matrices
+
+def propagate(model, factor_matrices):
+    """(표본, 국가, 비용 요소) 원시 행렬을 (제조 비용 지수, 수출 가격 지수) (표본, 국가) 배열로 변환합니다."""
+    base_index = model.countries.index(cost_index_engine.BASE_COUNTRY)
+    normalized = factor_matrices / factor_matrices[:, base_index:base_index + 1, :] * 100
+    cost_index = normalized @ model.weights
+
+    inputs = export_price_engine.PriceInputs(
+        cost=cost_index.T,
+        freight=model.freight[:, np.newaxis],
+        tariff=model.tariff[:, np.newaxis],
+        benefit=model.benefit[:, np.newaxis],
+        base_index=base_index
+    )
+    export_index = export_price_engine.apply_formula('weighted_80_10_10', inputs).T
+    return cost_index, export_index
+
+def summarize(model, values):
+    """(표본, 국가) 배열을 국가별 히스토그램, 합계, 제곱합, 구간 밖 표본 수로 요약합니다."""
+    edges = model.edges
+    bins = len(edges) - 1
+    country_count = values.shape[1]
+
+    positions = np.floor((values - edges[0]) / (edges[-1] - edges[0]) * bins).astype(np.int64)
+    clipped = int(((positions < 0) | (positions >= bins)).sum())
+    positions = np.clip(positions, 0, bins - 1)
+    keys = positions + np.arange(country_count) * bins
+    histogram = np.bincount(keys.ravel(), minlength=country_count * bins).reshape(country_count, bins)
+
+    return histogram, values.sum(axis=0), (values ** 2).sum(axis=0), clipped
+
+def simulate_chunk(model, seed_sequence, draws):
+    """하나의 청크를 표본 추출하고 요약합니다. (프로세스 풀 작업 단위)"""
+    rng = np.random.default_rng(seed_sequence)
+    cost_index, export_index = propagate(model, sample_factor_matrices(model, rng, draws))
+
+    histograms, sums, squares, clipped = {}, {}, {}, 0
+    for metric, values in zip(METRICS, (cost_index, export_index)):
+        histograms[metric], sums[metric], squares[metric], metric_clipped = summarize(model, values)
+        clipped += metric_clipped
+
+    return SampleSummary(draws, histograms, sums, squares, clipped)
+
+def merge_summaries(left, right):
+    """두 청크 요약을 합칩니다."""
+    if left is None:
+        return right
+    return SampleSummary(
+        left.draws + right.draws,
+        {metric: left.histograms[metric] + right.histograms[metric] for metric in METRICS},
+        {metric: left.sums[metric] + right.sums[metric] for metric in METRICS},
+        {metric: left.squares[metric] + right.squares[metric] for metric in METRICS},
+        left.clipped + right.clipped
+    )
+
+def check_sample_size(draws, chunk_size):
+    """표본 수와 청크 크기가 1 이상의 정수인지 검사합니다. 아니면 ValueError를 발생시킵니다."""
+    for name, value in (('draws', draws), ('chunk_size', chunk_size)):
+        if isinstance(value, bool) or not isinstance(value, (int, np.integer)) or value < 1:
+            raise ValueError(f"{name}는 1 이상의 정수여야 합니다: {value!r}")
+
+def chunk_plan(draws, chunk_size, seed):
+    """전체 표본을 (SeedSequence, 청크 표본 수) 목록으로 나눕니다."""
+    check_sample_size(draws, chunk_size)
+    sizes = [chunk_size] * (draws // chunk_size)
+    if draws % chunk_size:
+        sizes.append(draws % chunk_size)
+    return list(zip(np.random.SeedSequence(seed).spawn(len(sizes)), sizes))
+
+def iter_chunk_summaries(model, draws, chunk_size=20000, seed=0, workers=None):
+    """청크 요약을 차례로 생성합니다. workers가 주어지면 프로세스 풀에서 병렬로 계산합니다."""
+    plan = chunk_plan(draws, chunk_size, seed)
+    if not workers or workers <= 1 or len(plan) <= 1:
+        for seed_sequence, size in plan:
+            yield simulate_chunk(model, seed_sequence, size)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(simulate_chunk, model, seed_sequence, size) for seed_sequence, size in plan]
+        for future in futures:
+            yield future.result()
+
+def histogram_percentiles(histogram, edges, percentiles):
+    """히스토그램에서 백분위 값을 구간 내 선형 보간으로 추정합니다."""
+    cumulative = np.cumsum(histogram)
+    total = cumulative[-1]
+    results = []
+    for percentile in percentiles:
+        target = percentile / 100 * total
+        position = int(np.searchsorted(cumulative, target, side='left'))
+        position = min(position, len(histogram) - 1)
+        before = cumulative[position - 1] if position > 0 else 0
+        fraction = (target - before) / histogram[position] if histogram[position] else 0.0
+        results.append(float(edges[position] + fraction * (edges[position + 1] - edges[position])))
+    return results
+
+def describe(model, summary, percentiles=DEFAULT_PERCENTILES):
+    """청크 요약을 국가별 평균, 표준편차, 백분위 구간 딕셔너리로 변환합니다."""
+    baselines = dict(zip(METRICS, baseline_indices(model)))
+    result = {
+        'countries': list(model.countries),
+        'draws': summary.draws,
+        'horizon_months': model.horizon_months,
+        'percentiles': list(percentiles),
+        'clipped': summary.clipped
+    }
+
+    for metric in METRICS:
+        means = summary.sums[metric] / summary.draws
+        variances = np.maximum(summary.squares[metric] / summary.draws - means ** 2, 0.0)
+        bands = {}
+        for i, country in enumerate(model.countries):
+            values = histogram_percentiles(summary.histograms[metric][i], model.edges, percentiles)
+            bands[country] = {
+                'baseline': float(baselines[metric][i]),
+                'mean': float(means[i]),
+                'std': float(np.sqrt(variances[i])),
+                **{f"p{percentile:g}": value for percentile, value in zip(percentiles, values)}
+            }
+        result[metric] = bands
+
+    return result
+
+def run_monte_carlo(model=None, draws=100000, chunk_size=20000, seed=0, workers=None,
+                    percentiles=DEFAULT_PERCENTILES):
+    """몬테카를로 시뮬레이션을 실행하고 국가별 백분위 구간을 반환합니다.
+
+    model이 없으면 데이터 디렉토리에서 종합 가중치 모델을 만듭니다.
+    표본 수(draws)나 청크 크기(chunk_size)가 1보다 작으면 ValueError를 발생시킵니다.
+    """
+    check_sample_size(draws, chunk_size)
+    if model is None:
+        model = load_model()
+
+    summary = None
+    for chunk_summary in iter_chunk_summaries(model, draws, chunk_size, seed, workers):
+        summary = merge_summaries(summary, chunk_summary)
+
+    return describe(model, summary, percentiles)
+
+if __name__ == "__main__":
+    print("환율·인플레이션 몬테카를로 시뮬레이션 실행 중...")
+    bands = run_monte_carlo(draws=200000, workers=os.cpu_count())
+    for country in bands['countries']:
+        band = bands['export_price_index'][country]
+        print(f"{country}: 수출 가격 지수 중앙값 {band['p50']:.1f} (90% 구간 {band['p5']:.1f} ~ {band['p95']:.1f})")
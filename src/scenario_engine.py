@@ -0,0 +1,212 @@
+"""
+가정(what-if) 시나리오 일괄 계산 엔진
+
+이 모듈은 비용 요소 가중치, 관세율, 화물 비용을 바꾼 여러 시나리오의 제조 비용 지수와
+수출 가격 지수를 한 번의 벡터 연산으로 계산합니다. 파일은 읽기만 하고 쓰지 않습니다.
+
+시나리오 형식:
+    {
+        "name": "중국 관세 60%",
+        "category": "EPS 모터",                      # 기본 가중치 (생략 시 종합 가중치)
+        "weights": {"labor_cost": 0.45},             # 비용 요소 가중치 재정의
+        "tariff_overrides": {"CN": 60.0,             # 국가의 모든 HS 코드 관세율(%)
+                             "VN": {"8501.31": 30.0}},  # 국가·HS 코드별 관세율(%)
+        "freight_overrides": {"CN": 6000}            # 국가별 화물 비용 (USD)
+    }
+"""
+
+import os
+import numpy as np
+from collections import namedtuple
+
+from src import cost_index_engine, country_registry, export_price_calculator, export_price_engine
+from src import hs_export_pipeline, manufacturing_cost_simulator, tariff_store
+
+# 프로젝트 루트 디렉토리 경로
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 데이터 디렉토리 경로
+DATA_DIR = os.path.join(ROOT_DIR, 'data')
+
+# 기본 수출 가격 수식 (export_price_calculator와 동일)
+DEFAULT_FORMULA = 'weighted_80_10_10'
+
+# 한 번에 계산할 수 있는 최대 시나리오 수
+MAX_SCENARIOS = 10000
+
+# 시나리오 계산의 기준 데이터
+# (국가, 정규화된 국가×비용 요소 행렬, {카테고리: 가중치 벡터}, HS 코드 배열, (HS 코드, 국가) 관세 규칙 실효 관세율,
+#  국가별 평균 관세율, 화물 비용, 무역 협정 혜택)
+ScenarioBaseline = namedtuple('ScenarioBaseline', [
+    'countries', 'normalized_matrix', 'category_weights', 'hs_codes', 'hs_tariffs',
+    'mean_tariffs', 'freight', 'benefit'
+])
+
+# 시나리오 계산 결과
+# (시나리오 이름, 국가, HS 코드, (시나리오, 국가) 제조 비용 지수, (시나리오, HS 코드, 국가) 수출 가격 지수)
+ScenarioResult = namedtuple('ScenarioResult', ['names', 'countries', 'hs_codes', 'cost_index', 'export_index'])
+
+def load_baseline(data_dir=DATA_DIR, as_of_date=None):
+    """데이터 디렉토리의 비용 요소 데이터, 관세 저장소의 HS 코드와 관세 규칙(as_of_date 기준)으로 시나리오 기준 데이터를 만듭니다."""
+    countries = country_registry.country_codes()
+    factor_values = manufacturing_cost_simulator.load_cost_factor_data(os.path.join(data_dir, 'cost_data'))
+    factor_matrix = cost_index_engine.build_factor_matrix(factor_values, countries)
+    normalized_matrix = cost_index_engine.normalize_factor_matrix(
+        factor_matrix, countries.index(cost_index_engine.BASE_COUNTRY))
+
+    category_weights = {None: manufacturing_cost_simulator.COST_FACTOR_WEIGHTS}
+    category_weights.update(manufacturing_cost_simulator.load_product_categories(data_dir))
+    category_weights = {
+        category: cost_index_engine.build_weight_matrix([weights])[0]
+        for category, weights in category_weights.items()
+    }
+
+    # 관세 저장소 HS 코드의 (HS 코드, 국가) 관세 규칙 실효 관세율 행렬
+    table = tariff_store.read_table(os.path.join(data_dir, 'tariff_data', os.path.basename(tariff_store.STORE_FILE)))
+    hs_tariffs = hs_export_pipeline.rule_tariff_matrix(table, countries, as_of_date)
+
+    return ScenarioBaseline(
+        countries=countries,
+        normalized_matrix=normalized_matrix,
+        category_weights=category_weights,
+        hs_codes=np.asarray(table.hs_codes, dtype=str),
+        hs_tariffs=hs_tariffs,
+        mean_tariffs=hs_export_pipeline.country_tariff_rates(countries, as_of_date, data_dir),
+        freight=export_price_engine.country_vector(export_price_calculator.FREIGHT_COSTS, countries),
+        benefit=export_price_engine.country_vector(export_price_calculator.TRADE_AGREEMENT_BENEFITS, countries)
+    )
+
+def _index(values, key, label):
+    """목록에서 키의 위치를 찾습니다. 없으면 ValueError를 발생시킵니다."""
+    try:
+        return values.index(key)
+    except ValueError:
+        raise ValueError(f"알 수 없는 {label}: {key}") from None
+
+def _mapping(scenario, key):
+    """시나리오의 재정의 항목(딕셔너리)을 반환합니다. 없으면 빈 딕셔너리, 딕셔너리가 아니면 ValueError입니다."""
+    value = scenario.get(key)
+    if value is None:
+        return {}
+    if not isinstance(value, dict):
+        raise ValueError(f"'{key}'는 객체(딕셔너리)여야 합니다: {value!r}")
+    return value
+
+def _number(value, label):
+    """재정의 값을 float으로 변환합니다. 숫자가 아니면 ValueError를 발생시킵니다."""
+    if isinstance(value, bool):
+        raise ValueError(f"{label} 값은 숫자여야 합니다: {value!r}")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{label} 값은 숫자여야 합니다: {value!r}") from None
+
+def _hs_positions(baseline, hs_codes):
+    """HS 코드 목록의 기준 관세율 행렬 내 위치 배열을 찾습니다."""
+    hs_codes = np.asarray(list(hs_codes), dtype=str)
+    positions = np.searchsorted(baseline.hs_codes, hs_codes)
+    clipped = np.minimum(positions, max(len(baseline.hs_codes) - 1, 0))
+    found = (baseline.hs_codes[clipped] == hs_codes) if len(baseline.hs_codes) else np.zeros(len(hs_codes), bool)
+    if not found.all():
+        raise ValueError(f"관세 저장소에 없는 HS 코드: {', '.join(hs_codes[~found].tolist())}")
+    return clipped
+
+def build_scenario_arrays(baseline, scenarios, hs_codes=None):
+    """시나리오 목록을 (가중치, 관세율, 화물 비용) 배열로 변환합니다.
+
+    가중치는 (시나리오, 비용 요소), 관세율은 (시나리오, HS 코드, 국가), 화물 비용은
+    (시나리오, 국가) 배열입니다. hs_codes가 없으면 HS 코드 축은 국가별 평균 관세율 하나입니다.
+    """
+    countries = baseline.countries
+    factors = cost_index_engine.COST_FACTORS
+    scenario_count = len(scenarios)
+
+    if hs_codes is None:
+        hs_labels = [None]
+        base_tariffs = baseline.mean_tariffs[np.newaxis, :]
+    else:
+        if isinstance(hs_codes, str) or not all(isinstance(hs_code, str) for hs_code in hs_codes):
+            raise ValueError("'hs_codes'는 HS 코드 문자열의 목록이어야 합니다.")
+        hs_labels = list(hs_codes)
+        base_tariffs = baseline.hs_tariffs[_hs_positions(baseline, hs_labels)]
+
+    weights = np.empty((scenario_count, len(factors)))
+    tariffs = np.repeat(base_tariffs[np.newaxis], scenario_count, axis=0)
+    freight = np.repeat(baseline.freight[np.newaxis], scenario_count, axis=0)
+
+    for i, scenario in enumerate(scenarios):
+        if not isinstance(scenario, dict):
+            raise ValueError(f"시나리오는 객체(딕셔너리)여야 합니다: {scenario!r}")
+        category = scenario.get('category')
+        if not isinstance(category, (str, type(None))) or category not in baseline.category_weights:
+            raise ValueError(f"알 수 없는 제품 카테고리: {category}")
+        weights[i] = baseline.category_weights[category]
+        for factor, weight in _mapping(scenario, 'weights').items():
+            weights[i, _index(factors, factor, '비용 요소')] = _number(weight, f"비용 요소 가중치({factor})")
+
+        for country, override in _mapping(scenario, 'tariff_overrides').items():
+            column = _index(countries, country, '국가 코드')
+            if isinstance(override, dict):
+                if hs_codes is None:
+                    raise ValueError("HS 코드별 관세율을 재정의하려면 hs_codes를 지정해야 합니다.")
+                for hs_code, rate in override.items():
+                    tariffs[i, _index(hs_labels, hs_code, 'HS 코드'), column] = _number(rate, f"관세율({country}, {hs_code})")
+            else:
+                tariffs[i, :, column] = _number(override, f"관세율({country})")
+
+        for country, cost in _mapping(scenario, 'freight_overrides').items():
+            freight[i, _index(countries, country, '국가 코드')] = _number(cost, f"화물 비용({country})")
+
+    return weights, tariffs, freight, hs_labels
+
+def run_scenarios(scenarios, baseline=None, hs_codes=None, formula=DEFAULT_FORMULA):
+    """시나리오 목록의 제조 비용 지수와 수출 가격 지수를 한 번에 계산합니다.
+
+    baseline이 없으면 데이터 디렉토리에서 읽습니다. 잘못된 시나리오는 ValueError를 발생시킵니다.
+    """
+    scenarios = list(scenarios)
+    if not scenarios:
+        raise ValueError("시나리오가 비어 있습니다.")
+    if len(scenarios) > MAX_SCENARIOS:
+        raise ValueError(f"한 번에 계산할 수 있는 시나리오는 최대 {MAX_SCENARIOS}개입니다.")
+    if baseline is None:
+        baseline = load_baseline()
+
+    weights, tariffs, freight, hs_labels = build_scenario_arrays(baseline, scenarios, hs_codes)
+
+    # (시나리오, 국가) 제조 비용 지수
+    cost_index = cost_index_engine.compute_cost_index(baseline.normalized_matrix, weights)
+
+    # 수출 가격 수식은 (국가, HS 코드, 시나리오) 배열로 계산
+    inputs = export_price_engine.PriceInputs(
+        cost=cost_index.T[:, np.newaxis, :],
+        freight=freight.T[:, np.newaxis, :],
+        tariff=tariffs.transpose(2, 1, 0),
+        benefit=baseline.benefit[:, np.newaxis, np.newaxis],
+        base_index=baseline.countries.index(cost_index_engine.BASE_COUNTRY)
+    )
+    export_index = export_price_engine.apply_formula(formula, inputs).transpose(2, 1, 0)
+
+    names = [scenario.get('name') or f"시나리오 {i + 1}" for i, scenario in enumerate(scenarios)]
+    return ScenarioResult(names, list(baseline.countries), hs_labels, cost_index, export_index)
+
+def result_to_dict(result):
+    """시나리오 계산 결과를 JSON 응답 형식으로 변환합니다."""
+    cost_rows = result.cost_index.tolist()
+    export_rows = result.export_index.tolist()
+
+    scenarios = []
+    for name, cost_row, export_matrix in zip(result.names, cost_rows, export_rows):
+        scenario = {
+            'name': name,
+            'manufacturing_cost_index': dict(zip(result.countries, cost_row))
+        }
+        if result.hs_codes == [None]:
+            scenario['export_price_index'] = dict(zip(result.countries, export_matrix[0]))
+        else:
+            scenario['export_price_index'] = {
+                hs_code: dict(zip(result.countries, row)) for hs_code, row in zip(result.hs_codes, export_matrix)
+            }
+        scenarios.append(scenario)
+
+    return {'countries': result.countries, 'scenarios': scenarios}
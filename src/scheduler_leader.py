@@ -0,0 +1,252 @@
+"""
+리더 선출 스케줄러
+
+이 모듈은 여러 웹 작업자(gunicorn)나 여러 노드가 같은 데이터 디렉토리를 쓸 때 예약된 데이터 업데이트
+(매일 03:00, 06:00, 21:00)를 정확히 한 프로세스만 실행하도록 리더를 선출합니다.
+- 파일 잠금(file): OS 파일 잠금(flock)을 가진 프로세스가 리더입니다. 같은 노드의 여러 프로세스용이며,
+  리더 프로세스가 종료되면 OS가 잠금을 해제하므로 다른 프로세스가 다음 시도에서 리더가 됩니다.
+- SQLite 임대(sqlite): 임대 테이블의 만료되지 않은 행을 가진 프로세스가 리더입니다. 공유 저장소의 DB 파일로
+  여러 노드에서 사용할 수 있으며, 리더는 임대 기간의 1/3마다 임대를 갱신합니다.
+
+모든 프로세스가 같은 일정으로 스케줄러를 실행하지만 리더가 아닌 프로세스는 예약 업데이트를 건너뜁니다.
+리더가 아닌 프로세스는 주기적으로 리더 획득을 시도하므로 리더가 사라지면 자동으로 승계합니다.
+리더가 새 데이터 세대를 게시하면 다른 프로세스는 세대 포인터(data/generations/CURRENT)로 새 세대를 읽습니다.
+
+방식은 환경 변수 SCHEDULER_LEASE(file, sqlite)와 SCHEDULER_LEASE_PATH(잠금 파일 또는 DB 경로)로 정합니다.
+"""
+
+import os
+import time
+import uuid
+import socket
+import sqlite3
+import threading
+
+# 프로젝트 루트 디렉토리 경로
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 데이터 디렉토리 경로
+DATA_DIR = os.path.join(ROOT_DIR, 'data')
+
+# 예약 업데이트 시각 (매일)
+UPDATE_HOURS = (3, 6, 21)
+
+# 리더 선출 방식 설정
+LEASE_ENV = 'SCHEDULER_LEASE'
+LEASE_PATH_ENV = 'SCHEDULER_LEASE_PATH'
+DEFAULT_LEASE = 'file'
+LOCK_FILE = os.path.join(DATA_DIR, 'scheduler.lock')
+LEASE_DB = os.path.join(DATA_DIR, 'scheduler_lease.db')
+
+# 리더 임대 이름과 기간(초)
+LEASE_NAME = 'data_update'
+LEASE_TTL = 90
+
+def holder_id():
+    """프로세스를 식별하는 리더 ID를 생성합니다. (호스트:PID:임의 값)"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+def _try_lock(f):
+    """파일을 비차단 배타 잠금합니다. 이미 잠겨 있으면 OSError를 발생시킵니다."""
+    try:
+        import fcntl
+    except ImportError:
+        import msvcrt
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+    else:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+def _unlock(f):
+    """파일 잠금을 해제합니다."""
+    try:
+        import fcntl
+    except ImportError:
+        import msvcrt
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+class FileLockLease:
+    """OS 파일 잠금 기반 리더 선출 (같은 노드의 여러 프로세스)
+
+    잠금은 파일을 연 객체 단위이므로 같은 프로세스의 두 인스턴스도 서로 배타적입니다.
+    """
+
+    def __init__(self, path=LOCK_FILE, holder=None):
+        self.path = path
+        self.holder = holder or holder_id()
+        self._lock = threading.Lock()
+        self._file = None
+
+    @property
+    def is_leader(self):
+        return self._file is not None
+
+    def acquire(self):
+        """리더 잠금을 시도합니다. 리더이면 True를 반환합니다. (이미 리더이면 그대로 유지)"""
+        with self._lock:
+            if self._file is not None:
+                return True
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            f = open(self.path, 'a+', encoding='utf-8')
+            try:
+                _try_lock(f)
+            except OSError:
+                f.close()
+                return False
+
+            # 현재 리더 기록 (확인용)
+            f.seek(0)
+            f.truncate()
+            f.write(self.holder)
+            f.flush()
+            self._file = f
+            return True
+
+    def release(self):
+        """리더 잠금을 해제합니다."""
+        with self._lock:
+            if self._file is None:
+                return
+            try:
+                _unlock(self._file)
+            finally:
+                self._file.close()
+                self._file = None
+
+class SQLiteLease:
+    """SQLite 임대 테이블 기반 리더 선출 (공유 저장소의 DB 파일로 여러 노드)
+
+    임대 확인과 갱신은 BEGIN IMMEDIATE 트랜잭션 하나에서 수행하므로 동시에 시도해도 한 프로세스만 획득합니다.
+    임대가 만료되기 전에 갱신하지 않으면 다른 프로세스가 임대를 가져갑니다.
+    """
+
+    def __init__(self, path=LEASE_DB, name=LEASE_NAME, ttl=LEASE_TTL, holder=None, clock=time.time):
+        self.path = path
+        self.name = name
+        self.ttl = ttl
+        self.holder = holder or holder_id()
+        self.clock = clock
+        self._expires_at = None
+
+    @property
+    def is_leader(self):
+        return self._expires_at is not None and self.clock() < self._expires_at
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS leases (name TEXT PRIMARY KEY, holder TEXT NOT NULL, expires_at REAL NOT NULL)")
+        return connection
+
+    def acquire(self):
+        """임대 획득 또는 갱신을 시도합니다. 리더이면 True를 반환합니다."""
+        connection = self._connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            now = self.clock()
+            row = connection.execute("SELECT holder, expires_at FROM leases WHERE name = ?", (self.name,)).fetchone()
+            if row is not None and row[0] != self.holder and row[1] > now:
+                connection.execute("COMMIT")
+                self._expires_at = None
+                return False
+
+            expires_at = now + self.ttl
+            connection.execute("INSERT OR REPLACE INTO leases (name, holder, expires_at) VALUES (?, ?, ?)",
+                               (self.name, self.holder, expires_at))
+            connection.execute("COMMIT")
+            self._expires_at = expires_at
+            return True
+        except sqlite3.Error:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            raise
+        finally:
+            connection.close()
+
+    def release(self):
+        """보유 중인 임대를 반납합니다."""
+        connection = self._connect()
+        try:
+            connection.execute("DELETE FROM leases WHERE name = ? AND holder = ?", (self.name, self.holder))
+        finally:
+            connection.close()
+            self._expires_at = None
+
+    def current_holder(self):
+        """현재 임대 보유자 ID를 반환합니다. 없거나 만료되었으면 None을 반환합니다."""
+        connection = self._connect()
+        try:
+            row = connection.execute("SELECT holder, expires_at FROM leases WHERE name = ?", (self.name,)).fetchone()
+        finally:
+            connection.close()
+        return row[0] if row is not None and row[1] > self.clock() else None
+
+def create_lease(kind=None, path=None):
+    """설정(인자 또는 환경 변수)에 따라 리더 선출 객체를 생성합니다. 알 수 없는 방식은 ValueError입니다."""
+    kind = kind or os.environ.get(LEASE_ENV, DEFAULT_LEASE)
+    path = path or os.environ.get(LEASE_PATH_ENV)
+    if kind == 'file':
+        return FileLockLease(path or LOCK_FILE)
+    if kind == 'sqlite':
+        return SQLiteLease(path or LEASE_DB)
+    raise ValueError(f"알 수 없는 리더 선출 방식: {kind} (file 또는 sqlite)")
+
+class LeaderScheduler:
+    """리더만 예약 작업을 실행하는 스케줄러
+
+    모든 프로세스가 같은 cron 일정을 등록하고, 예약 시각에 리더 획득(또는 갱신)에 성공한 프로세스만
+    작업을 실행합니다. 임대 갱신 작업이 주기적으로 실행되어 리더는 임대를 유지하고, 리더가 아닌 프로세스는
+    리더가 사라졌을 때 승계합니다.
+    """
+
+    def __init__(self, job, lease=None, hours=UPDATE_HOURS, renew_interval=None):
+        self.job = job
+        self.lease = lease if lease is not None else create_lease()
+        self.hours = tuple(hours)
+        self.renew_interval = renew_interval or max(getattr(self.lease, 'ttl', LEASE_TTL) / 3, 1)
+        self.scheduler = None
+
+    def run_job(self):
+        """리더이면 작업을 실행하고 결과를 반환합니다. 리더가 아니면 실행하지 않고 None을 반환합니다."""
+        if not self.lease.acquire():
+            print(f"예약 업데이트 건너뜀: 리더가 아님 ({self.lease.holder})")
+            return None
+        print(f"예약 업데이트 실행: 리더 {self.lease.holder}")
+        return self.job()
+
+    def renew(self):
+        """리더 임대를 갱신하거나, 리더가 없으면 획득을 시도합니다."""
+        try:
+            self.lease.acquire()
+        except Exception as e:
+            print(f"리더 임대 갱신 오류: {str(e)}")
+
+    def start(self):
+        """백그라운드 스케줄러를 시작합니다."""
+        # 스케줄러는 업데이트를 실행하는 프로세스에서만 필요하므로 import 시 로드하지 않음
+        from apscheduler.schedulers.background import BackgroundScheduler
+
+        self.renew()
+        self.scheduler = BackgroundScheduler()
+        self.scheduler.add_job(self.run_job, 'cron', hour=','.join(str(hour) for hour in self.hours), minute=0,
+                               max_instances=1, coalesce=True)
+        self.scheduler.add_job(self.renew, 'interval', seconds=self.renew_interval)
+        self.scheduler.start()
+        print(f"스케줄러 시작됨 - 매일 {', '.join(f'{hour:02d}:00' for hour in self.hours)}에 데이터 업데이트 "
+              f"(리더: {'예' if self.lease.is_leader else '아니오'})")
+        return self
+
+    def shutdown(self):
+        """스케줄러를 종료하고 리더 자격을 반납합니다."""
+        if self.scheduler is not None:
+            self.scheduler.shutdown(wait=False)
+            self.scheduler = None
+        self.lease.release()
+
+def start_scheduler(job, lease=None, hours=UPDATE_HOURS):
+    """리더 선출 스케줄러를 생성하고 시작합니다."""
+    return LeaderScheduler(job, lease, hours).start()
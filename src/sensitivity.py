@@ -0,0 +1,256 @@
+"""
+제조 비용 지수·수출 가격 지수 민감도(토네이도) 분석
+
+이 모듈은 calculate_manufacturing_cost_index와 calculate_export_price_index의 계산식을
+해석적으로 미분하여 모든 제품 카테고리와 국가의 야코비안을 한 번에 계산합니다.
+- 제조 비용 지수 I_c = Σ_f w_f · 100 · x_cf / x_Kf (K = 기준 국가)는 가중치와 각 국가의
+  원시 비용 요소에 대해 선형이므로 재계산 없이 닫힌 형태로 미분됩니다.
+- 수출 가격 지수 P_c = 0.8·I_c + 0.1·f_c + 0.1·(I_c + f_c)·τ_c/100
+  (f_c = 20·F_c/F_K, τ_c = t_c·(1 - b_c/100))는 연쇄 법칙으로 미분합니다.
+- 토네이도 데이터는 각 입력을 ±shock 비율만큼 바꿨을 때의 선형 근사 변화량을 크기순으로 정렬한 것입니다.
+"""
+
+import os
+import numpy as np
+from collections import namedtuple
+
+from src import cost_index_engine, country_registry, export_price_calculator, export_price_engine
+from src import hs_export_pipeline, manufacturing_cost_simulator
+
+# 프로젝트 루트 디렉토리 경로
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 데이터 디렉토리 경로
+DATA_DIR = os.path.join(ROOT_DIR, 'data')
+
+# 기본 입력 변화 비율 (±10%)
+DEFAULT_SHOCK = 0.10
+
+# 분석 지표
+METRICS = ('manufacturing_cost_index', 'export_price_index')
+
+# 비용 요소 이름 (한국어)
+COST_FACTOR_LABELS = {
+    'corporate_tax': '기업세율',
+    'interest_rate': '이자율',
+    'labor_cost': '노동 비용',
+    'land_cost': '토지/공장 임대 비용',
+    'utility_cost': '전기/유틸리티 비용',
+    'logistics_cost': '물류 비용',
+    'fx_inflation_risk': '환율/인플레이션 리스크'
+}
+
+# 민감도 분석 입력 (국가, 국가×비용 요소 원시 행렬, 카테고리 목록, (카테고리, 비용 요소) 가중치,
+#                  화물 비용, 관세율(%), 무역 협정 혜택(%))
+SensitivityInputs = namedtuple('SensitivityInputs', [
+    'countries', 'factor_matrix', 'categories', 'weights', 'freight', 'tariff', 'benefit'
+])
+
+# 민감도 분석 결과
+# cost_index, export_index: (카테고리, 국가)
+# jacobians: {입력 이름: (카테고리, 국가, 비용 요소) 또는 (카테고리, 국가) 배열} (지표별)
+SensitivityResult = namedtuple('SensitivityResult', [
+    'inputs', 'cost_index', 'export_index', 'cost_jacobian', 'export_jacobian'
+])
+
+def load_inputs(data_dir=DATA_DIR, as_of_date=None):
+    """데이터 디렉토리의 비용 요소 데이터와 관세 규칙(as_of_date 기준)으로 민감도 분석 입력을 만듭니다. 파일은 쓰지 않습니다."""
+    countries = country_registry.country_codes()
+    factor_values = manufacturing_cost_simulator.load_cost_factor_data(os.path.join(data_dir, 'cost_data'))
+
+    product_categories = manufacturing_cost_simulator.load_product_categories(data_dir)
+    categories = [None] + list(product_categories)
+    weights_list = [manufacturing_cost_simulator.COST_FACTOR_WEIGHTS] + list(product_categories.values())
+
+    return SensitivityInputs(
+        countries=countries,
+        factor_matrix=cost_index_engine.build_factor_matrix(factor_values, countries),
+        categories=categories,
+        weights=cost_index_engine.build_weight_matrix(weights_list),
+        freight=export_price_engine.country_vector(export_price_calculator.FREIGHT_COSTS, countries),
+        tariff=hs_export_pipeline.country_tariff_rates(countries, as_of_date, data_dir),
+        benefit=export_price_engine.country_vector(export_price_calculator.TRADE_AGREEMENT_BENEFITS, countries)
+    )
+
+def analyze(inputs=None):
+    """모든 카테고리·국가의 지수와 야코비안을 한 번에 계산합니다.
+
+    제조 비용 지수 야코비안:
+    - weight: ∂I/∂w_f (카테고리, 국가, 비용 요소)
+    - factor: ∂I_c/∂x_cf, 해당 국가의 원시 비용 요소 (카테고리, 국가, 비용 요소)
+    - base_factor: ∂I_c/∂x_Kf, 기준 국가의 원시 비용 요소 (카테고리, 국가, 비용 요소)
+    수출 가격 지수 야코비안은 위 항목에 freight, base_freight, tariff, benefit (카테고리, 국가)를 더합니다.
+    기준 국가의 지수는 정의상 입력과 무관하므로 기준 국가 행의 원시 입력 미분은 0입니다.
+    """
+    if inputs is None:
+        inputs = load_inputs()
+
+    base = inputs.countries.index(cost_index_engine.BASE_COUNTRY)
+    x = inputs.factor_matrix
+    x_base = x[base]
+    weights = inputs.weights[:, np.newaxis, :]
+    category_count = len(inputs.categories)
+
+    # 제조 비용 지수와 야코비안
+    normalized = cost_index_engine.normalize_factor_matrix(x, base)
+    cost_index = cost_index_engine.compute_cost_index(normalized, inputs.weights)
+    cost_jacobian = {
+        'weight': np.broadcast_to(normalized, (category_count,) + normalized.shape).copy(),
+        'factor': np.broadcast_to(100 * weights / x_base, (category_count,) + x.shape).copy(),
+        'base_factor': -100 * weights * x / x_base ** 2
+    }
+    cost_jacobian['factor'][:, base] = 0.0
+    cost_jacobian['base_factor'][:, base] = 0.0
+
+    # 수출 가격 지수와 야코비안 (weighted_80_10_10)
+    freight_index = 20 * inputs.freight / inputs.freight[base]
+    effective_tariff = inputs.tariff * (1 - inputs.benefit / 100)
+    export_index = export_price_engine.evaluate(
+        'weighted_80_10_10', inputs.countries, cost_index, inputs.freight, inputs.tariff, inputs.benefit,
+        categories=inputs.categories).values[:, 0, :, 0].T
+
+    d_export_d_cost = 0.8 + 0.1 * effective_tariff / 100
+    d_export_d_freight_index = 0.1 + 0.1 * effective_tariff / 100
+    landed_base = cost_index + freight_index
+
+    export_jacobian = {
+        name: d_export_d_cost[np.newaxis, :, np.newaxis] * jacobian
+        for name, jacobian in cost_jacobian.items()
+    }
+    export_jacobian['freight'] = np.broadcast_to(
+        d_export_d_freight_index * 20 / inputs.freight[base], cost_index.shape).copy()
+    export_jacobian['base_freight'] = np.broadcast_to(
+        -d_export_d_freight_index * 20 * inputs.freight / inputs.freight[base] ** 2, cost_index.shape).copy()
+    export_jacobian['freight'][:, base] = 0.0
+    export_jacobian['base_freight'][:, base] = 0.0
+    export_jacobian['tariff'] = 0.1 * landed_base * (1 - inputs.benefit / 100) / 100
+    export_jacobian['benefit'] = -0.1 * landed_base * inputs.tariff / 10000
+
+    return SensitivityResult(inputs, cost_index, export_index, cost_jacobian, export_jacobian)
+
+def _tornado_entries(result, metric):
+    """토네이도 항목의 (이름 목록, (카테고리, 국가, 항목) 미분, (카테고리, 국가, 항목) 입력값)을 만듭니다."""
+    inputs = result.inputs
+    jacobian = result.cost_jacobian if metric == 'manufacturing_cost_index' else result.export_jacobian
+    shape = result.cost_index.shape
+    base = inputs.countries.index(cost_index_engine.BASE_COUNTRY)
+    factors = cost_index_engine.COST_FACTORS
+
+    names, derivatives, values = [], [], []
+
+    def add(prefix, derivative, value):
+        derivative = np.broadcast_to(derivative, shape + (derivative.shape[-1],) if derivative.ndim == 3 else shape)
+        value = np.broadcast_to(value, derivative.shape)
+        if derivative.ndim == 2:
+            derivative, value = derivative[..., np.newaxis], value[..., np.newaxis]
+            names.append(prefix)
+        else:
+            names.extend(f"{prefix}:{factor}" for factor in factors)
+        derivatives.append(derivative)
+        values.append(value)
+
+    add('weight', jacobian['weight'], inputs.weights[:, np.newaxis, :])
+    add('factor', jacobian['factor'], inputs.factor_matrix[np.newaxis])
+    add('base_factor', jacobian['base_factor'], inputs.factor_matrix[base])
+    if metric == 'export_price_index':
+        add('freight', jacobian['freight'], inputs.freight[np.newaxis])
+        add('base_freight', jacobian['base_freight'], inputs.freight[base])
+        add('tariff', jacobian['tariff'], inputs.tariff[np.newaxis])
+        add('benefit', jacobian['benefit'], inputs.benefit[np.newaxis])
+
+    return names, np.concatenate(derivatives, axis=-1), np.concatenate(values, axis=-1)
+
+def entry_label(name):
+    """토네이도 항목 이름을 한국어 표시 이름으로 변환합니다."""
+    kind, _, factor = name.partition(':')
+    factor_label = COST_FACTOR_LABELS.get(factor, factor)
+    return {
+        'weight': f"{factor_label} 가중치",
+        'factor': factor_label,
+        'base_factor': f"{factor_label} (기준 국가)",
+        'freight': "화물 비용",
+        'base_freight': "화물 비용 (기준 국가)",
+        'tariff': "관세율",
+        'benefit': "무역 협정 혜택"
+    }[kind]
+
+def category_label(category):
+    """카테고리를 응답용 이름으로 변환합니다. 종합 가중치(None)는 'default'입니다."""
+    return category or 'default'
+
+def _selection(labels, selected, label):
+    """선택한 레이블의 위치 목록을 반환합니다. 알 수 없는 레이블은 ValueError를 발생시킵니다."""
+    if selected is None:
+        return list(range(len(labels)))
+    unknown = [value for value in selected if value not in labels]
+    if unknown:
+        raise ValueError(f"알 수 없는 {label}: {', '.join(unknown)}")
+    return [labels.index(value) for value in selected]
+
+def tornado(result, metric='export_price_index', shock=DEFAULT_SHOCK, top=None, categories=None, countries=None):
+    """카테고리·국가별 토네이도 데이터를 계산합니다.
+
+    각 입력을 (1 - shock)배, (1 + shock)배 했을 때의 지수(선형 근사)를 low, high로 하고
+    변화량(swing)이 큰 순서로 정렬하여 {카테고리: {국가 코드: [항목, ...]}}를 반환합니다.
+    categories, countries로 결과를 제한할 수 있습니다.
+    """
+    if metric not in METRICS:
+        raise ValueError(f"알 수 없는 지표: {metric}")
+    if not 0 < shock <= 1:
+        raise ValueError("입력 변화 비율(shock)은 0보다 크고 1 이하여야 합니다.")
+    if top is not None and top < 1:
+        raise ValueError("항목 수(top)는 1 이상이어야 합니다.")
+    category_labels = [category_label(category) for category in result.inputs.categories]
+    category_rows = _selection(category_labels, categories, '제품 카테고리')
+    country_columns = _selection(result.inputs.countries, countries, '국가 코드')
+
+    names, derivatives, values = _tornado_entries(result, metric)
+    index = result.cost_index if metric == 'manufacturing_cost_index' else result.export_index
+
+    swings = derivatives * values * shock
+    order = np.argsort(-np.abs(swings), axis=-1, kind='stable')
+    if top is not None:
+        order = order[..., :top]
+
+    data = {}
+    for k in category_rows:
+        category_data = data.setdefault(category_labels[k], {})
+        for c in country_columns:
+            country = result.inputs.countries[c]
+            base_value = float(index[k, c])
+            category_data[country] = [
+                {
+                    'input': names[e],
+                    'label': entry_label(names[e]),
+                    'value': float(values[k, c, e]),
+                    'derivative': float(derivatives[k, c, e]),
+                    'low': base_value - float(swings[k, c, e]),
+                    'high': base_value + float(swings[k, c, e]),
+                    'swing': abs(float(swings[k, c, e]))
+                }
+                for e in order[k, c].tolist()
+            ]
+    return data
+
+def result_to_dict(result, shock=DEFAULT_SHOCK, top=None, categories=None, countries=None):
+    """민감도 분석 결과를 JSON 응답 형식으로 변환합니다."""
+    category_labels = [category_label(category) for category in result.inputs.categories]
+    category_rows = _selection(category_labels, categories, '제품 카테고리')
+    country_columns = _selection(result.inputs.countries, countries, '국가 코드')
+
+    def index_dict(index):
+        return {
+            category_labels[k]: {result.inputs.countries[c]: float(index[k, c]) for c in country_columns}
+            for k in category_rows
+        }
+
+    return {
+        'countries': [result.inputs.countries[c] for c in country_columns],
+        'categories': [category_labels[k] for k in category_rows],
+        'shock': shock,
+        'manufacturing_cost_index': index_dict(result.cost_index),
+        'export_price_index': index_dict(result.export_index),
+        'tornado': {
+            metric: tornado(result, metric, shock, top, categories, countries) for metric in METRICS
+        }
+    }
@@ -0,0 +1,228 @@
+"""
+작업자 간 공유 데이터 스냅샷 (메모리 맵 배열)
+
+이 모듈은 게시된 데이터 세대의 관세 저장소, HS 코드별 수출 가격 지수, 카테고리별 제조 비용·수출 가격 지수를
+세대 디렉토리의 shared/ 아래에 NumPy .npy 파일(배열당 하나)과 작은 매니페스트(manifest.json)로 저장합니다.
+- 읽는 쪽은 np.load(mmap_mode='r')로 파일을 메모리 맵하므로 같은 노드의 모든 웹 작업자가 같은 페이지 캐시를
+  공유하며, 작업자별로 데이터를 복사하거나 파싱하지 않습니다. (HS 품목이 늘어도 작업자 수만큼 메모리가 늘지 않음)
+- 문자열 사전(HS 코드, 품목 설명 등)도 고정 폭 유니코드 배열로 맵하며, 매니페스트에는 배열 목록과
+  국가·카테고리 레이블, 메타데이터만 둡니다.
+- 공유 스냅샷은 세대 게시 중 스테이징 디렉토리에 작성되므로 세대와 함께 원자적으로 게시됩니다.
+- SnapshotMapper는 요청에 고정된 세대의 스냅샷을 반환하고, 새 세대가 게시되면 새 세대의 파일을 맵합니다.
+  이전 세대의 맵은 그 세대를 고정한 요청이 끝날 때까지 유효합니다. (세대 정리로 파일이 삭제되어도 맵은 유지)
+"""
+
+import os
+import json
+import threading
+import numpy as np
+from collections import OrderedDict
+
+from src import hs_export_pipeline, manufacturing_cost_simulator, snapshot_store, tariff_store
+
+# 세대 디렉토리 안의 공유 스냅샷 디렉토리와 매니페스트 파일 이름
+SHARED_DIR_NAME = 'shared'
+MANIFEST_FILE_NAME = 'manifest.json'
+
+# 프로세스가 동시에 맵해 두는 세대 수 (현재 세대 + 요청이 고정한 이전 세대)
+KEEP_GENERATIONS = 2
+
+# 카테고리별 지수 (섹션 이름, 데이터 디렉토리, 파일 이름 접두사, JSON 키)
+INDEX_SECTIONS = [
+    ('cost_index', 'cost_data', 'manufacturing_cost_index', 'manufacturing_cost_index'),
+    ('export_index', 'export_data', 'export_price_index', 'export_price_index')
+]
+
+def _read_index_files(data_dir, directory, stem, key, categories):
+    """카테고리별 지수 JSON 파일을 읽어 {카테고리(종합 지수는 None): {국가 코드: 지수}}를 반환합니다."""
+    indices = {}
+    for category in [None] + categories:
+        file_name = f"{stem}.json" if category is None else f"{stem}_{category.replace(' ', '_')}.json"
+        file_path = os.path.join(data_dir, directory, file_name)
+        if os.path.exists(file_path):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                indices[category] = json.load(f).get(key, {})
+    return indices
+
+def write_snapshot(data_dir, output_dir=None):
+    """데이터 디렉토리의 결과를 메모리 맵용 배열 파일로 저장하고 매니페스트 경로를 반환합니다.
+
+    output_dir을 생략하면 data_dir/shared에 저장합니다. 없는 데이터의 섹션은 만들지 않으며,
+    매니페스트는 모든 배열을 저장한 뒤 마지막에 기록합니다.
+    """
+    output_dir = output_dir or os.path.join(data_dir, SHARED_DIR_NAME)
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = {'arrays': {}, 'sections': {}}
+
+    def save(name, array):
+        file_name = f"{name}.npy"
+        np.save(os.path.join(output_dir, file_name), np.ascontiguousarray(array), allow_pickle=False)
+        manifest['arrays'][name] = file_name
+
+    # 관세 저장소 (사전 배열과 행 단위 열 배열)
+    store_path = os.path.join(data_dir, 'tariff_data', os.path.basename(tariff_store.STORE_FILE))
+    if os.path.exists(store_path):
+        table = tariff_store.read_table(store_path)
+        for field in tariff_store.ARRAY_FIELDS:
+            save(f"tariff.{field}", getattr(table, field))
+        manifest['sections']['tariff'] = {'metadata': table.metadata}
+
+    # HS 코드별 수출 가격 지수
+    result = hs_export_pipeline.read_export_indices(
+        os.path.join(data_dir, 'export_data', hs_export_pipeline.HS_EXPORT_INDEX_FILE_NAME))
+    if result is not None:
+        for field in hs_export_pipeline.HSProducts._fields:
+            save(f"hs_export.{field}", getattr(result.products, field))
+        save('hs_export.values', result.values)
+        manifest['sections']['hs_export'] = {
+            'countries': result.countries,
+            'formula': result.formula,
+            'base_country': result.base_country,
+            'calculation_date': result.calculation_date
+        }
+
+    # 카테고리별 지수 (카테고리 × 국가 행렬, 값이 없는 칸은 NaN)
+    categories_file = os.path.join(data_dir, manufacturing_cost_simulator.PRODUCT_CATEGORIES_FILE_NAME)
+    categories = list(manufacturing_cost_simulator.read_product_categories(categories_file)[1]) \
+        if os.path.exists(categories_file) else []
+    for section, directory, stem, key in INDEX_SECTIONS:
+        indices = _read_index_files(data_dir, directory, stem, key, categories)
+        if not indices:
+            continue
+        countries = list(dict.fromkeys(code for index in indices.values() for code in index))
+        save(f"{section}.values", np.array([[index.get(code, np.nan) for code in countries]
+                                            for index in indices.values()], dtype=float).reshape(len(indices), len(countries)))
+        manifest['sections'][section] = {
+            'categories': ['' if category is None else category for category in indices],
+            'countries': countries
+        }
+
+    manifest_path = os.path.join(output_dir, MANIFEST_FILE_NAME)
+    temp_path = f"{manifest_path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, manifest_path)
+    return manifest_path
+
+class SharedSnapshot:
+    """한 세대의 공유 스냅샷 (읽기 전용 메모리 맵 배열)
+
+    반환되는 테이블의 배열은 여러 요청과 작업자가 공유하는 읽기 전용 메모리 맵이므로 수정할 수 없습니다.
+    """
+
+    def __init__(self, snapshot_dir):
+        self.snapshot_dir = snapshot_dir
+        with open(os.path.join(snapshot_dir, MANIFEST_FILE_NAME), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        self.sections = manifest['sections']
+        self.arrays = {
+            name: np.load(os.path.join(snapshot_dir, file_name), mmap_mode='r', allow_pickle=False)
+            for name, file_name in manifest['arrays'].items()
+        }
+        self._lock = threading.Lock()
+        self._objects = {}
+
+    def __contains__(self, section):
+        return section in self.sections
+
+    def cached(self, name, build):
+        """스냅샷 배열 위에 만든 객체(테이블, 색인 등)를 스냅샷별로 한 번만 만들어 반환합니다."""
+        with self._lock:
+            if name not in self._objects:
+                self._objects[name] = build()
+            return self._objects[name]
+
+    def tariff_table(self):
+        """관세 테이블을 반환합니다. 관세 저장소가 없는 스냅샷이면 None을 반환합니다."""
+        if 'tariff' not in self.sections:
+            return None
+        return self.cached('tariff', lambda: tariff_store.TariffTable(
+            metadata=self.sections['tariff']['metadata'],
+            **{field: self.arrays[f"tariff.{field}"] for field in tariff_store.ARRAY_FIELDS}
+        ))
+
+    def hs_export_indices(self):
+        """HS 코드별 수출 가격 지수 테이블을 반환합니다. 없는 스냅샷이면 None을 반환합니다."""
+        if 'hs_export' not in self.sections:
+            return None
+        section = self.sections['hs_export']
+        return self.cached('hs_export', lambda: hs_export_pipeline.HSExportIndexTable(
+            hs_export_pipeline.HSProducts(**{
+                field: self.arrays[f"hs_export.{field}"] for field in hs_export_pipeline.HSProducts._fields
+            }),
+            section['countries'], self.arrays['hs_export.values'], section['formula'],
+            section['base_country'], section['calculation_date']
+        ))
+
+    def index(self, section, category=None):
+        """카테고리의 {국가 코드: 지수}를 반환합니다. (section: cost_index, export_index)
+
+        카테고리의 지수가 없으면 종합 지수를, 섹션이 없으면 None을 반환합니다.
+        """
+        if section not in self.sections:
+            return None
+        labels = self.sections[section]['categories']
+        label = category if category in labels else ''
+        if label not in labels:
+            return {}
+        row = self.arrays[f"{section}.values"][labels.index(label)]
+        return {code: float(value) for code, value in zip(self.sections[section]['countries'], row.tolist())
+                if not np.isnan(value)}
+
+    def nbytes(self):
+        """맵한 배열의 전체 바이트 수를 반환합니다."""
+        return sum(array.nbytes for array in self.arrays.values())
+
+class SnapshotMapper:
+    """세대별 공유 스냅샷을 맵하고 새 세대가 게시되면 교체합니다. (스레드 안전)"""
+
+    def __init__(self, generations_dir=snapshot_store.GENERATIONS_DIR, keep=KEEP_GENERATIONS):
+        self.generations_dir = generations_dir
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._snapshots = OrderedDict()
+        self.maps = 0
+
+    def get(self, generation_id=None):
+        """세대의 공유 스냅샷을 반환합니다.
+
+        generation_id를 생략하면 현재 세대를 사용합니다. 게시된 세대가 없거나 공유 스냅샷이 없는
+        세대(이전 형식)이면 None을 반환합니다.
+        """
+        if generation_id is None:
+            generation_id = snapshot_store.current_generation(self.generations_dir)
+            if generation_id is None:
+                return None
+
+        with self._lock:
+            if generation_id in self._snapshots:
+                self._snapshots.move_to_end(generation_id)
+                return self._snapshots[generation_id]
+
+            snapshot_dir = os.path.join(snapshot_store.generation_dir(generation_id, self.generations_dir), SHARED_DIR_NAME)
+            snapshot = None
+            if os.path.exists(os.path.join(snapshot_dir, MANIFEST_FILE_NAME)):
+                snapshot = SharedSnapshot(snapshot_dir)
+                self.maps += 1
+
+            # 오래된 세대의 맵은 목록에서만 제거 (사용 중인 요청이 끝나면 해제됨)
+            self._snapshots[generation_id] = snapshot
+            while len(self._snapshots) > self.keep:
+                self._snapshots.popitem(last=False)
+            return snapshot
+
+    def stats(self):
+        """맵한 세대 목록과 맵 횟수를 반환합니다."""
+        with self._lock:
+            return {
+                'generations': [generation_id for generation_id, snapshot in self._snapshots.items() if snapshot is not None],
+                'maps': self.maps,
+                'bytes': sum(snapshot.nbytes() for snapshot in self._snapshots.values() if snapshot is not None)
+            }
+
+# 프로세스 전체에서 공유하는 스냅샷 맵
+mapper = SnapshotMapper()
+
+def get_snapshot(generation_id=None):
+    """세대의 공유 스냅샷을 반환합니다. 없으면 None을 반환합니다."""
+    return mapper.get(generation_id)
@@ -0,0 +1,201 @@
+"""
+데이터 세대(generation) 스냅샷 저장소
+
+이 모듈은 업데이트 파이프라인의 결과를 변경 불가능한 세대 디렉토리로 게시합니다.
+- 게시: 작업 데이터 디렉토리의 결과 파일을 새 세대 디렉토리에 복사한 뒤 CURRENT 포인터를 원자적으로 교체
+- 조회: 요청은 시작 시점의 세대를 고정(pin)하고 그 세대의 파일만 읽으므로 작성 중인 파일을 보지 않음
+- 정리: 보존 기간이 지난 이전 세대를 삭제 (현재 세대는 삭제하지 않음)
+
+디렉토리 구조:
+    data/generations/CURRENT             현재 세대 ID
+    data/generations/<세대 ID>/          게시된 세대 (게시 후 변경하지 않음)
+    data/generations/<세대 ID>/generation.json  세대 정보 (게시 시각, 파일 목록)
+    data/generations/<세대 ID>/shared/   작업자 간 공유 메모리 맵 배열 (src/shared_snapshot.py)
+"""
+
+import os
+import json
+import time
+import uuid
+import shutil
+import importlib
+from datetime import datetime
+
+# 프로젝트 루트 디렉토리 경로
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 데이터 디렉토리 경로
+DATA_DIR = os.path.join(ROOT_DIR, 'data')
+GENERATIONS_DIR = os.path.join(DATA_DIR, 'generations')
+
+# 현재 세대 포인터 파일 이름
+CURRENT_POINTER = 'CURRENT'
+
+# 세대 정보 파일 이름
+GENERATION_INFO = 'generation.json'
+
+# 세대에 포함되는 데이터 (데이터 디렉토리 기준 상대 경로)
+PUBLISHED_PATHS = ['tariff_data', 'cost_data', 'export_data', 'product_categories.json', 'last_update.txt']
+
+# 이전 세대 보존 기간 (시간)
+RETENTION_HOURS_ENV = 'DATA_GENERATION_RETENTION_HOURS'
+DEFAULT_RETENTION_HOURS = 24
+
+def pointer_file(generations_dir=GENERATIONS_DIR):
+    """현재 세대 포인터 파일 경로를 반환합니다."""
+    return os.path.join(generations_dir, CURRENT_POINTER)
+
+def retention_seconds():
+    """환경 변수에서 이전 세대 보존 기간(초)을 읽습니다."""
+    try:
+        hours = float(os.environ.get(RETENTION_HOURS_ENV, DEFAULT_RETENTION_HOURS))
+    except ValueError:
+        hours = DEFAULT_RETENTION_HOURS
+    return max(hours, 0) * 3600
+
+def new_generation_id():
+    """정렬 가능한 새 세대 ID를 생성합니다. (예: 20250409T030000123456-1a2b3c)"""
+    return f"{datetime.now().strftime('%Y%m%dT%H%M%S%f')}-{uuid.uuid4().hex[:6]}"
+
+def current_generation(generations_dir=GENERATIONS_DIR):
+    """현재 세대 ID를 반환합니다. 게시된 세대가 없으면 None을 반환합니다."""
+    try:
+        with open(pointer_file(generations_dir), 'r', encoding='utf-8') as f:
+            generation_id = f.read().strip()
+    except OSError:
+        return None
+
+    if generation_id and os.path.isdir(os.path.join(generations_dir, generation_id)):
+        return generation_id
+    return None
+
+def generation_dir(generation_id, generations_dir=GENERATIONS_DIR):
+    """세대 디렉토리 경로를 반환합니다."""
+    return os.path.join(generations_dir, generation_id)
+
+def resolve(relative_path, generation_id=None, data_dir=DATA_DIR, generations_dir=GENERATIONS_DIR):
+    """데이터 파일 경로를 세대 기준으로 변환합니다.
+
+    generation_id가 None이면 작업 데이터 디렉토리의 경로를 반환합니다.
+    """
+    if generation_id is None:
+        return os.path.join(data_dir, relative_path)
+    return os.path.join(generations_dir, generation_id, relative_path)
+
+def _write_pointer(generation_id, generations_dir):
+    """현재 세대 포인터를 임시 파일 작성 후 교체하는 방식으로 원자적으로 갱신합니다."""
+    path = pointer_file(generations_dir)
+    temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(generation_id)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+def publish_generation(data_dir=DATA_DIR, generations_dir=GENERATIONS_DIR, paths=None):
+    """작업 데이터 디렉토리의 결과를 새 세대로 게시하고 세대 ID를 반환합니다.
+
+    세대는 임시 디렉토리에 먼저 복사한 뒤 이름을 바꿔 완성하고, 마지막에 CURRENT
+    포인터를 교체합니다. 포인터 교체 전까지 읽는 쪽은 이전 세대를 그대로 봅니다.
+    """
+    paths = PUBLISHED_PATHS if paths is None else paths
+    os.makedirs(generations_dir, exist_ok=True)
+
+    generation_id = new_generation_id()
+    staging_dir = os.path.join(generations_dir, f".{generation_id}.partial")
+
+    try:
+        os.makedirs(staging_dir)
+        published = []
+        for relative_path in paths:
+            source = os.path.join(data_dir, relative_path)
+            target = os.path.join(staging_dir, relative_path)
+            if os.path.isdir(source):
+                shutil.copytree(source, target, ignore=shutil.ignore_patterns('*.tmp'))
+            elif os.path.isfile(source):
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.copy2(source, target)
+            else:
+                continue
+            published.append(relative_path)
+
+        # 웹 작업자가 공유하는 메모리 맵 배열 (실패해도 작업자는 파일 파싱으로 대체하므로 게시는 계속)
+        try:
+            importlib.import_module('src.shared_snapshot').write_snapshot(staging_dir)
+        except Exception as e:
+            print(f"공유 스냅샷 생성 오류: {str(e)}")
+
+        with open(os.path.join(staging_dir, GENERATION_INFO), 'w', encoding='utf-8') as f:
+            json.dump({
+                'generation_id': generation_id,
+                'published_at': time.time(),
+                'paths': published
+            }, f, ensure_ascii=False, indent=2)
+
+        os.rename(staging_dir, generation_dir(generation_id, generations_dir))
+    except Exception:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+
+    _write_pointer(generation_id, generations_dir)
+    print(f"데이터 세대 게시 완료: {generation_id}")
+    return generation_id
+
+def published_at(generation_id, generations_dir=GENERATIONS_DIR):
+    """세대의 게시 시각(epoch 초)을 반환합니다. 정보가 없으면 디렉토리 수정 시각을 사용합니다."""
+    path = generation_dir(generation_id, generations_dir)
+    try:
+        with open(os.path.join(path, GENERATION_INFO), 'r', encoding='utf-8') as f:
+            return float(json.load(f)['published_at'])
+    except (OSError, ValueError, KeyError):
+        return os.path.getmtime(path)
+
+def list_generations(generations_dir=GENERATIONS_DIR):
+    """게시된 세대 ID 목록을 게시 순서(오래된 순)로 반환합니다."""
+    if not os.path.isdir(generations_dir):
+        return []
+    names = [
+        name for name in os.listdir(generations_dir)
+        if not name.startswith('.') and os.path.isdir(os.path.join(generations_dir, name))
+    ]
+    return sorted(names, key=lambda name: (published_at(name, generations_dir), name))
+
+def collect_garbage(retention=None, generations_dir=GENERATIONS_DIR, now=None):
+    """보존 기간이 지난 이전 세대를 삭제하고 삭제한 세대 ID 목록을 반환합니다.
+
+    세대는 다음 세대가 게시된 시점부터 보존 기간을 셉니다. 그 사이에 시작된 요청이
+    이전 세대를 고정하고 있을 수 있으므로 보존 기간은 가장 긴 요청 시간보다 길어야 합니다.
+    현재 세대와 실패한 게시의 잔여 디렉토리 중 보존 기간 내의 것은 삭제하지 않습니다.
+    """
+    retention = retention_seconds() if retention is None else retention
+    now = time.time() if now is None else now
+    current = current_generation(generations_dir)
+
+    generations = list_generations(generations_dir)
+    removed = []
+    for generation_id, successor in zip(generations, generations[1:]):
+        if generation_id == current:
+            continue
+        # 다음 세대가 게시된 시점부터 이 세대는 새 요청에서 사용되지 않음
+        if now - published_at(successor, generations_dir) >= retention:
+            shutil.rmtree(generation_dir(generation_id, generations_dir), ignore_errors=True)
+            removed.append(generation_id)
+
+    # 중단된 게시의 임시 디렉토리 정리
+    for name in os.listdir(generations_dir) if os.path.isdir(generations_dir) else []:
+        path = os.path.join(generations_dir, name)
+        if name.endswith('.partial') and now - os.path.getmtime(path) >= retention:
+            shutil.rmtree(path, ignore_errors=True)
+
+    if removed:
+        print(f"이전 데이터 세대 {len(removed)}개 삭제")
+    return removed
+
+def publish_and_collect(data_dir=DATA_DIR, generations_dir=GENERATIONS_DIR):
+    """새 세대를 게시하고 보존 기간이 지난 이전 세대를 정리합니다. 새 세대 ID를 반환합니다."""
+    generation_id = publish_generation(data_dir, generations_dir)
+    collect_garbage(generations_dir=generations_dir)
+    return generation_id
+
+if __name__ == "__main__":
+    publish_and_collect()
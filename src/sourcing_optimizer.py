@@ -0,0 +1,350 @@
+"""
+소싱 최적화 모듈
+
+이 모듈은 여러 SKU의 연간 수요를 원산지 공장(예: KR, MX, VN)에 나누어 배정하는 문제를
+선형 계획법으로 풉니다. 단위당 비용은 도착 원가 엔진(landed_cost)의 USD 도착 원가이며
+관세 노출이 포함됩니다.
+
+    최소화   Σ c[p, j] · x[p, j]
+    제약     Σ_j x[p, j] = 수요[p]                      (SKU별 수요)
+             Σ_p 사용량[p, j] · x[p, j] ≤ 생산 능력[j]   (공장별 생산 능력, 직접 노동 시간)
+             x ≥ 0
+
+외부 솔버 없이 NumPy 개정 심플렉스법(2단계법)으로 모든 SKU를 하나의 문제로 한 번에 풉니다.
+수요 제약은 SKU마다 서로 다른 변수를 묶는 일반화 상한(GUB) 구조이므로 SKU별로 기저 열 하나(키 열)를
+수요 제약에 대응시키고, 나머지 기저 열(공장 수만큼)로 이루어진 공장 수 × 공장 수 작업 기저만
+역행렬로 다룹니다. 반복당 계산량이 SKU 수에 선형이므로 수천 개 SKU의 카탈로그도 한 번에 풉니다.
+제약 조건이 같고 비용(관세)만 바뀌면 이전 최적 기저가 그대로 가능해이므로
+1단계를 건너뛰고 이전 기저에서 시작합니다(웜 스타트).
+"""
+
+import os
+import json
+import time
+import numpy as np
+from collections import namedtuple
+
+from src import landed_cost
+
+# 프로젝트 루트 디렉토리 경로
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 데이터 디렉토리 경로
+DATA_DIR = os.path.join(ROOT_DIR, 'data')
+
+# 소싱 계획 파일
+SOURCING_PLAN_FILE_NAME = 'sourcing_plan.json'
+
+# 수치 허용 오차
+TOLERANCE = 1e-9
+
+# 최적화 결과
+# - allocation: (SKU, 공장) 배정 수량
+# - objective: 총비용 (USD)
+# - demand_duals: (SKU,) 수요 제약의 쌍대 변수 (한 단위 추가 수요의 한계 비용)
+# - capacity_duals: (공장,) 생산 능력 제약의 쌍대 변수 (0 이하, 노동 시간 한 단위의 가치)
+# - iterations: 심플렉스 반복 횟수, solve_time: 풀이 시간(초), warm_start: 이전 기저에서 시작했는지 여부
+AllocationResult = namedtuple('AllocationResult', [
+    'allocation', 'objective', 'demand_duals', 'capacity_duals', 'iterations', 'solve_time', 'warm_start'
+])
+
+class SourcingOptimizer:
+    """SKU × 공장 배정 선형 계획 문제와 마지막 최적 기저를 보관하는 최적화기입니다.
+
+    변수 순서: 배정 x[p, j] (p * 공장 수 + j), 생산 능력 여유 변수, 1단계 인공 변수(SKU별)
+    제약 순서: SKU별 수요(등식), 공장별 생산 능력(부등식)
+    기저(SKU 수 + 공장 수 개의 열)는 SKU별 키 열과 공장 수만큼의 비키 열로 나누어 다룹니다.
+    """
+
+    def __init__(self, demand, capacity, usage=None, plants=None, skus=None):
+        self.demand = np.asarray(demand, dtype=float)
+        self.capacity = np.asarray(capacity, dtype=float)
+        self.product_count = len(self.demand)
+        self.plant_count = len(self.capacity)
+        self.usage = np.ones((self.product_count, self.plant_count)) if usage is None else \
+            np.broadcast_to(np.asarray(usage, dtype=float), (self.product_count, self.plant_count)).copy()
+        self.plants = list(plants) if plants is not None else list(range(self.plant_count))
+        self.skus = list(skus) if skus is not None else list(range(self.product_count))
+
+        if (self.demand < 0).any() or (self.capacity < 0).any():
+            raise ValueError("수요와 생산 능력은 음수일 수 없습니다.")
+        if (self.usage <= 0).any():
+            raise ValueError("단위당 생산 능력 사용량은 0보다 커야 합니다.")
+
+        # 열 번호 → (수요 행(SKU), 생산 능력 행(공장), 생산 능력 행 계수), 해당 행이 없으면 -1
+        P, J = self.product_count, self.plant_count
+        self.structural_count = P * J
+        self.artificial_start = P * J + J
+        self.row_count = P + J
+        self.column_count = P * J + J + P
+        self._demand_row = np.concatenate([np.repeat(np.arange(P), J), np.full(J, -1), np.arange(P)])
+        self._plant_row = np.concatenate([np.tile(np.arange(J), P), np.arange(J), np.full(P, -1)])
+        self._capacity_coef = np.concatenate([self.usage.ravel(), np.ones(J), np.zeros(P)])
+
+        # 마지막 최적 기저 (웜 스타트용)
+        self.basis = None
+
+    def _initial_basis(self):
+        """인공 변수(수요 행)와 여유 변수(생산 능력 행)로 이루어진 초기 가능 기저를 반환합니다."""
+        P, J = self.product_count, self.plant_count
+        return np.concatenate([self.artificial_start + np.arange(P), self.structural_count + np.arange(J)])
+
+    def _split_basis(self, basis):
+        """기저 위치를 SKU별 키 위치 (SKU,)와 비키 위치 (공장,)로 나눕니다. 키는 구조 변수를 우선합니다."""
+        rows = self._demand_row[basis]
+        order = np.lexsort((basis >= self.artificial_start, rows))
+        order = order[rows[order] >= 0]
+        first = np.flatnonzero(np.r_[True, np.diff(rows[order]) != 0])
+        if len(first) != self.product_count:
+            raise RuntimeError("수요 제약을 포함하지 않는 기저입니다.")
+        key_positions = order[first]
+        nonkey_positions = np.setdiff1d(np.arange(self.row_count), key_positions)
+        return key_positions, nonkey_positions
+
+    def _capacity_part(self, columns, key_columns):
+        """열의 생산 능력 행 부분에서 같은 SKU 키 열의 부분을 뺀 (공장, 열) 작업 행렬을 만듭니다."""
+        J = self.plant_count
+        matrix = np.zeros((J, len(columns)))
+        positions = np.arange(len(columns))
+        plants = self._plant_row[columns]
+        has_plant = plants >= 0
+        np.add.at(matrix, (plants[has_plant], positions[has_plant]), self._capacity_coef[columns][has_plant])
+        rows = self._demand_row[columns]
+        has_key = rows >= 0
+        keys = key_columns[rows[has_key]]
+        key_plants = self._plant_row[keys]
+        has_key_plant = key_plants >= 0
+        np.add.at(matrix, (key_plants[has_key_plant], positions[has_key][has_key_plant]),
+                  -self._capacity_coef[keys][has_key_plant])
+        return matrix
+
+    def _factor(self, basis, key_positions, nonkey_positions, cost):
+        """작업 기저 역행렬, 기저 변수 값(기저 위치 순서), 쌍대 변수 (수요 + 생산 능력)를 계산합니다."""
+        P, J = self.product_count, self.plant_count
+        key_columns, nonkey_columns = basis[key_positions], basis[nonkey_positions]
+        inverse = np.linalg.inv(self._capacity_part(nonkey_columns, key_columns))
+
+        # 키 열이 수요를 모두 맡는다고 보고 남은 생산 능력으로 비키 변수 값을 구한 뒤 키 변수 값 계산
+        key_plants = self._plant_row[key_columns]
+        has_plant = key_plants >= 0
+        remaining = self.capacity - np.bincount(key_plants[has_plant], minlength=J,
+                                                weights=(self.demand * self._capacity_coef[key_columns])[has_plant])
+        nonkey_values = inverse @ remaining
+        nonkey_rows = self._demand_row[nonkey_columns]
+        has_row = nonkey_rows >= 0
+        values = np.empty(self.row_count)
+        values[nonkey_positions] = nonkey_values
+        values[key_positions] = self.demand - np.bincount(nonkey_rows[has_row], weights=nonkey_values[has_row],
+                                                          minlength=P)
+
+        # 생산 능력 쌍대 변수 (작업 기저의 전치 풀이)와 키 열의 축소 비용이 0이 되는 수요 쌍대 변수
+        nonkey_cost = cost[nonkey_columns].copy()
+        nonkey_cost[has_row] -= cost[key_columns[nonkey_rows[has_row]]]
+        capacity_duals = nonkey_cost @ inverse
+        demand_duals = cost[key_columns].copy()
+        demand_duals[has_plant] -= self._capacity_coef[key_columns][has_plant] * capacity_duals[key_plants[has_plant]]
+        return inverse, values, np.concatenate([demand_duals, capacity_duals])
+
+    def _column_direction(self, basis, key_positions, nonkey_positions, inverse, column):
+        """들어오는 열 한 단위당 기저 변수의 감소량(기저 위치 순서, B⁻¹a)을 계산합니다."""
+        nonkey_direction = inverse @ self._capacity_part(np.array([column]), basis[key_positions])[:, 0]
+        nonkey_rows = self._demand_row[basis[nonkey_positions]]
+        has_row = nonkey_rows >= 0
+        key_direction = -np.bincount(nonkey_rows[has_row], weights=nonkey_direction[has_row],
+                                     minlength=self.product_count)
+        if self._demand_row[column] >= 0:
+            key_direction[self._demand_row[column]] += 1.0
+        direction = np.empty(self.row_count)
+        direction[key_positions] = key_direction
+        direction[nonkey_positions] = nonkey_direction
+        return direction
+
+    def _iterate(self, cost, basis, allowed, max_iterations):
+        """주어진 가능 기저에서 개정 심플렉스법을 최적까지 반복합니다. (기저, 값, 쌍대 변수, 반복 횟수)를 반환합니다.
+
+        allowed가 거짓인 변수(2단계의 인공 변수)는 들어오지 않으며, 값 0으로 기저에 남아 있으면
+        값이 바뀌는 즉시 기저에서 나가므로 항상 0으로 유지됩니다.
+        """
+        basis = basis.copy()
+        key_positions, nonkey_positions = self._split_basis(basis)
+        is_key = np.zeros(self.row_count, dtype=bool)
+        is_key[key_positions] = True
+        iterations = 0
+
+        while True:
+            # 작업 기저 분해와 가격 결정 (열 구조를 이용해 행렬 곱 없이 축소 비용 계산)
+            inverse, values, duals = self._factor(basis, key_positions, nonkey_positions, cost)
+            demand_duals, capacity_duals = duals[:self.product_count], duals[self.product_count:]
+            reduced = cost - np.concatenate([
+                (demand_duals[:, np.newaxis] + self.usage * capacity_duals).ravel(), capacity_duals, demand_duals
+            ])
+            reduced[~allowed] = 0.0
+            reduced[basis] = 0.0
+
+            entering = int(np.argmin(reduced))
+            if reduced[entering] >= -TOLERANCE * max(1.0, np.abs(cost).max()):
+                return basis, values, duals, iterations
+
+            if iterations >= max_iterations:
+                raise RuntimeError(f"심플렉스 반복 횟수 한도({max_iterations})를 초과했습니다.")
+
+            # 비율 검사 (동률이면 열 번호가 작은 변수가 기저에서 나감, 기저에 남은 인공 변수는 값이 바뀌면 나감)
+            direction = self._column_direction(basis, key_positions, nonkey_positions, inverse, entering)
+            ratios = np.full(self.row_count, np.inf)
+            positive = direction > TOLERANCE
+            ratios[positive] = np.maximum(values[positive], 0.0) / direction[positive]
+            ratios[~allowed[basis] & (np.abs(direction) > TOLERANCE)] = 0.0
+            if np.isinf(ratios).all():
+                raise RuntimeError("목적 함수가 무한히 감소합니다.")
+            candidates = np.flatnonzero(ratios <= ratios.min() + TOLERANCE)
+            leaving = int(candidates[np.argmin(basis[candidates])])
+
+            # 기저 교체: 키 열이 나가고 들어오는 열이 다른 SKU이면 같은 SKU의 비키 열을 새 키로 지정
+            basis[leaving] = entering
+            if is_key[leaving]:
+                sku = int(np.flatnonzero(key_positions == leaving)[0])
+                if self._demand_row[entering] != sku:
+                    slot = int(np.flatnonzero(self._demand_row[basis[nonkey_positions]] == sku)[0])
+                    key_positions[sku], nonkey_positions[slot] = nonkey_positions[slot], leaving
+                    is_key[leaving], is_key[key_positions[sku]] = False, True
+            iterations += 1
+
+    def solve(self, cost, warm_start=True, max_iterations=None):
+        """(SKU, 공장) 단위당 비용으로 최적 배정을 구합니다.
+
+        warm_start가 참이고 이전 최적 기저가 있으면 1단계를 건너뛰고 그 기저에서 시작합니다.
+        생산 능력이 수요를 충족할 수 없으면 ValueError를 발생시킵니다.
+        """
+        start = time.perf_counter()
+        cost = np.asarray(cost, dtype=float)
+        if cost.shape != (self.product_count, self.plant_count):
+            raise ValueError(f"비용 행렬의 모양 {cost.shape}이 (SKU, 공장) {(self.product_count, self.plant_count)}과 다릅니다.")
+        if max_iterations is None:
+            max_iterations = 50 * self.row_count + 1000
+
+        P, J = self.product_count, self.plant_count
+        iterations = 0
+        warm = warm_start and self.basis is not None
+
+        if warm:
+            basis = self.basis
+        else:
+            # 1단계: 인공 변수 합 최소화로 가능 기저 탐색 (값이 0인 채 남은 인공 변수는 2단계에서 0으로 유지)
+            phase_one_cost = np.zeros(self.column_count)
+            phase_one_cost[self.artificial_start:] = 1.0
+            basis, values, _, iterations = self._iterate(
+                phase_one_cost, self._initial_basis(), np.ones(self.column_count, dtype=bool), max_iterations)
+            infeasibility = values[basis >= self.artificial_start].sum()
+            if infeasibility > TOLERANCE * max(1.0, self.demand.sum()):
+                raise ValueError("생산 능력이 수요를 충족하기에 부족합니다.")
+
+        # 2단계: 인공 변수를 제외하고 실제 비용 최소화
+        full_cost = np.concatenate([cost.ravel(), np.zeros(J + P)])
+        allowed = np.arange(self.column_count) < self.artificial_start
+        basis, values, duals, phase_two_iterations = self._iterate(full_cost, basis, allowed, max_iterations)
+        iterations += phase_two_iterations
+        self.basis = basis
+
+        solution = np.zeros(self.column_count)
+        solution[basis] = np.maximum(values, 0.0)
+        allocation = solution[:self.structural_count].reshape(P, J)
+
+        return AllocationResult(
+            allocation=allocation,
+            objective=float((allocation * cost).sum()),
+            demand_duals=duals[:P],
+            capacity_duals=duals[P:],
+            iterations=iterations,
+            solve_time=time.perf_counter() - start,
+            warm_start=warm
+        )
+
+def read_plan(file_path):
+    """소싱 계획 파일에서 (공장 국가 코드 목록, 생산 능력, {SKU: 수요})를 읽습니다."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        plan = json.load(f)
+    plants = [plant['country'] for plant in plan['plants']]
+    capacity = [plant['capacity_hours'] for plant in plan['plants']]
+    return plants, capacity, plan.get('demand', {})
+
+def plant_costs(result, plants):
+    """도착 원가 결과에서 공장 국가 열만 골라 (SKU, 공장) 단위당 비용 행렬을 만듭니다."""
+    columns = [result.countries.index(plant) for plant in plants]
+    return result.total[:, columns]
+
+def build_optimizer(catalog, plants, capacity, demand):
+    """SKU 카탈로그와 소싱 계획으로 최적화기를 만듭니다. 공장 생산 능력은 직접 노동 시간 기준입니다."""
+    labor = catalog.usage[:, landed_cost.RESOURCE_FIELDS.index('labor_hours')]
+    missing = [sku for sku in catalog.skus.tolist() if sku not in demand]
+    if missing:
+        raise KeyError(f"소싱 계획에 수요가 없는 SKU: {', '.join(missing)}")
+    return SourcingOptimizer(
+        demand=[demand[sku] for sku in catalog.skus.tolist()],
+        capacity=capacity,
+        usage=np.repeat(labor[:, np.newaxis], len(plants), axis=1),
+        plants=plants,
+        skus=catalog.skus.tolist()
+    )
+
+def tariff_costs(optimizer, catalog, factors, hs_tariffs):
+    """관세율 행렬만 바꾼 (SKU, 공장) 도착 원가를 계산합니다."""
+    result = landed_cost.calculate_landed_costs(catalog, factors._replace(hs_tariffs=hs_tariffs))
+    return plant_costs(result, optimizer.plants)
+
+def optimize_sourcing(data_dir=DATA_DIR, tariff_scenarios=None):
+    """데이터 디렉토리의 카탈로그와 소싱 계획으로 최적 배정을 구합니다.
+
+    tariff_scenarios({이름: (HS 코드, 국가) 관세율 행렬})를 주면 기준 최적 기저에서
+    웜 스타트로 시나리오별 배정을 이어서 풉니다. {이름: AllocationResult}를 반환합니다('baseline' 포함).
+    """
+    catalog = landed_cost.load_catalog(data_dir)
+    factors = landed_cost.get_factors(data_dir)
+    plants, capacity, demand = read_plan(os.path.join(data_dir, SOURCING_PLAN_FILE_NAME))
+    optimizer = build_optimizer(catalog, plants, capacity, demand)
+
+    results = {'baseline': optimizer.solve(plant_costs(landed_cost.calculate_landed_costs(catalog, factors), plants))}
+    for name, hs_tariffs in (tariff_scenarios or {}).items():
+        results[name] = optimizer.solve(tariff_costs(optimizer, catalog, factors, hs_tariffs))
+    return results
+
+def benchmark(product_count=300, plant_count=3, scenario_count=5, seed=0):
+    """무작위 배정 문제의 콜드 스타트와 관세 변경 웜 스타트 풀이 시간을 측정합니다."""
+    rng = np.random.default_rng(seed)
+    demand = rng.uniform(100, 1000, product_count)
+    usage = rng.uniform(0.2, 1.5, (product_count, 1)).repeat(plant_count, axis=1)
+    capacity = np.full(plant_count, (usage[:, 0] * demand).sum() / plant_count * 1.3)
+    base_cost = rng.uniform(10, 50, (product_count, 1)) * rng.uniform(0.8, 1.2, (product_count, plant_count))
+
+    optimizer = SourcingOptimizer(demand, capacity, usage)
+    cold = optimizer.solve(base_cost)
+
+    warm = []
+    for _ in range(scenario_count):
+        tariff = 1 + rng.uniform(0, 0.3, plant_count)
+        warm.append(optimizer.solve(base_cost * tariff))
+
+    return {
+        'product_count': product_count,
+        'plant_count': plant_count,
+        'cold_time': cold.solve_time,
+        'cold_iterations': cold.iterations,
+        'warm_time': float(np.mean([result.solve_time for result in warm])),
+        'warm_iterations': float(np.mean([result.iterations for result in warm]))
+    }
+
+if __name__ == "__main__":
+    # 샘플 카탈로그와 소싱 계획의 최적 배정
+    results = optimize_sourcing()
+    baseline = results['baseline']
+    catalog = landed_cost.load_catalog()
+    plants, _, _ = read_plan(os.path.join(DATA_DIR, SOURCING_PLAN_FILE_NAME))
+    print(f"최적 총비용: {baseline.objective:,.0f} USD (풀이 {baseline.solve_time * 1000:.1f} ms, "
+          f"반복 {baseline.iterations}회)")
+    for sku, row in zip(catalog.skus.tolist(), baseline.allocation):
+        print(f"{sku}: " + ", ".join(f"{plant} {quantity:,.0f}개" for plant, quantity in zip(plants, row)))
+
+    # 콜드 스타트와 웜 스타트 비교
+    summary = benchmark()
+    print(f"SKU {summary['product_count']}개 × 공장 {summary['plant_count']}개: "
+          f"콜드 스타트 {summary['cold_time'] * 1000:.1f} ms ({summary['cold_iterations']}회), "
+          f"관세 변경 웜 스타트 평균 {summary['warm_time'] * 1000:.1f} ms ({summary['warm_iterations']:.0f}회)")
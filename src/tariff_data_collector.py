@@ -8,33 +8,25 @@ API 직접 호출 대신 데이터 파일을 다운로드하여 처리하는 방
 import os
 import json
 import requests
-import pandas as pd
 from datetime import datetime
 from bs4 import BeautifulSoup
 import time
+import numpy as np
+
+from src import country_registry, tariff_rates, tariff_rules, tariff_store
 
 # 데이터 저장 경로
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'tariff_data')
 
-# 대상 국가 목록 (ISO 코드)
-TARGET_COUNTRIES = {
-    'KR': '대한민국',
-    'JP': '일본',
-    'CN': '중국',
-    'IN': '인도',
-    'TH': '태국',
-    'VN': '베트남',
-    'TW': '대만',
-    'EU': '유럽연합',
-    'MX': '멕시코'
-}
+# 대상 국가 목록 (ISO 코드, data/countries.json의 국가 레지스트리)
+TARGET_COUNTRIES = country_registry.target_countries()
 
 def ensure_data_dir():
     """데이터 디렉토리가 존재하는지 확인하고, 없으면 생성합니다."""
     os.makedirs(DATA_DIR, exist_ok=True)
 
-def download_hts_data():
-    """HTS 데이터를 다운로드합니다."""
+def download_hts_data(as_of_date=None):
+    """HTS 데이터를 다운로드합니다. 실패하면 as_of_date 기준 샘플 데이터를 생성합니다."""
     try:
         # 최신 HTS 데이터 다운로드 URL (JSON 형식)
         url = "https://hts.usitc.gov/current/hts.json"
@@ -66,15 +58,19 @@ def download_hts_data():
                 print(f"HTS 데이터(CSV) 다운로드 실패: {csv_response.status_code}")
                 
                 # 샘플 데이터 생성
-                return create_sample_hts_data()
+                return create_sample_hts_data(as_of_date)
     except Exception as e:
         print(f"HTS 데이터 다운로드 오류: {str(e)}")
         # 오류 발생 시 샘플 데이터 생성
-        return create_sample_hts_data()
+        return create_sample_hts_data(as_of_date)
+
+def create_sample_hts_data(as_of_date=None):
+    """API 접근이 불가능한 경우 샘플 HTS 데이터를 생성합니다.
 
-def create_sample_hts_data():
-    """API 접근이 불가능한 경우 샘플 HTS 데이터를 생성합니다."""
+    관세율은 as_of_date(YYYY-MM-DD, 생략하면 오늘) 기준 관세 규칙의 실효 관세율입니다.
+    """
     print("샘플 HTS 데이터 생성 중...")
+    as_of_date = as_of_date or datetime.now().date().isoformat()
     
     # 자동차 부품 관련 HS 코드 및 설명
     automotive_parts = [
@@ -105,83 +101,45 @@ def create_sample_hts_data():
         {"hts_number": "8544.30.00", "description": "자동차용 점화배선 세트와 기타 배선 세트", "general_rate": "5%"}
     ]
     
-    # 국가별 관세율 차이 (샘플 데이터)
-    country_rates = {
-        'KR': 0.0,  # 한-미 FTA로 대부분 0%
-        'JP': 1.0,  # 기본 관세율
-        'CN': 1.25, # 추가 관세 적용
-        'IN': 1.0,  # 기본 관세율
-        'TH': 1.0,  # 기본 관세율
-        'VN': 1.0,  # 기본 관세율
-        'TW': 1.0,  # 기본 관세율
-        'EU': 0.5,  # 일부 감면
-        'MX': 0.0   # USMCA로 대부분 0%
-    }
-    
-    # 국가별 데이터 생성 및 저장
-    for country_code, country_name in TARGET_COUNTRIES.items():
-        country_data = []
-        
-        for part in automotive_parts:
-            # 국가별 관세율 조정
-            rate_str = part["general_rate"]
-            if rate_str.endswith("%"):
-                rate_value = float(rate_str.rstrip("%"))
-                adjusted_rate = rate_value * country_rates[country_code]
-                
-                # 트럼프 관세 정책 반영 (중국에 대한 추가 관세)
-                if country_code == 'CN':
-                    adjusted_rate += 25.0  # 25% 추가 관세
-                
-                # 최근 발표된 자동차 부품 25% 관세 반영 (멕시코, 캐나다 제외)
-                if country_code not in ['MX']:
-                    adjusted_rate += 25.0
-                
-                adjusted_rate_str = f"{adjusted_rate:.1f}%"
-            else:
-                adjusted_rate_str = rate_str
-            
-            country_item = part.copy()
-            country_item["general_rate"] = adjusted_rate_str
-            country_data.append(country_item)
-        
-        # 국가별 데이터 저장
-        country_file_path = os.path.join(DATA_DIR, f"{country_code}_tariff_data.json")
-        with open(country_file_path, 'w', encoding='utf-8') as f:
-            json.dump({
-                'country_code': country_code,
-                'country_name': country_name,
-                'revision_id': '2025-6',
-                'revision_date': '2025-03-01',
-                'collection_date': datetime.now().isoformat(),
-                'data': country_data
-            }, f, ensure_ascii=False, indent=2)
-        
-        print(f"{country_name} 샘플 관세 데이터 저장 완료: {len(country_data)}개 항목")
+    # (국가, 품목) 관세율 행렬 계산 (관세율 원문은 품목별로 한 번만 파싱)
+    # 일반 세율을 기본 관세로 두고 FTA 특혜, 301조, 232조, 상호 관세는 data/tariff_rules.json의 규칙으로 중첩
+    country_codes = np.array(list(TARGET_COUNTRIES), dtype=str)
+    parsed_rates = [tariff_rates.parse_rate(part["general_rate"]) for part in automotive_parts]
+    ad_valorem = np.array([parsed_rate.ad_valorem for parsed_rate in parsed_rates])
+    decision = tariff_rules.get_table().evaluate(
+        [part["hts_number"] for part in automotive_parts], country_codes, as_of_date, ad_valorem
+    )
+    adjusted_rates = decision.rates.T
     
-    # 모든 국가 데이터 통합 저장
-    all_countries_data = {}
-    for country_code, country_name in TARGET_COUNTRIES.items():
-        country_file_path = os.path.join(DATA_DIR, f"{country_code}_tariff_data.json")
-        with open(country_file_path, 'r', encoding='utf-8') as f:
-            country_data = json.load(f)
-        
-        all_countries_data[country_code] = {
-            'country_name': country_name,
-            'data': country_data['data']
+    # 국가별 관세 품목 생성
+    records = [
+        {
+            'country_code': country_code,
+            'hs_code': part["hts_number"],
+            'description': part["description"],
+            'rate': round(rate, 1),
+            'base_rate': parsed_rate.ad_valorem,
+            'specific_rate': parsed_rate.specific,
+            'specific_unit': parsed_rate.specific_unit
         }
+        for country_code, row in zip(country_codes.tolist(), adjusted_rates.tolist())
+        for part, parsed_rate, rate in zip(automotive_parts, parsed_rates, row)
+    ]
     
-    all_countries_file_path = os.path.join(DATA_DIR, "all_countries_tariff_data.json")
-    with open(all_countries_file_path, 'w', encoding='utf-8') as f:
-        json.dump({
-            'revision_id': '2025-6',
-            'revision_date': '2025-03-01',
-            'collection_date': datetime.now().isoformat(),
-            'countries': all_countries_data
-        }, f, ensure_ascii=False, indent=2)
+    # 관세 저장소에 샘플 품목 저장 (샘플 HS 코드 행만 교체)
+    tariff_store.upsert_lines(records, metadata={
+        'revision_id': '2025-6',
+        'revision_date': '2025-03-01',
+        'collection_date': datetime.now().isoformat(),
+        'tariff_rules_as_of': as_of_date,
+        'countries': {
+            country_code: {'country_name': country_name}
+            for country_code, country_name in TARGET_COUNTRIES.items()
+        }
+    })
     
-    print("모든 국가의 샘플 관세 데이터 통합 저장 완료")
-    return all_countries_file_path
+    print(f"모든 국가의 샘플 관세 데이터 저장 완료: {len(TARGET_COUNTRIES)}개 국가, {len(automotive_parts)}개 품목")
+    return tariff_store.STORE_FILE
 
 def get_automotive_parts_hs_codes():
     """자동차 부품 관련 HS 코드 목록을 가져옵니다."""
@@ -266,39 +224,13 @@ def collect_tariff_policy_updates():
         return None
 
 def create_tariff_summary():
-    """수집된 관세 데이터를 요약하여 CSV 파일로 저장합니다."""
+    """관세 저장소의 데이터를 요약하여 CSV 파일로 내보냅니다."""
     try:
-        all_countries_file_path = os.path.join(DATA_DIR, "all_countries_tariff_data.json")
-        
-        if not os.path.exists(all_countries_file_path):
-            print("통합 관세 데이터 파일이 존재하지 않습니다.")
+        if not os.path.exists(tariff_store.STORE_FILE):
+            print("관세 데이터 저장소가 존재하지 않습니다.")
             return
         
-        with open(all_countries_file_path, 'r', encoding='utf-8') as f:
-            all_data = json.load(f)
-        
-        summary_data = []
-        
-        for country_code, country_info in all_data.get('countries', {}).items():
-            country_name = country_info.get('country_name')
-            
-            for item in country_info.get('data', []):
-                hs_code = item.get('hts_number', '')
-                description = item.get('description', '')
-                rate = item.get('general_rate', '')
-                
-                summary_data.append({
-                    '국가 코드': country_code,
-                    '국가명': country_name,
-                    'HS 코드': hs_code,
-                    '품목 설명': description,
-                    '관세율': rate
-                })
-        
-        # 데이터프레임 생성 및 CSV 저장
-        df = pd.DataFrame(summary_data)
-        csv_file_path = os.path.join(DATA_DIR, "tariff_summary.csv")
-        df.to_csv(csv_file_path, index=False, encoding='utf-8-sig')
+        csv_file_path = tariff_store.export_summary_csv(tariff_store.read_table())
         
         print(f"관세 데이터 요약 CSV 파일 저장 완료: {csv_file_path}")
         return csv_file_path
@@ -306,24 +238,20 @@ def create_tariff_summary():
         print(f"관세 데이터 요약 생성 오류: {str(e)}")
         return None
 
-def collect_tariff_data():
-    """관세 데이터를 수집하고 처리합니다."""
+def collect_tariff_data(as_of_date=None):
+    """관세 데이터를 수집하고 처리합니다. (샘플 데이터의 관세율은 as_of_date 기준)"""
     ensure_data_dir()
     
     # HTS 데이터 다운로드 또는 샘플 데이터 생성
-    hts_file = download_hts_data()
+    hts_file = download_hts_data(as_of_date)
     
-    # 다운로드한 데이터가 있지만 통합 관세 데이터 파일이 없는 경우 샘플 데이터 생성
-    all_countries_file_path = os.path.join(DATA_DIR, "all_countries_tariff_data.json")
-    if not os.path.exists(all_countries_file_path):
-        print("통합 관세 데이터 파일이 없습니다. 샘플 데이터를 생성합니다.")
-        create_sample_hts_data()
+    # 다운로드한 데이터가 있지만 관세 데이터 저장소가 없는 경우 샘플 데이터 생성
+    if not os.path.exists(tariff_store.STORE_FILE):
+        print("관세 데이터 저장소가 없습니다. 샘플 데이터를 생성합니다.")
+        create_sample_hts_data(as_of_date)
     
     # 관세 정책 업데이트 정보 수집
     collect_tariff_policy_updates()
-    
-    # 관세 데이터 요약 생성
-    create_tariff_summary()
 
 if __name__ == "__main__":
     print("미국 관세 정책 데이터 수집 시작...")
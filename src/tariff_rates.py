@@ -0,0 +1,105 @@
+"""
+HTS 관세율 표현식 파서
+
+이 모듈은 HTS 관세율 문자열을 한 번만 파싱하여 숫자 표현으로 변환합니다.
+- "Free": 무관세
+- "2.5%": 종가세 (ad valorem)
+- "4.4¢/kg", "$1.20/doz.": 종량세 (USD/단위)
+- "4.4¢/kg + 3%": 복합세 (종량세 + 종가세)
+"""
+
+import re
+import numpy as np
+from collections import namedtuple
+
+# 파싱된 관세율 (종가세 %, 종량세 USD/단위, 종량세 단위, 관세율 유형)
+ParsedRate = namedtuple('ParsedRate', ['ad_valorem', 'specific', 'specific_unit', 'kind'])
+
+# 관세율 구성 요소 패턴
+AD_VALOREM_PATTERN = re.compile(r'^(\d+(?:\.\d+)?)\s*%$')
+CENTS_PATTERN = re.compile(r'^(\d+(?:\.\d+)?)\s*¢\s*(?:/\s*(.+)|each)$')
+DOLLARS_PATTERN = re.compile(r'^\$\s*(\d+(?:\.\d+)?)\s*(?:/\s*(.+)|each)$')
+
+def rate_kind(ad_valorem, specific):
+    """종가세와 종량세 값으로 관세율 유형('free', 'ad_valorem', 'specific', 'compound')을 결정합니다."""
+    if ad_valorem and specific:
+        return 'compound'
+    if specific:
+        return 'specific'
+    if ad_valorem:
+        return 'ad_valorem'
+    return 'free'
+
+def parse_rate(expression):
+    """HTS 관세율 표현식을 ParsedRate로 변환합니다.
+
+    숫자가 주어지면 종가세(%)로 취급합니다. 해석할 수 없는 표현식이거나 복합세의
+    종량세 단위가 서로 다르면 ValueError를 발생시킵니다.
+    """
+    if isinstance(expression, (int, float)):
+        return ParsedRate(float(expression), 0.0, '', rate_kind(float(expression), 0.0))
+
+    text = ' '.join(str(expression).split())
+    if not text:
+        raise ValueError("관세율 표현식이 비어 있습니다.")
+
+    ad_valorem = 0.0
+    specific = 0.0
+    specific_unit = ''
+
+    for component in text.split('+'):
+        component = component.strip()
+
+        if component.lower() == 'free':
+            continue
+
+        match = AD_VALOREM_PATTERN.match(component)
+        if match:
+            ad_valorem += float(match.group(1))
+            continue
+
+        match = CENTS_PATTERN.match(component) or DOLLARS_PATTERN.match(component)
+        if match:
+            amount = float(match.group(1))
+            if match.re is CENTS_PATTERN:
+                amount = round(amount / 100, 10)
+            unit = (match.group(2) or 'each').strip().lower()
+            if specific_unit and unit != specific_unit:
+                raise ValueError(f"종량세 단위가 서로 다릅니다: {text}")
+            specific += amount
+            specific_unit = unit
+            continue
+
+        raise ValueError(f"해석할 수 없는 관세율 표현식: {text}")
+
+    return ParsedRate(ad_valorem, specific, specific_unit, rate_kind(ad_valorem, specific))
+
+def parse_rates(expressions):
+    """관세율 표현식 목록을 (종가세 배열, 종량세 배열, 종량세 단위 배열)로 변환합니다.
+
+    같은 표현식은 한 번만 파싱합니다.
+    """
+    parsed = {}
+    for expression in expressions:
+        if expression not in parsed:
+            parsed[expression] = parse_rate(expression)
+
+    rates = [parsed[expression] for expression in expressions]
+    return (
+        np.array([rate.ad_valorem for rate in rates], dtype=float),
+        np.array([rate.specific for rate in rates], dtype=float),
+        np.array([rate.specific_unit for rate in rates], dtype=str)
+    )
+
+def format_rate(ad_valorem, specific=0.0, specific_unit=''):
+    """숫자 관세율을 HTS 표현식 형식의 문자열로 변환합니다."""
+    parts = []
+    if specific:
+        unit_text = ' each' if specific_unit == 'each' else f"/{specific_unit}"
+        if specific < 1:
+            parts.append(f"{specific * 100:g}¢{unit_text}")
+        else:
+            parts.append(f"${specific:g}{unit_text}")
+    if ad_valorem or not parts:
+        parts.append(f"{ad_valorem}%")
+    return ' + '.join(parts)
@@ -0,0 +1,318 @@
+"""
+관세 중첩 규칙 엔진
+
+이 모듈은 조치별 관세 규칙(data/tariff_rules.json)을 결정 테이블로 한 번 컴파일하고
+(HS 품목 × 원산지 국가) 전체의 실효 관세율을 배열 연산으로 한 번에 계산합니다.
+
+규칙은 조치(measure)에 속하며 적용 범위는 HS 코드 접두사, 원산지 국가(제외 국가), 적용 기간
+[적용 시작일, 만료일)입니다. 조치의 중첩 방식(mode)은 다음과 같습니다.
+- base: 기본 관세 (규칙이 없는 품목은 입력된 HTS 일반 세율)
+- preference: 특혜 세율 (FTA, 기본 관세를 min(기본 관세, 특혜 세율)로 대체)
+- add: 추가 관세 (301조, 232조, 상호 관세 등, 기본 관세에 더함)
+
+한 조치 안에서 여러 규칙이 적용되면 가장 구체적인 규칙 하나만 적용됩니다.
+(HS 접두사가 긴 규칙 → 국가를 지정한 규칙 → 적용 시작일이 늦은 규칙 → 파일에서 나중에 나온 규칙 순)
+적용된 규칙의 excludes에 있는 조치는 그 품목·국가에 적용되지 않습니다. (예: 232조 품목은 상호 관세 제외)
+실효 관세율 = 기본 관세(특혜 반영) + 추가 관세 합계이며, 품목·국가별 적용 근거는 explain()으로 조회합니다.
+국가별 특혜 세율(FTA) 적용 현황은 trade_agreements()로 조회합니다. (수출 가격 공식에는 별도 혜택으로 다시 적용하지 않음)
+"""
+
+import os
+import json
+import threading
+import numpy as np
+from collections import namedtuple
+
+from src import hs_index, tariff_timeline
+
+# 프로젝트 루트 디렉토리 경로
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 관세 규칙 파일
+TARIFF_RULES_FILE = os.path.join(ROOT_DIR, 'data', 'tariff_rules.json')
+
+# 조치 중첩 방식
+MODES = ('base', 'preference', 'add')
+
+# 관세 조치 (이름, 중첩 방식, 설명)
+Measure = namedtuple('Measure', ['name', 'mode', 'description'])
+
+# 관세 규칙 (적용 시작일·만료일이 없으면 None)
+TariffRule = namedtuple('TariffRule', [
+    'id', 'measure', 'rate', 'hs_prefixes', 'countries', 'exclude_countries',
+    'effective_date', 'expiration_date', 'excludes', 'description'
+])
+
+# 결정 테이블 평가 결과
+# - rates: (품목, 국가) 실효 관세율(%)
+# - base_rates: (품목, 국가) 특혜 반영 전 기본 관세율
+# - contributions: (조치, 품목, 국가) 조치별 기여분 (특혜 조치는 기본 관세 감소분이 음수로 기록됨)
+# - winners: (조치, 품목, 국가) 조치별 적용 규칙 번호 (없으면 -1)
+# - excluded: (조치, 품목, 국가) 다른 규칙에 의해 제외된 조치
+DutyDecision = namedtuple('DutyDecision', [
+    'hs_codes', 'countries', 'as_of', 'rates', 'base_rates', 'contributions', 'winners', 'excluded'
+])
+
+def _rule(config, measures):
+    """규칙 설정 딕셔너리를 TariffRule로 변환합니다. 알 수 없는 조치는 ValueError입니다."""
+    if config.get('measure') not in measures:
+        raise ValueError(f"규칙 {config.get('id')}: 알 수 없는 관세 조치 {config.get('measure')}")
+    unknown = [measure for measure in config.get('excludes', []) if measure not in measures]
+    if unknown:
+        raise ValueError(f"규칙 {config['id']}: 알 수 없는 제외 조치 {', '.join(unknown)}")
+    return TariffRule(
+        id=config['id'],
+        measure=config['measure'],
+        rate=float(config['rate']),
+        hs_prefixes=[hs_index.normalize_hs_code(prefix) for prefix in config.get('hs_prefixes') or ['']],
+        countries=list(config.get('countries') or []),
+        exclude_countries=list(config.get('exclude_countries') or []),
+        effective_date=config.get('effective_date'),
+        expiration_date=config.get('expiration_date'),
+        excludes=list(config.get('excludes') or []),
+        description=config.get('description', '')
+    )
+
+class TariffRuleTable:
+    """관세 규칙을 컴파일한 결정 테이블
+
+    규칙의 HS 접두사마다 항목(entry) 하나를 만들고 구체성 순서로 정렬해 두므로,
+    평가 시 항목 순서대로 조치별 적용 규칙을 덮어쓰면 가장 구체적인 규칙이 남습니다.
+    """
+
+    def __init__(self, measures, rules):
+        self.measures = list(measures)
+        self.measure_names = [measure.name for measure in self.measures]
+        for measure in self.measures:
+            if measure.mode not in MODES:
+                raise ValueError(f"조치 {measure.name}: 알 수 없는 중첩 방식 {measure.mode}")
+        if len(set(self.measure_names)) != len(self.measure_names):
+            raise ValueError("관세 조치 이름이 중복되었습니다.")
+        self.rules = list(rules)
+        if len({rule.id for rule in self.rules}) != len(self.rules):
+            raise ValueError("관세 규칙 ID가 중복되었습니다.")
+
+        # 규칙별 배열
+        self.rule_measure = np.array([self.measure_names.index(rule.measure) for rule in self.rules], dtype=np.int64)
+        self.rule_rate = np.array([rule.rate for rule in self.rules], dtype=float)
+        self.rule_start = np.array([tariff_timeline.MIN_DAY if rule.effective_date is None
+                                    else tariff_timeline.to_day(rule.effective_date) for rule in self.rules],
+                                   dtype=np.int64)
+        self.rule_end = np.array([tariff_timeline.MAX_DAY if rule.expiration_date is None
+                                  else tariff_timeline.to_day(rule.expiration_date) for rule in self.rules],
+                                 dtype=np.int64)
+        self.rule_excludes = np.zeros((len(self.rules), len(self.measures)), dtype=bool)
+        for row, rule in enumerate(self.rules):
+            self.rule_excludes[row, [self.measure_names.index(measure) for measure in rule.excludes]] = True
+
+        # (규칙, HS 접두사) 항목을 구체성 오름차순으로 정렬
+        entries = [(row, prefix) for row, rule in enumerate(self.rules) for prefix in rule.hs_prefixes]
+        entry_rule = np.array([row for row, _ in entries], dtype=np.int64)
+        entry_prefix = np.array([prefix for _, prefix in entries], dtype=str)
+        order = np.lexsort((
+            entry_rule,
+            self.rule_start[entry_rule],
+            np.array([bool(self.rules[row].countries) for row in entry_rule.tolist()]),
+            np.char.str_len(entry_prefix) if len(entries) else np.array([], dtype=np.int64)
+        ))
+        self.entry_rule = entry_rule[order]
+        self.entry_prefix = entry_prefix[order]
+
+    def measure_mode(self, mode):
+        """중첩 방식이 mode인 조치 번호 목록을 반환합니다."""
+        return [position for position, measure in enumerate(self.measures) if measure.mode == mode]
+
+    def country_mask(self, countries):
+        """(규칙, 국가) 국가 적용 범위 배열을 반환합니다."""
+        countries = np.asarray(countries, dtype=str)
+        mask = np.ones((len(self.rules), len(countries)), dtype=bool)
+        for row, rule in enumerate(self.rules):
+            if rule.countries:
+                mask[row] &= np.isin(countries, rule.countries)
+            if rule.exclude_countries:
+                mask[row] &= ~np.isin(countries, rule.exclude_countries)
+        return mask
+
+    def entry_line_mask(self, hs_codes):
+        """(항목, 품목) HS 접두사 적용 범위 배열을 반환합니다. (정렬된 품목 키의 이진 탐색)"""
+        keys = hs_index.normalize_hs_codes(hs_codes)
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        starts = np.searchsorted(sorted_keys, self.entry_prefix, side='left')
+        ends = np.searchsorted(sorted_keys, np.char.add(self.entry_prefix, hs_index.PREFIX_UPPER_BOUND), side='left')
+
+        # 접두사 범위 [시작, 끝)을 누적 합으로 펼친 뒤 원래 품목 순서로 되돌림
+        coverage = np.zeros((len(self.entry_prefix), len(keys) + 1), dtype=np.int8)
+        rows = np.arange(len(self.entry_prefix))
+        np.add.at(coverage, (rows, starts), 1)
+        np.add.at(coverage, (rows, ends), -1)
+        mask = np.zeros((len(self.entry_prefix), len(keys)), dtype=bool)
+        mask[:, order] = np.cumsum(coverage[:, :-1], axis=1) > 0
+        return mask
+
+    def evaluate(self, hs_codes, countries, as_of, base_rates=None):
+        """(품목, 국가) 전체의 실효 관세율을 계산합니다.
+
+        base_rates는 규칙이 없는 품목의 기본 관세율(HTS 일반 세율)로 (품목,) 또는 (품목, 국가) 배열이며
+        생략하면 0입니다. as_of는 규칙 적용 기간을 판단하는 기준일입니다.
+        """
+        hs_codes = np.asarray(hs_codes, dtype=str)
+        countries = np.asarray(countries, dtype=str)
+        line_count, country_count = len(hs_codes), len(countries)
+        day = tariff_timeline.to_day(as_of)
+
+        active = (self.rule_start <= day) & (day < self.rule_end)
+        country_mask = self.country_mask(countries)
+        line_mask = self.entry_line_mask(hs_codes)
+
+        # 조치별 적용 규칙 (구체성 오름차순으로 덮어씀)
+        winners = np.full((len(self.measures), line_count, country_count), -1, dtype=np.int64)
+        for entry, rule in enumerate(self.entry_rule.tolist()):
+            if not active[rule] or not country_mask[rule].any():
+                continue
+            applicable = line_mask[entry][:, np.newaxis] & country_mask[rule][np.newaxis, :]
+            winners[self.rule_measure[rule]][applicable] = rule
+
+        # 적용 규칙의 제외 조치
+        has_winner = winners >= 0
+        excluded = np.zeros(winners.shape, dtype=bool)
+        for measure in range(len(self.measures)):
+            rows = winners[measure][has_winner[measure]]
+            excluded[:, has_winner[measure]] |= self.rule_excludes[rows].T
+        applied = has_winner & ~excluded
+        rule_rates = np.where(applied, self.rule_rate[np.maximum(winners, 0)], 0.0)
+
+        # 기본 관세 → 특혜 세율 → 추가 관세
+        base = np.zeros((line_count, country_count)) if base_rates is None else \
+            np.broadcast_to(np.asarray(base_rates, dtype=float).reshape(line_count, -1),
+                            (line_count, country_count)).astype(float)
+        for measure in self.measure_mode('base'):
+            base = np.where(applied[measure], rule_rates[measure], base)
+
+        contributions = np.zeros(winners.shape)
+        rates = base.copy()
+        for measure in self.measure_mode('preference'):
+            preferred = np.where(applied[measure], np.minimum(rates, rule_rates[measure]), rates)
+            contributions[measure] = preferred - rates
+            rates = preferred
+        for measure in self.measure_mode('base'):
+            contributions[measure] = base
+        for measure in self.measure_mode('add'):
+            contributions[measure] = rule_rates[measure]
+            rates = rates + rule_rates[measure]
+
+        return DutyDecision(
+            hs_codes=hs_codes, countries=countries, as_of=as_of, rates=rates, base_rates=base,
+            contributions=contributions, winners=winners, excluded=excluded
+        )
+
+    def explain(self, hs_code, country, as_of, base_rate=0.0):
+        """한 품목·국가의 실효 관세율과 규칙별 적용 근거 목록을 반환합니다.
+
+        근거 항목의 status는 applied(적용), overridden(같은 조치의 더 구체적인 규칙이 적용),
+        excluded(다른 규칙이 조치를 제외), inactive(적용 기간이 아님) 중 하나입니다.
+        """
+        decision = self.evaluate([hs_code], [country], as_of, [base_rate])
+        day = tariff_timeline.to_day(as_of)
+        key = hs_index.normalize_hs_code(hs_code)
+        in_country = self.country_mask([country])[:, 0]
+
+        # 적용 규칙별 제외 조치 → 제외한 규칙
+        excluded_by = {}
+        for measure in range(len(self.measures)):
+            winner = int(decision.winners[measure, 0, 0])
+            if winner >= 0 and not decision.excluded[measure, 0, 0]:
+                for excluded_measure in np.flatnonzero(self.rule_excludes[winner]).tolist():
+                    excluded_by.setdefault(excluded_measure, self.rules[winner].id)
+
+        trace = []
+        for row, rule in enumerate(self.rules):
+            if not in_country[row] or not any(key.startswith(prefix) for prefix in rule.hs_prefixes):
+                continue
+            measure = int(self.rule_measure[row])
+            winner = int(decision.winners[measure, 0, 0])
+            if not self.rule_start[row] <= day < self.rule_end[row]:
+                status, reason = 'inactive', "적용 기간이 아님"
+            elif winner != row:
+                status, reason = 'overridden', f"더 구체적인 규칙 {self.rules[winner].id} 적용"
+            elif decision.excluded[measure, 0, 0]:
+                status, reason = 'excluded', f"규칙 {excluded_by.get(measure, '')}에 의해 {rule.measure} 제외"
+            else:
+                status, reason = 'applied', ''
+            trace.append({
+                'rule': rule.id,
+                'measure': rule.measure,
+                'mode': self.measures[measure].mode,
+                'rate': rule.rate,
+                'status': status,
+                'reason': reason,
+                'contribution': float(decision.contributions[measure, 0, 0]) if status == 'applied' else 0.0,
+                'description': rule.description
+            })
+
+        return {
+            'hs_code': hs_code,
+            'country': country,
+            'as_of': str(as_of),
+            'base_rate': float(decision.base_rates[0, 0]),
+            'effective_rate': float(decision.rates[0, 0]),
+            'trace': trace
+        }
+
+def build_table(config):
+    """규칙 설정 딕셔너리({measures, rules})를 결정 테이블로 컴파일합니다."""
+    measures = [Measure(item['name'], item['mode'], item.get('description', '')) for item in config.get('measures', [])]
+    measure_names = {measure.name for measure in measures}
+    return TariffRuleTable(measures, [_rule(item, measure_names) for item in config.get('rules', [])])
+
+def read_table(file_path=TARIFF_RULES_FILE):
+    """관세 규칙 파일을 결정 테이블로 컴파일합니다."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return build_table(json.load(f))
+
+# 프로세스 전체에서 공유하는 결정 테이블 (규칙 파일이 바뀌면 다시 컴파일)
+_table_lock = threading.Lock()
+_table_cache = {}
+
+def get_table(file_path=TARIFF_RULES_FILE):
+    """관세 규칙 파일의 결정 테이블을 반환합니다. 파일이 바뀌지 않았다면 다시 컴파일하지 않습니다."""
+    stat = os.stat(file_path)
+    token = (stat.st_mtime_ns, stat.st_size)
+    with _table_lock:
+        cached = _table_cache.get(file_path)
+        if cached is None or cached[0] != token:
+            cached = (token, read_table(file_path))
+            _table_cache[file_path] = cached
+        return cached[1]
+
+def effective_rates(hs_codes, countries, as_of, base_rates=None, file_path=TARIFF_RULES_FILE):
+    """관세 규칙 파일 기준 (품목, 국가) 실효 관세율 배열을 반환합니다."""
+    return get_table(file_path).evaluate(hs_codes, countries, as_of, base_rates).rates
+
+def trade_agreements(hs_codes, countries, as_of, base_rates=None, file_path=TARIFF_RULES_FILE):
+    """국가별 특혜 세율(FTA) 적용 현황을 {국가 코드: {agreement, benefit_description, duty_reduction,
+    benefit_percentage}}로 반환합니다.
+
+    agreement는 품목 중 하나 이상에 적용된 특혜 규칙(없으면 None), duty_reduction은 품목 평균 기본 관세
+    감소분(%p)입니다. 특혜 세율은 실효 관세율에 이미 반영되므로 수출 가격 공식의 benefit_percentage는 0입니다.
+    """
+    table = get_table(file_path)
+    decision = table.evaluate(hs_codes, countries, as_of, base_rates)
+    preference = table.measure_mode('preference')
+
+    # (국가,) 적용 특혜 규칙 번호 (없으면 -1)와 품목 평균 기본 관세 감소분 (품목이 없으면 0)
+    applied = np.where(decision.excluded[preference], -1, decision.winners[preference])
+    applied = applied.reshape(-1, len(decision.countries))
+    winners = applied.max(axis=0, initial=-1)
+    reductions = 0.0 - decision.contributions[preference].sum(axis=(0, 1)) / max(len(decision.hs_codes), 1)
+
+    agreements = {}
+    for country, winner, reduction in zip(decision.countries.tolist(), winners.tolist(), reductions.tolist()):
+        rule = table.rules[winner] if winner >= 0 else None
+        agreements[country] = {
+            'agreement': rule.id if rule else None,
+            'benefit_description': rule.description if rule else "무역 협정 혜택 없음",
+            'duty_reduction': reduction,
+            'benefit_percentage': 0.0
+        }
+    return agreements
@@ -0,0 +1,529 @@
+"""
+관세 데이터 컬럼 저장소
+
+이 모듈은 모든 관세 품목 데이터를 하나의 NumPy 컬럼 저장소(tariff_store.npz)에 보관합니다.
+- 국가 코드, HS 코드, 비고, 관세율 원문, 종량세 단위는 사전 인코딩(dictionary encoding)하여 정수 ID 열로 저장
+- 관세율 원문은 저장 시점에 한 번만 파싱하여 종가세/종량세 숫자 열로 저장
+- 품목 설명은 HS 코드 사전에 한 번만 저장 (국가별 중복 없음)
+- 관세 업데이트 모듈은 모두 이 모듈의 읽기/쓰기 API를 사용
+- 기존 국가별 JSON, 통합 JSON, tariff_summary.csv는 요청 시에만 파생 내보내기로 생성
+"""
+
+import os
+import json
+import hashlib
+import numpy as np
+from collections import namedtuple
+from datetime import datetime
+
+from src import country_registry, tariff_rates
+
+# 데이터 저장 경로
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'tariff_data')
+STORE_FILE = os.path.join(DATA_DIR, 'tariff_store.npz')
+
+# 관세 테이블 (사전 배열 + 행 단위 열 배열 + 메타데이터)
+# - countries, hs_codes, notes, rate_texts, units: 사전 배열 (정수 ID → 문자열)
+# - descriptions: hs_codes와 같은 순서의 품목 설명
+# - country_id, hs_id, note_id, rate_text_id, unit_id: 행별 사전 ID
+# - rate: 행별 종가세율 (%), specific_rate: 행별 종량세 (USD/단위, 없으면 0)
+# - base_rate, additional_rate: 행별 기본/추가 관세율 (%, 값이 없으면 NaN)
+# - effective_date, expiration_date: 행별 적용 기간 (datetime64[D], 기간이 없으면 NaT)
+# - metadata: 개정 정보와 국가별 정보({'countries': {국가 코드: {'country_name': ...}}})
+TariffTable = namedtuple('TariffTable', [
+    'countries', 'hs_codes', 'descriptions', 'notes', 'rate_texts', 'units',
+    'country_id', 'hs_id', 'note_id', 'rate_text_id', 'unit_id',
+    'rate', 'specific_rate', 'base_rate', 'additional_rate',
+    'effective_date', 'expiration_date',
+    'metadata'
+])
+
+# 저장 파일에 기록되는 배열 열 (메타데이터 제외)
+ARRAY_FIELDS = TariffTable._fields[:-1]
+
+# 관세 품목이 같아도 저장할 때마다 바뀌는 메타데이터 키 (내용 해시에서 제외)
+VOLATILE_METADATA_KEYS = ('collection_date', 'last_updated', 'tariff_rules_as_of')
+
+def ensure_data_dir():
+    """데이터 디렉토리가 존재하는지 확인하고, 없으면 생성합니다."""
+    os.makedirs(DATA_DIR, exist_ok=True)
+
+def _encode(values):
+    """문자열 목록을 (사전 배열, 정수 ID 배열)로 사전 인코딩합니다."""
+    dictionary, ids = np.unique(np.array(values, dtype=str), return_inverse=True)
+    return dictionary, ids.astype(np.int32)
+
+def _to_float(value):
+    """관세율 값을 float으로 변환합니다. 값이 없으면 NaN을 반환합니다."""
+    if value is None or value == '':
+        return np.nan
+    return float(value)
+
+def _to_dates(values):
+    """날짜 문자열 목록을 datetime64[D] 배열로 변환합니다. 빈 값은 NaT가 됩니다."""
+    return np.array([value if value else 'NaT' for value in values], dtype='datetime64[D]')
+
+def build_table(records, metadata=None):
+    """관세 품목 레코드 목록으로 관세 테이블을 생성합니다.
+
+    각 레코드는 country_code, hs_code, description 키와 함께 숫자 관세율(rate, 선택적으로
+    specific_rate, specific_unit) 또는 관세율 원문(rate_text) 중 하나를 가집니다.
+    rate가 없는 레코드는 rate_text를 파싱하며, 같은 원문은 한 번만 파싱합니다.
+    선택적으로 base_rate, additional_rate, effective_date, expiration_date, notes 키를 가집니다.
+    같은 HS 코드에 여러 설명이 있으면 마지막 레코드의 설명을 사용합니다.
+    """
+    records = list(records)
+
+    parsed_texts = {}
+    parsed_rates = []
+    for record in records:
+        if record.get('rate') is None:
+            rate_text = record['rate_text']
+            if rate_text not in parsed_texts:
+                parsed_texts[rate_text] = tariff_rates.parse_rate(rate_text)
+            parsed_rates.append(parsed_texts[rate_text])
+        else:
+            specific = float(record.get('specific_rate') or 0.0)
+            parsed_rates.append(tariff_rates.ParsedRate(
+                float(record['rate']), specific, record.get('specific_unit') or '',
+                tariff_rates.rate_kind(float(record['rate']), specific)))
+
+    countries, country_id = _encode([record['country_code'] for record in records])
+    hs_codes, hs_id = _encode([record['hs_code'] for record in records])
+    notes, note_id = _encode([record.get('notes') or '' for record in records])
+    units, unit_id = _encode([parsed.specific_unit for parsed in parsed_rates])
+    rate_texts, rate_text_id = _encode([
+        record.get('rate_text') or tariff_rates.format_rate(parsed.ad_valorem, parsed.specific, parsed.specific_unit)
+        for record, parsed in zip(records, parsed_rates)
+    ])
+
+    hs_descriptions = {record['hs_code']: record.get('description', '') for record in records}
+    descriptions = np.array([hs_descriptions[hs_code] for hs_code in hs_codes.tolist()], dtype=str)
+
+    return TariffTable(
+        countries=countries,
+        hs_codes=hs_codes,
+        descriptions=descriptions,
+        notes=notes,
+        rate_texts=rate_texts,
+        units=units,
+        country_id=country_id.astype(np.int16),
+        hs_id=hs_id,
+        note_id=note_id,
+        rate_text_id=rate_text_id,
+        unit_id=unit_id,
+        rate=np.array([parsed.ad_valorem for parsed in parsed_rates], dtype=float),
+        specific_rate=np.array([parsed.specific for parsed in parsed_rates], dtype=float),
+        base_rate=np.array([_to_float(record.get('base_rate')) for record in records], dtype=float),
+        additional_rate=np.array([_to_float(record.get('additional_rate')) for record in records], dtype=float),
+        effective_date=_to_dates([record.get('effective_date') for record in records]),
+        expiration_date=_to_dates([record.get('expiration_date') for record in records]),
+        metadata=metadata or {'countries': {}}
+    )
+
+def _merge_encoded(dictionaries, id_columns):
+    """여러 사전 인코딩 열을 하나의 정렬된 사전으로 합칩니다.
+
+    행에서 사용하는 항목만 남기므로 결과는 _encode로 다시 인코딩한 것과 같습니다.
+    (합친 사전, 열별 새 ID 배열 목록)을 반환합니다.
+    """
+    used = [dictionary[np.unique(ids)] for dictionary, ids in zip(dictionaries, id_columns)]
+    merged = np.unique(np.concatenate(used))
+    return merged, [
+        np.searchsorted(merged, dictionary)[ids].astype(ids.dtype) if len(dictionary) else ids
+        for dictionary, ids in zip(dictionaries, id_columns)
+    ]
+
+def merge_tables(table, incoming, keep, metadata):
+    """기존 테이블에서 keep 마스크의 행을 남기고 incoming 테이블의 행을 뒤에 추가한 테이블을 만듭니다.
+
+    행을 레코드로 디코딩하지 않고 사전과 ID 열을 직접 합치며, 같은 HS 코드의 품목 설명은 incoming을 사용합니다.
+    """
+    rows = np.flatnonzero(keep)
+    merged = {}
+    for dictionary_field, id_field in [('countries', 'country_id'), ('hs_codes', 'hs_id'), ('notes', 'note_id'),
+                                       ('rate_texts', 'rate_text_id'), ('units', 'unit_id')]:
+        merged[dictionary_field], (kept_ids, incoming_ids) = _merge_encoded(
+            [getattr(table, dictionary_field), getattr(incoming, dictionary_field)],
+            [getattr(table, id_field)[rows], getattr(incoming, id_field)])
+        merged[id_field] = np.concatenate([kept_ids, incoming_ids]).astype(getattr(table, id_field).dtype)
+
+    # 품목 설명 (HS 코드 사전 순서, 기존 설명을 먼저 채우고 incoming 설명으로 덮어씀)
+    hs_codes = merged['hs_codes']
+    descriptions = np.zeros(len(hs_codes), dtype=np.result_type(table.descriptions, incoming.descriptions))
+    for source in (table, incoming):
+        present = np.isin(source.hs_codes, hs_codes)
+        descriptions[np.searchsorted(hs_codes, source.hs_codes[present])] = source.descriptions[present]
+    merged['descriptions'] = descriptions
+
+    for field in ['rate', 'specific_rate', 'base_rate', 'additional_rate', 'effective_date', 'expiration_date']:
+        merged[field] = np.concatenate([getattr(table, field)[rows], getattr(incoming, field)])
+
+    return TariffTable(metadata=metadata, **merged)
+
+def table_records(table, mask=None):
+    """관세 테이블의 행을 레코드 목록으로 디코딩합니다. mask가 주어지면 해당 행만 반환합니다."""
+    rows = np.arange(len(table.rate)) if mask is None else np.flatnonzero(mask)
+    effective_dates = np.datetime_as_string(table.effective_date[rows])
+    expiration_dates = np.datetime_as_string(table.expiration_date[rows])
+
+    records = []
+    for position, row in enumerate(rows.tolist()):
+        hs = table.hs_id[row]
+        records.append({
+            'country_code': str(table.countries[table.country_id[row]]),
+            'hs_code': str(table.hs_codes[hs]),
+            'description': str(table.descriptions[hs]),
+            'rate': float(table.rate[row]),
+            'specific_rate': float(table.specific_rate[row]),
+            'specific_unit': str(table.units[table.unit_id[row]]),
+            'rate_text': str(table.rate_texts[table.rate_text_id[row]]),
+            'base_rate': None if np.isnan(table.base_rate[row]) else float(table.base_rate[row]),
+            'additional_rate': None if np.isnan(table.additional_rate[row]) else float(table.additional_rate[row]),
+            'effective_date': '' if effective_dates[position] == 'NaT' else str(effective_dates[position]),
+            'expiration_date': '' if expiration_dates[position] == 'NaT' else str(expiration_dates[position]),
+            'notes': str(table.notes[table.note_id[row]])
+        })
+    return records
+
+def country_names(table):
+    """메타데이터의 {국가 코드: 국가명} 딕셔너리를 반환합니다."""
+    return {
+        country_code: info.get('country_name', country_code)
+        for country_code, info in table.metadata.get('countries', {}).items()
+    }
+
+def content_digest(table):
+    """관세 테이블의 배열 열과 메타데이터(수집·갱신 시각 제외)로 내용 해시를 계산합니다."""
+    hasher = hashlib.sha256()
+    for field in ARRAY_FIELDS:
+        array = np.ascontiguousarray(getattr(table, field))
+        if array.dtype.kind == 'U':
+            # 문자열 열은 저장 폭과 무관하게 같은 값이면 같은 해시 (사전 병합 시 폭이 달라질 수 있음)
+            array = np.array(array.tolist(), dtype=str)
+        hasher.update(f"{field}:{array.dtype.str}:{array.shape}".encode('utf-8'))
+        hasher.update(array.tobytes())
+    metadata = {key: value for key, value in table.metadata.items() if key not in VOLATILE_METADATA_KEYS}
+    hasher.update(json.dumps(metadata, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+    return hasher.hexdigest()
+
+def file_digest(path=STORE_FILE):
+    """저장소 파일의 내용 해시를 반환합니다. (수집·갱신 시각만 다른 저장소는 같은 해시)"""
+    return content_digest(read_table(path))
+
+def write_table(table, path=STORE_FILE):
+    """관세 테이블을 저장소 파일에 원자적으로 저장합니다."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        np.savez(
+            f,
+            metadata=np.array(json.dumps(table.metadata, ensure_ascii=False)),
+            **{field: getattr(table, field) for field in ARRAY_FIELDS}
+        )
+    os.replace(temp_path, path)
+    return path
+
+def read_table(path=STORE_FILE):
+    """저장소 파일에서 관세 테이블을 로드합니다.
+
+    저장소가 아직 없으면 기존 JSON 파일에서 가져오고, 그것도 없으면 빈 테이블을 반환합니다.
+    """
+    if not os.path.exists(path):
+        legacy_table = import_legacy_files(os.path.dirname(path))
+        return legacy_table if legacy_table is not None else build_table([])
+
+    with np.load(path, allow_pickle=False) as data:
+        arrays = {field: data[field] for field in ARRAY_FIELDS if field in data.files}
+        metadata = json.loads(str(data['metadata']))
+
+    # 종량세 열이 없는 이전 형식의 저장소는 관세율 원문 사전을 파싱하여 채움
+    if 'specific_rate' not in arrays:
+        _, specific, specific_units = tariff_rates.parse_rates(arrays['rate_texts'].tolist())
+        arrays['units'], unit_of_text = _encode(specific_units)
+        arrays['unit_id'] = unit_of_text[arrays['rate_text_id']]
+        arrays['specific_rate'] = specific[arrays['rate_text_id']]
+
+    return TariffTable(metadata=metadata, **arrays)
+
+def upsert_lines(records, hs_codes=None, countries=None, metadata=None, path=STORE_FILE):
+    """관세 품목을 교체 저장합니다.
+
+    hs_codes(및 countries)에 해당하는 기존 행을 제거하고 records를 추가한 뒤 저장합니다.
+    새 레코드만 파싱하고 기존 행은 인코딩된 열 그대로 합칩니다.
+    hs_codes가 None이면 records에 포함된 HS 코드를 교체합니다.
+    metadata가 주어지면 최상위 키와 국가별 정보를 병합합니다.
+    교체 결과가 기존 저장소와 같으면(수집 시각 제외) 파일을 다시 쓰지 않고 기존 테이블을 반환하므로
+    last_updated는 실제로 품목이 바뀐 경우에만 갱신됩니다.
+    """
+    records = list(records)
+    table = read_table(path)
+
+    if hs_codes is None:
+        hs_codes = {record['hs_code'] for record in records}
+    replaced = np.isin(table.hs_codes[table.hs_id], list(hs_codes))
+    if countries is not None:
+        replaced &= np.isin(table.countries[table.country_id], list(countries))
+
+    merged_metadata = dict(table.metadata)
+    merged_metadata['countries'] = {
+        country_code: dict(info) for country_code, info in table.metadata.get('countries', {}).items()
+    }
+    for key, value in (metadata or {}).items():
+        if key == 'countries':
+            for country_code, info in value.items():
+                merged_metadata['countries'].setdefault(country_code, {}).update(info)
+        else:
+            merged_metadata[key] = value
+    merged_metadata['last_updated'] = datetime.now().isoformat()
+
+    updated = merge_tables(table, build_table(records), ~replaced, merged_metadata)
+    if os.path.exists(path) and content_digest(updated) == content_digest(table):
+        return table
+    write_table(updated, path)
+    return updated
+
+def select(table, country_code=None, hs_code=None):
+    """국가 코드 및 HS 코드로 행 마스크를 생성합니다."""
+    mask = np.ones(len(table.rate), dtype=bool)
+    if country_code is not None:
+        mask &= table.countries[table.country_id] == country_code
+    if hs_code is not None:
+        mask &= table.hs_codes[table.hs_id] == hs_code
+    return mask
+
+def latest_line_indices(table):
+    """(국가, HS 코드)별로 적용 시작일이 가장 늦은 행의 인덱스를 반환합니다.
+
+    적용 시작일이 없는 행은 가장 이른 것으로 취급하며, 시작일이 같으면 나중에 추가된 행을 사용합니다.
+    """
+    row_count = len(table.rate)
+    if row_count == 0:
+        return np.array([], dtype=np.int64)
+
+    group_key = table.country_id.astype(np.int64) * len(table.hs_codes) + table.hs_id
+    dates = table.effective_date.astype(np.int64)  # NaT는 int64 최솟값
+    order = np.lexsort((np.arange(row_count), dates, group_key))
+    sorted_key = group_key[order]
+    last_in_group = np.append(sorted_key[1:] != sorted_key[:-1], True)
+    return order[last_in_group]
+
+def latest_mask(table):
+    """(국가, HS 코드)별 최신 행만 True인 행 마스크를 반환합니다."""
+    mask = np.zeros(len(table.rate), dtype=bool)
+    mask[latest_line_indices(table)] = True
+    return mask
+
+def latest_records(table, country_code=None, hs_code=None):
+    """(국가, HS 코드)별 최신 행을 레코드 목록으로 반환합니다."""
+    return table_records(table, latest_mask(table) & select(table, country_code, hs_code))
+
+def latest_rates(table, hs_codes=None):
+    """HS 코드별 국가별 최신 관세율 {HS 코드: {국가 코드: 관세율}}을 반환합니다."""
+    mask = latest_mask(table)
+    if hs_codes is not None:
+        mask &= np.isin(table.hs_codes[table.hs_id], list(hs_codes))
+
+    rates = {}
+    for row in np.flatnonzero(mask).tolist():
+        hs_code = str(table.hs_codes[table.hs_id[row]])
+        rates.setdefault(hs_code, {})[str(table.countries[table.country_id[row]])] = float(table.rate[row])
+    return rates
+
+def mean_rate_by_country(table):
+    """국가별 최신 종가세율의 평균 {국가 코드: 평균 관세율}을 계산합니다.
+
+    종량세 부분은 단가 정보가 없어 종가세로 환산할 수 없으므로 평균에 포함하지 않습니다.
+    """
+    return dict(zip(table.countries.tolist(), country_rate_vector(table, table.countries).tolist()))
+
+def country_rate_vector(table, countries):
+    """국가 순서 배열로 국가별 최신 종가세율의 평균을 계산합니다. 데이터가 없는 국가는 0입니다."""
+    rows = latest_line_indices(table)
+    country_count = len(table.countries)
+    sums = np.bincount(table.country_id[rows], weights=table.rate[rows], minlength=country_count)
+    counts = np.bincount(table.country_id[rows], minlength=country_count)
+    means = np.divide(sums, counts, out=np.zeros(country_count), where=counts > 0)
+
+    # 저장소 국가 사전 ID → 대상 국가 위치
+    positions = country_registry.lookup(countries, table.countries)
+    known = positions >= 0
+    result = np.zeros(len(countries))
+    result[positions[known]] = means[known]
+    return result
+
+def latest_rate_matrix(table, countries):
+    """(HS 코드, 국가) 최신 종가세율 행렬을 계산합니다. 데이터가 없는 칸은 0입니다.
+
+    행 순서는 table.hs_codes(정렬된 HS 코드 사전)와 같습니다.
+    """
+    rows = latest_line_indices(table)
+    columns = country_registry.lookup(countries, table.countries)[table.country_id[rows]]
+    known = columns >= 0
+    matrix = np.zeros((len(table.hs_codes), len(countries)))
+    matrix[table.hs_id[rows][known], columns[known]] = table.rate[rows][known]
+    return matrix
+
+def _legacy_item(record):
+    """레코드를 기존 JSON 품목 형식으로 변환합니다."""
+    item = {
+        'hts_number': record['hs_code'],
+        'description': record['description'],
+        'general_rate': record['rate_text']
+    }
+    for key in ['base_rate', 'additional_rate', 'effective_date', 'expiration_date', 'notes']:
+        if record[key] not in (None, ''):
+            item[key] = record[key]
+    return item
+
+def export_country_json(table, country_code, output_dir=DATA_DIR):
+    """국가별 관세 데이터 JSON 파일({국가 코드}_tariff_data.json)을 내보냅니다."""
+    country_info = table.metadata.get('countries', {}).get(country_code, {})
+    data = {
+        'country_code': country_code,
+        'country_name': country_info.get('country_name', country_code)
+    }
+    data.update({key: value for key, value in country_info.items() if key != 'country_name'})
+    data['data'] = [_legacy_item(record) for record in table_records(table, select(table, country_code))]
+
+    file_path = os.path.join(output_dir, f"{country_code}_tariff_data.json")
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    return file_path
+
+def export_all_countries_json(table, output_dir=DATA_DIR):
+    """모든 국가의 관세 데이터를 통합한 JSON 파일(all_countries_tariff_data.json)을 내보냅니다."""
+    names = country_names(table)
+
+    # 레코드를 한 번 순회하며 국가별로 모음
+    countries = {
+        country_code: {'country_name': names.get(country_code, country_code), 'data': []}
+        for country_code in table.countries.tolist()
+    }
+    for record in table_records(table):
+        countries[record['country_code']]['data'].append(_legacy_item(record))
+
+    file_path = os.path.join(output_dir, "all_countries_tariff_data.json")
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'revision_id': table.metadata.get('revision_id'),
+            'revision_date': table.metadata.get('revision_date'),
+            'collection_date': table.metadata.get('collection_date'),
+            'last_updated': table.metadata.get('last_updated'),
+            'countries': countries
+        }, f, ensure_ascii=False, indent=2)
+    return file_path
+
+def export_summary_csv(table, output_dir=DATA_DIR):
+    """관세 데이터 요약 CSV 파일(tariff_summary.csv)을 내보냅니다."""
+    import pandas as pd  # CSV 내보내기에서만 사용 (대시보드 import 시 로드하지 않음)
+    names = country_names(table)
+    df = pd.DataFrame([
+        {
+            "Country_Code": record['country_code'],
+            "Country_Name": names.get(record['country_code'], record['country_code']),
+            "HS_Code": record['hs_code'],
+            "Product_Description": record['description'],
+            "Tariff_Rate": record['rate'],
+            "Specific_Rate": record['specific_rate'],
+            "Specific_Unit": record['specific_unit'],
+            "Base_Rate": record['base_rate'] if record['base_rate'] is not None else record['rate'],
+            "Additional_Rate": record['additional_rate'] if record['additional_rate'] is not None else 0.0,
+            "Effective_Date": record['effective_date'],
+            "Expiration_Date": record['expiration_date'],
+            "Notes": record['notes']
+        }
+        for record in table_records(table)
+    ], columns=["Country_Code", "Country_Name", "HS_Code", "Product_Description", "Tariff_Rate",
+                "Specific_Rate", "Specific_Unit", "Base_Rate", "Additional_Rate", "Effective_Date", "Expiration_Date", "Notes"])
+
+    file_path = os.path.join(output_dir, "tariff_summary.csv")
+    df.to_csv(file_path, index=False, encoding='utf-8')
+    return file_path
+
+def export_legacy_files(table=None, output_dir=DATA_DIR):
+    """국가별 JSON, 통합 JSON, 요약 CSV를 저장소에서 파생하여 내보냅니다."""
+    if table is None:
+        table = read_table()
+    os.makedirs(output_dir, exist_ok=True)
+
+    file_paths = [export_country_json(table, country_code, output_dir) for country_code in table.countries.tolist()]
+    file_paths.append(export_all_countries_json(table, output_dir))
+    file_paths.append(export_summary_csv(table, output_dir))
+
+    print(f"관세 데이터 내보내기 완료: {len(file_paths)}개 파일")
+    return file_paths
+
+def import_legacy_files(input_dir=DATA_DIR):
+    """기존 국가별 관세 데이터 JSON 파일에서 관세 테이블을 생성합니다. 파일이 없으면 None을 반환합니다.
+
+    관세율을 해석할 수 없는 품목은 제외하고, 제외한 품목 목록을 출력하고 메타데이터(skipped_legacy_lines)에 기록합니다.
+    """
+    all_countries_file = os.path.join(input_dir, "all_countries_tariff_data.json")
+    if not os.path.exists(all_countries_file):
+        return None
+
+    with open(all_countries_file, 'r', encoding='utf-8') as f:
+        all_data = json.load(f)
+
+    metadata = {key: all_data.get(key) for key in ['revision_id', 'revision_date', 'collection_date']}
+    metadata['countries'] = {}
+    records = []
+    skipped = []
+
+    for country_code, country_info in all_data.get('countries', {}).items():
+        country_file = os.path.join(input_dir, f"{country_code}_tariff_data.json")
+        if os.path.exists(country_file):
+            with open(country_file, 'r', encoding='utf-8') as f:
+                country_info = json.load(f)
+
+        metadata['countries'][country_code] = {
+            key: value for key, value in country_info.items()
+            if key not in ('country_code', 'data', 'tariff_data', 'collection_date', 'last_updated')
+        }
+
+        for item in country_info.get('data', []):
+            rate_text = item.get('general_rate', '0%')
+            try:
+                tariff_rates.parse_rate(rate_text)
+            except ValueError:
+                skipped.append({'country_code': country_code, 'hs_code': item.get('hts_number', ''), 'rate_text': rate_text})
+                continue
+            records.append({
+                'country_code': country_code,
+                'hs_code': item.get('hts_number', ''),
+                'description': item.get('description', ''),
+                'rate_text': rate_text,
+                'base_rate': item.get('base_rate'),
+                'additional_rate': item.get('additional_rate'),
+                'effective_date': item.get('effective_date'),
+                'expiration_date': item.get('expiration_date'),
+                'notes': item.get('notes')
+            })
+
+        for item in country_info.get('tariff_data', []):
+            records.append({
+                'country_code': country_code,
+                'hs_code': item.get('hs_code', ''),
+                'description': item.get('product_description', ''),
+                'rate': item.get('tariff_rate', 0.0),
+                'base_rate': item.get('base_rate'),
+                'additional_rate': item.get('additional_rate'),
+                'effective_date': item.get('effective_date'),
+                'expiration_date': item.get('expiration_date'),
+                'notes': item.get('notes')
+            })
+
+    # 관세율을 해석할 수 없는 품목은 저장소에 넣지 않고 목록을 메타데이터에 남김 (조용히 유실되지 않도록)
+    if skipped:
+        metadata['skipped_legacy_lines'] = skipped
+        print(f"관세율을 해석할 수 없는 기존 품목 {len(skipped)}개 제외: "
+              + ", ".join(f"{line['country_code']} {line['hs_code']} ({line['rate_text']})" for line in skipped[:5])
+              + (" ..." if len(skipped) > 5 else ""))
+
+    return build_table(records, metadata)
+
+if __name__ == "__main__":
+    print("관세 데이터 저장소에서 기존 형식 파일 내보내기 시작...")
+    export_legacy_files()
+    print("관세 데이터 저장소에서 기존 형식 파일 내보내기 완료")
@@ -0,0 +1,164 @@
+"""
+관세 적용 기간 색인
+
+이 모듈은 관세 저장소의 행을 (국가, HS 코드)별 적용 기간으로 색인하여 날짜 기준 조회를 제공합니다.
+- 특정 날짜에 적용되는 관세율 조회 (O(log n))
+- 기간과 겹치는 관세 항목 조회 (O(log n + k))
+- 특정 날짜에 적용되는 모든 품목의 관세율 일괄 조회 (벡터화)
+
+적용 기간은 [적용 시작일, 만료일) 반열린 구간이며, 날짜가 없는 쪽은 무한히 열린 것으로 취급합니다.
+한 날짜에 여러 기간이 겹치면 적용 시작일이 가장 늦은 행(같으면 나중에 추가된 행)이 적용됩니다.
+각 (국가, HS 코드)의 기간들은 색인 생성 시 겹치지 않는 구간으로 펼쳐 두므로 조회는 이진 탐색 한 번입니다.
+"""
+
+import numpy as np
+from datetime import date, datetime
+
+# 날짜를 (그룹, 날짜) 결합 키로 만들 때 사용하는 범위 (1970-01-01 기준 일수)
+DAY_OFFSET = 2 ** 31
+MIN_DAY = -DAY_OFFSET
+MAX_DAY = DAY_OFFSET - 1
+GROUP_SHIFT = 33
+
+def to_day(value):
+    """날짜 값(문자열, date, datetime64)을 1970-01-01 기준 일수로 변환합니다."""
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, date):
+        value = value.isoformat()
+    return int(np.datetime64(value, 'D').astype(np.int64))
+
+def to_days(values):
+    """날짜 값 목록을 1970-01-01 기준 일수 배열로 변환합니다."""
+    return np.asarray(values, dtype='datetime64[D]').astype(np.int64)
+
+def _interval_days(dates, missing_day):
+    """datetime64[D] 배열을 일수 배열로 변환합니다. NaT는 missing_day가 됩니다."""
+    days = dates.astype(np.int64)
+    return np.where(np.isnat(dates), missing_day, np.clip(days, MIN_DAY, MAX_DAY))
+
+class TariffTimeline:
+    """(국가, HS 코드)별 관세 적용 기간 색인"""
+
+    def __init__(self, table):
+        self.table = table
+        self.hs_count = len(table.hs_codes)
+
+        starts = _interval_days(table.effective_date, MIN_DAY)
+        ends = _interval_days(table.expiration_date, MAX_DAY)
+        groups = table.country_id.astype(np.int64) * self.hs_count + table.hs_id
+        order = np.lexsort((np.arange(len(groups)), starts, groups))
+
+        segment_groups, segment_starts, segment_ends, segment_rows = [], [], [], []
+
+        # 그룹별로 기간을 겹치지 않는 구간으로 펼치고 각 구간의 적용 행 결정
+        group_bounds = np.flatnonzero(np.diff(groups[order])) + 1
+        for rows in np.split(order, group_bounds) if len(order) else []:
+            breakpoints = np.unique(np.concatenate([starts[rows], ends[rows]]))
+            for segment_start, segment_end in zip(breakpoints[:-1].tolist(), breakpoints[1:].tolist()):
+                covering = rows[(starts[rows] <= segment_start) & (ends[rows] > segment_start)]
+                segment_groups.append(groups[rows[0]])
+                segment_starts.append(segment_start)
+                segment_ends.append(segment_end)
+                # rows는 (시작일, 추가 순서)로 정렬되어 있으므로 마지막 행이 적용 행
+                segment_rows.append(covering[-1] if len(covering) else -1)
+
+        self.segment_groups = np.array(segment_groups, dtype=np.int64)
+        self.segment_starts = np.array(segment_starts, dtype=np.int64)
+        self.segment_ends = np.array(segment_ends, dtype=np.int64)
+        self.segment_rows = np.array(segment_rows, dtype=np.int64)
+        self.segment_keys = self._keys(self.segment_groups, self.segment_starts)
+
+    @staticmethod
+    def _keys(groups, days):
+        """(그룹, 날짜)를 정렬 가능한 하나의 정수 키로 결합합니다."""
+        return (groups << GROUP_SHIFT) | (np.asarray(days, dtype=np.int64) + DAY_OFFSET)
+
+    def _ids(self, dictionary, values):
+        """사전 배열에서 값의 ID 배열을 찾습니다. 없는 값은 -1입니다."""
+        values = np.asarray(values, dtype=str)
+        positions = np.minimum(np.searchsorted(dictionary, values), max(len(dictionary) - 1, 0))
+        found = (dictionary[positions] == values) if len(dictionary) else np.zeros(len(values), dtype=bool)
+        return np.where(found, positions, -1)
+
+    def _segments_at(self, groups, days):
+        """그룹·날짜 배열 각각을 포함하는 구간 위치 배열을 반환합니다. 없으면 -1입니다."""
+        groups = np.asarray(groups, dtype=np.int64)
+        days = np.asarray(days, dtype=np.int64)
+        if len(self.segment_keys) == 0:
+            return np.full(len(groups), -1, dtype=np.int64)
+
+        positions = np.searchsorted(self.segment_keys, self._keys(groups, days), side='right') - 1
+        clipped = np.maximum(positions, 0)
+        valid = (
+            (positions >= 0) & (groups >= 0)
+            & (self.segment_groups[clipped] == groups)
+            & (self.segment_ends[clipped] > days)
+        )
+        return np.where(valid, clipped, -1)
+
+    def rows_at(self, country_codes, hs_codes, dates):
+        """(국가 코드, HS 코드, 날짜) 배열 각각에 적용되는 행 인덱스 배열을 반환합니다. 없으면 -1입니다."""
+        country_ids = self._ids(self.table.countries, country_codes)
+        hs_ids = self._ids(self.table.hs_codes, hs_codes)
+        groups = np.where((country_ids >= 0) & (hs_ids >= 0), country_ids * self.hs_count + hs_ids, -1)
+        days = to_days(dates)
+
+        segments = self._segments_at(groups, days)
+        return np.where(segments >= 0, self.segment_rows[np.maximum(segments, 0)], -1)
+
+    def row_at(self, country_code, hs_code, on_date):
+        """특정 날짜에 적용되는 행 인덱스를 반환합니다. 없으면 None입니다."""
+        row = self.rows_at([country_code], [hs_code], [on_date])[0]
+        return None if row < 0 else int(row)
+
+    def rate_at(self, country_code, hs_code, on_date):
+        """특정 날짜에 적용되는 관세율을 반환합니다. 없으면 None입니다."""
+        row = self.row_at(country_code, hs_code, on_date)
+        return None if row is None else float(self.table.rate[row])
+
+    def rows_between(self, country_code, hs_code, start_date, end_date):
+        """[start_date, end_date) 기간과 겹치는 행 인덱스를 적용 순서대로 반환합니다."""
+        country_id = self._ids(self.table.countries, [country_code])[0]
+        hs_id = self._ids(self.table.hs_codes, [hs_code])[0]
+        if country_id < 0 or hs_id < 0:
+            return []
+
+        group = country_id * self.hs_count + hs_id
+        start_day, end_day = to_day(start_date), to_day(end_date)
+        first = max(np.searchsorted(self.segment_keys, self._keys(group, start_day), side='right') - 1, 0)
+        last = np.searchsorted(self.segment_keys, self._keys(group, end_day), side='left')
+
+        rows = []
+        for segment in range(first, last):
+            if (self.segment_groups[segment] == group and self.segment_rows[segment] >= 0
+                    and self.segment_ends[segment] > start_day):
+                row = int(self.segment_rows[segment])
+                if row not in rows:
+                    rows.append(row)
+        return rows
+
+    def rows_on(self, on_date):
+        """특정 날짜에 적용되는 모든 (국가, HS 코드)의 행 인덱스 배열을 반환합니다."""
+        groups = np.unique(self.segment_groups)
+        segments = self._segments_at(groups, np.full(len(groups), to_day(on_date)))
+        rows = self.segment_rows[segments[segments >= 0]]
+        return rows[rows >= 0]
+
+    def rates_on(self, on_date, hs_codes=None):
+        """특정 날짜에 적용되는 관세율 {HS 코드: {국가 코드: 관세율}}을 반환합니다."""
+        rows = self.rows_on(on_date)
+        row_hs_codes = self.table.hs_codes[self.table.hs_id[rows]]
+        row_countries = self.table.countries[self.table.country_id[rows]]
+        row_rates = self.table.rate[rows]
+
+        rates = {}
+        for hs_code, country_code, rate in zip(row_hs_codes.tolist(), row_countries.tolist(), row_rates.tolist()):
+            if hs_codes is None or hs_code in hs_codes:
+                rates.setdefault(hs_code, {})[country_code] = rate
+        return rates
+
+    def latest_effective_date(self):
+        """관세 저장소에서 가장 늦은 적용 시작일(YYYY-MM-DD)을 반환합니다. 없으면 None입니다."""
+        dates = self.table.effective_date[~np.isnat(self.table.effective_date)]
+        return str(dates.max()) if len(dates) else None
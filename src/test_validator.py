@@ -11,11 +11,17 @@ import json
 import time
 import unittest
 import requests
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from datetime import datetime
 import importlib
 import logging
+import tempfile
+import subprocess
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 # 로깅 설정
 logging.basicConfig(
@@ -102,6 +108,265 @@ class TariffDataCollectorTest(unittest.TestCase):
         
         logger.info("관세 정책 업데이트 정보 생성 기능 테스트 완료")
 
+class TariffStoreTest(unittest.TestCase):
+    """관세 데이터 컬럼 저장소 테스트"""
+    
+    def setUp(self):
+        """테스트 설정"""
+        self.store = importlib.import_module('src.tariff_store')
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store_file = os.path.join(self.temp_dir.name, 'tariff_store.npz')
+        self.records = [
+            {'country_code': country_code, 'hs_code': '8708.10.00', 'description': '범퍼 및 그 부분품', 'rate': rate}
+            for country_code, rate in [('KR', 25.0), ('CN', 53.1), ('MX', 0.0)]
+        ]
+        self.store.write_table(self.store.build_table(self.records, {'countries': {'KR': {'country_name': '대한민국'}}}), self.store_file)
+    
+    def tearDown(self):
+        """테스트 정리"""
+        self.temp_dir.cleanup()
+    
+    def test_round_trip(self):
+        """저장 후 로드한 테이블이 같은 레코드를 반환하는지 테스트"""
+        logger.info("관세 저장소 저장/로드 테스트 시작")
+        
+        table = self.store.read_table(self.store_file)
+        self.assertEqual(len(table.hs_codes), 1, "HS 코드가 사전 인코딩되지 않음")
+        self.assertEqual(len(table.descriptions), 1, "품목 설명이 중복 저장됨")
+        
+        records = self.store.table_records(table)
+        self.assertEqual(
+            sorted((record['country_code'], record['rate'], record['rate_text']) for record in records),
+            [('CN', 53.1, '53.1%'), ('KR', 25.0, '25.0%'), ('MX', 0.0, '0.0%')],
+            "저장된 관세 품목이 다름"
+        )
+        self.assertEqual(self.store.country_names(table)['KR'], '대한민국', "국가 정보가 저장되지 않음")
+        
+        logger.info("관세 저장소 저장/로드 테스트 완료")
+    
+    def test_upsert_and_latest_rates(self):
+        """HS 코드 교체와 최신 관세율 조회 테스트"""
+        logger.info("관세 저장소 교체/조회 테스트 시작")
+        
+        timeline = [
+            {'country_code': 'CN', 'hs_code': '8501.31', 'description': 'DC 모터', 'rate': rate, 'effective_date': date}
+            for rate, date in [(22.5, '2025-03-04'), (12.5, '2025-02-04')]
+        ]
+        self.store.upsert_lines(timeline, path=self.store_file)
+        table = self.store.upsert_lines(
+            [{'country_code': 'KR', 'hs_code': '8708.10.00', 'description': '범퍼 및 그 부분품', 'rate': 0.0}],
+            hs_codes=['8708.10.00'], countries=['KR'], path=self.store_file)
+        
+        rates = self.store.latest_rates(table)
+        self.assertEqual(rates['8501.31'], {'CN': 22.5}, "가장 최근 적용 시작일의 관세율이 아님")
+        self.assertEqual(rates['8708.10.00'], {'CN': 53.1, 'KR': 0.0, 'MX': 0.0}, "지정한 국가의 항목만 교체되지 않음")
+        self.assertAlmostEqual(self.store.mean_rate_by_country(table)['CN'], (53.1 + 22.5) / 2, msg="국가별 평균 관세율이 다름")
+        
+        logger.info("관세 저장소 교체/조회 테스트 완료")
+    
+    def test_unchanged_upsert(self):
+        """품목이 바뀌지 않은 교체 저장은 파일과 내용 해시를 바꾸지 않는지 테스트"""
+        logger.info("관세 저장소 무변경 교체 테스트 시작")
+        
+        table = self.store.upsert_lines(self.records, metadata={'collection_date': '2025-01-01T00:00:00'}, path=self.store_file)
+        with open(self.store_file, 'rb') as f:
+            content = f.read()
+        digest = self.store.file_digest(self.store_file)
+        
+        unchanged = self.store.upsert_lines(self.records, metadata={'collection_date': '2025-01-02T00:00:00'}, path=self.store_file)
+        with open(self.store_file, 'rb') as f:
+            self.assertEqual(f.read(), content, "품목이 같은데 저장소 파일을 다시 씀")
+        self.assertEqual(unchanged.metadata.get('last_updated'), table.metadata.get('last_updated'), "품목이 같은데 갱신 시각이 바뀜")
+        self.assertEqual(self.store.file_digest(self.store_file), digest, "내용 해시가 바뀜")
+        
+        changed = [dict(self.records[0], rate=30.0)] + self.records[1:]
+        self.store.upsert_lines(changed, path=self.store_file)
+        self.assertNotEqual(self.store.file_digest(self.store_file), digest, "관세율이 바뀌었는데 내용 해시가 같음")
+        
+        logger.info("관세 저장소 무변경 교체 테스트 완료")
+    
+    def test_merge_tables(self):
+        """인코딩된 열 병합이 레코드 재구성과 같은 테이블을 만드는지 테스트"""
+        logger.info("관세 저장소 열 병합 테스트 시작")
+        
+        table = self.store.build_table(self.records + [
+            {'country_code': 'JP', 'hs_code': '8501.31', 'description': 'DC 모터', 'rate_text': '4.4¢/kg + 3%', 'notes': '비고'},
+            {'country_code': 'CN', 'hs_code': '8501.31', 'description': 'DC 모터', 'rate': 25.0, 'effective_date': '2025-03-04'}
+        ])
+        incoming = [
+            {'country_code': 'VN', 'hs_code': '8501.31', 'description': '직류 전동기', 'rate': 0.0},
+            {'country_code': 'CN', 'hs_code': '4011.10', 'description': '타이어', 'rate_text': 'Free'}
+        ]
+        keep = ~((table.hs_codes[table.hs_id] == '8501.31') & (table.countries[table.country_id] == 'CN'))
+        merged = self.store.merge_tables(table, self.store.build_table(incoming), keep, table.metadata)
+        expected = self.store.build_table(self.store.table_records(table, keep) + incoming, table.metadata)
+        
+        self.assertEqual(self.store.table_records(merged), self.store.table_records(expected), "병합한 관세 품목이 다름")
+        self.assertEqual(self.store.content_digest(merged), self.store.content_digest(expected), "병합한 테이블의 내용 해시가 다름")
+        self.assertEqual(merged.countries.tolist(), ['CN', 'JP', 'KR', 'MX', 'VN'], "국가 사전이 정렬·병합되지 않음")
+        
+        logger.info("관세 저장소 열 병합 테스트 완료")
+    
+    def test_legacy_import_skipped_lines(self):
+        """해석할 수 없는 기존 관세율 품목이 메타데이터에 기록되는지 테스트"""
+        logger.info("기존 형식 가져오기 제외 품목 테스트 시작")
+        
+        with open(os.path.join(self.temp_dir.name, 'all_countries_tariff_data.json'), 'w', encoding='utf-8') as f:
+            json.dump({'countries': {'CN': {'country_name': '중국', 'data': [
+                {'hts_number': '8708.10.00', 'description': '범퍼', 'general_rate': '2.5%'},
+                {'hts_number': '8708.99.00', 'description': '기타', 'general_rate': 'The rate applicable to the article'}
+            ]}}}, f, ensure_ascii=False)
+        
+        table = self.store.import_legacy_files(self.temp_dir.name)
+        self.assertEqual(len(table.rate), 1, "해석할 수 있는 품목만 가져오지 않음")
+        self.assertEqual(table.metadata['skipped_legacy_lines'], [
+            {'country_code': 'CN', 'hs_code': '8708.99.00', 'rate_text': 'The rate applicable to the article'}
+        ], "제외한 품목이 기록되지 않음")
+        
+        logger.info("기존 형식 가져오기 제외 품목 테스트 완료")
+    
+    def test_legacy_export(self):
+        """기존 형식 파일 내보내기 테스트"""
+        logger.info("관세 저장소 내보내기 테스트 시작")
+        
+        file_paths = self.store.export_legacy_files(self.store.read_table(self.store_file), self.temp_dir.name)
+        self.assertEqual(len(file_paths), 5, "내보낸 파일 수가 다름")
+        
+        with open(os.path.join(self.temp_dir.name, 'all_countries_tariff_data.json'), 'r', encoding='utf-8') as f:
+            all_data = json.load(f)
+        self.assertEqual(all_data['countries']['CN']['data'][0]['general_rate'], '53.1%', "통합 JSON 형식이 다름")
+        
+        summary_df = pd.read_csv(os.path.join(self.temp_dir.name, 'tariff_summary.csv'))
+        self.assertEqual(len(summary_df), 3, "요약 CSV 행 수가 다름")
+        
+        logger.info("관세 저장소 내보내기 테스트 완료")
+
+class TariffRatesTest(unittest.TestCase):
+    """HTS 관세율 표현식 파서 테스트"""
+    
+    def setUp(self):
+        """테스트 설정"""
+        self.rates = importlib.import_module('src.tariff_rates')
+        self.store = importlib.import_module('src.tariff_store')
+    
+    def test_parse_rate(self):
+        """관세율 표현식 유형별 파싱 테스트"""
+        logger.info("관세율 파싱 테스트 시작")
+        
+        ParsedRate = self.rates.ParsedRate
+        self.assertEqual(self.rates.parse_rate("Free"), ParsedRate(0.0, 0.0, '', 'free'), "무관세 파싱 오류")
+        self.assertEqual(self.rates.parse_rate("2.5%"), ParsedRate(2.5, 0.0, '', 'ad_valorem'), "종가세 파싱 오류")
+        self.assertEqual(self.rates.parse_rate("4.4¢/kg"), ParsedRate(0.0, 0.044, 'kg', 'specific'), "종량세 파싱 오류")
+        self.assertEqual(self.rates.parse_rate("4.4¢/kg + 3%"), ParsedRate(3.0, 0.044, 'kg', 'compound'), "복합세 파싱 오류")
+        
+        with self.assertRaises(ValueError):
+            self.rates.parse_rate("The rate applicable to the article")
+        
+        logger.info("관세율 파싱 테스트 완료")
+    
+    def test_store_parses_once(self):
+        """저장소가 관세율 원문을 숫자 열로 저장하는지 테스트"""
+        logger.info("관세율 저장 테스트 시작")
+        
+        table = self.store.build_table([
+            {'country_code': 'KR', 'hs_code': '0201.10', 'description': '쇠고기', 'rate_text': "4.4¢/kg + 3%"},
+            {'country_code': 'JP', 'hs_code': '0201.10', 'description': '쇠고기', 'rate_text': "Free"},
+            {'country_code': 'CN', 'hs_code': '0201.10', 'description': '쇠고기', 'rate': 28.0}
+        ])
+        
+        np.testing.assert_array_equal(table.rate, [3.0, 0.0, 28.0])
+        np.testing.assert_array_equal(table.specific_rate, [0.044, 0.0, 0.0])
+        self.assertEqual(table.units[table.unit_id[0]], 'kg', "종량세 단위가 저장되지 않음")
+        self.assertEqual(self.store.table_records(table)[2]['rate_text'], "28.0%", "숫자 관세율 원문이 생성되지 않음")
+        
+        logger.info("관세율 저장 테스트 완료")
+
+class HSPrefixIndexTest(unittest.TestCase):
+    """HS 코드 접두사 색인 테스트"""
+    
+    def setUp(self):
+        """테스트 설정"""
+        self.hs_index = importlib.import_module('src.hs_index')
+        self.lines = ['8708.10.00', '8708.99.00', '8501.31.40', '8501.32.20', '4011.10.00']
+    
+    def test_lines_under_prefix(self):
+        """접두사 아래 품목 조회 테스트"""
+        logger.info("HS 코드 접두사 조회 테스트 시작")
+        
+        index = self.hs_index.HSPrefixIndex(self.lines)
+        self.assertEqual(index.lines_under('8708').tolist(), ['8708.10.00', '8708.99.00'], "호 단위 조회 오류")
+        self.assertEqual(index.lines_under('85').tolist(), ['8501.31.40', '8501.32.20'], "류 단위 조회 오류")
+        self.assertEqual(index.lines_under('8501.31').tolist(), ['8501.31.40'], "소호 단위 조회 오류")
+        self.assertEqual(len(index.lines_under('9999')), 0, "없는 접두사에 품목이 반환됨")
+        self.assertEqual(index.count_under_many(['87', '8708', '85']).tolist(), [2, 2, 2], "일괄 개수 조회 오류")
+        self.assertEqual(len(index.lines_under_any(['87', '8708'])), 2, "겹치는 접두사의 품목이 중복됨")
+        
+        logger.info("HS 코드 접두사 조회 테스트 완료")
+    
+    def test_most_specific_rule(self):
+        """가장 구체적인 규칙 코드 조회 테스트"""
+        logger.info("HS 코드 규칙 조회 테스트 시작")
+        
+        rules = self.hs_index.HSPrefixIndex(['87', '8708', '8708.10', '8501.31'])
+        self.assertEqual(rules.most_specific('8708.10.00'), '8708.10', "가장 구체적인 규칙이 아님")
+        self.assertEqual(rules.most_specific('8708.99.00'), '8708', "상위 규칙으로 대체되지 않음")
+        self.assertIsNone(rules.most_specific('4011.10.00'), "포함하는 규칙이 없는데 결과가 반환됨")
+        
+        # 일괄 조회 결과가 단건 조회 결과와 동일한지 확인
+        bulk = rules.most_specific_many(self.lines)
+        single = [rules.most_specific(line) or '' for line in self.lines]
+        self.assertEqual(bulk.tolist(), single, "일괄 조회 결과가 단건 조회와 다름")
+        
+        logger.info("HS 코드 규칙 조회 테스트 완료")
+
+class TariffTimelineTest(unittest.TestCase):
+    """관세 적용 기간 색인 테스트"""
+    
+    def setUp(self):
+        """테스트 설정"""
+        store = importlib.import_module('src.tariff_store')
+        timeline = importlib.import_module('src.tariff_timeline')
+        
+        records = [
+            # 기간이 없는 기본 관세율
+            {'country_code': 'CN', 'hs_code': '8501.31', 'description': 'DC 모터', 'rate': 2.5},
+            {'country_code': 'JP', 'hs_code': '8501.31', 'description': 'DC 모터', 'rate': 2.8}
+        ]
+        for effective_date, expiration_date, rate in [('2025-02-04', '2025-03-04', 12.5),
+                                                      ('2025-03-04', '2025-04-02', 22.5),
+                                                      ('2025-04-02', '2025-12-31', 56.5)]:
+            records.append({'country_code': 'CN', 'hs_code': '8501.31', 'description': 'DC 모터', 'rate': rate,
+                            'effective_date': effective_date, 'expiration_date': expiration_date})
+        
+        self.table = store.build_table(records)
+        self.timeline = timeline.TariffTimeline(self.table)
+    
+    def test_rate_at(self):
+        """특정 날짜 관세율 조회 테스트"""
+        logger.info("관세 적용 기간 조회 테스트 시작")
+        
+        self.assertEqual(self.timeline.rate_at('CN', '8501.31', '2025-01-15'), 2.5, "기간 이전에 기본 관세율이 적용되지 않음")
+        self.assertEqual(self.timeline.rate_at('CN', '8501.31', '2025-03-04'), 22.5, "만료일과 적용 시작일이 같은 날의 관세율 오류")
+        self.assertEqual(self.timeline.rate_at('CN', '8501.31', '2025-06-01'), 56.5, "최신 단계 관세율 오류")
+        self.assertEqual(self.timeline.rate_at('CN', '8501.31', '2026-01-01'), 2.5, "만료 후 기본 관세율로 돌아가지 않음")
+        self.assertIsNone(self.timeline.rate_at('VN', '8501.31', '2025-06-01'), "없는 국가에 관세율이 반환됨")
+        
+        rows = self.timeline.rows_between('CN', '8501.31', '2025-03-01', '2025-04-03')
+        self.assertEqual([self.table.rate[row] for row in rows], [12.5, 22.5, 56.5], "기간 조회 결과 오류")
+        
+        logger.info("관세 적용 기간 조회 테스트 완료")
+    
+    def test_rates_on(self):
+        """특정 날짜 전체 품목 관세율 일괄 조회 테스트"""
+        logger.info("관세 적용 기간 일괄 조회 테스트 시작")
+        
+        self.assertEqual(self.timeline.rates_on('2025-03-10'), {'8501.31': {'CN': 22.5, 'JP': 2.8}}, "일괄 조회 결과 오류")
+        
+        bulk = self.timeline.rows_at(['CN'] * 3, ['8501.31'] * 3, ['2025-02-10', '2025-03-10', '2025-05-10'])
+        self.assertEqual(self.table.rate[bulk].tolist(), [12.5, 22.5, 56.5], "벡터화 조회 결과 오류")
+        
+        logger.info("관세 적용 기간 일괄 조회 테스트 완료")
+
 class ManufacturingCostSimulatorTest(unittest.TestCase):
     """제조 비용 시뮬레이션 모듈 테스트"""
     
@@ -194,6 +459,83 @@ class ManufacturingCostSimulatorTest(unittest.TestCase):
             self.assertAlmostEqual(cost_index['KR'], 100.0, delta=0.1, msg="한국의 비용 지수가 100이 아님")
         
         logger.info("제품별 제조 비용 시뮬레이션 기능 테스트 완료")
+    
+    def test_product_categories_config(self):
+        """설정 파일의 모든 제품 카테고리가 한 번에 계산되는지 테스트"""
+        logger.info("제품 카테고리 설정 테스트 시작")
+        
+        product_categories = self.cost_simulator.load_product_categories()
+        self.assertEqual(list(product_categories), ["EPS 모터", "알루미늄"], "제품 카테고리 목록 오류")
+        
+        factor_values = self.cost_simulator.load_cost_factor_data()
+        result = self.cost_simulator.simulate_product_categories(product_categories, factor_values, visualize=False)
+        base_index = self.cost_simulator.calculate_manufacturing_cost_index(factor_values, visualize=False)
+        
+        countries = list(TARGET_COUNTRIES)
+        cost_index_engine = importlib.import_module('src.cost_index_engine')
+        for category, weights in product_categories.items():
+            _, expected = cost_index_engine.calculate_cost_indices(factor_values, [weights], countries)
+            self.assertEqual(result[category], cost_index_engine.to_country_dict(expected[0], countries),
+                             f"'{category}' 제조 비용 지수가 개별 계산과 다름")
+            self.assertTrue(os.path.exists(os.path.join(COST_DATA_DIR, f"manufacturing_cost_index_{category.replace(' ', '_')}.json")),
+                            f"'{category}' 제조 비용 지수 파일이 존재하지 않음")
+        self.assertNotEqual(result["알루미늄"], base_index, "알루미늄 제조 비용 지수가 종합 지수와 같음")
+        
+        # 가중치가 누락된 카테고리는 오류
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, "product_categories.json")
+            with open(file_path, 'w', encoding='utf-8') as f:
+                json.dump({'categories': [{'name': '구리', 'weights': {'labor_cost': 1.0}}]}, f)
+            with self.assertRaises(ValueError):
+                self.cost_simulator.read_product_categories(file_path)
+        
+        logger.info("제품 카테고리 설정 테스트 완료")
+
+class CostIndexEngineTest(unittest.TestCase):
+    """제조 비용 지수 계산 엔진 테스트"""
+    
+    def setUp(self):
+        """테스트 설정"""
+        self.engine = importlib.import_module('src.cost_index_engine')
+        self.countries = ['KR', 'JP', 'VN']
+        self.factor_values = {
+            factor: {'KR': 10.0 + i, 'JP': 12.5 + i * 0.7, 'VN': 3.3 + i * 0.1}
+            for i, factor in enumerate(self.engine.COST_FACTORS)
+        }
+        self.weights = dict(zip(self.engine.COST_FACTORS, [0.10, 0.05, 0.35, 0.10, 0.15, 0.15, 0.10]))
+    
+    def test_matches_dict_calculation(self):
+        """행렬 계산 결과가 딕셔너리 기반 계산과 동일한지 테스트"""
+        logger.info("비용 지수 엔진 정확성 테스트 시작")
+        
+        _, cost_indices = self.engine.calculate_cost_indices(self.factor_values, [self.weights], self.countries)
+        result = self.engine.to_country_dict(cost_indices[0], self.countries)
+        
+        for country in self.countries:
+            expected = 0.0
+            for j, factor in enumerate(self.engine.COST_FACTORS):
+                values = self.factor_values[factor]
+                term = values[country] / values['KR'] * 100 * self.weights[factor]
+                expected = term if j == 0 else expected + term
+            self.assertEqual(result[country], expected, f"국가 '{country}'의 비용 지수가 다름")
+        
+        self.assertAlmostEqual(result['KR'], 100.0, delta=1e-9, msg="한국의 비용 지수가 100이 아님")
+        
+        logger.info("비용 지수 엔진 정확성 테스트 완료")
+    
+    def test_batch_weights(self):
+        """여러 가중치 집합을 한 번에 계산하는 기능 테스트"""
+        logger.info("비용 지수 엔진 일괄 계산 테스트 시작")
+        
+        weights_list = [self.weights, dict(self.weights, labor_cost=0.5, utility_cost=0.0)]
+        normalized_matrix, cost_indices = self.engine.calculate_cost_indices(self.factor_values, weights_list, self.countries)
+        
+        self.assertEqual(cost_indices.shape, (2, len(self.countries)), "결과 행렬 크기가 올바르지 않음")
+        for k, weights in enumerate(weights_list):
+            single = self.engine.compute_cost_index(normalized_matrix, self.engine.build_weight_matrix([weights])[0])
+            self.assertTrue((single == cost_indices[k]).all(), "일괄 계산 결과가 개별 계산과 다름")
+        
+        logger.info("비용 지수 엔진 일괄 계산 테스트 완료")
 
 class ExportPriceCalculatorTest(unittest.TestCase):
     """수출 가격 계산기 모듈 테스트"""
@@ -282,6 +624,1141 @@ class ExportPriceCalculatorTest(unittest.TestCase):
         
         logger.info("한국어 형식 출력 기능 테스트 완료")
 
+class ExportPriceEngineTest(unittest.TestCase):
+    """수출 가격 계산 엔진 테스트"""
+    
+    def setUp(self):
+        """테스트 설정"""
+        self.engine = importlib.import_module('src.export_price_engine')
+        self.countries = ['KR', 'JP', 'CN']
+        self.cost = {'KR': 100.0, 'JP': 110.0, 'CN': 80.0}
+        self.freight = {'KR': 1500.0, 'JP': 1600.0, 'CN': 1400.0}
+        self.benefit = {'KR': 100.0, 'JP': 0.0, 'CN': -54.0}
+    
+    def test_formulas(self):
+        """등록된 수식이 국가별 계산식과 같은 결과를 내는지 테스트"""
+        logger.info("수출 가격 수식 테스트 시작")
+        
+        tariff = {'KR': 0.0, 'JP': 2.8, 'CN': 27.5}
+        arrays = dict(
+            cost=self.engine.country_vector(self.cost, self.countries),
+            freight=self.engine.country_vector(self.freight, self.countries),
+            tariff=self.engine.country_vector(tariff, self.countries),
+            benefit=self.engine.country_vector(self.benefit, self.countries)
+        )
+        
+        # 70/10/20 가중치 (한국 = 100 정규화, 한국의 관세 영향은 관세율과 무관)
+        expected = {}
+        for country in self.countries:
+            tariff_impact = 1.0 if country == 'KR' else 1 + tariff[country] / 100
+            expected[country] = (self.cost[country] * 0.7 + self.freight[country] / self.freight['KR'] * 100 * 0.1
+                                 + 100 * tariff_impact * 0.2 * (1 - self.benefit[country] / 100))
+        result = self.engine.evaluate('weighted_70_10_20', self.countries, **arrays).by_country()
+        for country in self.countries:
+            self.assertAlmostEqual(result[country], expected[country] / expected['KR'] * 100, places=9,
+                                   msg=f"{country}의 70/10/20 수출 가격 지수 오류")
+        
+        # 80/10/10 가중치
+        result = self.engine.evaluate('weighted_80_10_10', self.countries, **arrays).by_country()
+        freight = self.freight['CN'] / self.freight['KR'] * 20
+        expected_cn = (80.0 * 0.8 + freight * 0.1 + (80.0 + freight) * 27.5 * (1 + 0.54) / 100 * 0.1)
+        self.assertAlmostEqual(result['CN'], expected_cn, places=9, msg="80/10/10 수출 가격 지수 오류")
+        
+        # 사용자 정의 수식 등록
+        self.engine.register_formula('cost_only', "제조 비용만 사용", lambda inputs: inputs.cost)
+        result = self.engine.evaluate('cost_only', self.countries, **arrays).by_country()
+        self.assertEqual(result, self.cost, "등록한 수식이 적용되지 않음")
+        del self.engine.FORMULAS['cost_only']
+        
+        with self.assertRaises(KeyError):
+            self.engine.evaluate('unknown', self.countries, **arrays)
+        
+        logger.info("수출 가격 수식 테스트 완료")
+    
+    def test_tensor_broadcast(self):
+        """(국가 × HS 코드 × 카테고리 × 날짜) 텐서 계산이 단일 셀 계산과 같은지 테스트"""
+        logger.info("수출 가격 텐서 계산 테스트 시작")
+        
+        rng = np.random.default_rng(0)
+        hs_codes = [f"{code:04d}.{code % 100:02d}" for code in range(2000)]
+        categories = [None, 'EPS 모터', '팬']
+        dates = ['2025-01-01', '2025-03-01', '2025-04-10', '2025-06-01']
+        cost = rng.uniform(60, 120, size=(len(categories), len(self.countries)))
+        tariff = rng.uniform(0, 60, size=(len(dates), len(hs_codes), len(self.countries)))
+        freight = self.engine.country_vector(self.freight, self.countries)
+        benefit = self.engine.country_vector({'KR': 50.0, 'CN': -54.0}, self.countries)
+        
+        start_time = time.time()
+        prices = self.engine.evaluate('landed', self.countries, cost, freight, tariff, benefit,
+                                      hs_codes=hs_codes, categories=categories, dates=dates)
+        elapsed = time.time() - start_time
+        
+        self.assertEqual(prices.values.shape, (3, len(hs_codes), len(categories), len(dates)), "결과 텐서 모양 오류")
+        
+        single = self.engine.evaluate('landed', self.countries, cost[1], freight, tariff[2, 1234], benefit)
+        np.testing.assert_allclose(prices.values[:, 1234, 1, 2], single.values[:, 0, 0, 0],
+                                   err_msg="텐서 계산과 단일 셀 계산 결과가 다름")
+        self.assertTrue(np.allclose(prices.values[0], 100.0), "기준 국가가 100으로 정규화되지 않음")
+        self.assertLess(elapsed, 1.0, "텐서 계산 시간이 너무 김")
+        
+        logger.info(f"수출 가격 텐서 계산 테스트 완료 ({prices.values.size}개 셀, {elapsed:.4f}초)")
+    
+    def test_timeline_tariffs(self):
+        """관세 적용 기간 색인에서 날짜별 관세율 배열을 조회하는지 테스트"""
+        logger.info("날짜별 관세율 배열 조회 테스트 시작")
+        
+        store = importlib.import_module('src.tariff_store')
+        timeline = importlib.import_module('src.tariff_timeline')
+        table = store.build_table([
+            {'country_code': 'CN', 'hs_code': '8501.31', 'rate': 2.5},
+            {'country_code': 'CN', 'hs_code': '8501.31', 'rate': 56.5,
+             'effective_date': '2025-04-02', 'expiration_date': '2025-12-31'},
+            {'country_code': 'JP', 'hs_code': '8414.59', 'rate': 2.3}
+        ])
+        
+        tariffs = self.engine.timeline_tariffs(timeline.TariffTimeline(table), self.countries,
+                                               ['8501.31', '8414.59'], ['2025-03-01', '2025-05-01'])
+        
+        self.assertEqual(tariffs.shape, (2, 2, 3), "관세율 배열 모양 오류")
+        self.assertEqual(tariffs[:, 0, 2].tolist(), [2.5, 56.5], "날짜별 관세율 오류")
+        self.assertEqual(tariffs[:, 1, 1].tolist(), [2.3, 2.3], "기간이 없는 관세율 오류")
+        self.assertEqual(tariffs[:, :, 0].tolist(), [[0.0, 0.0], [0.0, 0.0]], "데이터가 없는 관세율이 0이 아님")
+        
+        logger.info("날짜별 관세율 배열 조회 테스트 완료")
+
+class ScenarioEngineTest(unittest.TestCase):
+    """가정 시나리오 일괄 계산 엔진 테스트"""
+    
+    def setUp(self):
+        """테스트 설정"""
+        self.scenario_engine = importlib.import_module('src.scenario_engine')
+        self.simulator = importlib.import_module('src.manufacturing_cost_simulator')
+        self.cost_index_engine = importlib.import_module('src.cost_index_engine')
+        self.baseline = self.scenario_engine.load_baseline()
+    
+    def test_baseline_scenario(self):
+        """재정의가 없는 시나리오가 기존 계산과 같은지 테스트"""
+        logger.info("기준 시나리오 테스트 시작")
+        
+        result = self.scenario_engine.run_scenarios([{}, {'category': 'EPS 모터'}], self.baseline)
+        countries = list(self.simulator.TARGET_COUNTRIES)
+        _, expected = self.cost_index_engine.calculate_cost_indices(
+            self.simulator.load_cost_factor_data(),
+            [self.simulator.COST_FACTOR_WEIGHTS, self.simulator.load_product_categories()['EPS 모터']], countries)
+        
+        np.testing.assert_array_equal(result.cost_index, expected, err_msg="시나리오 제조 비용 지수가 기존 계산과 다름")
+        self.assertEqual(result.export_index.shape, (2, 1, len(countries)), "수출 가격 지수 모양 오류")
+        
+        logger.info("기준 시나리오 테스트 완료")
+    
+    def test_overrides(self):
+        """가중치, 관세율, 화물 비용 재정의 테스트"""
+        logger.info("시나리오 재정의 테스트 시작")
+        
+        hs_code = str(self.baseline.hs_codes[0])
+        cn = self.baseline.countries.index('CN')
+        result = self.scenario_engine.run_scenarios([
+            {'name': '기준'},
+            {'name': '중국 관세', 'tariff_overrides': {'CN': {hs_code: 90.0}}},
+            {'name': '중국 화물', 'freight_overrides': {'CN': 20000}},
+            {'name': '노동 비용', 'weights': {'labor_cost': 0.0}}
+        ], self.baseline, hs_codes=[hs_code])
+        
+        base, tariff, freight, labor = result.export_index[:, 0, cn]
+        self.assertGreater(tariff, base, "관세율 인상이 수출 가격 지수에 반영되지 않음")
+        self.assertGreater(freight, base, "화물 비용 인상이 수출 가격 지수에 반영되지 않음")
+        self.assertNotEqual(labor, base, "가중치 재정의가 반영되지 않음")
+        np.testing.assert_array_equal(result.cost_index[1], result.cost_index[0], err_msg="관세 재정의가 제조 비용을 바꿈")
+        
+        with self.assertRaises(ValueError):
+            self.scenario_engine.run_scenarios([{'tariff_overrides': {'XX': 10.0}}], self.baseline)
+        with self.assertRaises(ValueError):
+            self.scenario_engine.run_scenarios([{'category': '없는 카테고리'}], self.baseline)
+        
+        logger.info("시나리오 재정의 테스트 완료")
+    
+    def test_batch_throughput_without_writes(self):
+        """대량 시나리오를 파일 쓰기 없이 빠르게 계산하는지 테스트"""
+        logger.info("시나리오 일괄 계산 성능 테스트 시작")
+        
+        def data_files_state():
+            state = {}
+            for root, _, files in os.walk(DATA_DIR):
+                for name in files:
+                    path = os.path.join(root, name)
+                    state[path] = os.stat(path).st_mtime_ns
+            return state
+        
+        scenarios = [
+            {'name': f"시나리오 {i}", 'weights': {'labor_cost': 0.2 + i % 10 * 0.03},
+             'tariff_overrides': {'CN': i % 100}, 'freight_overrides': {'VN': 5000 + i}}
+            for i in range(5000)
+        ]
+        before = data_files_state()
+        
+        start_time = time.time()
+        result = self.scenario_engine.run_scenarios(scenarios, self.baseline)
+        elapsed = time.time() - start_time
+        
+        self.assertEqual(result.cost_index.shape, (5000, len(self.baseline.countries)), "결과 모양 오류")
+        self.assertLess(elapsed, 1.0, "시나리오 일괄 계산 시간이 너무 김")
+        self.assertEqual(data_files_state(), before, "시나리오 계산 중 데이터 파일이 변경됨")
+        
+        logger.info(f"시나리오 일괄 계산 성능 테스트 완료 (5000개, {elapsed:.4f}초)")
+    
+    def test_api(self):
+        """가정 시나리오 API 테스트"""
+        logger.info("가정 시나리오 API 테스트 시작")
+        
+        dashboard_app = importlib.import_module('src.dashboard_app')
+        client = dashboard_app.app.test_client()
+        
+        response = client.post('/api/scenarios', json={
+            'scenarios': [{'name': '기준'}, {'name': '중국 관세 120%', 'tariff_overrides': {'CN': 120.0}}]
+        })
+        self.assertEqual(response.status_code, 200, "시나리오 API 응답 오류")
+        data = response.get_json()
+        self.assertEqual([scenario['name'] for scenario in data['scenarios']], ['기준', '중국 관세 120%'], "시나리오 이름 오류")
+        self.assertGreater(data['scenarios'][1]['export_price_index']['CN'],
+                           data['scenarios'][0]['export_price_index']['CN'], "관세 재정의가 응답에 반영되지 않음")
+        
+        response = client.post('/api/scenarios', json={'scenarios': [{'weights': {'unknown': 1.0}}]})
+        self.assertEqual(response.status_code, 400, "잘못된 시나리오에 400 응답을 반환하지 않음")
+        
+        # 재정의 항목의 형식이 잘못된 요청도 JSON 400 응답
+        for payload in [
+            {'scenarios': [{'weights': 5}]},
+            {'scenarios': [{'tariff_overrides': ['CN', 60]}]},
+            {'scenarios': [{'freight_overrides': 'CN'}]},
+            {'scenarios': [{'tariff_overrides': {'CN': 'high'}}]},
+            {'scenarios': [{'category': ['EPS 모터']}]},
+            {'scenarios': [{}], 'hs_codes': '8708.10.00'}
+        ]:
+            response = client.post('/api/scenarios', json=payload)
+            self.assertEqual(response.status_code, 400, f"잘못된 형식의 시나리오에 400 응답을 반환하지 않음: {payload}")
+            self.assertIn('error', response.get_json(), f"오류 응답이 JSON이 아님: {payload}")
+        
+        logger.info("가정 시나리오 API 테스트 완료")
+
+class MonteCarloTest(unittest.TestCase):
+    """환율·인플레이션 몬테카를로 엔진 테스트"""
+    
+    def setUp(self):
+        """테스트 설정"""
+        self.monte_carlo = importlib.import_module('src.monte_carlo')
+        self.model = self.monte_carlo.load_model()
+        self.bin_width = self.model.edges[1] - self.model.edges[0]
+    
+    def test_percentile_bands(self):
+        """백분위 구간이 순서대로이고 기준값을 포함하는지 테스트"""
+        logger.info("몬테카를로 백분위 구간 테스트 시작")
+        
+        bands = self.monte_carlo.run_monte_carlo(self.model, draws=20000, chunk_size=5000, seed=7)
+        
+        self.assertEqual(bands['draws'], 20000, "표본 수 오류")
+        self.assertEqual(bands['clipped'], 0, "히스토그램 구간 밖 표본이 존재함")
+        for metric in self.monte_carlo.METRICS:
+            for country, band in bands[metric].items():
+                values = [band[f"p{percentile}"] for percentile in self.monte_carlo.DEFAULT_PERCENTILES]
+                self.assertEqual(values, sorted(values), f"{country}의 {metric} 백분위 순서 오류")
+                self.assertGreaterEqual(band['baseline'], band['p5'] - self.bin_width, f"{country}의 기준값이 구간 밖에 있음")
+                self.assertLessEqual(band['baseline'], band['p95'] + self.bin_width, f"{country}의 기준값이 구간 밖에 있음")
+        
+        logger.info("몬테카를로 백분위 구간 테스트 완료")
+    
+    def test_reproducible_chunks(self):
+        """시드가 같으면 직렬 실행과 프로세스 풀 실행 결과가 같은지 테스트"""
+        logger.info("몬테카를로 재현성 테스트 시작")
+        
+        serial = self.monte_carlo.run_monte_carlo(self.model, draws=6000, chunk_size=1500, seed=11)
+        again = self.monte_carlo.run_monte_carlo(self.model, draws=6000, chunk_size=1500, seed=11)
+        pooled = self.monte_carlo.run_monte_carlo(self.model, draws=6000, chunk_size=1500, seed=11, workers=2)
+        other = self.monte_carlo.run_monte_carlo(self.model, draws=6000, chunk_size=1500, seed=12)
+        
+        self.assertEqual(serial, again, "같은 시드의 결과가 다름")
+        self.assertEqual(serial, pooled, "프로세스 풀 실행 결과가 직렬 실행과 다름")
+        self.assertNotEqual(serial, other, "다른 시드의 결과가 같음")
+        
+        logger.info("몬테카를로 재현성 테스트 완료")
+    
+    def test_invalid_sample_size(self):
+        """표본 수나 청크 크기가 1보다 작으면 ValueError를 발생시키는지 테스트"""
+        logger.info("몬테카를로 표본 수 검증 테스트 시작")
+        
+        for draws, chunk_size in [(0, 1500), (-10, 1500), (6000, 0), (6000, -1), (6000, 1.5)]:
+            with self.assertRaises(ValueError, msg=f"draws={draws}, chunk_size={chunk_size}"):
+                self.monte_carlo.run_monte_carlo(self.model, draws=draws, chunk_size=chunk_size)
+        
+        result = self.monte_carlo.run_monte_carlo(self.model, draws=1, chunk_size=1)
+        self.assertEqual(result['draws'], 1, "표본 1개 실행 결과의 표본 수가 다름")
+        
+        logger.info("몬테카를로 표본 수 검증 테스트 완료")
+    
+    def test_histogram_percentiles(self):
+        """히스토그램 백분위 추정이 정확한 백분위와 구간 폭 이내로 같은지 테스트"""
+        logger.info("히스토그램 백분위 추정 테스트 시작")
+        
+        values = np.random.default_rng(3).uniform(20, 180, size=(50000, 2))
+        left = self.monte_carlo.summarize(self.model, values[:20000])
+        right = self.monte_carlo.summarize(self.model, values[20000:])
+        histogram = left[0] + right[0]
+        
+        for column in range(2):
+            estimated = self.monte_carlo.histogram_percentiles(histogram[column], self.model.edges, [5, 50, 95])
+            exact = np.percentile(values[:, column], [5, 50, 95])
+            np.testing.assert_allclose(estimated, exact, atol=self.bin_width, err_msg="백분위 추정 오차가 구간 폭보다 큼")
+        
+        logger.info("히스토그램 백분위 추정 테스트 완료")
+
+class SensitivityTest(unittest.TestCase):
+    """민감도(토네이도) 분석 테스트"""
+    
+    def setUp(self):
+        """테스트 설정"""
+        self.sensitivity = importlib.import_module('src.sensitivity')
+        self.cost_index_engine = importlib.import_module('src.cost_index_engine')
+        self.export_price_engine = importlib.import_module('src.export_price_engine')
+        self.inputs = self.sensitivity.load_inputs()
+        self.result = self.sensitivity.analyze(self.inputs)
+        self.base = self.inputs.countries.index(self.cost_index_engine.BASE_COUNTRY)
+    
+    def _indices(self, inputs):
+        """엔진으로 (카테고리, 국가) 제조 비용 지수와 수출 가격 지수를 다시 계산합니다."""
+        normalized = self.cost_index_engine.normalize_factor_matrix(inputs.factor_matrix, self.base)
+        cost = self.cost_index_engine.compute_cost_index(normalized, inputs.weights)
+        export = self.export_price_engine.evaluate(
+            'weighted_80_10_10', inputs.countries, cost, inputs.freight, inputs.tariff, inputs.benefit,
+            categories=inputs.categories).values[:, 0, :, 0].T
+        return cost, export
+    
+    def test_jacobian_matches_finite_differences(self):
+        """해석적 야코비안이 유한 차분과 같은지 테스트"""
+        logger.info("민감도 야코비안 테스트 시작")
+        
+        cost, export = self._indices(self.inputs)
+        np.testing.assert_allclose(self.result.cost_index, cost, err_msg="제조 비용 지수 오류")
+        np.testing.assert_allclose(self.result.export_index, export, err_msg="수출 가격 지수 오류")
+        
+        country = self.inputs.countries.index('CN')
+        for f in range(len(self.cost_index_engine.COST_FACTORS)):
+            for row, name in ((country, 'factor'), (self.base, 'base_factor')):
+                factor_matrix = self.inputs.factor_matrix.copy()
+                step = factor_matrix[row, f] * 1e-6
+                factor_matrix[row, f] += step
+                cost_step, export_step = self._indices(self.inputs._replace(factor_matrix=factor_matrix))
+                np.testing.assert_allclose((cost_step - cost)[:, country] / step,
+                                           self.result.cost_jacobian[name][:, country, f], rtol=1e-4, atol=1e-6,
+                                           err_msg=f"제조 비용 지수 {name} 미분 오류")
+                np.testing.assert_allclose((export_step - export)[:, country] / step,
+                                           self.result.export_jacobian[name][:, country, f], rtol=1e-4, atol=1e-6,
+                                           err_msg=f"수출 가격 지수 {name} 미분 오류")
+        
+        for name in ('freight', 'tariff', 'benefit'):
+            values = getattr(self.inputs, name).copy()
+            values[country] += 1e-4
+            _, export_step = self._indices(self.inputs._replace(**{name: values}))
+            np.testing.assert_allclose((export_step - export)[:, country] / 1e-4,
+                                       self.result.export_jacobian[name][:, country], rtol=1e-4, atol=1e-6,
+                                       err_msg=f"수출 가격 지수 {name} 미분 오류")
+        
+        # 기준 국가의 지수는 입력과 무관함
+        self.assertTrue(np.all(self.result.cost_jacobian['factor'][:, self.base] == 0), "기준 국가 미분 오류")
+        
+        logger.info("민감도 야코비안 테스트 완료")
+    
+    def test_tornado(self):
+        """토네이도 데이터가 변화량 순서이고 필터가 적용되는지 테스트"""
+        logger.info("토네이도 데이터 테스트 시작")
+        
+        data = self.sensitivity.result_to_dict(self.result, shock=0.2, top=5, countries=['CN', 'VN'])
+        self.assertEqual(data['categories'], ['default', 'EPS 모터', '알루미늄'], "카테고리 목록 오류")
+        for metric in self.sensitivity.METRICS:
+            for category, countries in data['tornado'][metric].items():
+                self.assertEqual(sorted(countries), ['CN', 'VN'], "국가 필터 오류")
+                for country, entries in countries.items():
+                    swings = [entry['swing'] for entry in entries]
+                    self.assertEqual(len(entries), 5, "토네이도 항목 수 오류")
+                    self.assertEqual(swings, sorted(swings, reverse=True), f"{category} {country} 항목 순서 오류")
+                    base_value = data[metric][category][country]
+                    for entry in entries:
+                        self.assertAlmostEqual((entry['low'] + entry['high']) / 2, base_value, places=9,
+                                               msg="토네이도 구간이 기준값 중심이 아님")
+        
+        with self.assertRaises(ValueError):
+            self.sensitivity.result_to_dict(self.result, categories=['없는 카테고리'])
+        
+        logger.info("토네이도 데이터 테스트 완료")
+    
+    def test_api(self):
+        """민감도 분석 API 테스트"""
+        logger.info("민감도 분석 API 테스트 시작")
+        
+        dashboard_app = importlib.import_module('src.dashboard_app')
+        client = dashboard_app.app.test_client()
+        
+        response = client.get('/api/sensitivity', query_string={'category': 'EPS 모터', 'country': 'CN', 'top': 3})
+        self.assertEqual(response.status_code, 200, "민감도 분석 API 응답 오류")
+        data = response.get_json()
+        self.assertEqual(list(data['tornado']['export_price_index']['EPS 모터']), ['CN'], "필터가 응답에 반영되지 않음")
+        self.assertEqual(len(data['tornado']['export_price_index']['EPS 모터']['CN']), 3, "항목 수 오류")
+        
+        response = client.get('/api/sensitivity', query_string={'shock': 2})
+        self.assertEqual(response.status_code, 400, "잘못된 변화 비율에 400 응답을 반환하지 않음")
+        
+        logger.info("민감도 분석 API 테스트 완료")
+
+class CountryRegistryTest(unittest.TestCase):
+    """국가 레지스트리 테스트"""
+    
+    def setUp(self):
+        """테스트 설정"""
+        self.country_registry = importlib.import_module('src.country_registry')
+        self.registry = self.country_registry.get_registry()
+    
+    def test_registry_lookup(self):
+        """국가 코드와 정수 국가 ID 변환 테스트"""
+        logger.info("국가 레지스트리 조회 테스트 시작")
+        
+        self.assertEqual(self.registry.names_by_code(), TARGET_COUNTRIES, "국가 레지스트리가 대상 국가 목록과 다름")
+        self.assertEqual(self.registry.base_id, self.registry.id_of('KR'), "기준 국가 ID 오류")
+        self.assertEqual(self.registry.ids_of(['MX', 'XX', 'KR']).tolist(), [8, -1, 0], "국가 ID 일괄 조회 오류")
+        self.assertEqual(self.registry.vector({'CN': 3.0, 'XX': 1.0})[self.registry.id_of('CN')], 3.0, "국가 벡터 변환 오류")
+        self.assertEqual(self.country_registry.lookup(['b', 'a', 'c'], ['c', 'a', 'z']).tolist(), [2, 1, -1],
+                         "국가 위치 조회 오류")
+        with self.assertRaises(KeyError):
+            self.registry.id_of('XX')
+        
+        logger.info("국가 레지스트리 조회 테스트 완료")
+    
+    def test_country_parameters(self):
+        """국가 목록 파일의 국가별 파라미터 조회 테스트"""
+        logger.info("국가 파라미터 테스트 시작")
+        
+        freight = self.registry.parameter('freight_cost')
+        self.assertEqual(freight.shape, (len(self.registry),), "국가 파라미터 배열 모양 오류")
+        self.assertEqual(list(self.country_registry.country_parameter('freight_cost')), self.registry.codes.tolist(),
+                         "국가 파라미터가 레지스트리 순서가 아님")
+        
+        # 파라미터가 없는 국가는 default를 사용하고, default가 없으면 KeyError
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, 'countries.json')
+            with open(file_path, 'w', encoding='utf-8') as f:
+                json.dump({'countries': [
+                    {'code': 'KR', 'name': '대한민국', 'parameters': {'freight_cost': 4500}},
+                    {'code': 'ZZ', 'name': '신규 국가'}
+                ]}, f, ensure_ascii=False)
+            registry = self.country_registry.read_registry(file_path)
+        self.assertEqual(registry.parameter('freight_cost', default=0.0).tolist(), [4500.0, 0.0], "파라미터 기본값 적용 오류")
+        with self.assertRaises(KeyError):
+            registry.parameter('freight_cost')
+        with self.assertRaises(KeyError):
+            registry.parameter('labor_cost')
+        
+        logger.info("국가 파라미터 테스트 완료")
+    
+    def test_many_countries(self):
+        """수백 개 원산지 국가에서 비용·관세·수출 엔진이 배열 연산으로 동작하는지 테스트"""
+        logger.info("다수 국가 엔진 테스트 시작")
+        
+        cost_index_engine = importlib.import_module('src.cost_index_engine')
+        export_price_engine = importlib.import_module('src.export_price_engine')
+        tariff_store = importlib.import_module('src.tariff_store')
+        
+        rng = np.random.default_rng(5)
+        codes = ['KR'] + [f"C{i:03d}" for i in range(499)]
+        registry = self.country_registry.CountryRegistry(codes, codes)
+        factor_values = {
+            factor: dict(zip(codes, rng.uniform(1, 50, len(codes)).tolist())) for factor in cost_index_engine.COST_FACTORS
+        }
+        weights = dict(zip(cost_index_engine.COST_FACTORS, [0.10, 0.05, 0.35, 0.10, 0.15, 0.15, 0.10]))
+        
+        normalized_matrix, cost_indices = cost_index_engine.calculate_cost_indices(factor_values, [weights], codes)
+        self.assertEqual(cost_indices.shape, (1, len(codes)), "비용 지수 모양 오류")
+        self.assertAlmostEqual(cost_indices[0, registry.base_id], 100.0, msg="기준 국가의 비용 지수가 100이 아님")
+        country = registry.id_of('C123')
+        expected = sum(factor_values[factor]['C123'] / factor_values[factor]['KR'] * 100 * weights[factor]
+                       for factor in cost_index_engine.COST_FACTORS)
+        self.assertAlmostEqual(cost_indices[0, country], expected, places=9, msg="비용 지수 계산 오류")
+        
+        # 저장소 국가 사전 순서와 레지스트리 순서가 달라도 국가 ID로 정렬됨
+        table = tariff_store.build_table([
+            {'country_code': code, 'hs_code': hs_code, 'description': '', 'rate': float(i % 7) + h}
+            for i, code in enumerate(codes[::-1]) for h, hs_code in enumerate(['8501.31', '8708.99'])
+        ])
+        mean_rates = tariff_store.country_rate_vector(table, registry.codes)
+        rate_matrix = tariff_store.latest_rate_matrix(table, registry.codes)
+        self.assertEqual(mean_rates[country], (len(codes) - 1 - country) % 7 + 0.5, "국가별 평균 관세율 오류")
+        self.assertEqual(rate_matrix[:, country].tolist(), [(len(codes) - 1 - country) % 7, (len(codes) - 1 - country) % 7 + 1.0],
+                         "HS 코드별 관세율 오류")
+        
+        prices = export_price_engine.evaluate('weighted_80_10_10', codes, cost_indices[0],
+                                              registry.vector({code: 1000.0 for code in codes}), mean_rates)
+        self.assertEqual(prices.values.shape, (len(codes), 1, 1, 1), "수출 가격 지수 모양 오류")
+        
+        logger.info("다수 국가 엔진 테스트 완료")
+
+class HSExportPipelineTest(unittest.TestCase):
+    """HS 코드별 수출 가격 지수 파이프라인 테스트"""
+    
+    def setUp(self):
+        """테스트 설정"""
+        self.pipeline = importlib.import_module('src.hs_export_pipeline')
+        self.export_price_engine = importlib.import_module('src.export_price_engine')
+        self.tariff_store = importlib.import_module('src.tariff_store')
+        self.countries = list(TARGET_COUNTRIES)
+        self.temp_dir = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        """테스트 정리"""
+        self.temp_dir.cleanup()
+    
+    def test_batch_export_indices(self):
+        """제품 목록 전체의 수출 가격 지수가 카테고리별 개별 계산과 같은지 테스트"""
+        logger.info("HS 코드 일괄 수출 가격 지수 테스트 시작")
+        
+        products = self.pipeline.load_products()
+        self.assertIn('8501.31', products.hs_codes.tolist(), "제품 목록에 8501.31이 없음")
+        
+        products = self.pipeline.build_products(
+            ['8501.31', '8414.59', '8708.99'], categories=['EPS 모터', None, '알루미늄'])
+        with self.assertRaises(ValueError):
+            self.pipeline.build_products(['8501.31', '8501.31'])
+        
+        # 관세 저장소의 최신 관세율에 HS 코드별 관세율을 덮어씀
+        table = self.tariff_store.build_table([
+            {'country_code': 'CN', 'hs_code': '8708.99', 'description': '', 'rate': 25.0},
+            {'country_code': 'CN', 'hs_code': '8414.59', 'description': '', 'rate': 7.5}
+        ])
+        tariff = self.pipeline.tariff_matrix(products.hs_codes, self.countries, table,
+                                             overrides={'8414.59': {'CN': 27.3, 'JP': 2.3}})
+        cn, jp = self.countries.index('CN'), self.countries.index('JP')
+        self.assertEqual(tariff[:, cn].tolist(), [0.0, 27.3, 25.0], "관세율 행렬 오류")
+        self.assertEqual(tariff[:, jp].tolist(), [0.0, 2.3, 0.0], "관세율 덮어쓰기 오류")
+        
+        # 알루미늄 제조 비용 지수가 없으면 일반 지수 사용
+        rng = np.random.default_rng(11)
+        cost_indices = {
+            None: dict(zip(self.countries, rng.uniform(80, 120, len(self.countries)).tolist())),
+            'EPS 모터': dict(zip(self.countries, rng.uniform(80, 120, len(self.countries)).tolist()))
+        }
+        freight = dict(zip(self.countries, rng.uniform(3, 8, len(self.countries)).tolist()))
+        result = self.pipeline.compute_export_indices(products, self.countries, cost_indices, freight, tariff)
+        
+        self.assertEqual(result.values.shape, (3, len(self.countries)), "수출 가격 지수 행렬 모양 오류")
+        for row, category in enumerate(['EPS 모터', None, None]):
+            expected = self.export_price_engine.evaluate(
+                'landed', self.countries,
+                cost=self.export_price_engine.country_vector(cost_indices[category], self.countries),
+                freight=self.export_price_engine.country_vector(freight, self.countries),
+                tariff=tariff[row])
+            np.testing.assert_allclose(result.values[row], expected.values[:, 0, 0, 0], rtol=1e-12,
+                                       err_msg="개별 계산과 일괄 계산 결과가 다름")
+        self.assertAlmostEqual(result.by_country('8414.59')['KR'], 100.0, msg="기준 국가 지수가 100이 아님")
+        
+        # 통합 파일 저장 및 로드
+        path = self.pipeline.write_export_indices(result, self.temp_dir.name)
+        loaded = self.pipeline.read_export_indices(path)
+        np.testing.assert_array_equal(loaded.values, result.values, err_msg="통합 파일 로드 결과 오류")
+        self.assertEqual(loaded.products.categories.tolist(), ['EPS 모터', '', '알루미늄'], "제품 정보 로드 오류")
+        self.assertEqual(loaded.formula, 'landed', "수식 이름 로드 오류")
+        self.assertEqual(set(self.pipeline.export_index_summary(loaded)), {'8501.31', '8414.59', '8708.99'},
+                         "대시보드 요약 오류")
+        self.assertIsNone(self.pipeline.read_export_indices(os.path.join(self.temp_dir.name, 'missing.npz')),
+                          "없는 통합 파일에 결과가 반환됨")
+        
+        logger.info("HS 코드 일괄 수출 가격 지수 테스트 완료")
+    
+    def test_thousands_of_hs_codes(self):
+        """5,000개 HS 코드의 수출 가격 지수 계산·저장 테스트"""
+        logger.info("대량 HS 코드 수출 가격 지수 테스트 시작")
+        
+        result = self.pipeline.benchmark(hs_count=5000, repeat=1)
+        logger.info(f"HS 코드 5,000개 계산 {result['compute'] * 1000:.1f} ms, 저장 {result['write'] * 1000:.1f} ms, "
+                    f"로드 {result['read'] * 1000:.1f} ms")
+        self.assertEqual(result['hs_count'], 5000, "HS 코드 개수 오류")
+        self.assertLess(result['compute'], 1.0, "5,000개 HS 코드 계산 시간이 너무 김")
+        self.assertLess(result['write'] + result['read'], 2.0, "통합 파일 저장·로드 시간이 너무 김")
+        
+        logger.info("대량 HS 코드 수출 가격 지수 테스트 완료")
+
+class LandedCostTest(unittest.TestCase):
+    """절대 도착 원가 계산 테스트"""
+    
+    def setUp(self):
+        """테스트 설정"""
+        self.landed_cost = importlib.import_module('src.landed_cost')
+    
+    def test_landed_cost_breakdown(self):
+        """SKU 원가 구성 요소가 원시 비용 요소와 BOM으로 계산되는지 테스트"""
+        logger.info("도착 원가 구성 요소 테스트 시작")
+        
+        factors = self.landed_cost.get_factors()
+        self.assertIs(self.landed_cost.get_factors(), factors, "원시 비용 요소 배열이 재사용되지 않음")
+        
+        catalog = self.landed_cost.build_catalog([{
+            'sku': 'TEST-1', 'hs_code': '8501.31', 'units_per_container': 2000,
+            'labor_hours': 0.5, 'electricity_kwh': 4.0, 'water_m3': 0.1, 'gas_mmbtu': 0.02, 'floor_space_m2_month': 0.05,
+            'bill_of_materials': [
+                {'component': '구리', 'quantity': 0.5, 'unit_cost': 10.0},
+                {'component': '자석', 'quantity': 4, 'unit_cost': 1.5}
+            ]
+        }, {
+            'sku': 'TEST-2', 'hs_code': '0000.00', 'units_per_container': 1000
+        }])
+        self.assertEqual(catalog.material_cost.tolist(), [11.0, 0.0], "BOM 자재비 합계 오류")
+        with self.assertRaises(ValueError):
+            self.landed_cost.build_catalog([{'sku': 'A', 'hs_code': '8501.31', 'units_per_container': 0}])
+        
+        result = self.landed_cost.calculate_landed_costs(catalog, factors)
+        
+        with open(os.path.join(COST_DATA_DIR, 'labor_costs.json'), 'r', encoding='utf-8') as f:
+            labor = json.load(f)['total_labor_costs']
+        with open(os.path.join(COST_DATA_DIR, 'utility_costs.json'), 'r', encoding='utf-8') as f:
+            utility = json.load(f)
+        with open(os.path.join(COST_DATA_DIR, 'land_costs.json'), 'r', encoding='utf-8') as f:
+            land = json.load(f)['data']
+        
+        tariff_rate = dict(zip(factors.countries, self.landed_cost.tariff_rates(catalog, factors)[0].tolist()))
+        freight = dict(zip(factors.countries, factors.freight.tolist()))
+        for country in ['KR', 'VN', 'MX']:
+            breakdown = result.breakdown('TEST-1', country)
+            expected_utility = (4.0 * utility['electricity_costs'][country] + 0.1 * utility['water_costs'][country]
+                                + 0.02 * utility['gas_costs'][country])
+            ex_works = 11.0 + 0.5 * labor[country] + expected_utility + 0.05 * land[country]
+            self.assertAlmostEqual(breakdown['labor'], 0.5 * labor[country], places=12, msg="노무비 오류")
+            self.assertAlmostEqual(breakdown['utility'], expected_utility, places=12, msg="유틸리티비 오류")
+            self.assertAlmostEqual(breakdown['freight'], freight[country] / 2000, places=12, msg="화물비 오류")
+            self.assertAlmostEqual(breakdown['tariff'], ex_works * tariff_rate[country] / 100, places=12, msg="관세 오류")
+            self.assertAlmostEqual(breakdown['total'], ex_works + breakdown['freight'] + breakdown['tariff'],
+                                   places=12, msg="도착 원가 합계 오류")
+        
+        # 관세 저장소에 없는 HS 코드는 관세 0
+        self.assertEqual(result.component('tariff')[1].tolist(), [0.0] * len(factors.countries), "관세 없는 HS 코드 오류")
+        self.assertEqual(len(result.cheapest_origins()), 2, "최저 원가 원산지 개수 오류")
+        
+        # 샘플 카탈로그
+        sample = self.landed_cost.calculate_landed_costs(self.landed_cost.load_catalog())
+        self.assertTrue((sample.total > sample.catalog.material_cost[:, np.newaxis]).all(), "도착 원가가 자재비보다 작음")
+        
+        logger.info("도착 원가 구성 요소 테스트 완료")
+    
+    def test_large_catalog(self):
+        """수만 개 SKU 카탈로그의 도착 원가 일괄 계산 테스트"""
+        logger.info("대량 SKU 도착 원가 테스트 시작")
+        
+        summary = self.landed_cost.benchmark(sku_count=20000, repeat=1)
+        logger.info(f"SKU 20,000개 도착 원가 계산 {summary['compute'] * 1000:.1f} ms")
+        self.assertLess(summary['compute'], 2.0, "20,000개 SKU 도착 원가 계산 시간이 너무 김")
+        self.assertLess(summary['cached_factor_load'], summary['factor_load'], "원시 비용 요소 캐시가 동작하지 않음")
+        
+        logger.info("대량 SKU 도착 원가 테스트 완료")
+
+class SourcingOptimizerTest(unittest.TestCase):
+    """소싱 최적화 테스트"""
+    
+    def setUp(self):
+        """테스트 설정"""
+        self.sourcing_optimizer = importlib.import_module('src.sourcing_optimizer')
+    
+    def assert_optimal(self, optimizer, cost, result):
+        """원문제 가능성, 쌍대 가능성, 강쌍대성으로 최적해를 확인합니다."""
+        allocation = result.allocation
+        reduced = cost - result.demand_duals[:, np.newaxis] - optimizer.usage * result.capacity_duals[np.newaxis, :]
+        np.testing.assert_allclose(allocation.sum(axis=1), optimizer.demand, rtol=1e-9, atol=1e-6,
+                                   err_msg="수요 제약 위반")
+        self.assertTrue(((optimizer.usage * allocation).sum(axis=0) <= optimizer.capacity + 1e-6).all(), "생산 능력 제약 위반")
+        self.assertGreaterEqual(reduced.min(), -1e-7, "축소 비용이 음수 (최적해 아님)")
+        self.assertLessEqual(result.capacity_duals.max(), 1e-9, "생산 능력 쌍대 변수 부호 오류")
+        dual_objective = optimizer.demand @ result.demand_duals + optimizer.capacity @ result.capacity_duals
+        self.assertAlmostEqual(result.objective, dual_objective, delta=1e-6 * max(1.0, result.objective),
+                               msg="원문제와 쌍대 문제의 목적 함수 값이 다름")
+    
+    def test_optimal_allocation(self):
+        """무작위 배정 문제의 최적성과 관세 변경 웜 스타트 테스트"""
+        logger.info("소싱 최적화 테스트 시작")
+        
+        rng = np.random.default_rng(21)
+        demand = rng.uniform(10, 100, 40)
+        usage = rng.uniform(0.2, 2.0, (40, 3))
+        capacity = np.full(3, (usage.mean(axis=1) * demand).sum() / 3 * 1.2)
+        cost = rng.uniform(5, 20, (40, 3))
+        
+        optimizer = self.sourcing_optimizer.SourcingOptimizer(demand, capacity, usage)
+        cold = optimizer.solve(cost)
+        self.assertFalse(cold.warm_start, "첫 풀이가 웜 스타트로 표시됨")
+        self.assert_optimal(optimizer, cost, cold)
+        
+        # 관세만 바뀐 비용은 이전 기저에서 시작하며 콜드 스타트와 같은 최적값
+        tariff_cost = cost * np.array([1.0, 1.25, 1.1])
+        warm = optimizer.solve(tariff_cost)
+        self.assertTrue(warm.warm_start, "관세 변경 풀이가 웜 스타트가 아님")
+        self.assert_optimal(optimizer, tariff_cost, warm)
+        fresh = self.sourcing_optimizer.SourcingOptimizer(demand, capacity, usage).solve(tariff_cost)
+        self.assertAlmostEqual(warm.objective, fresh.objective, delta=1e-6 * fresh.objective, msg="웜 스타트 최적값 오류")
+        self.assertLessEqual(warm.iterations, fresh.iterations, "웜 스타트의 반복 횟수가 더 많음")
+        
+        with self.assertRaises(ValueError):
+            self.sourcing_optimizer.SourcingOptimizer(demand, capacity * 0.1, usage).solve(cost)
+        
+        logger.info("소싱 최적화 테스트 완료")
+    
+    def test_large_catalog(self):
+        """수천 개 SKU 카탈로그의 최적성과 풀이 시간 테스트"""
+        logger.info("대규모 카탈로그 소싱 최적화 테스트 시작")
+        
+        rng = np.random.default_rng(22)
+        demand = rng.uniform(100, 1000, 2000)
+        usage = rng.uniform(0.2, 1.5, (2000, 1)).repeat(4, axis=1)
+        capacity = np.full(4, (usage[:, 0] * demand).sum() / 4 * 1.1)
+        cost = rng.uniform(10, 50, (2000, 1)) * rng.uniform(0.8, 1.2, (2000, 4))
+        
+        optimizer = self.sourcing_optimizer.SourcingOptimizer(demand, capacity, usage)
+        cold = optimizer.solve(cost)
+        self.assert_optimal(optimizer, cost, cold)
+        self.assertLess(cold.solve_time, 20.0, "SKU 2000개 콜드 스타트 풀이 시간이 너무 김")
+        
+        tariff_cost = cost * np.array([1.0, 1.3, 1.1, 1.2])
+        warm = optimizer.solve(tariff_cost)
+        self.assert_optimal(optimizer, tariff_cost, warm)
+        self.assertLess(warm.solve_time, cold.solve_time, "웜 스타트가 콜드 스타트보다 느림")
+        
+        logger.info(f"대규모 카탈로그 소싱 최적화 테스트 완료 (콜드 {cold.solve_time:.2f}초, 웜 {warm.solve_time:.2f}초)")
+    
+    def test_sample_sourcing_plan(self):
+        """샘플 카탈로그와 소싱 계획의 관세 시나리오 최적화 테스트"""
+        logger.info("샘플 소싱 계획 테스트 시작")
+        
+        landed_cost = importlib.import_module('src.landed_cost')
+        factors = landed_cost.get_factors()
+        vn_tariffs = factors.hs_tariffs.copy()
+        vn_tariffs[:, factors.countries.index('VN')] += 30.0
+        
+        results = self.sourcing_optimizer.optimize_sourcing(tariff_scenarios={'vn_tariff': vn_tariffs})
+        baseline, scenario = results['baseline'], results['vn_tariff']
+        self.assertTrue(scenario.warm_start, "관세 시나리오가 웜 스타트가 아님")
+        self.assertGreaterEqual(scenario.objective, baseline.objective, "관세 인상 후 총비용이 감소함")
+        self.assertGreater(baseline.solve_time, 0.0, "풀이 시간이 기록되지 않음")
+        
+        _, _, demand = self.sourcing_optimizer.read_plan(os.path.join(DATA_DIR, 'sourcing_plan.json'))
+        catalog = landed_cost.load_catalog()
+        np.testing.assert_allclose(scenario.allocation.sum(axis=1), [demand[sku] for sku in catalog.skus.tolist()],
+                                   rtol=1e-9, err_msg="SKU별 수요가 충족되지 않음")
+        
+        logger.info("샘플 소싱 계획 테스트 완료")
+
+class TariffRulesTest(unittest.TestCase):
+    """관세 중첩 규칙 엔진 테스트"""
+    
+    def setUp(self):
+        """테스트 설정"""
+        self.tariff_rules = importlib.import_module('src.tariff_rules')
+        self.table = self.tariff_rules.build_table({
+            'measures': [
+                {'name': 'mfn', 'mode': 'base'},
+                {'name': 'fta', 'mode': 'preference'},
+                {'name': 'section_301', 'mode': 'add'},
+                {'name': 'section_232', 'mode': 'add'},
+                {'name': 'reciprocal', 'mode': 'add'}
+            ],
+            'rules': [
+                {'id': 'mfn_bearing', 'measure': 'mfn', 'rate': 9.0, 'hs_prefixes': ['8482.10']},
+                {'id': 'korus', 'measure': 'fta', 'rate': 0.0, 'countries': ['KR']},
+                {'id': 's301', 'measure': 'section_301', 'rate': 25.0, 'countries': ['CN'], 'hs_prefixes': ['84', '87']},
+                {'id': 's301_bearing', 'measure': 'section_301', 'rate': 7.5, 'countries': ['CN'], 'hs_prefixes': ['8482']},
+                {'id': 's232', 'measure': 'section_232', 'rate': 25.0, 'hs_prefixes': ['8708'],
+                 'exclude_countries': ['MX'], 'effective_date': '2025-04-03', 'excludes': ['reciprocal']},
+                {'id': 'reciprocal', 'measure': 'reciprocal', 'rate': 10.0, 'exclude_countries': ['MX'],
+                 'effective_date': '2025-04-05', 'expiration_date': '2030-01-01'}
+            ]
+        })
+        self.hs_codes = ['8708.10.00', '8482.10.00', '8501.31.00']
+        self.countries = ['KR', 'CN', 'MX', 'JP']
+        self.base_rates = [2.5, 2.8, 4.0]
+    
+    def test_stacking(self):
+        """기본 관세, 특혜, 추가 관세 중첩과 제외 규칙 테스트"""
+        logger.info("관세 중첩 규칙 테스트 시작")
+        
+        decision = self.table.evaluate(self.hs_codes, self.countries, '2025-06-01', self.base_rates)
+        expected = np.array([
+            [25.0, 2.5 + 25.0 + 25.0, 2.5, 2.5 + 25.0],  # 232조 품목은 상호 관세 제외
+            [10.0, 9.0 + 7.5 + 10.0, 9.0, 9.0 + 10.0],   # 더 구체적인 MFN 규칙과 301조 규칙 적용
+            [10.0, 4.0 + 10.0, 4.0, 4.0 + 10.0]          # 규칙 없는 품목은 입력 기본 관세
+        ])
+        np.testing.assert_allclose(decision.rates, expected, err_msg="실효 관세율이 다름")
+        np.testing.assert_allclose(decision.contributions.sum(axis=0), expected, err_msg="조치별 기여분 합계가 실효 관세율과 다름")
+        
+        # 적용 기간 이전에는 232조와 상호 관세 미적용, 만료일 이후에는 상호 관세 미적용
+        before = self.table.evaluate(self.hs_codes, self.countries, '2025-01-01', self.base_rates)
+        self.assertAlmostEqual(before.rates[0, 1], 27.5, msg="적용 시작일 이전 규칙이 적용됨")
+        expired = self.table.evaluate(self.hs_codes, self.countries, '2030-01-01', self.base_rates)
+        self.assertAlmostEqual(expired.rates[2, 3], 4.0, msg="만료된 규칙이 적용됨")
+        
+        logger.info("관세 중첩 규칙 테스트 완료")
+    
+    def test_explain(self):
+        """품목·국가별 적용 근거 조회 테스트"""
+        logger.info("관세 적용 근거 조회 테스트 시작")
+        
+        explanation = self.table.explain('8708.10.00', 'CN', '2025-06-01', 2.5)
+        self.assertAlmostEqual(explanation['effective_rate'], 52.5, msg="설명의 실효 관세율이 다름")
+        status = {item['rule']: item['status'] for item in explanation['trace']}
+        self.assertEqual(status, {'s301': 'applied', 's232': 'applied', 'reciprocal': 'excluded'}, "규칙별 적용 상태가 다름")
+        
+        bearing = {item['rule']: item['status'] for item in self.table.explain('8482.10', 'CN', '2025-06-01', 2.8)['trace']}
+        self.assertEqual(bearing['s301'], 'overridden', "덜 구체적인 규칙이 적용됨")
+        self.assertEqual(bearing['s301_bearing'], 'applied', "더 구체적인 규칙이 적용되지 않음")
+        
+        logger.info("관세 적용 근거 조회 테스트 완료")
+    
+    def test_vectorized_lines(self):
+        """대량 품목의 결정 테이블 평가가 품목별 설명과 일치하는지 테스트"""
+        logger.info("대량 품목 관세 규칙 평가 테스트 시작")
+        
+        rng = np.random.default_rng(20)
+        hs_codes = [f"{code:08d}" for code in rng.integers(84000000, 88000000, 2000)]
+        base_rates = rng.uniform(0, 5, len(hs_codes))
+        decision = self.table.evaluate(hs_codes, self.countries, '2025-06-01', base_rates)
+        self.assertEqual(decision.rates.shape, (len(hs_codes), len(self.countries)), "결정 테이블 결과 형태가 다름")
+        
+        for line in rng.choice(len(hs_codes), 20, replace=False).tolist():
+            for column, country in enumerate(self.countries):
+                explanation = self.table.explain(hs_codes[line], country, '2025-06-01', base_rates[line])
+                self.assertAlmostEqual(decision.rates[line, column], explanation['effective_rate'],
+                                       msg=f"{hs_codes[line]} {country} 관세율이 다름")
+        
+        with self.assertRaises(ValueError):
+            self.tariff_rules.build_table({'measures': [{'name': 'mfn', 'mode': 'base'}],
+                                           'rules': [{'id': 'x', 'measure': 'unknown', 'rate': 1.0}]})
+        
+        # 샘플 규칙 파일: 멕시코는 USMCA로 자동차 부품 무관세
+        rates = self.tariff_rules.effective_rates(['8708.10.00'], ['MX', 'CN'], '2025-06-01', [2.5])
+        self.assertEqual(rates[0, 0], 0.0, "USMCA 특혜가 적용되지 않음")
+        self.assertGreater(rates[0, 1], 25.0, "중국 추가 관세가 적용되지 않음")
+        
+        logger.info("대량 품목 관세 규칙 평가 테스트 완료")
+
+    def test_rule_lookups(self):
+        """무역 협정 현황과 중국 관세 타임라인이 규칙 파일에서 계산되는지 테스트"""
+        logger.info("관세 규칙 기반 조회 테스트 시작")
+        
+        agreements = self.tariff_rules.trade_agreements(['8708.10.00'], ['KR', 'MX', 'CN'], '2025-04-09', [2.5])
+        self.assertEqual(agreements['KR']['agreement'], 'korus_fta', "한-미 FTA 규칙이 조회되지 않음")
+        self.assertAlmostEqual(agreements['MX']['duty_reduction'], 2.5, msg="USMCA 기본 관세 감소분이 다름")
+        self.assertIsNone(agreements['CN']['agreement'], "협정 없는 국가에 특혜 규칙이 조회됨")
+        self.assertTrue(all(item['benefit_percentage'] == 0.0 for item in agreements.values()),
+                        "실효 관세율에 반영된 특혜가 수출 가격 혜택으로 중복 적용됨")
+        
+        update_china_tariff = importlib.import_module('src.update_china_tariff')
+        timeline = update_china_tariff.china_tariff_timeline()
+        self.assertEqual([step['date'] for step in timeline], ['2025-02-04', '2025-03-04', '2025-04-02'], "타임라인 단계가 다름")
+        self.assertEqual([step['cumulative_rate'] for step in timeline], [10.0, 20.0, 54.0], "누적 추가 관세율이 다름")
+        
+        # 샘플 규칙 파일: 제품 목록의 HS 코드별 국가 관세율 (일본·대만 8501.31 2.8%, 미-EU 무역협정 면제)
+        countries = ['KR', 'JP', 'CN', 'IN', 'TH', 'VN', 'TW', 'EU', 'MX']
+        rates = self.tariff_rules.effective_rates(['8501.31', '8414.59'], countries, '2025-01-01')
+        self.assertEqual(rates.tolist(), [[0.0, 2.8, 27.5, 2.5, 2.5, 2.5, 2.8, 0.0, 0.0],
+                                          [0.0, 2.3, 27.3, 2.3, 2.3, 2.3, 2.3, 0.0, 0.0]], "HS 코드별 국가 관세율이 다름")
+        
+        logger.info("관세 규칙 기반 조회 테스트 완료")
+
+class ChartServiceTest(unittest.TestCase):
+    """차트 렌더링 서비스 테스트"""
+    
+    def setUp(self):
+        """테스트 설정"""
+        self.chart_service = importlib.import_module('src.chart_service')
+        self.index = {'KR': 100.0, 'CN': 82.5, 'MX': 91.0, 'VN': 78.4}
+    
+    def test_render_cache(self):
+        """SVG/PNG 렌더링, 캐시 재사용, 그림 해제 테스트"""
+        logger.info("차트 렌더링 서비스 테스트 시작")
+        
+        import matplotlib.pyplot as plt
+        figures_before = len(plt.get_fignums())
+        
+        service = self.chart_service.ChartService(max_entries=2)
+        svg = service.render('export_price', self.index, fmt='svg')
+        self.assertIn(b'<svg', svg, "SVG 형식이 아님")
+        png = service.render('export_price', self.index, fmt='png', dpi=50)
+        self.assertTrue(png.startswith(b'\x89PNG'), "PNG 형식이 아님")
+        self.assertIs(service.render('export_price', dict(self.index), fmt='svg'), svg, "같은 데이터의 차트를 다시 렌더링함")
+        self.assertEqual(service.stats()['hits'], 1, "캐시 적중 횟수가 다름")
+        
+        # 데이터가 바뀌면 새 버전으로 렌더링, 항목 수 상한 초과 시 오래된 항목 제거
+        changed = service.render('export_price', dict(self.index, CN=90.0), fmt='svg')
+        self.assertNotEqual(changed, svg, "데이터 변경이 반영되지 않음")
+        self.assertEqual(service.stats()['entries'], 2, "캐시 항목 수 상한이 지켜지지 않음")
+        
+        self.assertEqual(len(plt.get_fignums()), figures_before, "렌더링 후 그림이 남아 있음")
+        with self.assertRaises(ValueError):
+            service.render('export_price', self.index, fmt='jpg')
+        
+        logger.info("차트 렌더링 서비스 테스트 완료")
+    
+    def test_worker_pool(self):
+        """작업자 풀 렌더링과 파일 저장 테스트"""
+        logger.info("차트 작업자 풀 테스트 시작")
+        
+        service = self.chart_service.ChartService(workers=2)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            futures = [
+                service.submit(service.save, os.path.join(temp_dir, f"chart_{i}.{fmt}"), 'manufacturing_cost', self.index)
+                for i, fmt in enumerate(['svg', 'png', 'svg', 'png'])
+            ]
+            paths = [future.result(timeout=60) for future in futures]
+            for path in paths:
+                self.assertTrue(os.path.getsize(path) > 0, f"차트 파일이 저장되지 않음: {path}")
+        service.shutdown()
+        self.assertEqual(service.stats()['entries'], 2, "같은 차트가 형식별로 한 번씩 렌더링되지 않음")
+        
+        dashboard_app = importlib.import_module('src.dashboard_app')
+        client = dashboard_app.app.test_client()
+        response = client.get('/charts/manufacturing_cost.svg')
+        self.assertEqual(response.status_code, 200, "차트 라우트 응답 오류")
+        self.assertEqual(response.mimetype, 'image/svg+xml', "차트 MIME 타입이 다름")
+        self.assertEqual(client.get('/charts/unknown.svg').status_code, 404, "알 수 없는 차트에 404 응답을 반환하지 않음")
+        
+        logger.info("차트 작업자 풀 테스트 완료")
+
+class VersionedApiTest(unittest.TestCase):
+    """버전 JSON API와 조건부 GET 테스트"""
+    
+    def setUp(self):
+        """테스트 설정"""
+        self.dashboard_app = importlib.import_module('src.dashboard_app')
+        self.client = self.dashboard_app.app.test_client()
+    
+    def test_conditional_get(self):
+        """데이터 버전 ETag와 304 응답 테스트"""
+        logger.info("버전 API 조건부 GET 테스트 시작")
+        
+        response = self.client.get('/api/v1/cost-index')
+        self.assertEqual(response.status_code, 200, "제조 비용 지수 API 응답 오류")
+        etag = response.headers.get('ETag')
+        self.assertTrue(etag, "ETag가 없음")
+        self.assertIsNotNone(response.last_modified, "Last-Modified가 없음")
+        self.assertNotIn('no-store', response.headers['Cache-Control'], "버전 API 응답이 저장 금지로 설정됨")
+        self.assertEqual(response.get_json()['data_version'], self.dashboard_app.data_version()[0], "응답의 데이터 버전이 다름")
+        
+        # 같은 데이터 버전이면 304, 다른 ETag면 200
+        for url in ['/api/v1/cost-index', '/api/v1/export-index', '/api/v1/policy-updates', '/api/v1/tariff-lines']:
+            not_modified = self.client.get(url, headers={'If-None-Match': etag})
+            self.assertEqual(not_modified.status_code, 304, f"{url}: 같은 버전에 304를 반환하지 않음")
+            self.assertEqual(not_modified.data, b'', f"{url}: 304 응답에 본문이 있음")
+            self.assertEqual(self.client.get(url, headers={'If-None-Match': '"old"'}).status_code, 200,
+                             f"{url}: 다른 버전에 200을 반환하지 않음")
+        
+        # 같은 데이터 버전이어도 알 수 없는 파라미터는 304가 아닌 404
+        for url, query in [('/api/v1/cost-index', {'category': '없는 카테고리'}),
+                           ('/api/v1/export-index', {'category': '없는 카테고리'}),
+                           ('/api/v1/export-index/hs', {'hs_code': '0000.00'})]:
+            self.assertEqual(self.client.get(url, query_string=query, headers={'If-None-Match': etag}).status_code, 404,
+                             f"{url}: 조건부 요청의 알 수 없는 파라미터에 404를 반환하지 않음")
+        
+        since = response.headers['Last-Modified']
+        self.assertEqual(self.client.get('/api/v1/cost-index', headers={'If-Modified-Since': since}).status_code, 304,
+                         "If-Modified-Since 조건부 요청에 304를 반환하지 않음")
+        
+        logger.info("버전 API 조건부 GET 테스트 완료")
+    
+    def test_endpoints(self):
+        """버전 API 응답 내용과 응답 종류별 캐시 헤더 테스트"""
+        logger.info("버전 API 응답 테스트 시작")
+        
+        lines = self.client.get('/api/v1/tariff-lines', query_string={'country': 'CN', 'hs_prefix': '8708'}).get_json()['lines']
+        self.assertGreater(len(lines), 0, "관세 품목이 없음")
+        self.assertTrue(all(line['country_code'] == 'CN' and line['hs_code'].startswith('8708') for line in lines),
+                        "관세 품목 필터가 적용되지 않음")
+        
+        self.assertEqual(self.client.get('/api/v1/export-index', query_string={'category': '없는 카테고리'}).status_code, 404,
+                         "알 수 없는 카테고리에 404를 반환하지 않음")
+        
+        # 작업 상태 응답은 캐시 금지, 정적 파일은 장기 캐시
+        self.assertIn('no-store', self.client.get('/cache-stats').headers['Cache-Control'], "캐시 상태 응답이 캐시 가능함")
+        static = self.client.get('/static/css/style.css')
+        self.assertIn(f"max-age={self.dashboard_app.STATIC_MAX_AGE}", static.headers['Cache-Control'], "정적 파일 캐시 기간이 다름")
+        static.close()
+        
+        logger.info("버전 API 응답 테스트 완료")
+
+class WebStartupTest(unittest.TestCase):
+    """웹 작업자 시작 시간 테스트"""
+    
+    def test_import_time(self):
+        """웹 진입점 import 시 무거운 모듈을 로드하지 않고 1초 안에 끝나는지 테스트"""
+        logger.info("웹 작업자 import 시간 테스트 시작")
+        
+        wsgi = importlib.import_module('src.wsgi')
+        summary = wsgi.benchmark(repeat=1)
+        logger.info(f"웹 진입점 import 시간: {summary['import_time'] * 1000:.0f} ms")
+        self.assertEqual(summary['heavy_modules'], [], "웹 작업자가 무거운 모듈을 import함")
+        self.assertLess(summary['import_time'], 1.0, "웹 진입점 import 시간이 1초 이상")
+        
+        # 템플릿 파일이 이미 있으면 다시 생성하지 않음
+        dashboard_app = importlib.import_module('src.dashboard_app')
+        mtimes = [os.stat(path).st_mtime_ns for path in dashboard_app.site_files()]
+        dashboard_app.ensure_site_files()
+        self.assertEqual([os.stat(path).st_mtime_ns for path in dashboard_app.site_files()], mtimes, "템플릿 파일을 다시 생성함")
+        
+        logger.info("웹 작업자 import 시간 테스트 완료")
+
+class SchedulerLeaderTest(unittest.TestCase):
+    """리더 선출 스케줄러 테스트"""
+    
+    def setUp(self):
+        """테스트 설정"""
+        self.scheduler_leader = importlib.import_module('src.scheduler_leader')
+        self.temp_dir = tempfile.TemporaryDirectory()
+    
+    def tearDown(self):
+        """테스트 정리"""
+        self.temp_dir.cleanup()
+    
+    def test_file_lock(self):
+        """파일 잠금 리더 선출과 승계 테스트"""
+        logger.info("파일 잠금 리더 선출 테스트 시작")
+        
+        path = os.path.join(self.temp_dir.name, 'scheduler.lock')
+        first = self.scheduler_leader.FileLockLease(path)
+        second = self.scheduler_leader.FileLockLease(path)
+        self.assertTrue(first.acquire(), "첫 번째 프로세스가 리더가 되지 못함")
+        self.assertFalse(second.acquire(), "두 프로세스가 동시에 리더가 됨")
+        self.assertTrue(first.acquire(), "리더가 자격을 유지하지 못함")
+        
+        first.release()
+        self.assertTrue(second.acquire(), "리더가 사라진 뒤 승계하지 못함")
+        second.release()
+        
+        logger.info("파일 잠금 리더 선출 테스트 완료")
+    
+    def test_sqlite_lease(self):
+        """SQLite 임대 만료, 갱신, 동시 획득 테스트"""
+        logger.info("SQLite 임대 리더 선출 테스트 시작")
+        
+        path = os.path.join(self.temp_dir.name, 'lease.db')
+        now = [1000.0]
+        clock = lambda: now[0]
+        first = self.scheduler_leader.SQLiteLease(path, ttl=60, clock=clock)
+        second = self.scheduler_leader.SQLiteLease(path, ttl=60, clock=clock)
+        self.assertTrue(first.acquire(), "첫 번째 프로세스가 임대를 획득하지 못함")
+        self.assertFalse(second.acquire(), "만료되지 않은 임대를 다른 프로세스가 획득함")
+        
+        # 갱신하면 유지, 갱신하지 않고 만료되면 다른 프로세스가 승계
+        now[0] += 50
+        self.assertTrue(first.acquire(), "리더가 임대를 갱신하지 못함")
+        now[0] += 50
+        self.assertFalse(second.acquire(), "갱신된 임대를 다른 프로세스가 획득함")
+        now[0] += 11
+        self.assertFalse(first.is_leader, "만료된 임대가 리더로 표시됨")
+        self.assertTrue(second.acquire(), "만료된 임대를 승계하지 못함")
+        self.assertEqual(first.current_holder(), second.holder, "임대 보유자가 다름")
+        self.assertFalse(first.acquire(), "이전 리더가 임대를 되찾음")
+        
+        # 여러 스레드가 동시에 시도해도 한 프로세스만 리더
+        race_path = os.path.join(self.temp_dir.name, 'race.db')
+        leases = [self.scheduler_leader.SQLiteLease(race_path) for _ in range(8)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda lease: lease.acquire(), leases))
+        self.assertEqual(sum(results), 1, "동시에 여러 프로세스가 리더가 됨")
+        
+        logger.info("SQLite 임대 리더 선출 테스트 완료")
+    
+    def test_run_job(self):
+        """리더만 예약 작업을 실행하는지 테스트"""
+        logger.info("리더 예약 작업 실행 테스트 시작")
+        
+        path = os.path.join(self.temp_dir.name, 'scheduler.lock')
+        runs = []
+        schedulers = [
+            self.scheduler_leader.LeaderScheduler(lambda index=index: runs.append(index) or True,
+                                                  self.scheduler_leader.FileLockLease(path))
+            for index in range(3)
+        ]
+        results = [scheduler.run_job() for scheduler in schedulers]
+        self.assertEqual(runs, [0], "예약 작업이 리더에서만 한 번 실행되지 않음")
+        self.assertEqual(results, [True, None, None], "리더가 아닌 프로세스의 결과가 다름")
+        for scheduler in schedulers:
+            scheduler.lease.release()
+        
+        with self.assertRaises(ValueError):
+            self.scheduler_leader.create_lease('zookeeper')
+        
+        logger.info("리더 예약 작업 실행 테스트 완료")
+
+class SharedSnapshotTest(unittest.TestCase):
+    """작업자 간 공유 데이터 스냅샷(메모리 맵 배열) 테스트"""
+    
+    def setUp(self):
+        """테스트 설정"""
+        self.shared_snapshot = importlib.import_module('src.shared_snapshot')
+        self.snapshot_store = importlib.import_module('src.snapshot_store')
+        self.hs_export_pipeline = importlib.import_module('src.hs_export_pipeline')
+        self.tariff_store = importlib.import_module('src.tariff_store')
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.generations_dir = os.path.join(self.temp_dir.name, 'generations')
+    
+    def tearDown(self):
+        """테스트 정리"""
+        self.temp_dir.cleanup()
+    
+    def test_write_snapshot(self):
+        """배열이 메모리 맵으로 로드되고 파일을 파싱한 결과와 같은지 테스트"""
+        logger.info("공유 스냅샷 생성 테스트 시작")
+        
+        data_dir = os.path.join(self.temp_dir.name, 'data')
+        products = self.hs_export_pipeline.synthetic_products(20)
+        result = self.hs_export_pipeline.HSExportIndexTable(products, ['KR', 'CN'], np.random.rand(20, 2), 'landed')
+        self.hs_export_pipeline.write_export_indices(result, os.path.join(data_dir, 'export_data'))
+        os.makedirs(os.path.join(data_dir, 'cost_data'))
+        with open(os.path.join(data_dir, 'cost_data', 'manufacturing_cost_index.json'), 'w', encoding='utf-8') as f:
+            json.dump({'manufacturing_cost_index': {'KR': 100.0, 'CN': 72.5}}, f)
+        
+        self.shared_snapshot.write_snapshot(data_dir)
+        snapshot = self.shared_snapshot.SharedSnapshot(os.path.join(data_dir, self.shared_snapshot.SHARED_DIR_NAME))
+        self.assertTrue(all(isinstance(array, np.memmap) for array in snapshot.arrays.values()), "배열이 메모리 맵으로 로드되지 않음")
+        self.assertNotIn('tariff', snapshot, "없는 관세 저장소의 섹션이 생성됨")
+        
+        shared = snapshot.hs_export_indices()
+        self.assertIs(shared, snapshot.hs_export_indices(), "같은 스냅샷의 테이블을 다시 만듦")
+        self.assertEqual(list(shared.items()), list(result.items()), "HS 코드별 수출 가격 지수가 다름")
+        self.assertEqual(snapshot.index('cost_index'), {'KR': 100.0, 'CN': 72.5}, "제조 비용 지수가 다름")
+        self.assertEqual(snapshot.index('cost_index', '없는 카테고리'), {'KR': 100.0, 'CN': 72.5}, "종합 지수로 대체하지 않음")
+        self.assertIsNone(snapshot.index('export_index'), "없는 지수 섹션이 None이 아님")
+        
+        with self.assertRaises(ValueError):
+            shared.values[0, 0] = 0.0
+        
+        logger.info("공유 스냅샷 생성 테스트 완료")
+    
+    def test_mapper(self):
+        """세대 게시 시 공유 스냅샷 생성과 세대별 맵 교체 테스트"""
+        logger.info("공유 스냅샷 맵 교체 테스트 시작")
+        
+        mapper = self.shared_snapshot.SnapshotMapper(self.generations_dir)
+        self.assertIsNone(mapper.get(), "게시된 세대가 없는데 스냅샷을 반환함")
+        
+        first_id = self.snapshot_store.publish_generation(DATA_DIR, self.generations_dir, paths=['tariff_data', 'cost_data'])
+        first = mapper.get()
+        self.assertIsNotNone(first, "게시된 세대의 공유 스냅샷이 없음")
+        self.assertIs(mapper.get(first_id), first, "같은 세대를 다시 맵함")
+        
+        table = self.tariff_store.read_table(os.path.join(DATA_DIR, 'tariff_data', os.path.basename(self.tariff_store.STORE_FILE)))
+        shared = first.tariff_table()
+        self.assertIsInstance(shared.rate, np.memmap, "관세율 배열이 메모리 맵이 아님")
+        self.assertEqual(shared.hs_codes.tolist(), table.hs_codes.tolist(), "관세 저장소 HS 코드가 다름")
+        self.assertTrue(np.array_equal(shared.rate, table.rate), "관세율이 다름")
+        self.assertEqual(shared.metadata, table.metadata, "관세 저장소 메타데이터가 다름")
+        
+        second_id = self.snapshot_store.publish_generation(DATA_DIR, self.generations_dir, paths=['tariff_data', 'cost_data'])
+        second = mapper.get()
+        self.assertIsNot(second, first, "새 세대를 맵하지 않음")
+        self.assertIs(mapper.get(first_id), first, "요청이 고정한 이전 세대의 스냅샷이 바뀜")
+        self.assertEqual(mapper.stats()['maps'], 2, "세대별로 한 번만 맵하지 않음")
+        self.assertEqual(set(mapper.stats()['generations']), {first_id, second_id}, "맵한 세대 목록이 다름")
+        
+        logger.info("공유 스냅샷 맵 교체 테스트 완료")
+
 class DashboardAppTest(unittest.TestCase):
     """대시보드 애플리케이션 테스트"""
     
@@ -347,6 +1824,236 @@ class DashboardAppTest(unittest.TestCase):
         
         logger.info("Flask 애플리케이션 테스트 완료")
 
+class DataSnapshotCacheTest(unittest.TestCase):
+    """데이터 스냅샷 캐시 테스트"""
+    
+    def setUp(self):
+        """테스트 설정"""
+        self.dashboard_app = importlib.import_module('src.dashboard_app')
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.version_file = os.path.join(self.temp_dir.name, 'last_update.txt')
+        self.data_file = os.path.join(self.temp_dir.name, 'data.json')
+        
+        with open(self.version_file, 'w', encoding='utf-8') as f:
+            f.write('2025-04-07 11:42:35')
+        with open(self.data_file, 'w', encoding='utf-8') as f:
+            json.dump({'value': 1}, f)
+    
+    def tearDown(self):
+        """테스트 정리"""
+        self.temp_dir.cleanup()
+    
+    def test_steady_state_hits(self):
+        """변경되지 않은 파일은 다시 읽지 않는지 테스트"""
+        logger.info("스냅샷 캐시 적중 테스트 시작")
+        
+        cache = self.dashboard_app.DataSnapshotCache(self.version_file)
+        parse_count = []
+        
+        def parser(file_path):
+            parse_count.append(file_path)
+            return self.dashboard_app.read_json_file(file_path)
+        
+        for _ in range(5):
+            data = cache.get(self.data_file, parser)
+            self.assertEqual(data['value'], 1, "캐시된 데이터가 올바르지 않음")
+        
+        self.assertEqual(len(parse_count), 1, "파일이 두 번 이상 파싱됨")
+        self.assertEqual(cache.stats()['hits'], 4, "캐시 적중 횟수가 올바르지 않음")
+        self.assertEqual(cache.stats()['misses'], 1, "캐시 실패 횟수가 올바르지 않음")
+        
+        logger.info("스냅샷 캐시 적중 테스트 완료")
+    
+    def test_invalidation(self):
+        """파일 변경 및 데이터 버전 변경 시 무효화 테스트"""
+        logger.info("스냅샷 캐시 무효화 테스트 시작")
+        
+        cache = self.dashboard_app.DataSnapshotCache(self.version_file)
+        cache.get(self.data_file, self.dashboard_app.read_json_file)
+        
+        # 파일 내용 변경 (크기 변경)
+        with open(self.data_file, 'w', encoding='utf-8') as f:
+            json.dump({'value': 22}, f)
+        self.assertEqual(cache.get(self.data_file, self.dashboard_app.read_json_file)['value'], 22, "파일 변경이 반영되지 않음")
+        
+        # 데이터 버전 마커 변경
+        with open(self.version_file, 'w', encoding='utf-8') as f:
+            f.write('2025-04-08 03:00:00 (new)')
+        cache.get(self.data_file, self.dashboard_app.read_json_file)
+        self.assertEqual(cache.stats()['misses'], 3, "데이터 버전 변경 시 캐시가 무효화되지 않음")
+        
+        # 존재하지 않는 파일은 기본값 반환
+        missing_file = os.path.join(self.temp_dir.name, 'missing.json')
+        self.assertEqual(cache.get(missing_file, self.dashboard_app.read_json_file, {}), {}, "기본값이 반환되지 않음")
+        
+        logger.info("스냅샷 캐시 무효화 테스트 완료")
+
+class SnapshotStoreTest(unittest.TestCase):
+    """데이터 세대 스냅샷 저장소 테스트"""
+    
+    def setUp(self):
+        """테스트 설정"""
+        self.snapshot_store = importlib.import_module('src.snapshot_store')
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.data_dir = os.path.join(self.temp_dir.name, 'data')
+        self.generations_dir = os.path.join(self.data_dir, 'generations')
+        os.makedirs(os.path.join(self.data_dir, 'cost_data'))
+        self.write_index(100.0)
+    
+    def tearDown(self):
+        """테스트 정리"""
+        self.temp_dir.cleanup()
+    
+    def write_index(self, value):
+        """작업 데이터 디렉토리의 제조 비용 지수 파일을 작성합니다."""
+        with open(os.path.join(self.data_dir, 'cost_data', 'manufacturing_cost_index.json'), 'w', encoding='utf-8') as f:
+            json.dump({'manufacturing_cost_index': {'KR': value}}, f)
+    
+    def read_index(self, generation_id):
+        """세대의 제조 비용 지수 파일을 읽습니다."""
+        path = self.snapshot_store.resolve('cost_data/manufacturing_cost_index.json', generation_id,
+                                           self.data_dir, self.generations_dir)
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)['manufacturing_cost_index']['KR']
+    
+    def test_publish_pins_generation(self):
+        """게시된 세대는 이후 작업 데이터 변경과 무관한지 테스트"""
+        logger.info("데이터 세대 게시 테스트 시작")
+        
+        self.assertIsNone(self.snapshot_store.current_generation(self.generations_dir), "게시 전 현재 세대가 존재함")
+        
+        first = self.snapshot_store.publish_generation(self.data_dir, self.generations_dir)
+        self.assertEqual(self.snapshot_store.current_generation(self.generations_dir), first, "현재 세대 포인터 오류")
+        
+        # 요청이 고정한 세대는 작업 데이터 변경 및 새 세대 게시 후에도 그대로 유지
+        pinned = self.snapshot_store.current_generation(self.generations_dir)
+        self.write_index(120.0)
+        second = self.snapshot_store.publish_generation(self.data_dir, self.generations_dir)
+        
+        self.assertNotEqual(first, second, "새 세대 ID가 생성되지 않음")
+        self.assertEqual(self.read_index(pinned), 100.0, "고정된 세대의 데이터가 변경됨")
+        self.assertEqual(self.read_index(self.snapshot_store.current_generation(self.generations_dir)), 120.0,
+                         "새 세대의 데이터가 반영되지 않음")
+        self.assertEqual(self.snapshot_store.list_generations(self.generations_dir), [first, second],
+                         "게시된 세대 목록 오류")
+        
+        logger.info("데이터 세대 게시 테스트 완료")
+    
+    def test_collect_garbage(self):
+        """보존 기간이 지난 이전 세대만 삭제되는지 테스트"""
+        logger.info("데이터 세대 정리 테스트 시작")
+        
+        first = self.snapshot_store.publish_generation(self.data_dir, self.generations_dir)
+        second = self.snapshot_store.publish_generation(self.data_dir, self.generations_dir)
+        
+        # 보존 기간 내에는 이전 세대를 유지
+        removed = self.snapshot_store.collect_garbage(3600, self.generations_dir)
+        self.assertEqual(removed, [], "보존 기간 내의 세대가 삭제됨")
+        
+        # 보존 기간이 지나면 이전 세대만 삭제하고 현재 세대는 유지
+        removed = self.snapshot_store.collect_garbage(3600, self.generations_dir, now=time.time() + 7200)
+        self.assertEqual(removed, [first], "보존 기간이 지난 세대가 삭제되지 않음")
+        self.assertEqual(self.snapshot_store.list_generations(self.generations_dir), [second], "현재 세대가 삭제됨")
+        self.assertEqual(self.read_index(second), 100.0, "현재 세대의 데이터 오류")
+        
+        logger.info("데이터 세대 정리 테스트 완료")
+
+class UpdateJobManagerTest(unittest.TestCase):
+    """백그라운드 데이터 업데이트 작업 관리 테스트"""
+    
+    def setUp(self):
+        """테스트 설정"""
+        self.dashboard_app = importlib.import_module('src.dashboard_app')
+    
+    def test_single_flight_job(self):
+        """실행 중인 작업에 동시 요청이 합류하는지 테스트"""
+        logger.info("업데이트 작업 합류 테스트 시작")
+        
+        release = threading.Event()
+        run_count = []
+        
+        def runner(progress):
+            run_count.append(1)
+            progress('tariff_data', 'start')
+            release.wait(5)
+            progress('tariff_data', 'finish')
+            return True
+        
+        manager = self.dashboard_app.UpdateJobManager(runner)
+        first_job, first_created = manager.submit()
+        second_job, second_created = manager.submit()
+        
+        self.assertTrue(first_created, "첫 번째 작업이 생성되지 않음")
+        self.assertFalse(second_created, "중복 작업이 생성됨")
+        self.assertEqual(first_job['job_id'], second_job['job_id'], "동시 요청이 같은 작업에 합류하지 않음")
+        
+        release.set()
+        for _ in range(100):
+            job = manager.get(first_job['job_id'])
+            if job['status'] in ('succeeded', 'failed'):
+                break
+            time.sleep(0.05)
+        
+        self.assertEqual(job['status'], 'succeeded', "작업이 성공으로 완료되지 않음")
+        self.assertEqual(len(run_count), 1, "업데이트가 두 번 이상 실행됨")
+        self.assertEqual(job['stages'][0]['name'], 'tariff_data', "단계 정보가 기록되지 않음")
+        self.assertIsNotNone(job['stages'][0]['duration_seconds'], "단계 소요 시간이 기록되지 않음")
+        
+        # 완료 후에는 새 작업 생성
+        third_job, third_created = manager.submit()
+        self.assertTrue(third_created, "완료 후 새 작업이 생성되지 않음")
+        self.assertNotEqual(third_job['job_id'], first_job['job_id'], "완료된 작업 ID가 재사용됨")
+        
+        logger.info("업데이트 작업 합류 테스트 완료")
+
+    def test_shared_job_records(self):
+        """여러 작업자가 작업 기록을 공유하는지 테스트 (조회, 단일 작업, 종료된 작업자의 작업 정리)"""
+        logger.info("작업자 간 업데이트 작업 공유 테스트 시작")
+        
+        release = threading.Event()
+        
+        def runner(progress):
+            release.wait(5)
+            return True
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'update_jobs.db')
+            first_worker = self.dashboard_app.UpdateJobManager(runner, path=path)
+            second_worker = self.dashboard_app.UpdateJobManager(runner, path=path)
+            
+            job, created = first_worker.submit()
+            other_job, other_created = second_worker.submit()
+            self.assertTrue(created, "첫 번째 작업이 생성되지 않음")
+            self.assertFalse(other_created, "다른 작업자에서 중복 작업이 생성됨")
+            self.assertEqual(other_job['job_id'], job['job_id'], "다른 작업자의 요청이 실행 중인 작업에 합류하지 않음")
+            
+            release.set()
+            for _ in range(100):
+                status = second_worker.get(job['job_id'])
+                if status['status'] in ('succeeded', 'failed'):
+                    break
+                time.sleep(0.05)
+            self.assertEqual(status['status'], 'succeeded', "다른 작업자에서 작업 완료 상태를 조회하지 못함")
+            self.assertNotIn('worker_pid', status, "내부 작업자 정보가 응답에 포함됨")
+            
+            # 종료된 작업자가 남긴 실행 중 작업은 실패로 기록하고 새 작업 생성
+            dead_worker = subprocess.Popen([sys.executable, '-c', 'pass'])
+            dead_worker.wait()
+            stale = dict(job, job_id='stale', status='running', stages={}, current_stages=[],
+                         worker_host=socket.gethostname(), worker_pid=dead_worker.pid)
+            with first_worker._transaction() as connection:
+                first_worker._save(connection, stale)
+            
+            new_job, new_created = second_worker.submit()
+            self.assertTrue(new_created, "종료된 작업자의 작업 때문에 새 작업이 생성되지 않음")
+            self.assertEqual(first_worker.get('stale')['status'], 'failed', "종료된 작업자의 작업이 실패로 기록되지 않음")
+            for _ in range(100):
+                if first_worker.get(new_job['job_id'])['status'] in ('succeeded', 'failed'):
+                    break
+                time.sleep(0.05)
+        
+        logger.info("작업자 간 업데이트 작업 공유 테스트 완료")
+
 class AutoUpdaterTest(unittest.TestCase):
     """자동 업데이트 메커니즘 테스트"""
     
@@ -382,6 +2089,155 @@ class AutoUpdaterTest(unittest.TestCase):
         
         logger.info("데이터 업데이트 기능 테스트 완료")
 
+class UpdatePipelineTest(unittest.TestCase):
+    """데이터 업데이트 파이프라인 테스트"""
+    
+    def setUp(self):
+        """테스트 설정"""
+        self.pipeline = importlib.import_module('src.update_pipeline')
+    
+    def test_stages_run_once_in_parallel(self):
+        """각 단계가 한 번만 실행되고 독립 단계가 병렬로 실행되는지 테스트"""
+        logger.info("파이프라인 실행 테스트 시작")
+        
+        Stage = self.pipeline.PipelineStage
+        barrier = threading.Barrier(2, timeout=5)
+        calls = []
+        
+        def independent(name, value):
+            def func(inputs):
+                calls.append(name)
+                barrier.wait()  # 두 독립 단계가 동시에 실행되지 않으면 시간 초과
+                return value
+            return func
+        
+        def combine(inputs):
+            calls.append('combine')
+            return inputs['tariff'] + inputs['cost']
+        
+        stages = [
+            Stage('combine', ['tariff', 'cost'], combine),
+            Stage('tariff', [], independent('tariff', 1)),
+            Stage('cost', [], independent('cost', 2))
+        ]
+        events = []
+        results = self.pipeline.run_pipeline(stages, progress=lambda stage, event: events.append((stage, event))).results
+        
+        self.assertEqual(results['combine'], 3, "의존 단계 결과가 전달되지 않음")
+        self.assertEqual(sorted(calls), ['combine', 'cost', 'tariff'], "단계가 한 번씩 실행되지 않음")
+        self.assertEqual(calls[-1], 'combine', "의존성 순서가 지켜지지 않음")
+        self.assertIn(('combine', 'finish'), events, "진행 이벤트가 보고되지 않음")
+        
+        logger.info("파이프라인 실행 테스트 완료")
+    
+    def test_invalid_graph(self):
+        """순환 의존성 검출 테스트"""
+        logger.info("파이프라인 그래프 검증 테스트 시작")
+        
+        Stage = self.pipeline.PipelineStage
+        stages = [Stage('a', ['b'], lambda inputs: 1), Stage('b', ['a'], lambda inputs: 2)]
+        with self.assertRaises(ValueError):
+            self.pipeline.run_pipeline(stages)
+        
+        logger.info("파이프라인 그래프 검증 테스트 완료")
+    
+    def test_stage_cache(self):
+        """입력이 바뀌지 않은 단계의 캐시 재사용 테스트"""
+        logger.info("파이프라인 단계 캐시 테스트 시작")
+        
+        Stage = self.pipeline.PipelineStage
+        StageCache = self.pipeline.StageCache
+        calls = []
+        source = {'value': 1}
+        
+        def leaf(inputs):
+            calls.append('leaf')
+            return source['value']
+        
+        def double(inputs):
+            calls.append('double')
+            return inputs['leaf'] * 2
+        
+        stages = [
+            Stage('leaf', [], leaf),
+            Stage('double', ['leaf'], double, StageCache(params={'factor': 2}))
+        ]
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_path = os.path.join(temp_dir, 'pipeline_cache.json')
+            
+            first = self.pipeline.run_pipeline(stages, cache_path=cache_path)
+            second = self.pipeline.run_pipeline(stages, cache_path=cache_path)
+            self.assertEqual(second.results['double'], 2, "캐시된 결과가 올바르지 않음")
+            self.assertEqual(first.report['cache_hits'], [], "첫 실행에서 캐시가 사용됨")
+            self.assertEqual(second.report['cache_hits'], ['double'], "입력이 같은 단계가 다시 실행됨")
+            self.assertEqual(calls, ['leaf', 'double', 'leaf'], "캐시 적중 단계가 실행됨")
+            
+            # 입력이 바뀌면 다시 실행
+            source['value'] = 5
+            third = self.pipeline.run_pipeline(stages, cache_path=cache_path)
+            self.assertEqual(third.results['double'], 10, "변경된 입력이 반영되지 않음")
+            self.assertEqual(third.report['cache_hits'], [], "입력이 바뀐 단계가 캐시를 사용함")
+            
+            # 입력 파일은 내용 해시 함수의 결과로 비교 (해시가 같으면 파일 바이트가 달라도 캐시 사용)
+            input_file = os.path.join(temp_dir, 'input.json')
+            digests = {'value': 'a'}
+            digest_stages = [Stage('read', [], lambda inputs: calls.append('read') or 1,
+                                   StageCache(input_digests=[(input_file, lambda path: digests['value'])]))]
+            with open(input_file, 'w', encoding='utf-8') as f:
+                f.write('{"collected_at": 1}')
+            self.pipeline.run_pipeline(digest_stages, cache_path=cache_path)
+            with open(input_file, 'w', encoding='utf-8') as f:
+                f.write('{"collected_at": 2}')
+            self.assertEqual(self.pipeline.run_pipeline(digest_stages, cache_path=cache_path).report['cache_hits'], ['read'],
+                             "내용 해시가 같은 입력 파일의 단계가 다시 실행됨")
+            digests['value'] = 'b'
+            self.assertEqual(self.pipeline.run_pipeline(digest_stages, cache_path=cache_path).report['cache_hits'], [],
+                             "내용 해시가 바뀐 입력 파일의 단계가 캐시를 사용함")
+        
+        logger.info("파이프라인 단계 캐시 테스트 완료")
+
+    def test_update_stage_inputs(self):
+        """데이터 업데이트 단계 캐시가 입력 파일(국가 목록, 관세 규칙, 제품 목록)과 계산 코드를 포함하는지 테스트"""
+        logger.info("업데이트 단계 캐시 입력 테스트 시작")
+        
+        country_registry = importlib.import_module('src.country_registry')
+        stages = {stage.name: stage for stage in self.pipeline.build_update_stages()}
+        for name in [factor for factor, _ in self.pipeline.COST_FACTOR_COLLECTORS] + ['export_index']:
+            self.assertIn(country_registry.COUNTRIES_FILE, stages[name].cache.input_files,
+                          f"'{name}' 단계 캐시에 국가 목록 파일이 없음")
+        
+        # 수출 가격 지수 단계는 공식(수출 가격 엔진)과 관세 규칙, 제품 목록이 바뀌어도 다시 실행
+        export_price_engine = importlib.import_module('src.export_price_engine')
+        tariff_rules = importlib.import_module('src.tariff_rules')
+        hs_export_pipeline = importlib.import_module('src.hs_export_pipeline')
+        cache = stages['export_index'].cache
+        for module in (export_price_engine, tariff_rules, hs_export_pipeline):
+            self.assertIn(module, cache.code, f"수출 가격 지수 단계 캐시에 {module.__name__} 코드가 없음")
+        for path in (tariff_rules.TARIFF_RULES_FILE, hs_export_pipeline.HS_PRODUCTS_FILE):
+            self.assertIn(path, cache.input_files, f"수출 가격 지수 단계 캐시에 {os.path.basename(path)} 파일이 없음")
+        
+        logger.info("업데이트 단계 캐시 입력 테스트 완료")
+
+    def test_update_lock(self):
+        """업데이트 잠금을 잡은 동안 다른 업데이트(파이프라인, 자동 업데이트)가 실행되지 않는지 테스트"""
+        logger.info("업데이트 잠금 테스트 시작")
+        
+        auto_updater = importlib.import_module('src.auto_updater')
+        with self.pipeline.update_lock():
+            with self.assertRaises(self.pipeline.UpdateInProgressError):
+                with self.pipeline.update_lock():
+                    pass
+            with self.assertRaises(self.pipeline.UpdateInProgressError):
+                self.pipeline.run_update_pipeline()
+            self.assertFalse(auto_updater.update_all_data(), "잠금 중에 자동 업데이트가 실행됨")
+        
+        # 잠금 해제 후에는 다시 잡을 수 있음
+        with self.pipeline.update_lock() as lock:
+            self.assertTrue(lock.is_leader, "해제된 업데이트 잠금을 다시 잡지 못함")
+        
+        logger.info("업데이트 잠금 테스트 완료")
+
 class IntegrationTest(unittest.TestCase):
     """통합 테스트"""
     
@@ -491,10 +2347,33 @@ def run_tests():
     
     # 단위 테스트 추가
     test_suite.addTest(unittest.makeSuite(TariffDataCollectorTest))
+    test_suite.addTest(unittest.makeSuite(TariffStoreTest))
+    test_suite.addTest(unittest.makeSuite(TariffRatesTest))
+    test_suite.addTest(unittest.makeSuite(HSPrefixIndexTest))
+    test_suite.addTest(unittest.makeSuite(TariffTimelineTest))
     test_suite.addTest(unittest.makeSuite(ManufacturingCostSimulatorTest))
+    test_suite.addTest(unittest.makeSuite(CostIndexEngineTest))
     test_suite.addTest(unittest.makeSuite(ExportPriceCalculatorTest))
+    test_suite.addTest(unittest.makeSuite(ExportPriceEngineTest))
+    test_suite.addTest(unittest.makeSuite(ScenarioEngineTest))
+    test_suite.addTest(unittest.makeSuite(MonteCarloTest))
+    test_suite.addTest(unittest.makeSuite(SensitivityTest))
+    test_suite.addTest(unittest.makeSuite(CountryRegistryTest))
+    test_suite.addTest(unittest.makeSuite(HSExportPipelineTest))
+    test_suite.addTest(unittest.makeSuite(LandedCostTest))
+    test_suite.addTest(unittest.makeSuite(SourcingOptimizerTest))
+    test_suite.addTest(unittest.makeSuite(TariffRulesTest))
+    test_suite.addTest(unittest.makeSuite(ChartServiceTest))
+    test_suite.addTest(unittest.makeSuite(VersionedApiTest))
+    test_suite.addTest(unittest.makeSuite(WebStartupTest))
+    test_suite.addTest(unittest.makeSuite(SchedulerLeaderTest))
+    test_suite.addTest(unittest.makeSuite(SharedSnapshotTest))
     test_suite.addTest(unittest.makeSuite(DashboardAppTest))
+    test_suite.addTest(unittest.makeSuite(DataSnapshotCacheTest))
+    test_suite.addTest(unittest.makeSuite(SnapshotStoreTest))
+    test_suite.addTest(unittest.makeSuite(UpdateJobManagerTest))
     test_suite.addTest(unittest.makeSuite(AutoUpdaterTest))
+    test_suite.addTest(unittest.makeSuite(UpdatePipelineTest))
     
     # 통합 테스트 추가
     test_suite.addTest(unittest.makeSuite(IntegrationTest))
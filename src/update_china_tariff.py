@@ -5,14 +5,16 @@
 - 2025년 2월 4일: 10% 관세 부과
 - 2025년 3월 4일: 추가 10% 관세 부과 (총 20%)
 - 2025년 4월 2일: 추가 34% 관세 부과 (총 54%)
+단계별 세율과 다른 조치(기본 관세, 301조 등)와의 중첩은 관세 규칙(data/tariff_rules.json)의 결정 테이블로 계산합니다.
 """
 
 import os
 import json
-import pandas as pd
-import matplotlib.pyplot as plt
+import numpy as np
 from datetime import datetime
 
+from src import country_registry, hs_export_pipeline, tariff_rules, tariff_store
+
 # 프로젝트 루트 디렉토리 경로
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -21,27 +23,12 @@ DATA_DIR = os.path.join(ROOT_DIR, 'data')
 TARIFF_DATA_DIR = os.path.join(DATA_DIR, 'tariff_data')
 EXPORT_DATA_DIR = os.path.join(DATA_DIR, 'export_data')
 
-# 중국 관세 타임라인 정보
-CHINA_TARIFF_TIMELINE = [
-    {
-        "date": "2025-02-04",
-        "description": "트럼프 행정부의 첫 번째 관세 인상",
-        "additional_rate": 10.0,
-        "cumulative_rate": 10.0
-    },
-    {
-        "date": "2025-03-04",
-        "description": "트럼프 행정부의 두 번째 관세 인상",
-        "additional_rate": 10.0,
-        "cumulative_rate": 20.0
-    },
-    {
-        "date": "2025-04-02",
-        "description": "트럼프 행정부의 세 번째 관세 인상 ('해방의 날' 관세)",
-        "additional_rate": 34.0,
-        "cumulative_rate": 54.0
-    }
-]
+# 중국 관세 타임라인의 대상 국가와 항목 만료일
+CHINA = "CN"
+TIMELINE_EXPIRATION_DATE = "2025-12-31"
+
+# 관세 규칙에 일반 세율이 없는 품목의 기본 관세율 (HTS 자동차 부품 일반 세율)
+DEFAULT_BASE_RATE = 2.5
 
 # 중국의 미국에 대한 보복 관세 정보
 CHINA_RETALIATION = {
@@ -50,137 +37,119 @@ CHINA_RETALIATION = {
     "rate": 34.0
 }
 
+def china_tariff_timeline(table=None):
+    """관세 규칙(data/tariff_rules.json)에서 중국에만 적용되는 추가 관세의 단계별 타임라인을 만듭니다.
+
+    품목 범위가 없는 중국 단독 추가 관세 규칙의 적용 시작일마다 {date, rule, description, additional_rate,
+    cumulative_rate}를 반환하며, 누적 세율은 그 날짜에 결정 테이블이 적용하는 해당 규칙 세율의 합계입니다.
+    """
+    table = table or tariff_rules.get_table()
+    add_measures = [table.measure_names[measure] for measure in table.measure_mode('add')]
+    rows = sorted(
+        (row for row, rule in enumerate(table.rules)
+         if rule.countries == [CHINA] and rule.measure in add_measures and rule.effective_date
+         and rule.hs_prefixes == ['']),
+        key=lambda row: table.rules[row].effective_date
+    )
+
+    timeline = []
+    previous = 0.0
+    for row in rows:
+        rule = table.rules[row]
+        decision = table.evaluate([''], [CHINA], rule.effective_date)
+        applied = np.isin(decision.winners[:, 0, 0], rows) & ~decision.excluded[:, 0, 0]
+        cumulative = float(decision.contributions[applied, 0, 0].sum())
+        timeline.append({
+            "date": rule.effective_date,
+            "rule": rule.id,
+            "description": rule.description,
+            "additional_rate": cumulative - previous,
+            "cumulative_rate": cumulative
+        })
+        previous = cumulative
+    return timeline
+
+def korean_date(date):
+    """YYYY-MM-DD 날짜를 'YYYY년 M월 D일' 형식으로 변환합니다."""
+    year, month, day = (int(part) for part in date.split('-'))
+    return f"{year}년 {month}월 {day}일"
+
+def timeline_lines(timeline):
+    """타임라인 단계를 '- 2025년 2월 4일: 추가 10% 관세 부과 (총 10%)' 형식의 줄로 만듭니다."""
+    return "".join(
+        f"- {korean_date(step['date'])}: 추가 {step['additional_rate']:g}% 관세 부과 (총 {step['cumulative_rate']:g}%)\n"
+        for step in timeline
+    )
+
 def update_china_tariff_data():
     """
-    중국에 대한 관세 데이터를 업데이트합니다.
+    중국에 대한 관세 데이터를 관세 규칙의 단계별 실효 관세율로 업데이트합니다.
     """
     print("중국 관세 데이터 업데이트 중...")
     
-    # 중국 관세 데이터 파일 경로
-    china_tariff_file = os.path.join(TARIFF_DATA_DIR, "CN_tariff_data.json")
-    
-    # 기존 파일이 있으면 로드, 없으면 새로 생성
-    if os.path.exists(china_tariff_file):
-        with open(china_tariff_file, 'r', encoding='utf-8') as f:
-            china_tariff_data = json.load(f)
-    else:
-        china_tariff_data = {
-            "country_code": "CN",
-            "country_name": "중국",
-            "last_updated": datetime.now().strftime('%Y-%m-%d'),
-            "tariff_data": []
-        }
-    
-    # 타임라인 정보 추가
-    china_tariff_data["tariff_timeline"] = CHINA_TARIFF_TIMELINE
-    china_tariff_data["retaliation_info"] = CHINA_RETALIATION
-    
-    # 기존 데이터에서 HS 코드 항목 가져오기
-    hs_codes = set()
-    if "tariff_data" in china_tariff_data:
-        for item in china_tariff_data["tariff_data"]:
-            if "hs_code" in item:
-                hs_codes.add(item["hs_code"])
-    
-    # 기존 데이터 초기화
-    china_tariff_data["tariff_data"] = []
-    
-    # 모든 HS 코드에 대해 업데이트된 관세율 적용
-    for hs_code in hs_codes:
-        # 기본 관세율 (HS 코드별로 다를 수 있음)
-        base_rate = 0.0
+    # 기간이 지정된 기존 중국 관세 항목의 HS 코드 가져오기 (샘플 HTS 품목 제외)
+    table = tariff_store.read_table()
+    china_rows = tariff_store.select(table, country_code=CHINA) & ~np.isnat(table.effective_date)
+    hs_codes = sorted(set(table.hs_codes[table.hs_id[china_rows]].tolist()))
+    
+    # 제품 목록의 HS 코드별 제품 설명 (제품 목록에 없는 HS 코드는 자동차 부품)
+    products = hs_export_pipeline.load_products()
+    descriptions = dict(zip(products.hs_codes.tolist(), products.descriptions.tolist()))
+    
+    # 타임라인 단계마다 모든 HS 코드의 실효 관세율을 결정 테이블로 한 번에 계산
+    # (일반 세율 규칙이 없는 품목의 기본 관세율은 DEFAULT_BASE_RATE)
+    timeline = china_tariff_timeline()
+    rule_table = tariff_rules.get_table()
+    records = []
+    for i, step in enumerate(timeline):
+        effective_date = step["date"]
+        expiration_date = timeline[i + 1]["date"] if i < len(timeline) - 1 else TIMELINE_EXPIRATION_DATE
+        decision = rule_table.evaluate(hs_codes, [CHINA], effective_date, np.full(len(hs_codes), DEFAULT_BASE_RATE))
         
-        if hs_code == "8501.31":  # DC 모터
-            base_rate = 2.5
-        elif hs_code == "8414.59":  # 팬, 블로워
-            base_rate = 2.3
-        else:
-            base_rate = 2.5  # 기본값
-        
-        # 제품 설명 설정
-        if hs_code == "8501.31":
-            product_description = "DC 모터, 출력 750W 이하"
-        elif hs_code == "8414.59":
-            product_description = "팬, 블로워 등"
-        else:
-            product_description = "자동차 부품"
-        
-        # 각 타임라인 단계별로 관세 데이터 항목 생성
-        for i, timeline in enumerate(CHINA_TARIFF_TIMELINE):
-            effective_date = timeline["date"]
-            expiration_date = CHINA_TARIFF_TIMELINE[i+1]["date"] if i < len(CHINA_TARIFF_TIMELINE) - 1 else "2025-12-31"
-            cumulative_rate = timeline["cumulative_rate"]
-            
-            # 총 관세율 = 기본 관세율 + 추가 관세율
-            total_rate = base_rate + cumulative_rate
-            
-            tariff_item = {
+        for hs_code, total_rate, base_rate in zip(hs_codes, decision.rates[:, 0].tolist(),
+                                                  decision.base_rates[:, 0].tolist()):
+            additional_rate = total_rate - base_rate
+            records.append({
+                "country_code": CHINA,
                 "hs_code": hs_code,
-                "product_description": product_description,
-                "tariff_rate": total_rate,
+                "description": descriptions.get(hs_code) or "자동차 부품",
+                "rate": total_rate,
                 "base_rate": base_rate,
-                "additional_rate": cumulative_rate,
+                "additional_rate": additional_rate,
                 "effective_date": effective_date,
                 "expiration_date": expiration_date,
-                "notes": f"트럼프 행정부 관세 정책 반영 (기본 {base_rate}% + 추가 {cumulative_rate}%)"
-            }
-            
-            # 관세 데이터에 추가
-            china_tariff_data["tariff_data"].append(tariff_item)
-    
-    # 마지막 업데이트 시간 갱신
-    china_tariff_data["last_updated"] = datetime.now().strftime('%Y-%m-%d')
-    
-    # 업데이트된 데이터 저장
-    with open(china_tariff_file, 'w', encoding='utf-8') as f:
-        json.dump(china_tariff_data, f, ensure_ascii=False, indent=2)
+                "notes": f"관세 규칙 적용 (기본 {base_rate}% + 추가 {additional_rate}%)"
+            })
     
-    print(f"중국 관세 데이터 업데이트 완료: {china_tariff_file}")
+    # 중국 항목 교체 및 타임라인 정보 저장
+    tariff_store.upsert_lines(records, hs_codes=hs_codes, countries=[CHINA], metadata={
+        "countries": {
+            CHINA: {
+                "country_name": country_registry.target_countries().get(CHINA, CHINA),
+                "tariff_timeline": timeline,
+                "retaliation_info": CHINA_RETALIATION
+            }
+        }
+    })
     
-    # 관세 데이터 요약 CSV 파일 업데이트
-    update_tariff_summary_csv()
+    print(f"중국 관세 데이터 업데이트 완료: {len(records)}개 항목")
 
 def update_tariff_summary_csv():
     """
-    업데이트된 관세 데이터를 요약하여 CSV 파일로 저장합니다.
+    관세 데이터 저장소를 요약하여 CSV 파일로 내보냅니다.
     """
     print("관세 데이터 요약 CSV 파일 업데이트 중...")
     
-    # 모든 국가의 관세 데이터 로드
-    all_tariff_data = []
-    
-    for country_code in ["KR", "JP", "CN", "IN", "TH", "VN", "TW", "EU", "MX"]:
-        country_file = os.path.join(TARIFF_DATA_DIR, f"{country_code}_tariff_data.json")
-        if os.path.exists(country_file):
-            with open(country_file, 'r', encoding='utf-8') as f:
-                country_data = json.load(f)
-                
-                if "tariff_data" in country_data:
-                    for item in country_data["tariff_data"]:
-                        if "hs_code" in item and "tariff_rate" in item:
-                            all_tariff_data.append({
-                                "Country_Code": country_code,
-                                "Country_Name": country_data.get("country_name", country_code),
-                                "HS_Code": item["hs_code"],
-                                "Product_Description": item.get("product_description", ""),
-                                "Tariff_Rate": item["tariff_rate"],
-                                "Base_Rate": item.get("base_rate", item["tariff_rate"]),
-                                "Additional_Rate": item.get("additional_rate", 0.0),
-                                "Effective_Date": item.get("effective_date", ""),
-                                "Expiration_Date": item.get("expiration_date", ""),
-                                "Notes": item.get("notes", "")
-                            })
-    
-    # DataFrame 생성 및 CSV 저장
-    df = pd.DataFrame(all_tariff_data)
-    csv_file = os.path.join(TARIFF_DATA_DIR, "tariff_summary.csv")
-    df.to_csv(csv_file, index=False, encoding='utf-8')
+    csv_file = tariff_store.export_summary_csv(tariff_store.read_table())
     
     print(f"관세 데이터 요약 CSV 파일 업데이트 완료: {csv_file}")
 
-def update_export_price_calculations():
+def update_export_price_calculations(as_of_date=None):
     """
     수출 가격 계산을 업데이트합니다.
+    
+    as_of_date(YYYY-MM-DD) 기준 관세 규칙의 실효 관세율을 사용하며,
+    지정하지 않으면 중국 관세 타임라인의 마지막 단계 적용 시작일을 기준으로 합니다.
     """
     print("수출 가격 계산 업데이트 중...")
     
@@ -189,210 +158,35 @@ def update_export_price_calculations():
     with open(manufacturing_cost_file, 'r', encoding='utf-8') as f:
         manufacturing_costs = json.load(f)
     
-    # 화물 비용 데이터 (미국으로의 수출 비용)
-    freight_costs = {
-        "KR": 1500,  # USD
-        "JP": 1600,
-        "CN": 1400,
-        "IN": 2200,
-        "TH": 1900,
-        "VN": 1800,
-        "TW": 1550,
-        "EU": 2500,
-        "MX": 1000
-    }
-    
-    # 관세 데이터 로드
-    tariff_summary_file = os.path.join(TARIFF_DATA_DIR, "tariff_summary.csv")
-    tariff_df = pd.read_csv(tariff_summary_file)
-    
-    # 최신 관세율 데이터 추출 (가장 최근 effective_date 기준)
-    latest_tariffs = {}
-    
-    for hs_code in ["8501.31", "8414.59"]:
-        hs_df = tariff_df[tariff_df["HS_Code"] == hs_code]
-        latest_tariffs[hs_code] = {}
-        
-        for country_code in ["KR", "JP", "CN", "IN", "TH", "VN", "TW", "EU", "MX"]:
-            country_df = hs_df[hs_df["Country_Code"] == country_code]
-            
-            if not country_df.empty:
-                # effective_date 기준으로 정렬하여 가장 최근 데이터 선택
-                country_df = country_df.sort_values("Effective_Date", ascending=False)
-                latest_tariffs[hs_code][country_code] = country_df.iloc[0]["Tariff_Rate"]
-            else:
-                # 데이터가 없는 경우 기본값 설정
-                latest_tariffs[hs_code][country_code] = 0.0
-    
-    # 무역 협정 혜택 데이터
-    trade_agreement_benefits = {
-        "KR": {
-            "agreement": "한-미 FTA",
-            "benefit_description": "대부분의 자동차 부품에 대해 관세 면제",
-            "benefit_percentage": 100.0
-        },
-        "JP": {
-            "agreement": "일반 관세",
-            "benefit_description": "무역 협정 혜택 없음",
-            "benefit_percentage": 0.0
-        },
-        "CN": {
-            "agreement": "추가 관세 부과",
-            "benefit_description": "트럼프 행정부의 단계적 추가 관세 부과 (2월 10%, 3월 20%, 4월 54%)",
-            "benefit_percentage": -54.0
-        },
-        "IN": {
-            "agreement": "일반 관세",
-            "benefit_description": "무역 협정 혜택 없음",
-            "benefit_percentage": 0.0
-        },
-        "TH": {
-            "agreement": "일반 관세",
-            "benefit_description": "무역 협정 혜택 없음",
-            "benefit_percentage": 0.0
-        },
-        "VN": {
-            "agreement": "일반 관세",
-            "benefit_description": "무역 협정 혜택 없음",
-            "benefit_percentage": 0.0
-        },
-        "TW": {
-            "agreement": "일반 관세",
-            "benefit_description": "무역 협정 혜택 없음",
-            "benefit_percentage": 0.0
-        },
-        "EU": {
-            "agreement": "미-EU 무역협정",
-            "benefit_description": "대부분의 자동차 부품에 대해 관세 면제",
-            "benefit_percentage": 100.0
-        },
-        "MX": {
-            "agreement": "USMCA",
-            "benefit_description": "대부분의 자동차 부품에 대해 관세 면제",
-            "benefit_percentage": 100.0
-        }
-    }
+    # 화물 비용 데이터 (미국으로의 수출 비용, 국가 레지스트리의 freight_cost)
+    freight_costs = country_registry.country_parameter('freight_cost')
+    
+    # 제품 목록 전체의 (HS 코드, 국가) 실효 관세율 (기본 관세 + FTA 특혜 + 301조·IEEPA·상호 관세 등 중첩)
+    timeline = china_tariff_timeline()
+    as_of_date = as_of_date or (timeline[-1]["date"] if timeline else datetime.now().strftime('%Y-%m-%d'))
+    countries = country_registry.country_codes()
+    products = hs_export_pipeline.load_products()
+    tariffs = tariff_rules.effective_rates(products.hs_codes, countries, as_of_date)
+    print(f"관세율 기준일: {as_of_date}")
     
-    # 무역 협정 혜택 데이터 저장
+    # 무역 협정 혜택 데이터 저장 (관세 규칙의 특혜 세율 적용 현황, 혜택은 이미 실효 관세율에 반영됨)
     benefits_file = os.path.join(EXPORT_DATA_DIR, "trade_agreement_benefits.json")
     with open(benefits_file, 'w', encoding='utf-8') as f:
-        json.dump(trade_agreement_benefits, f, ensure_ascii=False, indent=2)
-    
-    # 각 HS 코드별로 수출 가격 계산
-    for hs_code in ["8501.31", "8414.59"]:
-        product_name = "DC_모터" if hs_code == "8501.31" else "팬_블로워"
-        product_desc = "DC 모터, 출력 750W 이하" if hs_code == "8501.31" else "팬, 블로워 등"
-        
-        # 수출 가격 지수 계산 (한국 = 100 기준)
-        export_price_index = {}
-        
-        for country_code in ["KR", "JP", "CN", "IN", "TH", "VN", "TW", "EU", "MX"]:
-            # 제조 비용 지수 (한국 = 100 기준)
-            manufacturing_index = manufacturing_costs["manufacturing_cost_index"][country_code]
-            
-            # 화물 비용 지수 (한국 = 100 기준)
-            freight_index = (freight_costs[country_code] / freight_costs["KR"]) * 100
-            
-            # 관세율
-            tariff_rate = latest_tariffs[hs_code][country_code]
-            
-            # 무역 협정 혜택
-            benefit_percentage = trade_agreement_benefits[country_code]["benefit_percentage"]
-            
-            # 수출 가격 지수 계산 (제조 비용 70%, 화물 비용 10%, 관세 20% 가중치)
-            # 무역 협정 혜택은 관세에 적용됨
-            manufacturing_component = manufacturing_index * 0.7
-            freight_component = freight_index * 0.1
-            
-            # 관세 영향 계산 (한국 = 100 기준)
-            # 한국의 관세율이 0%이므로, 다른 국가의 관세 영향은 상대적으로 계산
-            tariff_component = 100 * 0.2  # 기본값 (한국)
-            if country_code != "KR":
-                # 관세율에 따른 영향 계산 (관세율이 높을수록 수출 가격 지수가 높아짐)
-                tariff_impact = (1 + (tariff_rate / 100))
-                tariff_component = 100 * tariff_impact * 0.2
-            
-            # 무역 협정 혜택 적용
-            if benefit_percentage > 0:
-                # 혜택이 있는 경우 관세 영향 감소
-                tariff_component = tariff_component * (1 - (benefit_percentage / 100))
-            elif benefit_percentage < 0:
-                # 불이익이 있는 경우 관세 영향 증가
-                tariff_component = tariff_component * (1 - (benefit_percentage / 100))
-            
-            # 최종 수출 가격 지수 계산
-            export_price_index[country_code] = manufacturing_component + freight_component + tariff_component
-        
-        # 한국을 100으로 정규화
-        kr_value = export_price_index["KR"]
-        for country_code in export_price_index:
-            export_price_index[country_code] = (export_price_index[country_code] / kr_value) * 100
-        
-        # 수출 가격 지수 저장
-        export_index_file = os.path.join(EXPORT_DATA_DIR, f"export_price_index_{hs_code}_{product_name}.json")
-        with open(export_index_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                "hs_code": hs_code,
-                "product_description": product_desc,
-                "base_country": "KR",
-                "calculation_date": datetime.now().strftime('%Y-%m-%d'),
-                "export_price_index": export_price_index
-            }, f, ensure_ascii=False, indent=2)
-        
-        print(f"수출 가격 지수 저장 완료: {export_index_file}")
-        
-        # CSV 파일로도 저장
-        csv_data = []
-        for country_code, index_value in export_price_index.items():
-            country_name = {
-                "KR": "대한민국",
-                "JP": "일본",
-                "CN": "중국",
-                "IN": "인도",
-                "TH": "태국",
-                "VN": "베트남",
-                "TW": "대만",
-                "EU": "유럽연합",
-                "MX": "멕시코"
-            }.get(country_code, country_code)
-            
-            csv_data.append({
-                "Country_Code": country_code,
-                "Country_Name": country_name,
-                "Export_Price_Index": round(index_value, 1)
-            })
-        
-        df = pd.DataFrame(csv_data)
-        csv_file = os.path.join(EXPORT_DATA_DIR, f"export_price_index_{hs_code}_{product_name}.csv")
-        df.to_csv(csv_file, index=False, encoding='utf-8')
-        
-        print(f"수출 가격 지수 CSV 파일 저장 완료: {csv_file}")
-        
-        # 시각화
-        plt.figure(figsize=(12, 6))
-        countries = [csv_data[i]["Country_Name"] for i in range(len(csv_data))]
-        indices = [csv_data[i]["Export_Price_Index"] for i in range(len(csv_data))]
-        
-        bars = plt.bar(countries, indices, color='skyblue')
-        plt.axhline(y=100, color='r', linestyle='-', alpha=0.3)  # 한국 기준선
-        
-        # 값 표시
-        for bar in bars:
-            height = bar.get_height()
-            plt.text(bar.get_x() + bar.get_width()/2., height + 1,
-                    f'{height:.1f}', ha='center', va='bottom')
-        
-        plt.title(f'국가별 수출 가격 지수 비교 (HS {hs_code}, 한국=100)')
-        plt.xlabel('국가')
-        plt.ylabel('수출 가격 지수')
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        
-        # 그래프 저장
-        plt.savefig(os.path.join(EXPORT_DATA_DIR, f"export_price_index_{hs_code}_{product_name}.png"))
-        plt.close()
-        
-        print(f"수출 가격 지수 시각화 저장 완료: {os.path.join(EXPORT_DATA_DIR, f'export_price_index_{hs_code}_{product_name}.png')}")
+        json.dump(tariff_rules.trade_agreements(products.hs_codes, countries, as_of_date), f, ensure_ascii=False, indent=2)
+    
+    # 제품 목록 전체의 수출 가격 지수를 한 번에 계산
+    # (제조 비용 70%, 화물 비용 10%, 관세 20% 가중치, 한국 = 100 기준)
+    result = hs_export_pipeline.compute_export_indices(
+        products, countries,
+        cost_indices={None: manufacturing_costs["manufacturing_cost_index"]},
+        freight=freight_costs,
+        tariff=tariffs,
+        formula='weighted_70_10_20'
+    )
+    
+    # 모든 HS 코드의 수출 가격 지수를 하나의 통합 파일로 저장
+    export_index_file = hs_export_pipeline.write_export_indices(result, EXPORT_DATA_DIR)
+    print(f"수출 가격 지수 저장 완료: {export_index_file} (HS 코드 {len(result)}개)")
     
     # 한국어 형식의 수출 가격 비교 결과 생성
     create_korean_export_price_comparison()
@@ -407,37 +201,20 @@ def create_korean_export_price_comparison():
     
     result_text = "# 국가별 미국 수출 가격 비교 (한국 = 100 기준)\n\n"
     result_text += "## 미국의 중국에 대한 단계적 관세 인상 정책 반영\n"
-    result_text += "- 2025년 2월 4일: 10% 관세 부과\n"
-    result_text += "- 2025년 3월 4일: 추가 10% 관세 부과 (총 20%)\n"
-    result_text += "- 2025년 4월 2일: 추가 34% 관세 부과 (총 54%)\n\n"
+    result_text += timeline_lines(china_tariff_timeline()) + "\n"
     
-    for hs_code in ["8501.31", "8414.59"]:
-        product_name = "DC_모터" if hs_code == "8501.31" else "팬_블로워"
-        product_desc = "DC 모터, 출력 750W 이하" if hs_code == "8501.31" else "팬, 블로워 등"
-        
-        # 수출 가격 지수 로드
-        export_index_file = os.path.join(EXPORT_DATA_DIR, f"export_price_index_{hs_code}_{product_name}.json")
-        with open(export_index_file, 'r', encoding='utf-8') as f:
-            export_data = json.load(f)
-        
+    # 통합 파일의 HS 코드별 수출 가격 지수 로드
+    result = hs_export_pipeline.read_export_indices(
+        os.path.join(EXPORT_DATA_DIR, hs_export_pipeline.HS_EXPORT_INDEX_FILE_NAME))
+    country_names = country_registry.target_countries()
+    
+    for hs_code, _, product_desc, export_price_index in result.items():
         result_text += f"## HS {hs_code} ({product_desc})\n\n"
         
         # 국가별 수출 가격 지수를 한국어 형식으로 변환
-        country_names = {
-            "KR": "대한민국",
-            "JP": "일본",
-            "CN": "중국",
-            "IN": "인도",
-            "TH": "태국",
-            "VN": "베트남",
-            "TW": "대만",
-            "EU": "유럽연합",
-            "MX": "멕시코"
-        }
-        
-        for country_code in ["KR", "JP", "CN", "IN", "TH", "VN", "TW", "EU", "MX"]:
-            index_value = export_data["export_price_index"][country_code]
-            result_text += f"{country_names[country_code]} → 미국: {index_value:.1f}  \n"
+        for country_code, country_name in country_names.items():
+            index_value = export_price_index[country_code]
+            result_text += f"{country_name} → 미국: {index_value:.1f}  \n"
         
         result_text += "\n"
     
@@ -448,22 +225,69 @@ def create_korean_export_price_comparison():
     
     print(f"한국어 형식의 수출 가격 비교 결과 저장 완료: {result_file}")
 
-def create_china_tariff_timeline_report():
+def create_china_tariff_timeline_report(as_of_date=None):
     """
     중국 관세 타임라인 보고서를 생성합니다.
+    
+    HS 코드별 관세 구성은 as_of_date(YYYY-MM-DD, 생략하면 타임라인의 마지막 단계 적용 시작일) 기준
+    관세 규칙의 적용 근거(explain)로 만듭니다.
     """
     print("중국 관세 타임라인 보고서 생성 중...")
     
-    report = """# 미국의 중국에 대한 관세 정책 타임라인 보고서
+    timeline = china_tariff_timeline()
+    as_of_date = as_of_date or (timeline[-1]["date"] if timeline else datetime.now().strftime('%Y-%m-%d'))
+    steps = "".join(
+        f"{i}. **{korean_date(step['date'])}**: {step['description']} - 추가 {step['additional_rate']:g}% "
+        f"(총 {step['cumulative_rate']:g}%)\n"
+        for i, step in enumerate(timeline, start=1)
+    )
+    
+    # 제품 목록 HS 코드의 중국산 관세 구성 (적용된 조치별 기여분)
+    rule_table = tariff_rules.get_table()
+    products = hs_export_pipeline.load_products()
+    impacts = ""
+    for hs_code, description in zip(products.hs_codes.tolist(), products.descriptions.tolist()):
+        explanation = rule_table.explain(hs_code, CHINA, as_of_date, DEFAULT_BASE_RATE)
+        parts = [f"{item['description']} {item['contribution']:g}%" for item in explanation['trace']
+                 if item['status'] == 'applied' and item['mode'] == 'add']
+        impacts += (f"- **HS {hs_code}** ({description}): 기본 관세 {explanation['base_rate']:g}%"
+                    + "".join(f" + {part}" for part in parts)
+                    + f" = 총 {explanation['effective_rate']:g}%\n")
+    
+    # 수출 가격 경쟁력 (HS 코드별 수출 가격 지수의 국가별 평균, 지수 파일이 없으면 생략)과 관세 부담이 낮은 국가
+    country_names = country_registry.target_countries()
+    countries = list(country_names)
+    mean_rates = dict(zip(countries, hs_export_pipeline.country_tariff_rates(countries, as_of_date).tolist()))
+    low_tariff = [code for code in sorted(countries, key=mean_rates.get) if code not in (CHINA, 'KR')][:3]
+    low_tariff_text = ", ".join(f"{country_names[code]}({mean_rates[code]:.1f}%)" for code in low_tariff)
+    result = hs_export_pipeline.read_export_indices(
+        os.path.join(EXPORT_DATA_DIR, hs_export_pipeline.HS_EXPORT_INDEX_FILE_NAME))
+    if result is not None:
+        mean_index = dict(zip(result.countries, result.values.mean(axis=0).tolist()))
+        others = sorted((code for code in mean_index if code not in (CHINA, result.base_country)), key=mean_index.get)[:3]
+        competitiveness = (
+            f"기준 국가({country_names[result.base_country]})를 100으로 했을 때, 제품 목록 HS 코드 평균 중국의 수출 가격 지수는 "
+            f"{mean_index[CHINA]:.1f}입니다. 수출 가격 지수가 가장 낮은 국가는 "
+            + ", ".join(f"{country_names[code]}({mean_index[code]:.1f})" for code in others) + "입니다."
+        )
+    else:
+        competitiveness = "HS 코드별 수출 가격 지수 파일이 없어 수출 가격 지수를 비교하지 못했습니다."
+    
+    # 한국의 무역 협정 적용 현황
+    korea = tariff_rules.trade_agreements(products.hs_codes, ['KR'], as_of_date)['KR']
+    if korea['agreement']:
+        korea_text = (f"한국은 {korea['benefit_description']} 혜택(기본 관세 평균 {korea['duty_reduction']:.1f}%p 감면)을 받으며, "
+                      f"추가 관세를 포함한 평균 실효 관세율은 {mean_rates['KR']:.1f}%입니다.")
+    else:
+        korea_text = f"한국에 적용되는 무역 협정 특혜가 없으며 평균 실효 관세율은 {mean_rates['KR']:.1f}%입니다."
+    
+    report = f"""# 미국의 중국에 대한 관세 정책 타임라인 보고서
 
 ## 트럼프 행정부의 단계적 관세 인상 정책
 
 트럼프 행정부는 취임 이후 중국에 대한 관세를 단계적으로 인상했습니다:
 
-1. **2025년 2월 4일**: 첫 번째 관세 인상 - 10% 추가 관세 부과
-2. **2025년 3월 4일**: 두 번째 관세 인상 - 추가 10% 관세 부과 (총 20%)
-3. **2025년 4월 2일**: 세 번째 관세 인상 ('해방의 날' 관세) - 추가 34% 관세 부과 (총 54%)
-
+{steps}
 ## 중국의 보복 관세
 
 중국 정부는 트럼프 행정부의 관세 공격에 대응하여 다음과 같은 보복 조치를 발표했습니다:
@@ -472,23 +296,21 @@ def create_china_tariff_timeline_report():
 
 ## 자동차 부품에 대한 영향
 
-자동차 부품 중 특히 다음 HS 코드에 대한 영향이 큽니다:
-
-- **HS 8501.31** (DC 모터, 출력 750W 이하): 기본 관세 2.5% + 추가 관세 54% = 총 56.5%
-- **HS 8414.59** (팬, 블로워 등): 기본 관세 2.3% + 추가 관세 54% = 총 56.3%
+자동차 부품 중 특히 다음 HS 코드에 대한 영향이 큽니다 ({korean_date(as_of_date)} 기준 관세 규칙 적용):
 
+{impacts}
 ## 수출 가격 경쟁력 분석
 
-중국에 대한 높은 관세율로 인해 중국에서 미국으로의 수출 가격 경쟁력이 크게 약화되었습니다. 한국을 100으로 기준했을 때, 중국의 수출 가격 지수는 약 140 수준으로 상승했습니다. 이는 베트남(약 93), 인도(약 94), 태국(약 97) 등 다른 아시아 국가들에 비해 현저히 높은 수준입니다.
+중국에 대한 높은 관세율(제품 목록 평균 실효 관세율 {mean_rates[CHINA]:.1f}%)로 인해 중국에서 미국으로의 수출 가격 경쟁력이 크게 약화되었습니다. {competitiveness}
 
 ## 시사점
 
 1. 중국의 미국 수출 경쟁력 약화로 인해 글로벌 공급망 재편이 가속화될 것으로 예상됩니다.
-2. 베트남, 인도, 태국 등 관세 부담이 적은 국가들의 수출 경쟁력이 강화될 것입니다.
-3. 한국은 한-미 FTA 혜택으로 관세 면제를 유지하고 있어 상대적으로 유리한 위치에 있습니다.
+2. {low_tariff_text} 등 관세 부담이 적은 국가들의 수출 경쟁력이 강화될 것입니다.
+3. {korea_text}
 4. 자동차 부품 제조업체들은 중국 외 지역으로의 생산 기지 이전을 고려할 필요가 있습니다.
 
-이 보고서는 2025년 4월 7일 기준 정보를 바탕으로 작성되었으며, 향후 정책 변화에 따라 업데이트될 수 있습니다.
+이 보고서는 {korean_date(as_of_date)} 기준 관세 규칙을 바탕으로 작성되었으며, 향후 정책 변화에 따라 업데이트될 수 있습니다.
 """
     
     # 보고서 저장
@@ -519,52 +341,18 @@ def update_dashboard_data():
         }
     
     # 중국 관세 타임라인 정보 추가
-    dashboard_data["china_tariff_timeline"] = CHINA_TARIFF_TIMELINE
+    dashboard_data["china_tariff_timeline"] = china_tariff_timeline()
     dashboard_data["china_retaliation"] = CHINA_RETALIATION
     
-    # 관세 요약 데이터 업데이트
-    tariff_summary_file = os.path.join(TARIFF_DATA_DIR, "tariff_summary.csv")
-    if os.path.exists(tariff_summary_file):
-        tariff_df = pd.read_csv(tariff_summary_file)
-        
-        # HS 코드별로 그룹화
-        for hs_code in ["8501.31", "8414.59"]:
-            hs_data = tariff_df[tariff_df["HS_Code"] == hs_code]
-            
-            if not hs_data.empty:
-                product_desc = hs_data.iloc[0]["Product_Description"]
-                
-                dashboard_data["tariff_summary"][hs_code] = {
-                    "product_description": product_desc,
-                    "country_rates": {}
-                }
-                
-                for _, row in hs_data.iterrows():
-                    country_code = row["Country_Code"]
-                    country_name = row["Country_Name"]
-                    tariff_rate = row["Tariff_Rate"]
-                    
-                    dashboard_data["tariff_summary"][hs_code]["country_rates"][country_code] = {
-                        "country_name": country_name,
-                        "tariff_rate": tariff_rate,
-                        "effective_date": row["Effective_Date"] if "Effective_Date" in row else ""
-                    }
-    
-    # 수출 가격 지수 데이터 업데이트
-    for hs_code in ["8501.31", "8414.59"]:
-        product_name = "DC_모터" if hs_code == "8501.31" else "팬_블로워"
-        export_index_file = os.path.join(EXPORT_DATA_DIR, f"export_price_index_{hs_code}_{product_name}.json")
-        
-        if os.path.exists(export_index_file):
-            with open(export_index_file, 'r', encoding='utf-8') as f:
-                export_data = json.load(f)
-                
-                dashboard_data["export_price_indices"][hs_code] = {
-                    "product_description": export_data["product_description"],
-                    "base_country": export_data["base_country"],
-                    "calculation_date": export_data["calculation_date"],
-                    "indices": export_data["export_price_index"]
-                }
+    # 관세 요약 및 수출 가격 지수 데이터 업데이트 (제품 목록의 모든 HS 코드, 국가별 최신 관세 항목 기준)
+    products = hs_export_pipeline.load_products()
+    dashboard_data["tariff_summary"].update(
+        hs_export_pipeline.tariff_summary(tariff_store.read_table(), products.hs_codes))
+    
+    result = hs_export_pipeline.read_export_indices(
+        os.path.join(EXPORT_DATA_DIR, hs_export_pipeline.HS_EXPORT_INDEX_FILE_NAME))
+    if result is not None:
+        dashboard_data["export_price_indices"].update(hs_export_pipeline.export_index_summary(result))
     
     # 마지막 업데이트 시간 갱신
     dashboard_data["last_updated"] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
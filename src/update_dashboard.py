@@ -6,10 +6,11 @@
 
 import os
 import json
-import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
 from datetime import datetime
-import shutil
+
+from src import country_registry, hs_export_pipeline, tariff_store
 
 # 프로젝트 루트 디렉토리 경로
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -27,19 +28,6 @@ def update_dashboard_data():
     """
     print("대시보드 데이터 업데이트 중...")
     
-    # 정적 이미지 디렉토리가 없으면 생성
-    os.makedirs(STATIC_IMAGES_DIR, exist_ok=True)
-    
-    # 수출 가격 지수 이미지 파일을 정적 디렉토리로 복사
-    for hs_code in ["8501.31", "8414.59"]:
-        product_name = "DC_모터" if hs_code == "8501.31" else "팬_블로워"
-        source_file = os.path.join(EXPORT_DATA_DIR, f"export_price_index_{hs_code}_{product_name}.png")
-        target_file = os.path.join(STATIC_IMAGES_DIR, f"export_price_index_{hs_code}.png")
-        
-        if os.path.exists(source_file):
-            shutil.copy2(source_file, target_file)
-            print(f"수출 가격 지수 이미지 복사 완료: {target_file}")
-    
     # 대시보드 데이터 파일 생성
     dashboard_data = {
         "last_updated": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
@@ -47,49 +35,15 @@ def update_dashboard_data():
         "export_price_indices": {}
     }
     
-    # 관세 요약 데이터 로드
-    tariff_summary_file = os.path.join(TARIFF_DATA_DIR, "tariff_summary.csv")
-    if os.path.exists(tariff_summary_file):
-        tariff_df = pd.read_csv(tariff_summary_file)
-        
-        # HS 코드별로 그룹화
-        for hs_code in ["8501.31", "8414.59"]:
-            hs_data = tariff_df[tariff_df["HS_Code"] == hs_code]
-            
-            if not hs_data.empty:
-                product_desc = hs_data.iloc[0]["Product_Description"]
-                
-                dashboard_data["tariff_summary"][hs_code] = {
-                    "product_description": product_desc,
-                    "country_rates": {}
-                }
-                
-                for _, row in hs_data.iterrows():
-                    country_code = row["Country_Code"]
-                    country_name = row["Country_Name"]
-                    tariff_rate = row["Tariff_Rate"]
-                    
-                    dashboard_data["tariff_summary"][hs_code]["country_rates"][country_code] = {
-                        "country_name": country_name,
-                        "tariff_rate": tariff_rate,
-                        "effective_date": "2025-04-09"
-                    }
-    
-    # 수출 가격 지수 데이터 로드
-    for hs_code in ["8501.31", "8414.59"]:
-        product_name = "DC_모터" if hs_code == "8501.31" else "팬_블로워"
-        export_index_file = os.path.join(EXPORT_DATA_DIR, f"export_price_index_{hs_code}_{product_name}.json")
-        
-        if os.path.exists(export_index_file):
-            with open(export_index_file, 'r', encoding='utf-8') as f:
-                export_data = json.load(f)
-                
-                dashboard_data["export_price_indices"][hs_code] = {
-                    "product_description": export_data["product_description"],
-                    "base_country": export_data["base_country"],
-                    "calculation_date": export_data["calculation_date"],
-                    "indices": export_data["export_price_index"]
-                }
+    # 관세 요약 데이터 로드 (제품 목록의 모든 HS 코드, 국가별 최신 관세 항목 기준)
+    products = hs_export_pipeline.load_products()
+    dashboard_data["tariff_summary"] = hs_export_pipeline.tariff_summary(tariff_store.read_table(), products.hs_codes)
+    
+    # 수출 가격 지수 데이터 로드 (HS 코드별 수출 가격 지수 통합 파일)
+    result = hs_export_pipeline.read_export_indices(
+        os.path.join(EXPORT_DATA_DIR, hs_export_pipeline.HS_EXPORT_INDEX_FILE_NAME))
+    if result is not None:
+        dashboard_data["export_price_indices"] = hs_export_pipeline.export_index_summary(result)
     
     # 대시보드 데이터 저장
     dashboard_data_file = os.path.join(DATA_DIR, "dashboard_data.json")
@@ -106,6 +60,9 @@ def update_dashboard_data():
 def create_tariff_policy_summary():
     """
     최신 관세 정책 요약을 생성합니다.
+    
+    HS 코드 목록은 제품 목록(data/hs_products.json), 국가별 관세율은 관세 저장소의 최신 관세율,
+    수출 가격 지수는 HS 코드별 수출 가격 지수 통합 파일에서 가져옵니다.
     """
     print("최신 관세 정책 요약 생성 중...")
     
@@ -117,6 +74,35 @@ def create_tariff_policy_summary():
         with open(report_file, 'r', encoding='utf-8') as f:
             report_content = f.read()
     
+    # 제품 목록 전체의 (HS 코드, 국가) 관세율과 수출 가격 지수 (지수가 없는 칸은 NaN)
+    products = hs_export_pipeline.load_products()
+    registry = country_registry.get_registry()
+    countries = registry.codes.tolist()
+    tariffs = hs_export_pipeline.store_tariff_matrix(tariff_store.read_table(), products.hs_codes, countries)
+    indices = np.full(tariffs.shape, np.nan)
+    result = hs_export_pipeline.read_export_indices(
+        os.path.join(EXPORT_DATA_DIR, hs_export_pipeline.HS_EXPORT_INDEX_FILE_NAME))
+    if result is not None:
+        rows = country_registry.lookup(result.products.hs_codes, products.hs_codes)
+        columns = country_registry.lookup(result.countries, countries)
+        known_rows, known_columns = np.flatnonzero(rows >= 0), np.flatnonzero(columns >= 0)
+        indices[np.ix_(known_rows, known_columns)] = result.values[np.ix_(rows[known_rows], columns[known_columns])]
+    
+    def optional(values):
+        return [None if np.isnan(value) else value for value in values.tolist()]
+    
+    # 국가별 평균 관세율과 평균 수출 가격 지수
+    has_index = ~np.isnan(indices)
+    index_counts = has_index.sum(axis=0)
+    index_totals = np.where(has_index, indices, 0.0).sum(axis=0)
+    mean_indices = np.where(index_counts > 0, index_totals / np.maximum(index_counts, 1), np.nan)
+    mean_tariffs = tariffs.mean(axis=0)
+    duty_free = registry.names[mean_tariffs == 0].tolist()
+    
+    # HS 코드별 최저 수출 가격 국가 (지수가 없는 HS 코드는 None)
+    lowest = np.argmin(np.where(has_index, indices, np.inf), axis=1)
+    lowest_countries = [countries[column] if has_index[row].any() else None for row, column in enumerate(lowest.tolist())]
+    
     # 관세 정책 요약 생성
     summary = {
         "last_updated": datetime.now().strftime('%Y-%m-%d'),
@@ -125,47 +111,29 @@ def create_tariff_policy_summary():
         "key_points": [
             "2025년 4월 9일부터 새로운 상호관세 정책 적용",
             "중국 수입품에 대한 추가 25% 관세 부과",
-            "한국, EU, 멕시코는 무역협정으로 관세 혜택 유지",
-            "DC 모터(HS 8501.31)와 팬 모터(HS 8414.59)에 대한 국가별 차등 관세율 적용"
+            f"관세 면제 유지 국가: {', '.join(duty_free) if duty_free else '없음'}",
+            f"제품 목록의 HS 코드 {len(products.hs_codes)}개에 대한 국가별 차등 관세율 적용"
         ],
         "affected_countries": {
-            "KR": {
-                "name": "대한민국",
-                "impact": "한-미 FTA로 인해 관세 면제 유지, 경쟁력 우수",
-                "key_changes": "변동 없음 (0% 관세율 유지)"
-            },
-            "JP": {
-                "name": "일본",
-                "impact": "기본 관세율 적용으로 중간 수준의 경쟁력",
-                "key_changes": "변동 없음 (2.3~2.8% 관세율 유지)"
-            },
-            "CN": {
-                "name": "중국",
-                "impact": "추가 관세로 인해 경쟁력 크게 약화",
-                "key_changes": "25% 추가 관세 적용으로 총 27.3~27.5% 관세율"
-            },
-            "EU": {
-                "name": "유럽연합",
-                "impact": "미-EU 무역협정으로 관세 혜택 유지",
-                "key_changes": "변동 없음 (0% 관세율 유지)"
-            },
-            "MX": {
-                "name": "멕시코",
-                "impact": "USMCA로 인해 관세 면제 유지, 경쟁력 우수",
-                "key_changes": "변동 없음 (0% 관세율 유지)"
+            code: {
+                "name": name,
+                "mean_tariff_rate": tariff,
+                "mean_export_price_index": index
             }
+            for code, name, tariff, index in zip(countries, registry.names.tolist(), mean_tariffs.tolist(),
+                                                 optional(mean_indices))
         },
         "hs_codes": {
-            "8501.31": {
-                "description": "DC 모터, 출력 750W 이하",
-                "us_hscode": "8501.30-6000",
-                "key_changes": "중국산 제품에 대해 27.5% 관세율 적용 (기본 2.5% + 추가 25%)"
-            },
-            "8414.59": {
-                "description": "팬, 블로워 등",
-                "us_hscode": "8414.59-6595",
-                "key_changes": "중국산 제품에 대해 27.3% 관세율 적용 (기본 2.3% + 추가 25%)"
+            hs_code: {
+                "description": description,
+                "category": category or None,
+                "tariff_rates": dict(zip(countries, line_tariffs)),
+                "export_price_indices": dict(zip(countries, line_indices)),
+                "lowest_export_price_country": lowest_country
             }
+            for hs_code, description, category, line_tariffs, line_indices, lowest_country in zip(
+                products.hs_codes.tolist(), products.descriptions.tolist(), products.categories.tolist(),
+                tariffs.tolist(), [optional(line) for line in indices], lowest_countries)
         },
         "report_excerpt": report_content[:500] + "..." if report_content else "상세 보고서가 준비 중입니다."
     }
@@ -0,0 +1,348 @@
+"""
+데이터 업데이트 파이프라인
+
+이 모듈은 데이터 업데이트 단계를 의존성 그래프(DAG)로 선언하고 실행합니다.
+- 각 단계는 업데이트마다 정확히 한 번 실행됩니다.
+- 단계의 결과는 메모리로 의존 단계에 전달되며, 파일을 다시 읽지 않습니다.
+- 서로 독립적인 단계(관세 데이터 수집, 비용 데이터 수집)는 병렬로 실행됩니다.
+- 입력과 매개변수의 해시(fingerprint)가 이전 실행과 같은 단계는 저장된 결과를 재사용하고
+  파일을 다시 쓰지 않습니다.
+- 업데이트는 데이터 디렉토리의 잠금 파일(data/update.lock)을 가진 프로세스 하나만 실행합니다.
+  (예약 업데이트, 수동 업데이트, 여러 작업자가 같은 파일을 동시에 쓰지 않음)
+- 차트 이미지는 업데이트 단계에서 만들지 않습니다. 대시보드의 /charts/<종류>.<형식> 라우트가 처음 요청될 때
+  렌더링하고 데이터 세대별로 차트 서비스 캐시에 보관합니다.
+"""
+
+import os
+import json
+import time
+import hashlib
+import inspect
+import importlib
+from contextlib import contextmanager
+from datetime import datetime
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# 데이터 디렉토리 경로
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+TARIFF_DATA_DIR = os.path.join(DATA_DIR, 'tariff_data')
+COST_DATA_DIR = os.path.join(DATA_DIR, 'cost_data')
+EXPORT_DATA_DIR = os.path.join(DATA_DIR, 'export_data')
+
+# 단계 캐시 및 실행 보고서 파일
+STAGE_CACHE_FILE = os.path.join(DATA_DIR, 'pipeline_cache.json')
+RUN_REPORT_FILE = os.path.join(DATA_DIR, 'pipeline_report.json')
+
+# 업데이트 잠금 파일 (프로세스 간 단일 실행)
+UPDATE_LOCK_FILE = os.path.join(DATA_DIR, 'update.lock')
+
+# 파이프라인 단계 정의 (이름, 의존 단계 이름 목록, 실행 함수, 캐시 설정)
+# 실행 함수는 {의존 단계 이름: 결과} 딕셔너리를 인자로 받습니다.
+# 캐시 설정이 None인 단계는 항상 실행됩니다.
+PipelineStage = namedtuple('PipelineStage', ['name', 'deps', 'func', 'cache'], defaults=(None,))
+
+# 단계 캐시 설정
+# - code: 소스 코드가 fingerprint에 포함되는 모듈 목록 (수집 값이 코드에 있으므로)
+# - params: fingerprint에 포함되는 매개변수
+# - input_files: 내용이 fingerprint에 포함되는 입력 파일 목록
+# - output_files: 결과를 재사용하려면 존재해야 하는 출력 파일 목록
+# - input_digests: (입력 파일, 내용 해시 함수) 목록 (저장 시각 등 매번 바뀌는 값을 제외하고 해시해야 하는 파일)
+StageCache = namedtuple('StageCache', ['code', 'params', 'input_files', 'output_files', 'input_digests'],
+                        defaults=((), None, (), (), ()))
+
+# 파이프라인 실행 결과 ({단계 이름: 결과}, 실행 보고서)
+PipelineRun = namedtuple('PipelineRun', ['results', 'report'])
+
+# 비용 요소 수집 단계 (단계 이름, 수집 함수 이름)
+COST_FACTOR_COLLECTORS = [
+    ('corporate_tax', 'collect_corporate_tax_rates'),
+    ('interest_rate', 'collect_interest_rates'),
+    ('labor_cost', 'collect_labor_costs'),
+    ('land_cost', 'collect_land_costs'),
+    ('utility_cost', 'collect_utility_costs'),
+    ('logistics_cost', 'collect_logistics_costs'),
+    ('fx_inflation_risk', 'collect_fx_inflation_data')
+]
+
+def topological_order(stages):
+    """단계 목록을 의존성 순서로 정렬합니다. 순환 의존성이나 알 수 없는 의존 단계가 있으면 ValueError를 발생시킵니다."""
+    stage_map = {}
+    for stage in stages:
+        if stage.name in stage_map:
+            raise ValueError(f"중복된 단계 이름: {stage.name}")
+        stage_map[stage.name] = stage
+
+    for stage in stages:
+        for dep in stage.deps:
+            if dep not in stage_map:
+                raise ValueError(f"단계 '{stage.name}'의 의존 단계 '{dep}'가 존재하지 않습니다.")
+
+    order = []
+    state = {}
+
+    def visit(name):
+        if state.get(name) == 'done':
+            return
+        if state.get(name) == 'visiting':
+            raise ValueError(f"순환 의존성이 발견되었습니다: {name}")
+        state[name] = 'visiting'
+        for dep in stage_map[name].deps:
+            visit(dep)
+        state[name] = 'done'
+        order.append(stage_map[name])
+
+    for stage in stages:
+        visit(stage.name)
+
+    return order
+
+def stage_fingerprint(stage, inputs):
+    """단계의 입력 결과, 매개변수, 코드, 입력 파일 내용으로 fingerprint를 계산합니다."""
+    hasher = hashlib.sha256()
+    payload = {'stage': stage.name, 'params': stage.cache.params, 'inputs': inputs}
+    hasher.update(json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8'))
+
+    for module in stage.cache.code:
+        hasher.update(inspect.getsource(module).encode('utf-8'))
+
+    for file_path in stage.cache.input_files:
+        hasher.update(file_path.encode('utf-8'))
+        if os.path.exists(file_path):
+            with open(file_path, 'rb') as f:
+                hasher.update(f.read())
+        else:
+            hasher.update(b'<missing>')
+
+    for file_path, digest in stage.cache.input_digests:
+        hasher.update(file_path.encode('utf-8'))
+        hasher.update(digest(file_path).encode('utf-8') if os.path.exists(file_path) else b'<missing>')
+
+    return hasher.hexdigest()
+
+def load_stage_cache(cache_path):
+    """저장된 단계 캐시를 로드합니다. 파일이 없거나 손상된 경우 빈 캐시를 반환합니다."""
+    if not cache_path or not os.path.exists(cache_path):
+        return {}
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('stages', {})
+    except Exception as e:
+        print(f"파이프라인 캐시 로드 오류: {str(e)}")
+        return {}
+
+def write_json_atomic(file_path, data):
+    """JSON 파일을 임시 파일에 쓴 뒤 교체하여 원자적으로 저장합니다."""
+    temp_path = f"{file_path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, file_path)
+
+def run_pipeline(stages, progress=None, max_workers=4, cache_path=None):
+    """단계 그래프를 실행하고 PipelineRun(결과, 실행 보고서)을 반환합니다.
+
+    모든 의존 단계가 끝난 단계부터 스레드 풀에서 실행하므로 독립적인 단계는 병렬로 실행됩니다.
+    progress가 주어지면 각 단계의 시작과 종료 시 progress(단계 이름, 이벤트)를 호출합니다.
+    이벤트는 'start', 'finish', 'error', 'cached' 중 하나입니다.
+    cache_path가 주어지면 fingerprint가 이전 실행과 같은 캐시 가능 단계는 실행하지 않고
+    저장된 결과를 사용합니다('cached' 이벤트만 보고됩니다).
+    한 단계라도 실패하면 새 단계를 시작하지 않고 실행 중인 단계가 끝난 뒤 예외를 다시 발생시킵니다.
+    """
+    def report(name, event):
+        if progress:
+            progress(name, event)
+
+    pending = list(topological_order(stages))
+    stage_cache = load_stage_cache(cache_path)
+    results = {}
+    stage_reports = {}
+    running = {}
+    error = None
+
+    def run_stage(stage):
+        inputs = {dep: results[dep] for dep in stage.deps}
+        fingerprint = None
+
+        if stage.cache is not None:
+            fingerprint = stage_fingerprint(stage, inputs)
+            cached = stage_cache.get(stage.name)
+            if (cached and cached.get('fingerprint') == fingerprint
+                    and all(os.path.exists(path) for path in stage.cache.output_files)):
+                report(stage.name, 'cached')
+                return cached['result'], {'status': 'cached', 'fingerprint': fingerprint, 'duration_seconds': 0.0}
+
+        report(stage.name, 'start')
+        started = time.monotonic()
+        try:
+            result = stage.func(inputs)
+        except Exception:
+            report(stage.name, 'error')
+            raise
+        report(stage.name, 'finish')
+        return result, {
+            'status': 'ran',
+            'fingerprint': fingerprint,
+            'duration_seconds': round(time.monotonic() - started, 3)
+        }
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='pipeline') as executor:
+        while pending or running:
+            # 의존 단계가 모두 끝난 단계 시작
+            if error is None:
+                for stage in [stage for stage in pending if all(dep in results for dep in stage.deps)]:
+                    pending.remove(stage)
+                    running[executor.submit(run_stage, stage)] = stage
+
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                try:
+                    results[stage.name], stage_reports[stage.name] = future.result()
+                except Exception as e:
+                    stage_reports[stage.name] = {'status': 'error', 'error': str(e)}
+                    if error is None:
+                        error = e
+
+    # 새로 실행된 캐시 가능 단계의 결과 저장
+    if cache_path:
+        for stage in stages:
+            stage_report = stage_reports.get(stage.name, {})
+            if stage.cache is not None and stage_report.get('status') == 'ran':
+                stage_cache[stage.name] = {'fingerprint': stage_report['fingerprint'], 'result': results[stage.name]}
+        write_json_atomic(cache_path, {'updated_at': datetime.now().isoformat(), 'stages': stage_cache})
+
+    if error is not None:
+        raise error
+
+    run_report = {
+        'run_at': datetime.now().isoformat(),
+        'stages': [dict(name=stage.name, **stage_reports[stage.name]) for stage in stages if stage.name in stage_reports],
+        'cache_hits': [stage.name for stage in stages if stage_reports.get(stage.name, {}).get('status') == 'cached']
+    }
+    return PipelineRun(results, run_report)
+
+class UpdateInProgressError(RuntimeError):
+    """다른 프로세스나 스레드가 데이터 업데이트를 실행 중일 때 발생합니다."""
+
+@contextmanager
+def update_lock(path=None):
+    """데이터 업데이트 배타 잠금을 잡습니다. 이미 다른 곳에서 잡고 있으면 UpdateInProgressError가 발생합니다.
+
+    OS 파일 잠금이므로 잠금을 가진 프로세스가 종료되면 자동으로 해제됩니다.
+    """
+    scheduler_leader = importlib.import_module('src.scheduler_leader')
+    lock = scheduler_leader.FileLockLease(path or UPDATE_LOCK_FILE)
+    if not lock.acquire():
+        raise UpdateInProgressError("다른 데이터 업데이트가 실행 중입니다.")
+    try:
+        yield lock
+    finally:
+        lock.release()
+
+def build_update_stages():
+    """전체 데이터 업데이트 단계 그래프를 생성합니다."""
+    tariff_collector = importlib.import_module('src.tariff_data_collector')
+    cost_simulator = importlib.import_module('src.manufacturing_cost_simulator')
+    cost_index_engine = importlib.import_module('src.cost_index_engine')
+    export_calculator = importlib.import_module('src.export_price_calculator')
+    tariff_store = importlib.import_module('src.tariff_store')
+    country_registry = importlib.import_module('src.country_registry')
+    export_price_engine = importlib.import_module('src.export_price_engine')
+    hs_export_pipeline = importlib.import_module('src.hs_export_pipeline')
+    tariff_rules = importlib.import_module('src.tariff_rules')
+    product_categories = cost_simulator.load_product_categories()
+    category_stems = [category.replace(' ', '_') for category in product_categories]
+
+    def collect_tariffs(inputs):
+        tariff_collector.ensure_data_dir()
+        return tariff_collector.collect_tariff_data()
+
+    def make_cost_collector(func_name):
+        def collect(inputs):
+            cost_simulator.ensure_data_dir()
+            return getattr(cost_simulator, func_name)()
+        return collect
+
+    def factor_values_from(inputs):
+        return {factor: inputs[factor] for factor, _ in COST_FACTOR_COLLECTORS}
+
+    def cost_index(inputs):
+        return cost_simulator.calculate_manufacturing_cost_index(factor_values_from(inputs), visualize=False)
+
+    def category_indices(inputs):
+        return cost_simulator.simulate_product_categories(product_categories, factor_values_from(inputs), visualize=False)
+
+    def export_index(inputs):
+        cost_indices = {None: inputs['cost_index']}
+        cost_indices.update(inputs['category_indices'])
+        return export_calculator.calculate_export_prices_for_products(cost_indices, visualize=False)
+
+    # 각 비용 요소 수집 단계의 출력 파일
+    factor_files = {
+        'corporate_tax': "corporate_tax_rates.json",
+        'interest_rate': "interest_rates.json",
+        'labor_cost': "labor_costs.json",
+        'land_cost': "land_costs.json",
+        'utility_cost': "utility_costs.json",
+        'logistics_cost': "logistics_costs.json",
+        'fx_inflation_risk': "fx_inflation_data.json"
+    }
+    factor_stage_names = [factor for factor, _ in COST_FACTOR_COLLECTORS]
+
+    stages = [PipelineStage('tariff_data', [], collect_tariffs)]
+    stages += [
+        PipelineStage(factor, [], make_cost_collector(func_name), StageCache(
+            code=[cost_simulator],
+            params={'collector': func_name},
+            input_files=[country_registry.COUNTRIES_FILE],
+            output_files=[os.path.join(COST_DATA_DIR, factor_files[factor])]))
+        for factor, func_name in COST_FACTOR_COLLECTORS
+    ]
+    stages += [
+        PipelineStage('cost_index', factor_stage_names, cost_index, StageCache(
+            code=[cost_simulator, cost_index_engine],
+            output_files=[
+                os.path.join(COST_DATA_DIR, "manufacturing_cost_index.json"),
+                os.path.join(COST_DATA_DIR, "manufacturing_cost_index.csv")
+            ])),
+        PipelineStage('category_indices', factor_stage_names + ['cost_index'], category_indices, StageCache(
+            code=[cost_simulator, cost_index_engine],
+            params={'categories': product_categories},
+            output_files=[os.path.join(COST_DATA_DIR, f"manufacturing_cost_index_{stem}.json") for stem in category_stems])),
+        PipelineStage('export_index', ['tariff_data', 'cost_index', 'category_indices'], export_index, StageCache(
+            code=[export_calculator, export_price_engine, hs_export_pipeline, tariff_rules],
+            params={'categories': list(product_categories), 'tariff_as_of': hs_export_pipeline.tariff_as_of()},
+            input_files=[country_registry.COUNTRIES_FILE, tariff_rules.TARIFF_RULES_FILE, hs_export_pipeline.HS_PRODUCTS_FILE],
+            input_digests=[(os.path.join(TARIFF_DATA_DIR, "tariff_store.npz"), tariff_store.file_digest)],
+            output_files=[
+                os.path.join(EXPORT_DATA_DIR, "freight_costs.json"),
+                os.path.join(EXPORT_DATA_DIR, "trade_agreement_benefits.json"),
+                os.path.join(EXPORT_DATA_DIR, "export_price_index.json"),
+                os.path.join(EXPORT_DATA_DIR, "export_price_index.csv"),
+                os.path.join(EXPORT_DATA_DIR, "export_price_comparison_korean.txt")
+            ] + [
+                os.path.join(EXPORT_DATA_DIR, f"export_price_index_{stem}.{extension}")
+                for stem in category_stems for extension in ('json', 'csv')
+            ]))
+    ]
+    return stages
+
+def run_update_pipeline(progress=None, use_cache=True, lock=True):
+    """전체 데이터 업데이트 파이프라인을 실행하고 PipelineRun(결과, 실행 보고서)을 반환합니다.
+
+    실행 보고서는 캐시 적중 단계 목록과 함께 pipeline_report.json에도 저장됩니다.
+    lock이 참이면 업데이트 잠금을 잡고 실행합니다. (이미 잠금을 잡은 호출자는 lock=False)
+    다른 업데이트가 실행 중이면 UpdateInProgressError가 발생합니다.
+    """
+    if lock:
+        with update_lock():
+            return run_update_pipeline(progress=progress, use_cache=use_cache, lock=False)
+
+    run = run_pipeline(build_update_stages(), progress=progress,
+                       cache_path=STAGE_CACHE_FILE if use_cache else None)
+    write_json_atomic(RUN_REPORT_FILE, run.report)
+    print(f"파이프라인 실행 완료 (캐시 적중 단계: {', '.join(run.report['cache_hits']) or '없음'})")
+    return run
@@ -0,0 +1,54 @@
+"""
+웹 서버 진입점
+
+gunicorn 등 WSGI 서버에서 대시보드를 실행할 때 사용합니다.
+
+    gunicorn -w 4 -b 0.0.0.0:5000 src.wsgi:app
+
+작업자 프로세스는 Flask와 데이터 조회 계층만 import하고, 마지막으로 게시된 데이터 세대로 바로 요청을
+처리합니다. 데이터 업데이트 파이프라인, 스케줄러, pandas, matplotlib은 필요할 때만 로드되며,
+템플릿 파일은 없을 때만 생성합니다. (데이터 업데이트는 python -m src.auto_updater로 별도 실행)
+"""
+
+import os
+import sys
+import json
+import subprocess
+
+from src.dashboard_app import app, ensure_site_files
+
+# 프로젝트 루트 디렉토리 경로
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 웹 작업자가 import하지 않아야 하는 무거운 모듈
+HEAVY_MODULES = ('pandas', 'matplotlib', 'apscheduler', 'requests', 'bs4')
+
+ensure_site_files()
+
+def benchmark(repeat=3, module='src.wsgi'):
+    """새 인터프리터에서 module을 import하는 시간(초, repeat회 중 최솟값)과 로드된 무거운 모듈 목록을 측정합니다."""
+    code = (
+        "import sys, time, json\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"print(json.dumps({{'import_time': elapsed, 'heavy_modules': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))\n"
+    )
+    timings = []
+    heavy_modules = set()
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', code], cwd=ROOT_DIR, capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        timings.append(result['import_time'])
+        heavy_modules.update(result['heavy_modules'])
+
+    return {
+        'module': module,
+        'import_time': min(timings),
+        'heavy_modules': sorted(heavy_modules)
+    }
+
+if __name__ == "__main__":
+    summary = benchmark()
+    print(f"{summary['module']} import: {summary['import_time'] * 1000:.0f} ms "
+          f"(무거운 모듈: {', '.join(summary['heavy_modules']) or '없음'})")
@@ -3,12 +3,43 @@ document.addEventListener('DOMContentLoaded', function() {
     const updateDataBtn = document.getElementById('updateDataBtn');
     
     if (updateDataBtn) {
+        // 버튼 상태 복원
+        function resetButton() {
+            updateDataBtn.disabled = false;
+            updateDataBtn.textContent = '데이터 업데이트';
+        }
+        
+        // 작업 상태 주기적 확인
+        function pollJob(statusUrl) {
+            fetch(statusUrl)
+            .then(response => response.json())
+            .then(job => {
+                if (job.status === 'succeeded') {
+                    alert('데이터가 성공적으로 업데이트되었습니다. 페이지를 새로고침합니다.');
+                    location.reload();
+                } else if (job.status === 'failed') {
+                    alert('데이터 업데이트 중 오류가 발생했습니다.');
+                    resetButton();
+                } else {
+                    if (job.current_stages && job.current_stages.length > 0) {
+                        updateDataBtn.textContent = '업데이트 중... (' + job.current_stages.join(', ') + ')';
+                    }
+                    setTimeout(function() { pollJob(statusUrl); }, 2000);
+                }
+            })
+            .catch(error => {
+                console.error('Error:', error);
+                alert('데이터 업데이트 상태 확인 중 오류가 발생했습니다.');
+                resetButton();
+            });
+        }
+        
         updateDataBtn.addEventListener('click', function() {
             // 버튼 비활성화 및 텍스트 변경
             updateDataBtn.disabled = true;
             updateDataBtn.textContent = '업데이트 중...';
             
-            // 데이터 업데이트 요청
+            // 데이터 업데이트 작업 요청
             fetch('/update-data', {
                 method: 'POST',
                 headers: {
@@ -17,20 +48,12 @@ document.addEventListener('DOMContentLoaded', function() {
             })
             .then(response => response.json())
             .then(data => {
-                if (data.success) {
-                    alert('데이터가 성공적으로 업데이트되었습니다. 페이지를 새로고침합니다.');
-                    location.reload();
-                } else {
-                    alert('데이터 업데이트 중 오류가 발생했습니다.');
-                    updateDataBtn.disabled = false;
-                    updateDataBtn.textContent = '데이터 업데이트';
-                }
+                pollJob(data.status_url);
             })
             .catch(error => {
                 console.error('Error:', error);
                 alert('데이터 업데이트 요청 중 오류가 발생했습니다.');
-                updateDataBtn.disabled = false;
-                updateDataBtn.textContent = '데이터 업데이트';
+                resetButton();
             });
         });
     }